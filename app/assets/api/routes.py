@@ -1,3 +1,4 @@
+import asyncio
 import logging
 import uuid
 import urllib.parse
@@ -11,7 +12,7 @@ import app.assets.manager as manager
 from app import user_manager
 from app.assets.api import schemas_in
 from app.assets.helpers import get_query_dict
-from app.assets.scanner import seed_assets
+from app.assets.scanner import start_background_seed, get_scan_progress
 
 import folder_paths
 
@@ -60,17 +61,21 @@ async def list_assets(request: web.Request) -> web.Response:
     except ValidationError as ve:
         return _validation_error_response("INVALID_QUERY", ve)
 
-    payload = manager.list_assets(
-        include_tags=q.include_tags,
-        exclude_tags=q.exclude_tags,
-        name_contains=q.name_contains,
-        metadata_filter=q.metadata_filter,
-        limit=q.limit,
-        offset=q.offset,
-        sort=q.sort,
-        order=q.order,
-        owner_id=USER_MANAGER.get_request_user_id(request),
-    )
+    try:
+        payload = manager.list_assets(
+            include_tags=q.include_tags,
+            exclude_tags=q.exclude_tags,
+            name_contains=q.name_contains,
+            metadata_filter=q.metadata_filter,
+            limit=q.limit,
+            offset=q.offset,
+            sort=q.sort,
+            order=q.order,
+            owner_id=USER_MANAGER.get_request_user_id(request),
+            cursor=q.cursor,
+        )
+    except ValueError as e:
+        return _error_response(400, "INVALID_CURSOR", str(e))
     return web.json_response(payload.model_dump(mode="json", exclude_none=True))
 
 
@@ -97,6 +102,31 @@ async def get_asset(request: web.Request) -> web.Response:
     return web.json_response(result.model_dump(mode="json"), status=200)
 
 
+@ROUTES.post(f"/api/assets/{{id:{UUID_RE}}}/hash")
+async def hash_asset(request: web.Request) -> web.Response:
+    """
+    POST request to compute the content hash of an asset that was seeded without one.
+    """
+    asset_info_id = str(uuid.UUID(request.match_info["id"]))
+    try:
+        result = await manager.ensure_asset_hash(
+            asset_info_id=asset_info_id,
+            owner_id=USER_MANAGER.get_request_user_id(request),
+        )
+    except ValueError as e:
+        return _error_response(404, "ASSET_NOT_FOUND", str(e), {"id": asset_info_id})
+    except FileNotFoundError:
+        return _error_response(404, "FILE_NOT_FOUND", "Underlying file not found on disk.")
+    except Exception:
+        logging.exception(
+            "ensure_asset_hash failed for asset_info_id=%s, owner_id=%s",
+            asset_info_id,
+            USER_MANAGER.get_request_user_id(request),
+        )
+        return _error_response(500, "INTERNAL", "Unexpected server error.")
+    return web.json_response(result.model_dump(mode="json"), status=200)
+
+
 @ROUTES.get(f"/api/assets/{{id:{UUID_RE}}}/content")
 async def download_asset_content(request: web.Request) -> web.Response:
     # question: do we need disposition? could we just stick with one of these?
@@ -324,7 +354,7 @@ async def upload_asset(request: web.Request) -> web.Response:
         return _error_response(404, "ASSET_NOT_FOUND", "Provided hash not found and no file uploaded.")
 
     try:
-        created = manager.upload_asset_from_temp_path(
+        created = await manager.upload_asset_from_temp_path(
             spec,
             temp_path=tmp_path,
             client_filename=file_client_name,
@@ -405,6 +435,65 @@ async def delete_asset(request: web.Request) -> web.Response:
     return web.Response(status=204)
 
 
+@ROUTES.post("/api/assets/bulk")
+async def bulk_update_assets(request: web.Request) -> web.Response:
+    """
+    POST request to add/remove tags, replace user_metadata or set the preview of many assets at once.
+    """
+    try:
+        body = schemas_in.BulkUpdateAssetsBody.model_validate(await request.json())
+    except ValidationError as ve:
+        return _validation_error_response("INVALID_BODY", ve)
+    except Exception:
+        return _error_response(400, "INVALID_JSON", "Request body must be valid JSON.")
+
+    try:
+        result = manager.bulk_update_assets(
+            asset_info_ids=body.ids,
+            add_tags=body.add_tags,
+            remove_tags=body.remove_tags,
+            user_metadata=body.user_metadata,
+            set_preview="preview_id" in body.model_fields_set,
+            preview_asset_id=body.preview_id,
+            owner_id=USER_MANAGER.get_request_user_id(request),
+        )
+    except ValueError as ve:
+        return _error_response(404, "ASSET_NOT_FOUND", str(ve))
+    except Exception:
+        logging.exception(
+            "bulk_update_assets failed for %d assets, owner_id=%s",
+            len(body.ids),
+            USER_MANAGER.get_request_user_id(request),
+        )
+        return _error_response(500, "INTERNAL", "Unexpected server error.")
+    return web.json_response(result.model_dump(mode="json"), status=200)
+
+
+@ROUTES.post("/api/assets/bulk/delete")
+async def bulk_delete_assets(request: web.Request) -> web.Response:
+    try:
+        body = schemas_in.BulkDeleteAssetsBody.model_validate(await request.json())
+    except ValidationError as ve:
+        return _validation_error_response("INVALID_BODY", ve)
+    except Exception:
+        return _error_response(400, "INVALID_JSON", "Request body must be valid JSON.")
+
+    try:
+        result = manager.bulk_delete_asset_references(
+            asset_info_ids=body.ids,
+            owner_id=USER_MANAGER.get_request_user_id(request),
+            delete_content_if_orphan=body.delete_content,
+        )
+    except Exception:
+        logging.exception(
+            "bulk_delete_asset_references failed for %d assets, owner_id=%s",
+            len(body.ids),
+            USER_MANAGER.get_request_user_id(request),
+        )
+        return _error_response(500, "INTERNAL", "Unexpected server error.")
+    return web.json_response(result.model_dump(mode="json"), status=200)
+
+
 @ROUTES.get("/api/tags")
 async def get_tags(request: web.Request) -> web.Response:
     """
@@ -506,9 +595,17 @@ async def seed_assets_endpoint(request: web.Request) -> web.Response:
         return _error_response(400, "INVALID_BODY", "No valid roots specified")
 
     try:
-        seed_assets(tuple(valid_roots))
+        task = start_background_seed(tuple(valid_roots))
+        if task is not None:
+            await asyncio.shield(task)
     except Exception:
         logging.exception("seed_assets failed for roots=%s", valid_roots)
         return _error_response(500, "INTERNAL", "Seed operation failed")
 
     return web.json_response({"seeded": valid_roots}, status=200)
+
+
+@ROUTES.get("/api/assets/seed/status")
+async def seed_assets_status(request: web.Request) -> web.Response:
+    """Progress of the running or most recent background asset scan."""
+    return web.json_response({"scan": get_scan_progress()}, status=200)
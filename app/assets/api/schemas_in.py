@@ -1,4 +1,5 @@
 import json
+import uuid
 from typing import Any, Literal
 
 from pydantic import (
@@ -20,10 +21,18 @@ class ListAssetsQuery(BaseModel):
 
     limit: conint(ge=1, le=500) = 20
     offset: conint(ge=0) = 0
+    # Opaque keyset cursor from a previous page's next_cursor, preferred over offset for deep pages
+    cursor: str | None = None
 
     sort: Literal["name", "created_at", "updated_at", "size", "last_access_time"] = "created_at"
     order: Literal["asc", "desc"] = "desc"
 
+    @model_validator(mode="after")
+    def _cursor_or_offset(self):
+        if self.cursor and self.offset:
+            raise ValueError("Use either offset or cursor, not both.")
+        return self
+
     @field_validator("include_tags", "exclude_tags", mode="before")
     @classmethod
     def _split_csv_tags(cls, v):
@@ -152,6 +161,51 @@ class TagsRemove(TagsAdd):
     pass
 
 
+BULK_MAX_IDS = 10_000
+
+
+class BulkAssetIds(BaseModel):
+    model_config = ConfigDict(extra="ignore")
+    ids: list[str] = Field(..., min_length=1, max_length=BULK_MAX_IDS)
+
+    @field_validator("ids")
+    @classmethod
+    def _canonical_ids(cls, v: list[str]) -> list[str]:
+        out = []
+        for item in v:
+            try:
+                out.append(str(uuid.UUID(str(item))))
+            except ValueError:
+                raise ValueError(f"invalid asset id: {item!r}")
+        return list(dict.fromkeys(out))
+
+
+class BulkUpdateAssetsBody(BulkAssetIds):
+    """Changes applied to every asset in ids. preview_id: null clears the preview, leaving it out keeps it."""
+    add_tags: list[str] = Field(default_factory=list)
+    remove_tags: list[str] = Field(default_factory=list)
+    user_metadata: dict[str, Any] | None = None
+    preview_id: str | None = None
+
+    @field_validator("add_tags", "remove_tags")
+    @classmethod
+    def _normalize_tags(cls, v: list[str]) -> list[str]:
+        return TagsAdd.normalize_tags(v)
+
+    @model_validator(mode="after")
+    def _validate_ops(self):
+        if not (self.add_tags or self.remove_tags or self.user_metadata is not None or "preview_id" in self.model_fields_set):
+            raise ValueError("Provide at least one of: add_tags, remove_tags, user_metadata, preview_id.")
+        both = set(self.add_tags) & set(self.remove_tags)
+        if both:
+            raise ValueError(f"tags both added and removed: {sorted(both)}")
+        return self
+
+
+class BulkDeleteAssetsBody(BulkAssetIds):
+    delete_content: bool = True
+
+
 class UploadAssetSpec(BaseModel):
     """Upload Asset operation.
     - tags: ordered; first is root ('models'|'input'|'output');
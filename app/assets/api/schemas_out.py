@@ -27,6 +27,7 @@ class AssetsList(BaseModel):
     assets: list[AssetSummary]
     total: int
     has_more: bool
+    next_cursor: str | None = None
 
 
 class AssetUpdated(BaseModel):
@@ -91,3 +92,13 @@ class TagsRemove(BaseModel):
     removed: list[str] = Field(default_factory=list)
     not_present: list[str] = Field(default_factory=list)
     total_tags: list[str] = Field(default_factory=list)
+
+
+class AssetsBulkUpdated(BaseModel):
+    updated: list[str] = Field(default_factory=list)
+    not_found: list[str] = Field(default_factory=list)
+
+
+class AssetsBulkDeleted(BaseModel):
+    deleted: list[str] = Field(default_factory=list)
+    not_found: list[str] = Field(default_factory=list)
@@ -1,12 +1,14 @@
 import os
 import uuid
 import sqlalchemy
-from typing import Iterable
+from typing import Iterable, Sequence
 from sqlalchemy.orm import Session
 from sqlalchemy.dialects import sqlite
 
-from app.assets.helpers import utcnow
+from app.assets.helpers import normalize_tags, project_kv, utcnow
 from app.assets.database.models import Asset, AssetCacheState, AssetInfo, AssetInfoTag, AssetInfoMeta
+from app.assets.database.queries import visible_owner_clause
+from app.assets.database.tags import ensure_tags_exist
 
 MAX_BIND_PARAMS = 800
 
@@ -202,3 +204,168 @@ def bulk_insert_tags_and_meta(
         )
         for chunk in _chunk_rows(meta_rows, cols_per_row=7, max_bind_params=max_bind_params):
             session.execute(ins_meta, chunk)
+
+
+def select_visible_asset_info_ids(
+    session: Session,
+    *,
+    asset_info_ids: Sequence[str],
+    owner_id: str = "",
+) -> list[str]:
+    """Return the ids (deduplicated, in request order) of AssetInfo rows that exist and the owner may modify."""
+    wanted = list(dict.fromkeys(asset_info_ids))
+    found: set[str] = set()
+    for chunk in _iter_chunks(wanted, MAX_BIND_PARAMS):
+        result = session.execute(
+            sqlalchemy.select(AssetInfo.id).where(AssetInfo.id.in_(chunk)).where(visible_owner_clause(owner_id))
+        )
+        found.update(result.scalars().all())
+    return [i for i in wanted if i in found]
+
+
+def bulk_add_tags_to_asset_infos(
+    session: Session,
+    *,
+    asset_info_ids: Sequence[str],
+    tags: Sequence[str],
+    origin: str = "manual",
+) -> None:
+    """Link every tag to every AssetInfo, skipping links that already exist."""
+    norm = normalize_tags(tags)
+    if not norm or not asset_info_ids:
+        return
+    ensure_tags_exist(session, norm, tag_type="user")
+    now = utcnow()
+    tag_rows = [
+        {"asset_info_id": iid, "tag_name": t, "origin": origin, "added_at": now}
+        for iid in asset_info_ids
+        for t in norm
+    ]
+    bulk_insert_tags_and_meta(session, tag_rows=tag_rows, meta_rows=[], max_bind_params=MAX_BIND_PARAMS)
+
+
+def bulk_remove_tags_from_asset_infos(
+    session: Session,
+    *,
+    asset_info_ids: Sequence[str],
+    tags: Sequence[str],
+) -> None:
+    norm = normalize_tags(tags)
+    if not norm or not asset_info_ids:
+        return
+    for chunk in _iter_chunks(list(asset_info_ids), max(1, MAX_BIND_PARAMS - len(norm))):
+        session.execute(
+            sqlalchemy.delete(AssetInfoTag).where(
+                AssetInfoTag.asset_info_id.in_(chunk),
+                AssetInfoTag.tag_name.in_(norm),
+            )
+        )
+
+
+def bulk_replace_asset_info_metadata(
+    session: Session,
+    *,
+    asset_info_ids: Sequence[str],
+    user_metadata: dict,
+) -> None:
+    """
+    Replace user_metadata of many AssetInfo rows and rebuild their projection rows.
+    The computed 'filename' key of each row is kept, as update_asset_info_full does for single updates.
+    """
+    if not asset_info_ids:
+        return
+    now = utcnow()
+    info_rows: list[dict] = []
+    meta_rows: list[dict] = []
+    for chunk in _iter_chunks(list(asset_info_ids), MAX_BIND_PARAMS):
+        current = session.execute(
+            sqlalchemy.select(AssetInfo.id, AssetInfo.user_metadata).where(AssetInfo.id.in_(chunk))
+        ).all()
+        for iid, old_meta in current:
+            new_meta = dict(user_metadata)
+            filename = (old_meta or {}).get("filename")
+            if filename:
+                new_meta["filename"] = filename
+            info_rows.append({"id": iid, "user_metadata": new_meta, "updated_at": now})
+            for k, v in new_meta.items():
+                for r in project_kv(k, v):
+                    meta_rows.append(
+                        {
+                            "asset_info_id": iid,
+                            "key": r["key"],
+                            "ordinal": int(r["ordinal"]),
+                            "val_str": r.get("val_str"),
+                            "val_num": r.get("val_num"),
+                            "val_bool": r.get("val_bool"),
+                            "val_json": r.get("val_json"),
+                        }
+                    )
+        session.execute(sqlalchemy.delete(AssetInfoMeta).where(AssetInfoMeta.asset_info_id.in_(chunk)))
+
+    # ORM bulk UPDATE by primary key: one executemany per chunk
+    for chunk in _chunk_rows(info_rows, cols_per_row=3, max_bind_params=MAX_BIND_PARAMS):
+        session.execute(sqlalchemy.update(AssetInfo), chunk)
+    bulk_insert_tags_and_meta(session, tag_rows=[], meta_rows=meta_rows, max_bind_params=MAX_BIND_PARAMS)
+
+
+def bulk_set_asset_info_preview(
+    session: Session,
+    *,
+    asset_info_ids: Sequence[str],
+    preview_asset_id: str | None = None,
+) -> None:
+    """Set or clear preview_id on many AssetInfo rows. Raises ValueError on an unknown preview Asset."""
+    if preview_asset_id is not None and not session.get(Asset, preview_asset_id):
+        raise ValueError(f"Preview Asset {preview_asset_id} not found")
+    now = utcnow()
+    for chunk in _iter_chunks(list(asset_info_ids), MAX_BIND_PARAMS):
+        session.execute(
+            sqlalchemy.update(AssetInfo)
+            .where(AssetInfo.id.in_(chunk))
+            .values(preview_id=preview_asset_id, updated_at=now)
+        )
+
+
+def bulk_delete_asset_infos(
+    session: Session,
+    *,
+    asset_info_ids: Sequence[str],
+    delete_orphans: bool = True,
+) -> list[str]:
+    """
+    Delete AssetInfo rows together with their tag links and metadata projection.
+
+    With delete_orphans, Assets left without any AssetInfo are deleted too, along with their cache states.
+    Returns the file paths of the deleted Assets, the caller removes them once the transaction is committed.
+    """
+    if not asset_info_ids:
+        return []
+    ids = list(asset_info_ids)
+    asset_ids: set[str] = set()
+    for chunk in _iter_chunks(ids, MAX_BIND_PARAMS):
+        result = session.execute(sqlalchemy.select(AssetInfo.asset_id).where(AssetInfo.id.in_(chunk)))
+        asset_ids.update(result.scalars().all())
+        session.execute(sqlalchemy.delete(AssetInfoTag).where(AssetInfoTag.asset_info_id.in_(chunk)))
+        session.execute(sqlalchemy.delete(AssetInfoMeta).where(AssetInfoMeta.asset_info_id.in_(chunk)))
+        session.execute(sqlalchemy.delete(AssetInfo).where(AssetInfo.id.in_(chunk)))
+
+    if not delete_orphans or not asset_ids:
+        return []
+
+    candidates = sorted(asset_ids)
+    still_used: set[str] = set()
+    for chunk in _iter_chunks(candidates, MAX_BIND_PARAMS):
+        result = session.execute(sqlalchemy.select(AssetInfo.asset_id).where(AssetInfo.asset_id.in_(chunk)).distinct())
+        still_used.update(result.scalars().all())
+    orphans = [a for a in candidates if a not in still_used]
+
+    file_paths: list[str] = []
+    for chunk in _iter_chunks(orphans, MAX_BIND_PARAMS):
+        result = session.execute(sqlalchemy.select(AssetCacheState.file_path).where(AssetCacheState.asset_id.in_(chunk)))
+        file_paths.extend(result.scalars().all())
+        session.execute(sqlalchemy.delete(AssetCacheState).where(AssetCacheState.asset_id.in_(chunk)))
+        session.execute(
+            sqlalchemy.update(AssetInfo).where(AssetInfo.preview_id.in_(chunk)).values(preview_id=None)
+        )
+        session.execute(sqlalchemy.delete(Asset).where(Asset.id.in_(chunk)))
+    return file_paths
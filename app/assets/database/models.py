@@ -61,6 +61,7 @@ class Asset(Base):
     __table_args__ = (
         Index("uq_assets_hash", "hash", unique=True),
         Index("ix_assets_mime_type", "mime_type"),
+        Index("ix_assets_size_bytes", "size_bytes"),
         CheckConstraint("size_bytes >= 0", name="ck_assets_size_nonneg"),
     )
 
@@ -144,7 +145,10 @@ class AssetInfo(Base):
 
     __table_args__ = (
         UniqueConstraint("asset_id", "owner_id", "name", name="uq_assets_info_asset_owner_name"),
-        Index("ix_assets_info_owner_name", "owner_id", "name"),
+        Index("ix_assets_info_owner_name_id", "owner_id", "name", "id"),
+        Index("ix_assets_info_owner_created_at_id", "owner_id", "created_at", "id"),
+        Index("ix_assets_info_owner_updated_at_id", "owner_id", "updated_at", "id"),
+        Index("ix_assets_info_owner_last_access_time_id", "owner_id", "last_access_time", "id"),
         Index("ix_assets_info_owner_id", "owner_id"),
         Index("ix_assets_info_asset_id", "asset_id"),
         Index("ix_assets_info_name", "name"),
@@ -179,9 +183,9 @@ class AssetInfoMeta(Base):
 
     __table_args__ = (
         Index("ix_asset_info_meta_key", "key"),
-        Index("ix_asset_info_meta_key_val_str", "key", "val_str"),
-        Index("ix_asset_info_meta_key_val_num", "key", "val_num"),
-        Index("ix_asset_info_meta_key_val_bool", "key", "val_bool"),
+        Index("ix_asset_info_meta_key_val_str_info", "key", "val_str", "asset_info_id"),
+        Index("ix_asset_info_meta_key_val_num_info", "key", "val_num", "asset_info_id"),
+        Index("ix_asset_info_meta_key_val_bool_info", "key", "val_bool", "asset_info_id"),
     )
 
 
@@ -203,7 +207,7 @@ class AssetInfoTag(Base):
     tag: Mapped[Tag] = relationship(back_populates="asset_info_links")
 
     __table_args__ = (
-        Index("ix_asset_info_tags_tag_name", "tag_name"),
+        Index("ix_asset_info_tags_tag_name_info", "tag_name", "asset_info_id"),
         Index("ix_asset_info_tags_asset_info_id", "asset_info_id"),
     )
 
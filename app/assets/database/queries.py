@@ -4,7 +4,7 @@ import sqlalchemy as sa
 from collections import defaultdict
 from datetime import datetime
 from typing import Iterable, Any
-from sqlalchemy import select, delete, exists, func
+from sqlalchemy import select, delete, func
 from sqlalchemy.dialects import sqlite
 from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session, contains_eager, noload
@@ -39,10 +39,25 @@ def pick_best_live_path(states: Sequence[AssetCacheState]) -> str:
     return alive[0].file_path
 
 
+def _filter_term(clause: sa.sql.ClauseElement, ordered_scan: bool) -> sa.sql.ClauseElement:
+    """
+    Filters are uncorrelated IN subqueries, so SQLite builds each id set once from a covering index.
+
+    Left alone, the planner may drive the query from such a set, which is ideal for counting but means sorting
+    every match before a page can be returned. Marking the term as likely true (ordered_scan) makes SQLite walk
+    the sort index instead and stop once the page is full; ANALYZE statistics are averages and cannot tell a
+    tag on 5 assets from one on half of them.
+    """
+    if ordered_scan:
+        return sa.func.likelihood(clause, sa.literal_column("0.9"), type_=sa.Boolean)
+    return clause
+
+
 def apply_tag_filters(
     stmt: sa.sql.Select,
     include_tags: Sequence[str] | None = None,
     exclude_tags: Sequence[str] | None = None,
+    ordered_scan: bool = False,
 ) -> sa.sql.Select:
     """include_tags: every tag must be present; exclude_tags: none may be present."""
     include_tags = normalize_tags(include_tags)
@@ -50,45 +65,37 @@ def apply_tag_filters(
 
     if include_tags:
         for tag_name in include_tags:
-            stmt = stmt.where(
-                exists().where(
-                    (AssetInfoTag.asset_info_id == AssetInfo.id)
-                    & (AssetInfoTag.tag_name == tag_name)
-                )
-            )
+            stmt = stmt.where(_filter_term(
+                AssetInfo.id.in_(select(AssetInfoTag.asset_info_id).where(AssetInfoTag.tag_name == tag_name)),
+                ordered_scan,
+            ))
 
     if exclude_tags:
-        stmt = stmt.where(
-            ~exists().where(
-                (AssetInfoTag.asset_info_id == AssetInfo.id)
-                & (AssetInfoTag.tag_name.in_(exclude_tags))
-            )
-        )
+        stmt = stmt.where(_filter_term(
+            AssetInfo.id.not_in(select(AssetInfoTag.asset_info_id).where(AssetInfoTag.tag_name.in_(exclude_tags))),
+            ordered_scan,
+        ))
     return stmt
 
 
 def apply_metadata_filter(
     stmt: sa.sql.Select,
     metadata_filter: dict | None = None,
+    ordered_scan: bool = False,
 ) -> sa.sql.Select:
     """Apply filters using asset_info_meta projection table."""
     if not metadata_filter:
         return stmt
 
     def _exists_for_pred(key: str, *preds) -> sa.sql.ClauseElement:
-        return sa.exists().where(
-            AssetInfoMeta.asset_info_id == AssetInfo.id,
-            AssetInfoMeta.key == key,
-            *preds,
+        return AssetInfo.id.in_(
+            select(AssetInfoMeta.asset_info_id).where(AssetInfoMeta.key == key, *preds)
         )
 
     def _exists_clause_for_value(key: str, value) -> sa.sql.ClauseElement:
         if value is None:
-            no_row_for_key = sa.not_(
-                sa.exists().where(
-                    AssetInfoMeta.asset_info_id == AssetInfo.id,
-                    AssetInfoMeta.key == key,
-                )
+            no_row_for_key = AssetInfo.id.not_in(
+                select(AssetInfoMeta.asset_info_id).where(AssetInfoMeta.key == key)
             )
             null_row = _exists_for_pred(
                 key,
@@ -113,9 +120,9 @@ def apply_metadata_filter(
         if isinstance(v, list):
             ors = [_exists_clause_for_value(k, elem) for elem in v]
             if ors:
-                stmt = stmt.where(sa.or_(*ors))
+                stmt = stmt.where(_filter_term(sa.or_(*ors), ordered_scan))
         else:
-            stmt = stmt.where(_exists_clause_for_value(k, v))
+            stmt = stmt.where(_filter_term(_exists_clause_for_value(k, v), ordered_scan))
     return stmt
 
 
@@ -159,6 +166,51 @@ def get_asset_by_hash(
     ).scalars().first()
 
 
+def assign_asset_hash(
+    session: Session,
+    *,
+    asset_id: str,
+    asset_hash: str,
+) -> str:
+    """Record the content hash of a seed Asset and return the id of the Asset that now holds it.
+
+    If another Asset already has this hash, the seed Asset is merged into it: its cache states, infos and
+    preview references move over, infos that would duplicate an existing (owner_id, name) are dropped.
+    """
+    asset = session.get(Asset, asset_id)
+    if asset is None:
+        raise ValueError(f"Asset {asset_id} not found")
+    if asset.hash == asset_hash:
+        return asset.id
+
+    existing = get_asset_by_hash(session, asset_hash=asset_hash)
+    if existing is None:
+        asset.hash = asset_hash
+        session.flush()
+        return asset.id
+
+    target_id = existing.id
+    taken = set(
+        session.execute(
+            select(AssetInfo.owner_id, AssetInfo.name).where(AssetInfo.asset_id == target_id)
+        ).tuples().all()
+    )
+    rows = session.execute(
+        select(AssetInfo.id, AssetInfo.owner_id, AssetInfo.name).where(AssetInfo.asset_id == asset_id)
+    ).all()
+    duplicate_ids = [iid for iid, owner, name in rows if (owner, name) in taken]
+    if duplicate_ids:
+        session.execute(delete(AssetInfoTag).where(AssetInfoTag.asset_info_id.in_(duplicate_ids)))
+        session.execute(delete(AssetInfoMeta).where(AssetInfoMeta.asset_info_id.in_(duplicate_ids)))
+        session.execute(delete(AssetInfo).where(AssetInfo.id.in_(duplicate_ids)))
+    session.execute(sa.update(AssetInfo).where(AssetInfo.asset_id == asset_id).values(asset_id=target_id))
+    session.execute(sa.update(AssetInfo).where(AssetInfo.preview_id == asset_id).values(preview_id=target_id))
+    session.execute(sa.update(AssetCacheState).where(AssetCacheState.asset_id == asset_id).values(asset_id=target_id))
+    session.execute(delete(Asset).where(Asset.id == asset_id))
+    session.expire_all()
+    return target_id
+
+
 def get_asset_info_by_id(
     session: Session,
     *,
@@ -167,6 +219,15 @@ def get_asset_info_by_id(
     return session.get(AssetInfo, asset_info_id)
 
 
+LIST_SORT_COLUMNS = {
+    "name": AssetInfo.name,
+    "created_at": AssetInfo.created_at,
+    "updated_at": AssetInfo.updated_at,
+    "last_access_time": AssetInfo.last_access_time,
+    "size": Asset.size_bytes,
+}
+
+
 def list_asset_infos_page(
     session: Session,
     owner_id: str = "",
@@ -178,7 +239,14 @@ def list_asset_infos_page(
     offset: int = 0,
     sort: str = "created_at",
     order: str = "desc",
+    after: tuple[Any, str] | None = None,
 ) -> tuple[list[AssetInfo], dict[str, list[str]], int]:
+    """
+    One page of AssetInfo rows ordered by (sort, id).
+
+    after is a keyset cursor: the (sort value, id) of the last row of the previous page. Rows after it are
+    returned without scanning the skipped ones, unlike offset which SQLite has to walk through.
+    """
     base = (
         select(AssetInfo)
         .join(Asset, Asset.id == AssetInfo.asset_id)
@@ -190,27 +258,27 @@ def list_asset_infos_page(
         escaped, esc = escape_like_prefix(name_contains)
         base = base.where(AssetInfo.name.ilike(f"%{escaped}%", escape=esc))
 
-    base = apply_tag_filters(base, include_tags, exclude_tags)
-    base = apply_metadata_filter(base, metadata_filter)
+    base = apply_tag_filters(base, include_tags, exclude_tags, ordered_scan=True)
+    base = apply_metadata_filter(base, metadata_filter, ordered_scan=True)
 
     sort = (sort or "created_at").lower()
     order = (order or "desc").lower()
-    sort_map = {
-        "name": AssetInfo.name,
-        "created_at": AssetInfo.created_at,
-        "updated_at": AssetInfo.updated_at,
-        "last_access_time": AssetInfo.last_access_time,
-        "size": Asset.size_bytes,
-    }
-    sort_col = sort_map.get(sort, AssetInfo.created_at)
-    sort_exp = sort_col.desc() if order == "desc" else sort_col.asc()
+    sort_col = LIST_SORT_COLUMNS.get(sort, AssetInfo.created_at)
+    if order == "desc":
+        order_by = (sort_col.desc(), AssetInfo.id.desc())
+    else:
+        order_by = (sort_col.asc(), AssetInfo.id.asc())
 
-    base = base.order_by(sort_exp).limit(limit).offset(offset)
+    if after is not None:
+        key = sa.tuple_(sort_col, AssetInfo.id)
+        base = base.where(key < sa.tuple_(*after) if order == "desc" else key > sa.tuple_(*after))
 
+    base = base.order_by(*order_by).limit(limit).offset(offset)
+
+    # asset_id is a non-null FK, so the count does not need the Asset join and stays on assets_info indexes
     count_stmt = (
         select(sa.func.count())
         .select_from(AssetInfo)
-        .join(Asset, Asset.id == AssetInfo.asset_id)
         .where(visible_owner_clause(owner_id))
     )
     if name_contains:
@@ -2,9 +2,16 @@ from blake3 import blake3
 from typing import IO
 import os
 import asyncio
+import threading
+import concurrent.futures
 
 
 DEFAULT_CHUNK = 8 * 1024 *1024 # 8MB
+HASH_MAX_WORKERS = max(1, min(4, os.cpu_count() or 1))
+
+_hash_pool: concurrent.futures.ThreadPoolExecutor | None = None
+_hash_lock = threading.RLock()
+_hash_in_flight: dict[tuple[str, int, int], concurrent.futures.Future] = {}
 
 # NOTE: this allows hashing different representations of a file-like object
 def blake3_hash(
@@ -73,3 +80,38 @@ def _hash_file_obj(file_obj: IO, chunk_size: int = DEFAULT_CHUNK) -> str:
         # restore original position in file object, if needed
         if orig_pos != 0:
             file_obj.seek(orig_pos)
+
+
+def _get_hash_pool() -> concurrent.futures.ThreadPoolExecutor:
+    global _hash_pool
+    with _hash_lock:
+        if _hash_pool is None:
+            _hash_pool = concurrent.futures.ThreadPoolExecutor(max_workers=HASH_MAX_WORKERS, thread_name_prefix="blake3")
+        return _hash_pool
+
+
+def submit_blake3_hash(path: str, chunk_size: int = DEFAULT_CHUNK) -> concurrent.futures.Future:
+    """
+    Hash a file in the shared, bounded hashing pool and return a future with the hex digest.
+    Concurrent requests for the same unchanged file (path, size, mtime) share a single job, so
+    on-demand hashing of large models never runs more than ``HASH_MAX_WORKERS`` reads at once.
+    """
+    st = os.stat(path, follow_symlinks=True)
+    key = (os.path.abspath(path), st.st_size, getattr(st, "st_mtime_ns", int(st.st_mtime * 1_000_000_000)))
+    with _hash_lock:
+        future = _hash_in_flight.get(key)
+        if future is None:
+            future = _get_hash_pool().submit(blake3_hash, key[0], chunk_size)
+            _hash_in_flight[key] = future
+            future.add_done_callback(lambda _f: _forget_hash_job(key))
+        return future
+
+
+def _forget_hash_job(key: tuple[str, int, int]) -> None:
+    with _hash_lock:
+        _hash_in_flight.pop(key, None)
+
+
+async def blake3_hash_on_demand(path: str, chunk_size: int = DEFAULT_CHUNK) -> str:
+    """Async wrapper for ``submit_blake3_hash``."""
+    return await asyncio.wrap_future(submit_blake3_hash(path, chunk_size))
@@ -25,14 +25,12 @@ def get_query_dict(request: web.Request) -> dict[str, Any]:
     return query_dict
 
 def list_tree(base_dir: str) -> list[str]:
-    out: list[str] = []
     base_abs = os.path.abspath(base_dir)
     if not os.path.isdir(base_abs):
-        return out
-    for dirpath, _subdirs, filenames in os.walk(base_abs, topdown=True, followlinks=False):
-        for name in filenames:
-            out.append(os.path.abspath(os.path.join(dirpath, name)))
-    return out
+        return []
+    # Same semantics as os.walk(followlinks=False): links to directories are not descended into
+    snapshot = folder_paths.get_directory_snapshot(base_abs, follow_symlinks=False)
+    return [full_path for _rel, full_path, _stats in snapshot.entries()]
 
 def prefixes_for_root(root: RootType) -> list[str]:
     if root == "models":
@@ -1,9 +1,13 @@
 import os
+import json
+import base64
+import importlib.util
 import mimetypes
 import contextlib
-from typing import Sequence
+from datetime import datetime
+from typing import Any, Sequence
 
-from app.database.db import create_session
+from app.database.db import can_create_session, create_read_session, create_session, queue_write
 from app.assets.api import schemas_out, schemas_in
 from app.assets.database.queries import (
     asset_exists_by_hash,
@@ -25,8 +29,22 @@ from app.assets.database.queries import (
     pick_best_live_path,
     ingest_fs_asset,
     set_asset_info_preview,
+    assign_asset_hash,
+)
+from app.assets.database.bulk_ops import (
+    select_visible_asset_info_ids,
+    bulk_add_tags_to_asset_infos,
+    bulk_remove_tags_from_asset_infos,
+    bulk_replace_asset_info_metadata,
+    bulk_set_asset_info_preview,
+    bulk_delete_asset_infos,
+)
+from app.assets.helpers import (
+    resolve_destination_from_tags,
+    ensure_within_base,
+    fast_asset_file_check,
+    get_name_and_tags_from_asset_path,
 )
-from app.assets.helpers import resolve_destination_from_tags, ensure_within_base
 from app.assets.database.models import Asset
 
 
@@ -39,6 +57,35 @@ def _safe_sort_field(requested: str | None) -> str:
     return "created_at"
 
 
+def _encode_list_cursor(sort: str, order: str, info) -> str:
+    if sort == "size":
+        value = int(info.asset.size_bytes)
+    elif sort == "name":
+        value = info.name
+    else:
+        value = getattr(info, sort).isoformat()
+    raw = json.dumps([sort, order, value, info.id], separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def _decode_list_cursor(cursor: str, sort: str, order: str) -> tuple[Any, str]:
+    """Return the (sort value, id) keyset position encoded in a cursor. Raises ValueError if it is invalid."""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        c_sort, c_order, value, info_id = json.loads(raw)
+        if sort in {"created_at", "updated_at", "last_access_time"}:
+            value = datetime.fromisoformat(value)
+        elif sort == "size":
+            value = int(value)
+        elif not isinstance(value, str):
+            raise TypeError
+    except (ValueError, TypeError) as e:
+        raise ValueError(f"invalid cursor: {e}")
+    if (c_sort, c_order) != (sort, order):
+        raise ValueError("cursor was issued for a different sort order")
+    return value, str(info_id)
+
+
 def _get_size_mtime_ns(path: str) -> tuple[int, int]:
     st = os.stat(path, follow_symlinks=True)
     return st.st_size, getattr(st, "st_mtime_ns", int(st.st_mtime * 1_000_000_000))
@@ -55,7 +102,7 @@ def asset_exists(*, asset_hash: str) -> bool:
     """
     Check if an asset with a given hash exists in database.
     """
-    with create_session() as session:
+    with create_read_session() as session:
         return asset_exists_by_hash(session, asset_hash=asset_hash)
 
 
@@ -70,11 +117,13 @@ def list_assets(
     sort: str = "created_at",
     order: str = "desc",
     owner_id: str = "",
+    cursor: str | None = None,
 ) -> schemas_out.AssetsList:
     sort = _safe_sort_field(sort)
     order = "desc" if (order or "desc").lower() not in {"asc", "desc"} else order.lower()
+    after = _decode_list_cursor(cursor, sort, order) if cursor else None
 
-    with create_session() as session:
+    with create_read_session() as session:
         infos, tag_map, total = list_asset_infos_page(
             session,
             owner_id=owner_id,
@@ -82,11 +131,14 @@ def list_assets(
             exclude_tags=exclude_tags,
             name_contains=name_contains,
             metadata_filter=metadata_filter,
-            limit=limit,
+            limit=limit + 1,
             offset=offset,
             sort=sort,
             order=order,
+            after=after,
         )
+    has_more = len(infos) > limit
+    infos = infos[:limit]
 
     summaries: list[schemas_out.AssetSummary] = []
     for info in infos:
@@ -109,7 +161,8 @@ def list_assets(
     return schemas_out.AssetsList(
         assets=summaries,
         total=total,
-        has_more=(offset + len(summaries)) < total,
+        has_more=has_more,
+        next_cursor=_encode_list_cursor(sort, order, infos[-1]) if has_more else None,
     )
 
 
@@ -118,7 +171,7 @@ def get_asset(
     asset_info_id: str,
     owner_id: str = "",
 ) -> schemas_out.AssetDetail:
-    with create_session() as session:
+    with create_read_session() as session:
         res = fetch_asset_info_asset_and_tags(session, asset_info_id=asset_info_id, owner_id=owner_id)
         if not res:
             raise ValueError(f"AssetInfo {asset_info_id} not found")
@@ -139,12 +192,45 @@ def get_asset(
     )
 
 
+async def ensure_asset_hash(
+    *,
+    asset_info_id: str,
+    owner_id: str = "",
+) -> schemas_out.AssetDetail:
+    """
+    Hash the content of a seed asset on demand (scans never hash) and return the updated details.
+    Hashing runs in the bounded hashing pool, so the event loop is not blocked.
+    """
+    with create_read_session() as session:
+        pair = fetch_asset_info_and_asset(session, asset_info_id=asset_info_id, owner_id=owner_id)
+        if not pair:
+            raise ValueError(f"AssetInfo {asset_info_id} not found")
+        _info, asset = pair
+        if asset.hash:
+            asset_id = None
+        else:
+            asset_id = asset.id
+            abs_path = pick_best_live_path(list_cache_states_by_asset_id(session, asset_id=asset.id))
+            if not abs_path:
+                raise FileNotFoundError
+
+    if asset_id is not None:
+        # NOTE: blake3 is not required right now, so this will fail if blake3 is not installed in local environment
+        import app.assets.hashing as hashing
+        digest = await hashing.blake3_hash_on_demand(abs_path)
+        with create_session() as session:
+            assign_asset_hash(session, asset_id=asset_id, asset_hash="blake3:" + digest)
+            session.commit()
+
+    return get_asset(asset_info_id=asset_info_id, owner_id=owner_id)
+
+
 def resolve_asset_content_for_download(
     *,
     asset_info_id: str,
     owner_id: str = "",
 ) -> tuple[str, str, str]:
-    with create_session() as session:
+    with create_read_session() as session:
         pair = fetch_asset_info_and_asset(session, asset_info_id=asset_info_id, owner_id=owner_id)
         if not pair:
             raise ValueError(f"AssetInfo {asset_info_id} not found")
@@ -155,15 +241,15 @@ def resolve_asset_content_for_download(
         if not abs_path:
             raise FileNotFoundError
 
-        touch_asset_info_by_id(session, asset_info_id=asset_info_id)
-        session.commit()
+        # Access time is bookkeeping, so do not make the download wait for the write lock
+        queue_write(touch_asset_info_by_id, asset_info_id=asset_info_id)
 
         ctype = asset.mime_type or mimetypes.guess_type(info.name or abs_path)[0] or "application/octet-stream"
         download_name = info.name or os.path.basename(abs_path)
         return abs_path, ctype, download_name
 
 
-def upload_asset_from_temp_path(
+async def upload_asset_from_temp_path(
     spec: schemas_in.UploadAssetSpec,
     *,
     temp_path: str,
@@ -173,11 +259,12 @@ def upload_asset_from_temp_path(
 ) -> schemas_out.AssetCreated:
     """
     Create new asset or update existing asset from a temporary file path.
+    Hashing runs in the bounded hashing pool, so the event loop is not blocked.
     """
     try:
         # NOTE: blake3 is not required right now, so this will fail if blake3 is not installed in local environment
         import app.assets.hashing as hashing
-        digest = hashing.blake3_hash(temp_path)
+        digest = await hashing.blake3_hash_on_demand(temp_path)
     except Exception as e:
         raise RuntimeError(f"failed to hash uploaded file: {e}")
     asset_hash = "blake3:" + digest
@@ -289,6 +376,61 @@ def upload_asset_from_temp_path(
     return created_result
 
 
+def upload_dedupe_available() -> bool:
+    """Deduplicating uploads need the database for the hash index and blake3 to hash the upload."""
+    return can_create_session() and importlib.util.find_spec("blake3") is not None
+
+
+def find_file_by_hash(*, asset_hash: str, base_dir: str) -> str | None:
+    """
+    Return a file under base_dir whose content has the given hash, or None.
+    Files whose size or mtime changed since they were recorded are skipped, as their content may have changed.
+    """
+    base_dir = os.path.abspath(base_dir)
+    with create_read_session() as session:
+        asset = get_asset_by_hash(session, asset_hash=asset_hash)
+        if asset is None:
+            return None
+        size_bytes = asset.size_bytes
+        states = [(s.file_path, s.mtime_ns) for s in list_cache_states_by_asset_id(session, asset_id=asset.id)]
+
+    for file_path, mtime_ns in states:
+        try:
+            if os.path.commonpath((base_dir, os.path.abspath(file_path))) != base_dir:
+                continue
+            st = os.stat(file_path)
+        except (OSError, ValueError):
+            continue
+        if fast_asset_file_check(mtime_db=mtime_ns, size_db=size_bytes, stat_result=st):
+            return file_path
+    return None
+
+
+def register_file_hash(*, abs_path: str, asset_hash: str) -> None:
+    """
+    Record the hash of a file in the input or output folder, so later uploads of the same content find it.
+    Files outside the folders the asset database tracks are ignored.
+    """
+    try:
+        name, tags = get_name_and_tags_from_asset_path(abs_path)
+    except ValueError:
+        return
+    size_bytes, mtime_ns = _get_size_mtime_ns(abs_path)
+    with create_session() as session:
+        ingest_fs_asset(
+            session,
+            asset_hash=asset_hash,
+            abs_path=abs_path,
+            size_bytes=size_bytes,
+            mtime_ns=mtime_ns,
+            mime_type=mimetypes.guess_type(name, strict=False)[0],
+            info_name=name,
+            tags=tags,
+            tag_origin="automatic",
+        )
+        session.commit()
+
+
 def update_asset(
     *,
     asset_info_id: str,
@@ -401,6 +543,58 @@ def delete_asset_reference(*, asset_info_id: str, owner_id: str, delete_content_
     return True
 
 
+def bulk_update_assets(
+    *,
+    asset_info_ids: Sequence[str],
+    add_tags: Sequence[str] | None = None,
+    remove_tags: Sequence[str] | None = None,
+    user_metadata: dict | None = None,
+    set_preview: bool = False,
+    preview_asset_id: str | None = None,
+    owner_id: str = "",
+) -> schemas_out.AssetsBulkUpdated:
+    """
+    Apply the same tag, metadata and preview changes to many assets in one transaction.
+    Assets that do not exist or belong to another owner are reported in not_found and left untouched.
+    """
+    wanted = list(dict.fromkeys(asset_info_ids))
+    with create_session() as session:
+        ids = select_visible_asset_info_ids(session, asset_info_ids=wanted, owner_id=owner_id)
+        if ids:
+            if set_preview:
+                bulk_set_asset_info_preview(session, asset_info_ids=ids, preview_asset_id=preview_asset_id)
+            if remove_tags:
+                bulk_remove_tags_from_asset_infos(session, asset_info_ids=ids, tags=remove_tags)
+            if add_tags:
+                bulk_add_tags_to_asset_infos(session, asset_info_ids=ids, tags=add_tags, origin="manual")
+            if user_metadata is not None:
+                bulk_replace_asset_info_metadata(session, asset_info_ids=ids, user_metadata=user_metadata)
+        session.commit()
+
+    found = set(ids)
+    return schemas_out.AssetsBulkUpdated(updated=ids, not_found=[i for i in wanted if i not in found])
+
+
+def bulk_delete_asset_references(
+    *,
+    asset_info_ids: Sequence[str],
+    owner_id: str,
+    delete_content_if_orphan: bool = True,
+) -> schemas_out.AssetsBulkDeleted:
+    wanted = list(dict.fromkeys(asset_info_ids))
+    with create_session() as session:
+        ids = select_visible_asset_info_ids(session, asset_info_ids=wanted, owner_id=owner_id)
+        file_paths = bulk_delete_asset_infos(session, asset_info_ids=ids, delete_orphans=delete_content_if_orphan)
+        session.commit()
+
+    for p in file_paths:
+        with contextlib.suppress(Exception):
+            if p and os.path.isfile(p):
+                os.remove(p)
+    found = set(ids)
+    return schemas_out.AssetsBulkDeleted(deleted=ids, not_found=[i for i in wanted if i not in found])
+
+
 def create_asset_from_hash(
     *,
     hash_str: str,
@@ -501,7 +695,7 @@ def list_tags(
     limit = max(1, min(1000, limit))
     offset = max(0, offset)
 
-    with create_session() as session:
+    with create_read_session() as session:
         rows, total = list_tags_with_usage(
             session,
             prefix=prefix,
@@ -1,8 +1,10 @@
+import asyncio
 import contextlib
 import time
 import logging
 import os
 import sqlalchemy
+from typing import Iterator
 
 import folder_paths
 from app.database.db import create_session, dependencies_available
@@ -16,6 +18,44 @@ from app.assets.database.bulk_ops import seed_from_paths_batch
 from app.assets.database.models import Asset, AssetCacheState, AssetInfo
 
 
+SEED_BATCH_SIZE = 500
+
+_STEPS_DONE = object()
+_background_task: asyncio.Task | None = None
+_background_roots: tuple[RootType, ...] = ()
+_last_progress: "ScanProgress | None" = None
+
+
+class ScanProgress:
+    """Progress of one assets scan, readable while the scan runs."""
+
+    def __init__(self, roots: tuple[RootType, ...]):
+        self.roots = roots
+        self.phase = "pending"
+        self.total = 0
+        self.processed = 0
+        self.created = 0
+        self.skipped_existing = 0
+        self.orphans_pruned = 0
+        self.started_at = time.time()
+        self.finished_at: float | None = None
+        self.error: str | None = None
+
+    def to_dict(self) -> dict:
+        return {
+            "roots": list(self.roots),
+            "phase": self.phase,
+            "total": self.total,
+            "processed": self.processed,
+            "created": self.created,
+            "skipped_existing": self.skipped_existing,
+            "orphans_pruned": self.orphans_pruned,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+            "error": self.error,
+        }
+
+
 def seed_assets(roots: tuple[RootType, ...], enable_logging: bool = False) -> None:
     """
     Scan the given roots and seed the assets into the database.
@@ -24,39 +64,130 @@ def seed_assets(roots: tuple[RootType, ...], enable_logging: bool = False) -> No
         if enable_logging:
             logging.warning("Database dependencies not available, skipping assets scan")
         return
-    t_start = time.perf_counter()
-    created = 0
-    skipped_existing = 0
-    orphans_pruned = 0
-    paths: list[str] = []
+    progress = ScanProgress(tuple(roots))
     try:
-        existing_paths: set[str] = set()
-        for r in roots:
-            try:
-                survivors: set[str] = _fast_db_consistency_pass(r, collect_existing_paths=True, update_missing_tags=True)
-                if survivors:
-                    existing_paths.update(survivors)
-            except Exception as e:
-                logging.exception("fast DB scan failed for %s: %s", r, e)
+        for _ in _seed_steps(progress):
+            pass
+    finally:
+        _finish_scan(progress, enable_logging)
+
+
+def start_background_seed(
+    roots: tuple[RootType, ...],
+    enable_logging: bool = False,
+    loop: asyncio.AbstractEventLoop | None = None,
+) -> asyncio.Task | None:
+    """
+    Seed the given roots in a background task, one batch at a time on a worker thread, so the event loop keeps serving requests.
+
+    A scan that is already running is reused when it covers the requested roots; otherwise the new scan is queued behind it.
+    Returns the task, or None when the database dependencies are not available.
+    """
+    global _background_task, _background_roots
+    if not dependencies_available():
+        if enable_logging:
+            logging.warning("Database dependencies not available, skipping assets scan")
+        return None
+    roots = tuple(roots)
+    previous = None
+    if _background_task is not None and not _background_task.done():
+        if set(roots) <= set(_background_roots):
+            return _background_task
+        previous = _background_task
+        roots = tuple(dict.fromkeys(_background_roots + roots))
+
+    if loop is None:
+        loop = asyncio.get_running_loop()
+    _background_roots = roots
+    _background_task = loop.create_task(_seed_in_background(roots, enable_logging, previous))
+    return _background_task
+
 
+def get_scan_progress() -> dict | None:
+    """Progress of the running or most recent background scan."""
+    return _last_progress.to_dict() if _last_progress is not None else None
+
+
+async def _seed_in_background(roots: tuple[RootType, ...], enable_logging: bool, previous: asyncio.Task | None) -> None:
+    global _last_progress
+    if previous is not None:
+        with contextlib.suppress(Exception):
+            await previous
+
+    progress = ScanProgress(roots)
+    _last_progress = progress
+    steps = _seed_steps(progress)
+    try:
+        while await asyncio.to_thread(next, steps, _STEPS_DONE) is not _STEPS_DONE:
+            logging.debug("Assets scan(roots=%s): %s, %d/%d files", roots, progress.phase, progress.processed, progress.total)
+    except Exception as e:
+        progress.error = str(e)
+        logging.exception("Background assets scan failed for roots=%s", roots)
+    finally:
+        _finish_scan(progress, enable_logging)
+
+
+def _finish_scan(progress: ScanProgress, enable_logging: bool) -> None:
+    progress.phase = "failed" if progress.error else "done"
+    progress.finished_at = time.time()
+    if enable_logging:
+        logging.info(
+            "Assets scan(roots=%s) completed in %.3fs (created=%d, skipped_existing=%d, orphans_pruned=%d, total_seen=%d)",
+            progress.roots,
+            progress.finished_at - progress.started_at,
+            progress.created,
+            progress.skipped_existing,
+            progress.orphans_pruned,
+            progress.total,
+        )
+
+
+def _seed_steps(progress: ScanProgress) -> Iterator[None]:
+    """
+    Run a scan as a sequence of short steps, yielding between them.
+
+    Known paths are diffed against AssetCacheState by (size, mtime_ns) in the consistency pass, so only
+    new files are stat-ed and inserted, in batches of SEED_BATCH_SIZE that are committed one at a time.
+    """
+    roots = progress.roots
+    progress.phase = "verifying"
+    existing_paths: set[str] = set()
+    for r in roots:
         try:
-            orphans_pruned = _prune_orphaned_assets(roots)
+            survivors: set[str] = _fast_db_consistency_pass(r, collect_existing_paths=True, update_missing_tags=True)
+            if survivors:
+                existing_paths.update(survivors)
         except Exception as e:
-            logging.exception("orphan pruning failed: %s", e)
+            logging.exception("fast DB scan failed for %s: %s", r, e)
+        yield
 
-        if "models" in roots:
-            paths.extend(collect_models_files())
-        if "input" in roots:
-            paths.extend(list_tree(folder_paths.get_input_directory()))
-        if "output" in roots:
-            paths.extend(list_tree(folder_paths.get_output_directory()))
+    progress.phase = "pruning"
+    try:
+        progress.orphans_pruned = _prune_orphaned_assets(roots)
+    except Exception as e:
+        logging.exception("orphan pruning failed: %s", e)
+    yield
+
+    progress.phase = "listing"
+    paths: list[str] = []
+    if "models" in roots:
+        paths.extend(collect_models_files())
+    if "input" in roots:
+        paths.extend(list_tree(folder_paths.get_input_directory()))
+    if "output" in roots:
+        paths.extend(list_tree(folder_paths.get_output_directory()))
+    progress.total = len(paths)
+    yield
 
+    progress.phase = "seeding"
+    for i in range(0, len(paths), SEED_BATCH_SIZE):
+        batch = paths[i:i + SEED_BATCH_SIZE]
         specs: list[dict] = []
         tag_pool: set[str] = set()
-        for p in paths:
+        for p in batch:
             abs_p = os.path.abspath(p)
             if abs_p in existing_paths:
-                skipped_existing += 1
+                progress.skipped_existing += 1
                 continue
             try:
                 stat_p = os.stat(abs_p, follow_symlinks=False)
@@ -78,27 +209,16 @@ def seed_assets(roots: tuple[RootType, ...], enable_logging: bool = False) -> No
             )
             for t in tags:
                 tag_pool.add(t)
-        # if no file specs, nothing to do
-        if not specs:
-            return
-        with create_session() as sess:
-            if tag_pool:
-                ensure_tags_exist(sess, tag_pool, tag_type="user")
-
-            result = seed_from_paths_batch(sess, specs=specs, owner_id="")
-            created += result["inserted_infos"]
-            sess.commit()
-    finally:
-        if enable_logging:
-            logging.info(
-                "Assets scan(roots=%s) completed in %.3fs (created=%d, skipped_existing=%d, orphans_pruned=%d, total_seen=%d)",
-                roots,
-                time.perf_counter() - t_start,
-                created,
-                skipped_existing,
-                orphans_pruned,
-                len(paths),
-            )
+        if specs:
+            with create_session() as sess:
+                if tag_pool:
+                    ensure_tags_exist(sess, tag_pool, tag_type="user")
+
+                result = seed_from_paths_batch(sess, specs=specs, owner_id="")
+                progress.created += result["inserted_infos"]
+                sess.commit()
+        progress.processed += len(batch)
+        yield
 
 
 def _prune_orphaned_assets(roots: tuple[RootType, ...]) -> int:
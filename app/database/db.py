@@ -1,12 +1,23 @@
 import logging
 import os
+import queue
 import shutil
+import threading
+import time
+from concurrent.futures import Future
+from typing import Any, Callable
 from app.logger import log_startup_warning
 from utils.install_util import get_missing_requirements_message
 from comfy.cli_args import args
 
 _DB_AVAILABLE = False
 Session = None
+ReadSession = None
+_write_queue = None
+
+SQLITE_BUSY_TIMEOUT_MS = 30_000
+SQLITE_MMAP_SIZE = 256 * 1024 * 1024
+SQLITE_CACHE_SIZE_KIB = 64 * 1024
 
 
 try:
@@ -14,7 +25,7 @@ try:
     from alembic.config import Config
     from alembic.runtime.migration import MigrationContext
     from alembic.script import ScriptDirectory
-    from sqlalchemy import create_engine
+    from sqlalchemy import create_engine, event
     from sqlalchemy.orm import sessionmaker
 
     _DB_AVAILABLE = True
@@ -65,6 +76,39 @@ def get_db_path():
         raise ValueError(f"Unsupported database URL '{url}'.")
 
 
+def is_memory_db(url: str) -> bool:
+    return url in ("sqlite://", "sqlite:///:memory:") or "mode=memory" in url
+
+
+def _configure_sqlite_connection(dbapi_connection, read_only: bool) -> None:
+    """
+    Tune every new SQLite connection: WAL lets readers run alongside the single writer, NORMAL sync is safe in WAL
+    mode, and the busy timeout makes writers queue on the lock instead of failing with "database is locked".
+    """
+    cursor = dbapi_connection.cursor()
+    try:
+        cursor.execute(f"PRAGMA busy_timeout={SQLITE_BUSY_TIMEOUT_MS}")
+        if not read_only:
+            cursor.execute("PRAGMA journal_mode=WAL")
+        cursor.execute("PRAGMA synchronous=NORMAL")
+        cursor.execute("PRAGMA temp_store=MEMORY")
+        cursor.execute(f"PRAGMA mmap_size={SQLITE_MMAP_SIZE}")
+        cursor.execute(f"PRAGMA cache_size=-{SQLITE_CACHE_SIZE_KIB}")
+        if read_only:
+            cursor.execute("PRAGMA query_only=ON")
+    finally:
+        cursor.close()
+
+
+def _create_engine(db_url: str, read_only: bool = False):
+    engine = create_engine(db_url, connect_args={"check_same_thread": False, "timeout": SQLITE_BUSY_TIMEOUT_MS / 1000})
+    if db_url.startswith("sqlite") and not is_memory_db(db_url):
+        @event.listens_for(engine, "connect")
+        def _on_connect(dbapi_connection, connection_record):
+            _configure_sqlite_connection(dbapi_connection, read_only)
+    return engine
+
+
 def init_db():
     db_url = args.database_url
     logging.debug(f"Database URL: {db_url}")
@@ -74,7 +118,7 @@ def init_db():
     config = get_alembic_config()
 
     # Check if we need to upgrade
-    engine = create_engine(db_url)
+    engine = _create_engine(db_url)
     conn = engine.connect()
 
     context = MigrationContext.configure(conn)
@@ -103,10 +147,134 @@ def init_db():
                 os.remove(backup_path)
             logging.exception("Error upgrading database: ")
             raise e
+    if not is_memory_db(db_url):
+        # Refresh planner statistics for tables whose size changed a lot since they were last analyzed
+        conn.exec_driver_sql("PRAGMA optimize")
+    conn.close()
 
-    global Session
+    global Session, ReadSession, _write_queue
     Session = sessionmaker(bind=engine)
+    if is_memory_db(db_url):
+        # A second engine would open a different in-memory database
+        ReadSession = Session
+    else:
+        ReadSession = sessionmaker(bind=_create_engine(db_url, read_only=True))
+    if _write_queue is not None:
+        _write_queue.stop()
+    _write_queue = WriteQueue(Session, run_inline=is_memory_db(db_url))
 
 
 def create_session():
     return Session()
+
+
+def create_read_session():
+    """
+    Session for queries only. It uses its own connection pool, so API reads are not queued behind writers, and
+    any attempt to write through it fails.
+    """
+    return ReadSession()
+
+
+def queue_write(fn: Callable[..., Any], *fn_args, **fn_kwargs) -> Future:
+    """
+    Run fn(session, *fn_args, **fn_kwargs) on the background writer and commit it together with other queued writes.
+    Meant for small writes on hot paths that do not need to wait for the commit; the returned future resolves
+    with fn's result once it is committed.
+    """
+    return _write_queue.submit(fn, *fn_args, **fn_kwargs)
+
+
+def flush_writes(timeout: float | None = None) -> None:
+    """Wait until every write queued so far has been committed."""
+    if _write_queue is not None:
+        _write_queue.submit(lambda session: None).result(timeout)
+
+
+class WriteQueue:
+    """
+    Single writer thread that coalesces queued writes into one transaction per batch.
+
+    SQLite only has one writer at a time, so committing many small writes together is much cheaper than
+    committing each one. If a batch fails, its writes are retried one by one so one bad write does not fail
+    the others.
+    """
+
+    def __init__(self, session_factory, max_batch: int = 256, max_delay: float = 0.01, run_inline: bool = False):
+        self.session_factory = session_factory
+        self.max_batch = max_batch
+        self.max_delay = max_delay
+        self.run_inline = run_inline
+        self._queue: queue.Queue = queue.Queue()
+        self._thread: threading.Thread | None = None
+        self._lock = threading.Lock()
+
+    def submit(self, fn: Callable[..., Any], *fn_args, **fn_kwargs) -> Future:
+        future = Future()
+        item = (fn, fn_args, fn_kwargs, future)
+        if self.run_inline:
+            self._run_batch([item])
+            return future
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._worker, name="db-writer", daemon=True)
+                self._thread.start()
+        self._queue.put(item)
+        return future
+
+    def stop(self) -> None:
+        with self._lock:
+            if self._thread is None:
+                return
+            self._queue.put(None)
+            self._thread.join()
+            self._thread = None
+
+    def _worker(self) -> None:
+        while True:
+            item = self._queue.get()
+            if item is None:
+                return
+            batch = [item]
+            # Collect what arrives within max_delay of the first write, without holding it back any longer
+            deadline = time.monotonic() + self.max_delay
+            stop = False
+            while len(batch) < self.max_batch:
+                try:
+                    item = self._queue.get(timeout=max(0.0, deadline - time.monotonic()))
+                except queue.Empty:
+                    break
+                if item is None:
+                    stop = True
+                    break
+                batch.append(item)
+            self._run_batch(batch)
+            if stop:
+                return
+
+    def _run_batch(self, batch: list) -> None:
+        batch = [item for item in batch if item[3].set_running_or_notify_cancel()]
+        if not batch:
+            return
+        if len(batch) > 1:
+            try:
+                with self.session_factory() as session:
+                    results = [fn(session, *fn_args, **fn_kwargs) for fn, fn_args, fn_kwargs, _ in batch]
+                    session.commit()
+            except Exception:
+                logging.debug("Batched database write failed, retrying writes individually", exc_info=True)
+            else:
+                for (_, _, _, future), result in zip(batch, results):
+                    future.set_result(result)
+                return
+
+        for fn, fn_args, fn_kwargs, future in batch:
+            try:
+                with self.session_factory() as session:
+                    result = fn(session, *fn_args, **fn_kwargs)
+                    session.commit()
+            except Exception as e:
+                logging.warning(f"Queued database write {getattr(fn, '__name__', fn)} failed: {e}")
+                future.set_exception(e)
+            else:
+                future.set_result(result)
@@ -2,21 +2,43 @@ from __future__ import annotations
 
 import os
 import base64
+import hashlib
 import json
 import time
+import asyncio
 import logging
+import threading
+import concurrent.futures
 import folder_paths
 import glob
 import comfy.utils
 from aiohttp import web
 from PIL import Image
 from io import BytesIO
-from folder_paths import map_legacy, filter_files_extensions, filter_files_content_types
+from folder_paths import map_legacy, filter_files_content_types
+
+
+PREVIEW_THUMBNAIL_SIZES = (64, 128, 256, 512, 1024)
+PREVIEW_CACHE_CONTROL = "private, max-age=600"
+PREVIEW_MAX_WORKERS = 4
+PREVIEW_MISSING_CACHE_SIZE = 4096
+PREVIEW_DISK_CACHE_MAX_BYTES = 256 * 1024 * 1024
+PREVIEW_DISK_CACHE_PRUNE_INTERVAL = 64
+
+
+def _is_hidden(relative_path: str) -> bool:
+    return any(part.startswith(".") for part in relative_path.split(os.sep))
 
 
 class ModelFileManager:
     def __init__(self) -> None:
         self.cache: dict[str, tuple[list[dict], dict[str, float], float]] = {}
+        self.preview_cache_dir: str | None = None
+        self._preview_pool: concurrent.futures.ThreadPoolExecutor | None = None
+        self._preview_lock = threading.RLock()
+        self._preview_in_flight: dict[str, concurrent.futures.Future] = {}
+        self._missing_previews: set[str] = set()
+        self._preview_cache_writes = 0
 
     def get_cache(self, key: str, default=None) -> tuple[list[dict], dict[str, float], float] | None:
         return self.cache.get(key, default)
@@ -26,6 +48,7 @@ class ModelFileManager:
 
     def clear_cache(self):
         self.cache.clear()
+        self._missing_previews.clear()
 
     def add_routes(self, routes):
         # NOTE: This is an experiment to replace `/models`
@@ -62,28 +85,182 @@ class ModelFileManager:
             folder = folders[0][path_index]
             full_filename = os.path.join(folder, filename)
 
-            previews = self.get_model_previews(full_filename)
-            default_preview = previews[0] if len(previews) > 0 else None
-            if default_preview is None or (isinstance(default_preview, str) and not os.path.isfile(default_preview)):
+            size = request.query.get("size", None)
+            if size is not None:
+                try:
+                    size = int(size)
+                except ValueError:
+                    return web.Response(status=400, text="Invalid size")
+
+            preview = await self.get_model_preview_webp(full_filename, size)
+            if preview is None:
                 return web.Response(status=404)
 
+            body, etag = preview
+            headers = {"ETag": etag, "Cache-Control": PREVIEW_CACHE_CONTROL}
+            if request.headers.get("If-None-Match") == etag:
+                return web.Response(status=304, headers=headers)
+            return web.Response(body=body, content_type="image/webp", headers=headers)
+
+    def get_preview_cache_dir(self) -> str:
+        if self.preview_cache_dir is None:
+            self.preview_cache_dir = os.path.join(folder_paths.get_system_user_directory("cache"), "model_previews")
+        return self.preview_cache_dir
+
+    @staticmethod
+    def _preview_thumbnail_size(size: int | None) -> int | None:
+        """Snap a requested size to the next thumbnail bucket so the disk cache stays small. None keeps the full size."""
+        if size is None or size <= 0:
+            return None
+        for bucket in PREVIEW_THUMBNAIL_SIZES:
+            if size <= bucket:
+                return bucket
+        return None
+
+    @staticmethod
+    def _preview_sidecar_files(filepath: str) -> list[str]:
+        """Files next to the model that share its name, which includes its sidecar preview images."""
+        basename = os.path.splitext(filepath)[0]
+        return glob.glob(f"{basename}.*", recursive=False)
+
+    @classmethod
+    def _preview_cache_key(cls, filepath: str, size: int | None) -> str:
+        """
+        Key a preview by the model path and the mtimes of the model and its sidecar images, so updating the model
+        or adding, removing or replacing a sidecar image gives a new key.
+        """
+        filepath = os.path.abspath(filepath)
+        key = [filepath, size]
+        for path in [filepath, *sorted(filter_files_content_types(cls._preview_sidecar_files(filepath), "image"))]:
             try:
-                with Image.open(default_preview) as img:
-                    img_bytes = BytesIO()
-                    img.save(img_bytes, format="WEBP")
-                    img_bytes.seek(0)
-                    return web.Response(body=img_bytes.getvalue(), content_type="image/webp")
-            except:
-                return web.Response(status=404)
+                key.append([path, os.stat(path).st_mtime_ns])
+            except OSError:
+                key.append([path, None])
+        return hashlib.sha256(json.dumps(key).encode("utf-8")).hexdigest()
+
+    def _get_preview_pool(self) -> concurrent.futures.ThreadPoolExecutor:
+        with self._preview_lock:
+            if self._preview_pool is None:
+                self._preview_pool = concurrent.futures.ThreadPoolExecutor(max_workers=PREVIEW_MAX_WORKERS, thread_name_prefix="model_preview")
+            return self._preview_pool
+
+    async def get_model_preview_webp(self, filepath: str, size: int | None = None) -> tuple[bytes, str] | None:
+        """
+        Return the default preview of a model as WEBP bytes and its ETag, or None if it has no preview.
+        Resolution and encoding run on a worker pool, identical concurrent requests share one job.
+        """
+        size = self._preview_thumbnail_size(size)
+        future = self._submit_preview(filepath, size)
+        return await asyncio.wrap_future(future)
+
+    def _submit_preview(self, filepath: str, size: int | None) -> concurrent.futures.Future:
+        job_key = f"{os.path.abspath(filepath)}|{size}"
+        with self._preview_lock:
+            future = self._preview_in_flight.get(job_key)
+            if future is None:
+                future = self._get_preview_pool().submit(self.render_model_preview, filepath, size)
+                self._preview_in_flight[job_key] = future
+                future.add_done_callback(lambda _f: self._forget_preview_job(job_key))
+            return future
+
+    def _forget_preview_job(self, job_key: str) -> None:
+        with self._preview_lock:
+            self._preview_in_flight.pop(job_key, None)
+
+    def render_model_preview(self, filepath: str, size: int | None = None) -> tuple[bytes, str] | None:
+        key = self._preview_cache_key(filepath, size)
+        if key in self._missing_previews:
+            return None
+
+        cache_path = os.path.join(self.get_preview_cache_dir(), key[:2], f"{key}.webp")
+        try:
+            with open(cache_path, "rb") as f:
+                body = f.read()
+            # The mtime orders entries for pruning, so a hit marks the entry as recently used
+            os.utime(cache_path)
+            return body, f'"{key}"'
+        except OSError:
+            pass
+
+        previews = self.get_model_previews(filepath)
+        default_preview = previews[0] if len(previews) > 0 else None
+        if default_preview is None or (isinstance(default_preview, str) and not os.path.isfile(default_preview)):
+            self._remember_missing_preview(key)
+            return None
+
+        try:
+            with Image.open(default_preview) as img:
+                if size is not None:
+                    img.thumbnail((size, size), Image.Resampling.LANCZOS)
+                img_bytes = BytesIO()
+                img.save(img_bytes, format="WEBP")
+        except Exception:
+            self._remember_missing_preview(key)
+            return None
+
+        body = img_bytes.getvalue()
+        try:
+            os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+            tmp_path = f"{cache_path}.{threading.get_ident()}.tmp"
+            with open(tmp_path, "wb") as f:
+                f.write(body)
+            os.replace(tmp_path, cache_path)
+        except OSError as e:
+            logging.warning(f"Unable to cache model preview for {filepath}: {e}")
+        else:
+            with self._preview_lock:
+                self._preview_cache_writes += 1
+                # Prune on the first write of the process and then every PREVIEW_DISK_CACHE_PRUNE_INTERVAL writes
+                prune = (self._preview_cache_writes - 1) % PREVIEW_DISK_CACHE_PRUNE_INTERVAL == 0
+            if prune:
+                self._prune_preview_cache()
+        return body, f'"{key}"'
+
+    def _prune_preview_cache(self) -> None:
+        """Delete the least recently used cached previews while the disk cache is larger than PREVIEW_DISK_CACHE_MAX_BYTES."""
+        entries = []
+        total = 0
+        try:
+            with os.scandir(self.get_preview_cache_dir()) as buckets:
+                for bucket in buckets:
+                    if not bucket.is_dir():
+                        continue
+                    with os.scandir(bucket.path) as it:
+                        for entry in it:
+                            if not entry.name.endswith(".webp"):
+                                continue
+                            st = entry.stat()
+                            entries.append((st.st_mtime, st.st_size, entry.path))
+                            total += st.st_size
+        except OSError as e:
+            logging.warning(f"Unable to prune the model preview cache: {e}")
+            return
+
+        entries.sort()
+        for _mtime, size, path in entries:
+            if total <= PREVIEW_DISK_CACHE_MAX_BYTES:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                continue
+            total -= size
+
+    def _remember_missing_preview(self, key: str) -> None:
+        with self._preview_lock:
+            if len(self._missing_previews) >= PREVIEW_MISSING_CACHE_SIZE:
+                self._missing_previews.clear()
+            self._missing_previews.add(key)
 
     def get_model_file_list(self, folder_name: str):
         folder_name = map_legacy(folder_name)
         folders = folder_paths.folder_names_and_paths[folder_name]
         output_list: list[dict] = []
 
-        for index, folder in enumerate(folders[0]):
-            if not os.path.isdir(folder):
-                continue
+        roots = [(index, folder) for index, folder in enumerate(folders[0]) if os.path.isdir(folder)]
+        # Refresh all roots together; the per-folder searches below read the shared snapshots and only stat on a cache miss
+        folder_paths.get_directory_snapshots([folder for _, folder in roots], excluded_dir_names=[".git"])
+        for index, folder in roots:
             out = self.cache_model_file_list_(folder)
             if out is None:
                 out = self.recursive_search_models_(folder, index)
@@ -99,8 +276,6 @@ class ModelFileManager:
             return None
         if not os.path.isdir(folder):
             return None
-        if os.path.getmtime(folder) != model_file_list_cache[1]:
-            return None
         for x in model_file_list_cache[1]:
             time_modified = model_file_list_cache[1][x]
             folder = x
@@ -113,47 +288,33 @@ class ModelFileManager:
         if not os.path.isdir(directory):
             return [], {}, time.perf_counter()
 
-        excluded_dir_names = [".git"]
         # TODO use settings
         include_hidden_files = False
 
-        result: list[str] = []
-        dirs: dict[str, float] = {}
-
-        for dirpath, subdirs, filenames in os.walk(directory, followlinks=True, topdown=True):
-            subdirs[:] = [d for d in subdirs if d not in excluded_dir_names]
-            if not include_hidden_files:
-                subdirs[:] = [d for d in subdirs if not d.startswith(".")]
-                filenames = [f for f in filenames if not f.startswith(".")]
-
-            filenames = filter_files_extensions(filenames, folder_paths.supported_pt_extensions)
+        def is_model_file(relative_path: str) -> bool:
+            if not include_hidden_files and _is_hidden(relative_path):
+                return False
+            return os.path.splitext(relative_path)[-1].lower() in folder_paths.supported_pt_extensions
 
-            for file_name in filenames:
-                try:
-                    full_path = os.path.join(dirpath, file_name)
-                    relative_path = os.path.relpath(full_path, directory)
-
-                    # Get file metadata
-                    file_info = {
-                        "name": relative_path,
-                        "pathIndex": pathIndex,
-                        "modified": os.path.getmtime(full_path),  # Add modification time
-                        "created": os.path.getctime(full_path),   # Add creation time
-                        "size": os.path.getsize(full_path)        # Add file size
-                    }
-                    result.append(file_info)
-
-                except Exception as e:
-                    logging.warning(f"Warning: Unable to access {file_name}. Error: {e}. Skipping this file.")
-                    continue
-
-            for d in subdirs:
-                path: str = os.path.join(dirpath, d)
-                try:
-                    dirs[path] = os.path.getmtime(path)
-                except FileNotFoundError:
-                    logging.warning(f"Warning: Unable to access {path}. Skipping this path.")
-                    continue
+        # Only model files are stat'ed, not the hidden files or other files next to them
+        snapshot = folder_paths.get_directory_snapshot(directory, excluded_dir_names=[".git"], with_stats=True, stats_filter=is_model_file)
+        result: list[str] = []
+        for relative_path, _full_path, stats in snapshot.entries():
+            if stats is None or not is_model_file(relative_path):
+                continue
+            size, modified, created = stats
+            result.append({
+                "name": relative_path,
+                "pathIndex": pathIndex,
+                "modified": modified,  # Add modification time
+                "created": created,    # Add creation time
+                "size": size           # Add file size
+            })
+        result.sort(key=lambda x: x["name"])
+
+        dirs = snapshot.dirs()
+        if not include_hidden_files:
+            dirs = {path: mtime for path, mtime in dirs.items() if path == directory or not _is_hidden(os.path.relpath(path, directory))}
 
         return result, dirs, time.perf_counter()
 
@@ -164,7 +325,7 @@ class ModelFileManager:
             return []
 
         basename = os.path.splitext(filepath)[0]
-        match_files = glob.glob(f"{basename}.*", recursive=False)
+        match_files = self._preview_sidecar_files(filepath)
         image_files = filter_files_content_types(match_files, "image")
         safetensors_file = next(filter(lambda x: x.endswith(".safetensors"), match_files), None)
         safetensors_metadata = {}
@@ -0,0 +1,348 @@
+from __future__ import annotations
+
+import asyncio
+import inspect
+import json
+import logging
+import os
+import sys
+import threading
+import time
+from collections.abc import MutableMapping
+
+import folder_paths
+from comfyui_version import __version__
+
+MANIFEST_VERSION = 1
+MANIFEST_FILENAME = "node_manifest.json"
+FINGERPRINT_SKIP_DIRS = {"__pycache__", ".git", "node_modules", ".venv", "venv"}
+FINGERPRINT_EXTENSIONS = {".py", ".toml", ".json", ".txt"}
+
+
+def module_fingerprint(module_path: str) -> list | None:
+    """
+    Fingerprint a node module by the size and mtime of its source files.
+
+    Single-file modules only use their own file. Packages walk the whole folder, skipping caches and VCS data.
+    Returns None if the module does not exist.
+    """
+    if os.path.isfile(module_path):
+        st = os.stat(module_path)
+        return [[os.path.basename(module_path), st.st_mtime_ns, st.st_size]]
+    if not os.path.isdir(module_path):
+        return None
+
+    entries = []
+    for root, dirs, files in os.walk(module_path):
+        dirs[:] = sorted(d for d in dirs if d not in FINGERPRINT_SKIP_DIRS)
+        for name in sorted(files):
+            if os.path.splitext(name)[1] not in FINGERPRINT_EXTENSIONS:
+                continue
+            path = os.path.join(root, name)
+            try:
+                st = os.stat(path)
+            except OSError:
+                continue
+            entries.append([os.path.relpath(path, module_path), st.st_mtime_ns, st.st_size])
+    return entries
+
+
+class NodeManifest:
+    """
+    Cached description of which nodes every node module registers.
+
+    Entries hold the node ids, their class names and display names, and where the module came from. An entry is
+    only returned while the module's fingerprint, the ComfyUI version and the Python version are unchanged.
+
+    Entries also cache the /object_info output of their nodes, so it can be served without importing the module.
+    Modules can change what other nodes offer (like the sampler list), so whenever any module is added or changed,
+    the cached object info of every module is dropped.
+    """
+
+    def __init__(self, path: str | None = None):
+        if path is None:
+            path = os.path.join(folder_paths.get_system_user_directory("cache"), MANIFEST_FILENAME)
+        self.path = path
+        self.modules: dict[str, dict] = {}
+        self.dirty = False
+
+    @staticmethod
+    def _environment() -> dict:
+        return {
+            "version": MANIFEST_VERSION,
+            "comfyui": __version__,
+            "python": "{}.{}".format(*sys.version_info[:2]),
+        }
+
+    def load(self) -> NodeManifest:
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except FileNotFoundError:
+            return self
+        except (OSError, ValueError) as e:
+            logging.warning(f"Ignoring unreadable node manifest {self.path}: {e}")
+            return self
+
+        if data.get("environment") != self._environment():
+            logging.info("Node manifest was written by a different ComfyUI or Python version, rebuilding it.")
+            self.dirty = True
+            return self
+        self.modules = data.get("modules", {})
+        return self
+
+    def save(self) -> None:
+        if not self.dirty:
+            return
+        try:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            tmp_path = f"{self.path}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump({"environment": self._environment(), "modules": self.modules}, f)
+            os.replace(tmp_path, self.path)
+            self.dirty = False
+        except OSError as e:
+            logging.warning(f"Unable to write node manifest {self.path}: {e}")
+
+    def get(self, module_path: str) -> dict | None:
+        """Return the cached entry for a module, or None if it is missing or stale."""
+        key = os.path.abspath(module_path)
+        entry = self.modules.get(key)
+        if entry is None:
+            return None
+        if entry.get("fingerprint") != module_fingerprint(module_path):
+            del self.modules[key]
+            self._drop_object_info()
+            self.dirty = True
+            return None
+        return entry
+
+    def record(self, module_path: str, module_dir: str, nodes: dict[str, dict], web_dirs: dict[str, str]) -> None:
+        """Store what a module registered after it was imported successfully."""
+        key = os.path.abspath(module_path)
+        fingerprint = module_fingerprint(module_path)
+        old = self.modules.get(key)
+        object_info = {}
+        if old is not None and old.get("fingerprint") == fingerprint:
+            object_info = old.get("object_info", {})
+        else:
+            self._drop_object_info()
+        self.modules[key] = {
+            "fingerprint": fingerprint,
+            "module_dir": module_dir,
+            "nodes": nodes,
+            "web_dirs": web_dirs,
+            "object_info": object_info,
+        }
+        self.dirty = True
+
+    def _drop_object_info(self) -> None:
+        for entry in self.modules.values():
+            entry.pop("object_info", None)
+
+    def get_object_info(self, module_path: str, node_id: str) -> dict | None:
+        """Cached /object_info output of a node, only call this for modules whose entry get() returned."""
+        entry = self.modules.get(os.path.abspath(module_path))
+        if entry is None:
+            return None
+        return entry.get("object_info", {}).get(node_id)
+
+    def record_object_info(self, module_path: str, node_id: str, info: dict) -> None:
+        entry = self.modules.get(os.path.abspath(module_path))
+        if entry is None:
+            return
+        entry.setdefault("object_info", {})[node_id] = info
+        self.dirty = True
+
+
+class LazyNode:
+    """Placeholder stored in a LazyNodeMappings until the module that defines the node is imported."""
+
+    __slots__ = ("node_id", "module_path", "loader")
+
+    def __init__(self, node_id: str, module_path: str, loader):
+        self.node_id = node_id
+        self.module_path = module_path
+        self.loader = loader
+
+    def __repr__(self):
+        return f"LazyNode({self.node_id!r}, {self.module_path!r})"
+
+
+class LazyNodeMappings(MutableMapping):
+    """
+    NODE_CLASS_MAPPINGS that can hold LazyNode placeholders.
+
+    Membership tests and key iteration never import anything. Looking up a placeholder imports its module,
+    which registers the real classes over the placeholders of that module. If the import fails, the module's
+    placeholders are dropped and the lookup behaves like a missing key. Every read goes through __getitem__,
+    so dict(mappings) and {**mappings} return node classes, never placeholders.
+
+    Loaders may be coroutine functions. They run on `loop` (the server loop, once set): coroutines on that loop
+    should `await load(node_ids)` before looking nodes up, other threads wait for the loop to import them.
+    """
+
+    def __init__(self, *args, **kwargs):
+        self._data = dict(*args, **kwargs)
+        self._lock = threading.RLock()
+        self._failed_modules = set()
+        self._loading = {}  # module path -> task importing it on the loop
+        self.loop: asyncio.AbstractEventLoop | None = None
+
+    def set_lazy(self, node_id: str, module_path: str, loader) -> None:
+        self._data[node_id] = LazyNode(node_id, module_path, loader)
+
+    def is_loaded(self, node_id: str) -> bool:
+        return not isinstance(self._data.get(node_id), LazyNode)
+
+    def lazy_module(self, node_id: str) -> str | None:
+        """Path of the module behind a placeholder, None if the node is loaded or missing."""
+        value = self._data.get(node_id)
+        return value.module_path if isinstance(value, LazyNode) else None
+
+    def __contains__(self, node_id):
+        return node_id in self._data
+
+    def __iter__(self):
+        return iter(self._data)
+
+    def __len__(self):
+        return len(self._data)
+
+    def __setitem__(self, node_id, value):
+        self._data[node_id] = value
+
+    def __delitem__(self, node_id):
+        del self._data[node_id]
+
+    def __repr__(self):
+        return f"LazyNodeMappings({self._data!r})"
+
+    def __getitem__(self, node_id):
+        value = self._data[node_id]
+        if isinstance(value, LazyNode):
+            self._load_sync(value)
+            return self._data[node_id]
+        return value
+
+    async def _load_module(self, lazy: LazyNode) -> None:
+        if self._data.get(lazy.node_id) is not lazy:
+            return  # imported in the meantime
+        success = False
+        if lazy.module_path not in self._failed_modules:
+            success = lazy.loader()
+            if inspect.isawaitable(success):
+                success = await success
+        if not success:
+            self._failed_modules.add(lazy.module_path)
+        # Drop placeholders the module did not replace: it failed or no longer defines those nodes
+        for key, other in list(self._data.items()):
+            if isinstance(other, LazyNode) and other.module_path == lazy.module_path:
+                del self._data[key]
+
+    async def load(self, node_ids=None) -> None:
+        """Import the modules behind the placeholders among node_ids (all placeholders if None)."""
+        node_ids = list(self._data) if node_ids is None else node_ids
+        modules = {}
+        for node_id in node_ids:
+            value = self._data.get(node_id) if isinstance(node_id, str) else None
+            if isinstance(value, LazyNode):
+                modules.setdefault(value.module_path, value)
+        for module_path, lazy in modules.items():
+            task = self._loading.get(module_path)
+            if task is None:
+                task = self._loading[module_path] = asyncio.ensure_future(self._load_module(lazy))
+                task.add_done_callback(lambda _, path=module_path: self._loading.pop(path, None))
+            await task
+
+    def _load_sync(self, lazy: LazyNode) -> None:
+        try:
+            running = asyncio.get_running_loop()
+        except RuntimeError:
+            running = None
+        loop = self.loop
+        if loop is not None and loop is not running and loop.is_running():
+            asyncio.run_coroutine_threadsafe(self.load([lazy.node_id]), loop).result()
+        elif running is None:
+            with self._lock:
+                asyncio.run(self._load_module(lazy))
+        else:
+            # Synchronous code on the running loop cannot wait for it, only finish an import that never suspends
+            coro = self._load_module(lazy)
+            try:
+                coro.send(None)
+            except StopIteration:
+                return
+            coro.close()
+            raise RuntimeError(f"Node {lazy.node_id} has to be loaded with 'await NODE_CLASS_MAPPINGS.load()' on the event loop.")
+
+    def items(self):
+        items = []
+        for key in list(self._data):
+            try:
+                items.append((key, self[key]))
+            except KeyError:
+                pass  # placeholder of a module that failed or no longer defines the node
+        return items
+
+    def values(self):
+        return [value for _, value in self.items()]
+
+    def copy(self):
+        return dict(self.items())
+
+
+class ImportProfiler:
+    """Collects how long each node module took to import and which top level packages it pulled in."""
+
+    def __init__(self):
+        self.records = []
+
+    def measure(self, module_path: str, group: str, lazy: bool = False):
+        return _ImportMeasurement(self, module_path, group, lazy)
+
+    def report(self, top: int = 25) -> None:
+        if not self.records:
+            return
+        totals = {}
+        for record in self.records:
+            totals[record["group"]] = totals.get(record["group"], 0.0) + record["seconds"]
+
+        logging.info("\nNode import profile:")
+        for group, seconds in sorted(totals.items(), key=lambda x: -x[1]):
+            logging.info("{:6.2f} seconds total: {}".format(seconds, group))
+        logging.info("Slowest node modules:")
+        for record in sorted(self.records, key=lambda x: -x["seconds"])[:top]:
+            flags = []
+            if record["lazy"]:
+                flags.append("lazy")
+            if not record["success"]:
+                flags.append("IMPORT FAILED")
+            suffix = " ({})".format(", ".join(flags)) if flags else ""
+            packages = ", ".join(record["new_packages"][:8])
+            logging.info("{:6.2f} seconds{}: {}{}".format(
+                record["seconds"], suffix, record["module_path"], " [first imported: {}]".format(packages) if packages else ""))
+        logging.info("")
+
+
+class _ImportMeasurement:
+    def __init__(self, profiler: ImportProfiler, module_path: str, group: str, lazy: bool):
+        self.profiler = profiler
+        self.record = {"module_path": module_path, "group": group, "lazy": lazy, "success": False}
+
+    def __enter__(self):
+        self.modules_before = {name.partition(".")[0] for name in list(sys.modules)}
+        self.start = time.perf_counter()
+        return self.record
+
+    def __exit__(self, exc_type, exc, tb):
+        self.record["seconds"] = time.perf_counter() - self.start
+        modules_after = {name.partition(".")[0] for name in list(sys.modules)}
+        self.record["new_packages"] = sorted(
+            name for name in modules_after - self.modules_before
+            if not name.startswith("_") and os.sep not in name and "/" not in name
+        )
+        self.profiler.records.append(self.record)
+        if self.record["lazy"]:
+            logging.info("Lazily imported {} in {:.2f} seconds".format(self.record["module_path"], self.record["seconds"]))
+        return False
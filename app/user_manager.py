@@ -3,7 +3,7 @@ import json
 import os
 import re
 import uuid
-import glob
+import bisect
 import shutil
 import logging
 from aiohttp import web
@@ -32,6 +32,58 @@ def get_file_info(path: str, relative_to: str) -> FileInfo:
     }
 
 
+def _parse_page_query(request) -> tuple[int | None, str | None, web.Response | None]:
+    """Read the optional limit/cursor pagination parameters of a listing request."""
+    limit = request.rel_url.query.get('limit', None)
+    cursor = request.rel_url.query.get('cursor', None)
+    if limit is not None:
+        try:
+            limit = int(limit)
+        except ValueError:
+            return None, None, web.Response(status=400, text="limit must be an integer")
+        if limit <= 0:
+            return None, None, web.Response(status=400, text="limit must be a positive integer")
+    return limit, cursor or None, None
+
+
+def _paginate(items: list, keys: list, cursor_key, limit: int | None, cursor_of) -> dict:
+    """Return the page of key-sorted items that follows cursor_key, in the paginated response format."""
+    start = bisect.bisect_right(keys, cursor_key) if cursor_key is not None else 0
+    end = len(items) if limit is None else min(len(items), start + limit)
+    has_more = end < len(items)
+    return {
+        "items": items[start:end],
+        "pagination": {
+            "limit": limit,
+            "next_cursor": cursor_of(end - 1) if has_more and end > start else None,
+            "has_more": has_more,
+        },
+    }
+
+
+def _list_dir_files(path: str, with_stats: bool) -> list[tuple[str, tuple[int, float, float] | None]]:
+    """Names (and optionally size, mtime, ctime) of the files directly inside path, for non-recursive listings."""
+    files = []
+    with os.scandir(path) as it:
+        for entry in it:
+            try:
+                if not entry.is_file():
+                    continue
+                stats = None
+                if with_stats:
+                    st = entry.stat()
+                    stats = (st.st_size, st.st_mtime, st.st_ctime)
+            except OSError as e:
+                logging.warning(f"Could not stat file {entry.path}: {e}")
+                continue
+            files.append((entry.name, stats))
+    return files
+
+
+def _is_hidden_path(rel_path: str) -> bool:
+    return any(part.startswith('.') for part in rel_path.split('/'))
+
+
 class UserManager():
     def __init__(self):
         user_directory = folder_paths.get_user_directory()
@@ -185,30 +237,43 @@ class UserManager():
             recurse = request.rel_url.query.get('recurse', '').lower() == "true"
             full_info = request.rel_url.query.get('full_info', '').lower() == "true"
             split_path = request.rel_url.query.get('split', '').lower() == "true"
+            limit, cursor, error = _parse_page_query(request)
+            if error is not None:
+                return error
 
-            # Use different patterns based on whether we're recursing or not
+            # Recursive listings come from a shared, incrementally refreshed scandir snapshot of the directory, which
+            # the write, move and delete endpoints keep up to date. A single directory is cheaper to list directly.
             if recurse:
-                pattern = os.path.join(glob.escape(path), '**', '*')
+                snapshot = folder_paths.get_directory_snapshot(path, with_stats=full_info)
+                entries = [(rel_path.replace(os.sep, '/'), stats) for rel_path, _full_path, stats in snapshot.entries()]
             else:
-                pattern = os.path.join(glob.escape(path), '*')
-
-            def process_full_path(full_path: str) -> FileInfo | str | list[str]:
+                entries = _list_dir_files(path, full_info) if os.path.isdir(path) else []
+            files = []
+            for rel_path, stats in entries:
+                if _is_hidden_path(rel_path):
+                    continue
+                if full_info and stats is None:
+                    continue
+                files.append((rel_path.split('/'), rel_path, stats))
+            files.sort(key=lambda x: x[0])
+
+            def process_file(rel_path: str, stats) -> FileInfo | str | list[str]:
                 if full_info:
-                    return get_file_info(full_path, path)
+                    size, modified, created = stats
+                    return {"path": rel_path, "size": size, "modified": modified, "created": created}
 
-                rel_path = os.path.relpath(full_path, path).replace(os.sep, '/')
                 if split_path:
                     return [rel_path] + rel_path.split('/')
 
                 return rel_path
 
-            results = [
-                process_full_path(full_path)
-                for full_path in glob.glob(pattern, recursive=recurse)
-                if os.path.isfile(full_path)
-            ]
+            results = [process_file(rel_path, stats) for _key, rel_path, stats in files]
+            if limit is None and cursor is None:
+                return web.json_response(results)
 
-            return web.json_response(results)
+            keys = [key for key, _rel_path, _stats in files]
+            cursor_key = cursor.split('/') if cursor is not None else None
+            return web.json_response(_paginate(results, keys, cursor_key, limit, lambda i: files[i][1]))
 
         @routes.get("/v2/userdata")
         async def list_userdata_v2(request):
@@ -277,44 +342,55 @@ class UserManager():
             if not os.path.isdir(target_abs_path):
                  return web.Response(status=400, text="Requested path is not a directory")
 
+            limit, cursor, error = _parse_page_query(request)
+            if error is not None:
+                return error
+
             results = []
             try:
-                for root, dirs, files in os.walk(target_abs_path, topdown=True):
-                    # Process directories
-                    for dir_name in dirs:
-                        dir_path = os.path.join(root, dir_name)
-                        rel_path = os.path.relpath(dir_path, base_user_path).replace(os.sep, '/')
-                        results.append({
-                            "name": dir_name,
-                            "path": rel_path,
-                            "type": "directory"
-                        })
-
-                    # Process files
-                    for file_name in files:
-                        file_path = os.path.join(root, file_name)
-                        rel_path = os.path.relpath(file_path, base_user_path).replace(os.sep, '/')
-                        entry_info = {
-                            "name": file_name,
-                            "path": rel_path,
-                            "type": "file"
-                        }
-                        try:
-                            stats = os.stat(file_path) # Use os.stat for potentially better performance with os.walk
-                            entry_info["size"] = stats.st_size
-                            entry_info["modified"] = stats.st_mtime
-                        except OSError as stat_error:
-                            logging.warning(f"Could not stat file {file_path}: {stat_error}")
-                            pass # Include file with available info
-                        results.append(entry_info)
+                # Like os.walk, links to directories are listed but not descended into
+                snapshot = folder_paths.get_directory_snapshot(target_abs_path, with_stats=True, follow_symlinks=False)
+                for dir_path in [*snapshot.dirs(), *snapshot.linked_dirs()]:
+                    if dir_path == snapshot.root:
+                        continue
+                    rel_path = os.path.relpath(dir_path, base_user_path).replace(os.sep, '/')
+                    results.append({
+                        "name": os.path.basename(dir_path),
+                        "path": rel_path,
+                        "type": "directory"
+                    })
+
+                for _rel, file_path, stats in snapshot.entries():
+                    rel_path = os.path.relpath(file_path, base_user_path).replace(os.sep, '/')
+                    entry_info = {
+                        "name": os.path.basename(file_path),
+                        "path": rel_path,
+                        "type": "file"
+                    }
+                    if stats is not None:
+                        entry_info["size"] = stats[0]
+                        entry_info["modified"] = stats[1]
+                    results.append(entry_info)
             except OSError as e:
                 logging.error(f"Error listing directory {target_abs_path}: {e}")
                 return web.Response(status=500, text="Error reading directory contents")
 
             # Sort results alphabetically, directories first then files
-            results.sort(key=lambda x: (x['type'] != 'directory', x['name'].lower()))
-
-            return web.json_response(results)
+            def sort_key(x):
+                return (x['type'] != 'directory', x['name'].lower(), x['path'])
+            results.sort(key=sort_key)
+            if limit is None and cursor is None:
+                return web.json_response(results)
+
+            # Cursors are "<d|f>:<path>" so the position of a deleted entry can still be found
+            cursor_key = None
+            if cursor is not None:
+                kind, _, cursor_path = cursor.partition(':')
+                cursor_key = (kind != 'd', os.path.basename(cursor_path).lower(), cursor_path)
+            keys = [sort_key(x) for x in results]
+            return web.json_response(_paginate(
+                results, keys, cursor_key, limit,
+                lambda i: "{}:{}".format("d" if results[i]["type"] == "directory" else "f", results[i]["path"])))
 
         def get_user_data_path(request, check_exists = False, param = "file"):
             file = request.match_info.get(param, None)
@@ -379,6 +455,7 @@ class UserManager():
 
                 with open(path, "wb") as f:
                     f.write(body)
+                folder_paths.notify_file_changed(path)
             except OSError as e:
                 logging.warning(f"Error saving file '{path}': {e}")
                 return web.Response(
@@ -401,6 +478,7 @@ class UserManager():
                 return path
 
             os.remove(path)
+            folder_paths.notify_file_changed(path)
 
             return web.Response(status=204)
 
@@ -446,6 +524,8 @@ class UserManager():
 
             logging.info(f"moving '{source}' -> '{dest}'")
             shutil.move(source, dest)
+            folder_paths.notify_file_changed(source)
+            folder_paths.notify_file_changed(dest)
 
             user_path = self.get_request_user_filepath(request, None)
             if full_info:
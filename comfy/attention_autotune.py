@@ -0,0 +1,199 @@
+"""
+Per shape choice of the attention function.
+
+The first time attention runs for a bucket of device (the GPU model for CUDA), dtype, heads, query and key lengths,
+head dim and mask, every registered attention function is timed on the real inputs. The fastest one whose output
+matches the default attention function is used for that bucket from then on. Sequence lengths are rounded up to a
+power of two so similar resolutions share a bucket. If the chosen function fails on another input of its bucket, the
+bucket switches to the default.
+
+Decisions are kept in memory and, once enable() was called with a folder, stored there so later runs skip the
+tuning. The table is discarded when the torch version or the devices change.
+"""
+
+import functools
+import json
+import logging
+import os
+import threading
+import time
+
+import torch
+
+from comfy import model_management
+
+TABLE_VERSION = 2
+TABLE_FILENAME = "attention_autotune.json"
+WARMUP_RUNS = 1
+TIMING_RUNS = 3
+
+_lock = threading.RLock()
+_table_path = None
+_entries = None
+
+
+def enable(cache_dir):
+    global _table_path, _entries
+    with _lock:
+        _table_path = os.path.join(cache_dir, TABLE_FILENAME)
+        _entries = None
+
+
+def disable():
+    global _table_path, _entries
+    with _lock:
+        _table_path = None
+        _entries = None
+
+
+def _environment():
+    devices = []
+    if torch.cuda.is_available():
+        devices = [torch.cuda.get_device_name(i) for i in range(torch.cuda.device_count())]
+    return {"version": TABLE_VERSION, "torch": torch.__version__, "devices": devices}
+
+
+def _load():
+    global _entries
+    if _entries is not None:
+        return _entries
+    _entries = {}
+    if _table_path is None:
+        return _entries
+    try:
+        with open(_table_path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+    except FileNotFoundError:
+        return _entries
+    except (OSError, ValueError) as e:
+        logging.warning("Ignoring unreadable attention autotune table {}: {}".format(_table_path, e))
+        return _entries
+    if data.get("environment") == _environment():
+        _entries = data.get("entries", {})
+    return _entries
+
+
+def _save():
+    if _table_path is None:
+        return
+    try:
+        os.makedirs(os.path.dirname(_table_path), exist_ok=True)
+        tmp_path = "{}.tmp".format(_table_path)
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"environment": _environment(), "entries": _entries}, f, indent=1)
+        os.replace(tmp_path, _table_path)
+    except OSError as e:
+        logging.warning("Unable to write attention autotune table {}: {}".format(_table_path, e))
+
+
+def _bucket_length(length):
+    return 1 << max(length - 1, 0).bit_length()
+
+
+@functools.lru_cache(maxsize=None)
+def _device_label(device):
+    if device.type == "cuda":
+        return torch.cuda.get_device_name(device)
+    return str(device)
+
+
+def bucket_key(q, k, heads, mask=None, skip_reshape=False):
+    if skip_reshape:
+        dim_head = q.shape[-1]
+        seq_q, seq_k = q.shape[-2], k.shape[-2]
+    else:
+        dim_head = q.shape[-1] // heads
+        seq_q, seq_k = q.shape[1], k.shape[1]
+    return "{}|{}|h{}|q{}|k{}|d{}|{}".format(
+        _device_label(q.device), str(q.dtype).removeprefix("torch."), heads, _bucket_length(seq_q), _bucket_length(seq_k), dim_head,
+        "mask" if mask is not None else "nomask")
+
+
+def _tolerance(dtype):
+    if dtype == torch.float32:
+        return 1e-3
+    return 2e-2
+
+
+def _matches(out, reference):
+    if not torch.is_tensor(out) or out.shape != reference.shape:
+        return False
+    tol = _tolerance(reference.dtype)
+    out = out.float()
+    reference = reference.float()
+    if not torch.isfinite(out).all():
+        return False
+    return (out - reference).abs().max().item() <= tol * (reference.abs().max().item() + 1.0)
+
+
+def _time(func, args, kwargs):
+    for _ in range(WARMUP_RUNS):
+        out = func(*args, **kwargs)
+    model_management.synchronize()
+    start = time.perf_counter()
+    for _ in range(TIMING_RUNS):
+        out = func(*args, **kwargs)
+    model_management.synchronize()
+    return (time.perf_counter() - start) / TIMING_RUNS, out
+
+
+def _tune(key, default_name, default, candidates, args, kwargs):
+    default_time, reference = _time(default, args, kwargs)
+    best_name, best_time = default_name, default_time
+    results = ["{} {:.3f} ms".format(default_name, default_time * 1000)]
+    for name, func in candidates.items():
+        if func is default:
+            continue
+        try:
+            t, out = _time(func, args, kwargs)
+        except Exception as e:
+            # Kernels that do not support this shape, dtype or device just drop out of the race
+            logging.debug("Attention function {} failed for {}: {}".format(name, key, e))
+            model_management.soft_empty_cache()
+            continue
+        if not _matches(out, reference):
+            results.append("{} rejected".format(name))
+            continue
+        results.append("{} {:.3f} ms".format(name, t * 1000))
+        if t < best_time:
+            best_name, best_time = name, t
+    logging.info("Attention autotune {}: using {} ({})".format(key, best_name, ", ".join(results)))
+    return best_name
+
+
+def select(default_name, default, candidates, q, k, v, heads, mask=None, skip_reshape=False, **kwargs):
+    """
+    Attention function to use for these inputs. Tunes the bucket on first use.
+
+    default is what attention would use without the autotuner. It is the numerical reference and the fallback for
+    buckets whose chosen function is no longer registered.
+    """
+    if torch.compiler.is_compiling() or torch.is_grad_enabled():
+        return default
+    key = bucket_key(q, k, heads, mask=mask, skip_reshape=skip_reshape)
+    with _lock:
+        entries = _load()
+        name = entries.get(key, None)
+        if name is not None:
+            if name == default_name:
+                return default
+            if name in candidates:
+                return candidates[name]
+
+        name = _tune(key, default_name, default, candidates, (q, k, v, heads), dict(kwargs, mask=mask, skip_reshape=skip_reshape))
+        entries[key] = name
+        _save()
+    return candidates.get(name, default)
+
+
+def reject(key, name, default_name, error=None):
+    """
+    Use the default for a bucket whose chosen function raised on an input it was not tuned on. Shapes that share a
+    bucket can differ, a kernel that handled the tuned shape may not support another one.
+    """
+    with _lock:
+        entries = _load()
+        if entries.get(key, None) == name:
+            logging.warning("Attention autotune {}: {} failed, using {} instead: {}".format(key, name, default_name, error))
+            entries[key] = default_name
+            _save()
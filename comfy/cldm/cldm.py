@@ -380,7 +380,7 @@ class ControlNet(nn.Module):
     def make_zero_conv(self, channels, operations=None, dtype=None, device=None):
         return TimestepEmbedSequential(operations.conv_nd(self.dims, channels, channels, 1, padding=0, dtype=dtype, device=device))
 
-    def forward(self, x, hint, timesteps, context, y=None, **kwargs):
+    def forward(self, x, hint, timesteps, context, y=None, transformer_options={}, **kwargs):
         t_emb = timestep_embedding(timesteps, self.model_channels, repeat_only=False).to(x.dtype)
         emb = self.time_embed(t_emb)
 
@@ -420,14 +420,14 @@ class ControlNet(nn.Module):
         h = x
         for module, zero_conv in zip(self.input_blocks, self.zero_convs):
             if guided_hint is not None:
-                h = module(h, emb, context)
+                h = module(h, emb, context, transformer_options)
                 h += guided_hint
                 guided_hint = None
             else:
-                h = module(h, emb, context)
+                h = module(h, emb, context, transformer_options)
             out_output.append(zero_conv(h, emb, context))
 
-        h = self.middle_block(h, emb, context)
+        h = self.middle_block(h, emb, context, transformer_options)
         out_middle.append(self.middle_block_out(h, emb, context))
 
         return {"middle": out_middle, "output": out_output}
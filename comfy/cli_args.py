@@ -122,6 +122,7 @@ attn_group.add_argument("--use-sage-attention", action="store_true", help="Use s
 attn_group.add_argument("--use-flash-attention", action="store_true", help="Use FlashAttention.")
 
 parser.add_argument("--disable-xformers", action="store_true", help="Disable xformers.")
+parser.add_argument("--autotune-attention", action="store_true", help="Time every available attention function the first time an input shape is seen and use the fastest one for that shape. The choices are stored in the user cache folder.")
 
 upcast = parser.add_mutually_exclusive_group()
 upcast.add_argument("--force-upcast-attention", action="store_true", help="Force enable attention upcasting, please report if it fixes black images.")
@@ -167,6 +168,7 @@ parser.add_argument("--disable-pinned-memory", action="store_true", help="Disabl
 
 parser.add_argument("--mmap-torch-files", action="store_true", help="Use mmap when loading ckpt/pt files.")
 parser.add_argument("--disable-mmap", action="store_true", help="Don't use mmap when loading safetensors.")
+parser.add_argument("--disable-model-detection-cache", action="store_true", help="Don't store model detection results in the user cache folder, every model load detects the model architecture again.")
 
 parser.add_argument("--dont-print-server", action="store_true", help="Don't print server output.")
 parser.add_argument("--quick-test-for-ci", action="store_true", help="Quick test for CI.")
@@ -176,6 +178,8 @@ parser.add_argument("--disable-metadata", action="store_true", help="Disable sav
 parser.add_argument("--disable-all-custom-nodes", action="store_true", help="Disable loading all custom nodes.")
 parser.add_argument("--whitelist-custom-nodes", type=str, nargs='+', default=[], help="Specify custom node folders to load even when --disable-all-custom-nodes is enabled.")
 parser.add_argument("--disable-api-nodes", action="store_true", help="Disable loading all api nodes. Also prevents the frontend from communicating with the internet.")
+parser.add_argument("--lazy-node-loading", type=str, default="off", choices=["off", "builtin", "all"], help="Register nodes from a cached manifest and only import their module when one of its nodes is first used. \"builtin\" applies to comfy_extras and api nodes, \"all\" also to custom nodes (custom nodes that register routes or patch ComfyUI at import time need to be loaded eagerly).")
+parser.add_argument("--profile-node-imports", action="store_true", help="Log a per module breakdown of node import times at startup.")
 
 parser.add_argument("--multi-user", action="store_true", help="Enables per-user storage.")
 
@@ -44,6 +44,15 @@ class CONDNoiseShape(CONDRegular):
 
 
 class CONDCrossAttn(CONDRegular):
+    MAX_REPEAT_PADDING = 4 #arbitrary limit on the padding because it's probably going to impact performance negatively if it's too much
+
+    def __init__(self, cond, mask_padding=False):
+        self.cond = cond
+        self.mask_padding = mask_padding #the model applies the padding mask from transformer_options["context_padding_mask"] to its cross attention
+
+    def _copy_with(self, cond):
+        return self.__class__(cond, mask_padding=self.mask_padding)
+
     def can_concat(self, other):
         s1 = self.cond.shape
         s2 = other.cond.shape
@@ -53,28 +62,57 @@ class CONDCrossAttn(CONDRegular):
 
             mult_min = math.lcm(s1[1], s2[1])
             diff = mult_min // min(s1[1], s2[1])
-            if diff > 4: #arbitrary limit on the padding because it's probably going to impact performance negatively if it's too much
+            if diff > self.MAX_REPEAT_PADDING and not (self.mask_padding and other.mask_padding):
                 return False
         if self.cond.device != other.cond.device:
             logging.warning("WARNING: conds not on same device: skipping concat.")
             return False
         return True
 
-    def concat(self, others):
-        conds = [self.cond]
-        crossattn_max_len = self.cond.shape[1]
-        for x in others:
-            c = x.cond
-            crossattn_max_len = math.lcm(crossattn_max_len, c.shape[1])
-            conds.append(c)
+    def _use_mask_padding(self, conds):
+        lengths = [c.cond.shape[1] for c in conds]
+        crossattn_max_len = math.lcm(*lengths)
+        if crossattn_max_len // min(lengths) <= self.MAX_REPEAT_PADDING:
+            return False
+        return all(c.mask_padding for c in conds)
 
+    def concat(self, others):
+        conds = [self] + list(others)
+        if self._use_mask_padding(conds):
+            crossattn_max_len = max(c.cond.shape[1] for c in conds)
+            out = []
+            for c in conds:
+                c = c.cond
+                if c.shape[1] < crossattn_max_len:
+                    c = torch.nn.functional.pad(c, (0, 0, 0, crossattn_max_len - c.shape[1])) #padded tokens are masked out in the attention
+                out.append(c)
+            return torch.cat(out)
+
+        crossattn_max_len = math.lcm(*[c.cond.shape[1] for c in conds])
         out = []
         for c in conds:
+            c = c.cond
             if c.shape[1] < crossattn_max_len:
                 c = c.repeat(1, crossattn_max_len // c.shape[1], 1) #padding with repeat doesn't change result
             out.append(c)
         return torch.cat(out)
 
+    def padding_mask(self, others):
+        """
+        Key padding mask for the output of concat: a bool tensor of shape [batch, tokens] that is False for padding.
+        None if concat does not add padding tokens.
+        """
+        conds = [self] + list(others)
+        if not self._use_mask_padding(conds):
+            return None
+        crossattn_max_len = max(c.cond.shape[1] for c in conds)
+        out = []
+        for c in conds:
+            m = torch.zeros((c.cond.shape[0], crossattn_max_len), dtype=torch.bool, device=c.cond.device)
+            m[:, :c.cond.shape[1]] = True
+            out.append(m)
+        return torch.cat(out)
+
 
 class CONDConstant(CONDRegular):
     def __init__(self, cond):
@@ -270,6 +270,8 @@ class ControlNet(ControlBase):
             temp = cond.get(c, None)
             if temp is not None:
                 extra[c] = comfy.model_base.convert_tensor(temp, dtype, x_noisy.device)
+        if 'crossattn_controlnet' not in cond and "context_padding_mask" in transformer_options:
+            extra["transformer_options"] = {"context_padding_mask": transformer_options["context_padding_mask"]}
 
         timestep = self.model_sampling_current.timestep(t)
         x_noisy = self.model_sampling_current.calculate_input(t, x_noisy)
@@ -65,6 +65,7 @@ def get_attention_function(name: str, default: Any=...) -> Union[Callable, None]
     return REGISTERED_ATTENTION_FUNCTIONS[name]
 
 from comfy.cli_args import args
+import comfy.attention_autotune
 import comfy.ops
 ops = comfy.ops.disable_weight_init
 
@@ -755,6 +756,29 @@ register_attention_function("sub_quad", attention_sub_quad)
 register_attention_function("split", attention_split)
 
 
+@wrap_attn
+def attention_autotuned(q, k, v, heads, mask=None, attn_precision=None, skip_reshape=False, skip_output_reshape=False, **kwargs):
+    default = attention_sub_quad if q.device.type == "cpu" else static_optimized_attention
+    default_name = next((name for name, func in REGISTERED_ATTENTION_FUNCTIONS.items() if func is default), "default")
+    func = comfy.attention_autotune.select(default_name, default, REGISTERED_ATTENTION_FUNCTIONS, q, k, v, heads, mask=mask,
+                                           attn_precision=attn_precision, skip_reshape=skip_reshape, skip_output_reshape=skip_output_reshape, **kwargs)
+    if func is default:
+        return func(q, k, v, heads, mask=mask, attn_precision=attn_precision, skip_reshape=skip_reshape, skip_output_reshape=skip_output_reshape, **kwargs)
+    try:
+        return func(q, k, v, heads, mask=mask, attn_precision=attn_precision, skip_reshape=skip_reshape, skip_output_reshape=skip_output_reshape, **kwargs)
+    except Exception as e:
+        name = next((name for name, f in REGISTERED_ATTENTION_FUNCTIONS.items() if f is func), None)
+        comfy.attention_autotune.reject(comfy.attention_autotune.bucket_key(q, k, heads, mask=mask, skip_reshape=skip_reshape), name, default_name, e)
+    return default(q, k, v, heads, mask=mask, attn_precision=attn_precision, skip_reshape=skip_reshape, skip_output_reshape=skip_output_reshape, **kwargs)
+
+
+static_optimized_attention = optimized_attention
+if args.autotune_attention:
+    logging.info("Autotuning the attention function for every input shape")
+    optimized_attention = attention_autotuned
+    optimized_attention_masked = optimized_attention
+
+
 def optimized_attention_for_device(device, mask=False, small_input=False):
     if small_input:
         if model_management.pytorch_attention_enabled():
@@ -762,6 +786,9 @@ def optimized_attention_for_device(device, mask=False, small_input=False):
         else:
             return attention_basic
 
+    if args.autotune_attention:
+        return attention_autotuned
+
     if device == torch.device("cpu"):
         return attention_sub_quad
 
@@ -771,6 +798,91 @@ def optimized_attention_for_device(device, mask=False, small_input=False):
     return optimized_attention
 
 
+class CrossAttentionKVCache:
+    """
+    Projected keys and values of the cross attention context, reused between the steps of one sampling run.
+
+    The sampler creates one per run when transformer_options["cross_attn_kv_cache"] is set and replaces the flag
+    with it. Model families opt in by casting their context with cast_context, so the same context tensor reaches
+    the attention on every step, and by projecting it with project. CrossAttention only does so when called with
+    cache_kv=True, which BasicTransformerBlock passes for its attn2 cross attention, never for self attention.
+    An entry is only reused while the layer gets the same context and value tensors and the to_k/to_v weights
+    were not replaced or modified in place, like when weight hooks are applied.
+    """
+
+    MAX_CASTS = 64
+
+    def __init__(self):
+        self.casts = {}
+        self.entries = {}
+
+    def cast_context(self, context, device, dtype):
+        entry = self.casts.get(id(context), None)
+        if entry is not None and entry[0] is context and entry[1] == device and entry[2] == dtype:
+            return entry[3]
+        out = model_management.cast_to_device(context, device, dtype)
+        if len(self.casts) >= self.MAX_CASTS:
+            self.casts.clear()
+        self.casts[id(context)] = (context, device, dtype, out)
+        return out
+
+    @staticmethod
+    def _weights(layers):
+        out = []
+        for layer in layers:
+            if len(getattr(layer, "weight_function", [])) > 0 or len(getattr(layer, "bias_function", [])) > 0:
+                return None
+            weight = getattr(layer, "weight", None)
+            if weight is None:
+                return None
+            bias = getattr(layer, "bias", None)
+            out.append((weight, weight._version, bias, None if bias is None else bias._version))
+        return out
+
+    @staticmethod
+    def _same_weights(w1, w2):
+        for a, b in zip(w1, w2):
+            if a[0] is not b[0] or a[1] != b[1] or a[2] is not b[2] or a[3] != b[3]:
+                return False
+        return True
+
+    def project(self, attn, context, value, transformer_options):
+        if value is None:
+            value = context
+        weights = None
+        if not torch.is_grad_enabled():
+            weights = self._weights((attn.to_k, attn.to_v))
+        if weights is None:
+            return attn.to_k(context), attn.to_v(value)
+
+        key = (id(attn), tuple(transformer_options.get("uuids", ())))
+        entry = self.entries.get(key, None)
+        if entry is not None and entry[0] is attn and entry[1] is context and entry[2] is value and self._same_weights(entry[3], weights):
+            return entry[4], entry[5]
+
+        k = attn.to_k(context)
+        v = attn.to_v(value)
+        self.entries[key] = (attn, context, value, weights, k, v)
+        return k, v
+
+
+def context_padding_bias(transformer_options, context, x):
+    """
+    Additive attention mask that hides the padding tokens of a batched context, see comfy.conds.CONDCrossAttn.
+    None if the context was not padded or no longer lines up with the padding mask.
+    """
+    mask = transformer_options.get("context_padding_mask", None)
+    if mask is None or context is None or context.shape[1] != mask.shape[1]:
+        return None
+    if x.shape[0] != mask.shape[0]:
+        if x.shape[0] % mask.shape[0] != 0:
+            return None
+        mask = mask.repeat_interleave(x.shape[0] // mask.shape[0], dim=0)
+    bias = torch.zeros(mask.shape, dtype=x.dtype, device=x.device)
+    bias.masked_fill_(~mask.to(x.device), -torch.finfo(x.dtype).max)
+    return bias.unsqueeze(1)
+
+
 class CrossAttention(nn.Module):
     def __init__(self, query_dim, context_dim=None, heads=8, dim_head=64, dropout=0., attn_precision=None, dtype=None, device=None, operations=ops):
         super().__init__()
@@ -787,15 +899,20 @@ class CrossAttention(nn.Module):
 
         self.to_out = nn.Sequential(operations.Linear(inner_dim, query_dim, dtype=dtype, device=device), nn.Dropout(dropout))
 
-    def forward(self, x, context=None, value=None, mask=None, transformer_options={}):
+    def forward(self, x, context=None, value=None, mask=None, transformer_options={}, cache_kv=False):
         q = self.to_q(x)
-        context = default(context, x)
-        k = self.to_k(context)
-        if value is not None:
-            v = self.to_v(value)
+        kv_cache = transformer_options.get("cross_attn_kv_cache", None) if cache_kv else None
+        if context is not None and isinstance(kv_cache, CrossAttentionKVCache):
+            k, v = kv_cache.project(self, context, value, transformer_options)
             del value
         else:
-            v = self.to_v(context)
+            context = default(context, x)
+            k = self.to_k(context)
+            if value is not None:
+                v = self.to_v(value)
+                del value
+            else:
+                v = self.to_v(context)
 
         if mask is None:
             out = optimized_attention(q, k, v, self.heads, attn_precision=self.attn_precision, transformer_options=transformer_options)
@@ -939,12 +1056,19 @@ class BasicTransformerBlock(nn.Module):
                 if value_attn2 is None:
                     value_attn2 = context_attn2
                 n = self.attn2.to_q(n)
-                context_attn2 = self.attn2.to_k(context_attn2)
-                value_attn2 = self.attn2.to_v(value_attn2)
+                kv_cache = None if self.switch_temporal_ca_to_sa else transformer_options.get("cross_attn_kv_cache", None)
+                if context_attn2 is not None and isinstance(kv_cache, CrossAttentionKVCache):
+                    context_attn2, value_attn2 = kv_cache.project(self.attn2, context_attn2, value_attn2, transformer_options)
+                else:
+                    context_attn2 = self.attn2.to_k(context_attn2)
+                    value_attn2 = self.attn2.to_v(value_attn2)
                 n = attn2_replace_patch[block_attn2](n, context_attn2, value_attn2, extra_options)
                 n = self.attn2.to_out(n)
             else:
-                n = self.attn2(n, context=context_attn2, value=value_attn2, transformer_options=transformer_options)
+                mask_attn2 = None
+                if not self.switch_temporal_ca_to_sa:
+                    mask_attn2 = context_padding_bias(transformer_options, context_attn2, n)
+                n = self.attn2(n, context=context_attn2, value=value_attn2, mask=mask_attn2, transformer_options=transformer_options, cache_kv=not self.switch_temporal_ca_to_sa)
 
         if "attn2_output_patch" in transformer_patches:
             patch = transformer_patches["attn2_output_patch"]
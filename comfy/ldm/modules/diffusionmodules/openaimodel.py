@@ -398,6 +398,9 @@ class UNetModel(nn.Module):
                                     increased efficiency.
     """
 
+    # cross attention hides the padding tokens listed in transformer_options["context_padding_mask"]
+    supports_context_padding_mask = True
+
     def __init__(
         self,
         image_size,
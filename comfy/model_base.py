@@ -21,6 +21,7 @@ import comfy.ldm.hunyuan3dv2_1.hunyuandit
 import torch
 import logging
 import comfy.ldm.lightricks.av_model
+import comfy.ldm.modules.attention
 from comfy.ldm.modules.diffusionmodules.openaimodel import UNetModel, Timestep
 from comfy.ldm.cascade.stage_c import StageC
 from comfy.ldm.cascade.stage_b import StageB
@@ -187,7 +188,11 @@ class BaseModel(torch.nn.Module):
         device = xc.device
         t = self.model_sampling.timestep(t).float()
         if context is not None:
-            context = comfy.model_management.cast_to_device(context, device, dtype)
+            kv_cache = transformer_options.get("cross_attn_kv_cache", None)
+            if isinstance(kv_cache, comfy.ldm.modules.attention.CrossAttentionKVCache):
+                context = kv_cache.cast_context(context, device, dtype)
+            else:
+                context = comfy.model_management.cast_to_device(context, device, dtype)
 
         extra_conds = {}
         for o in kwargs:
@@ -290,7 +295,7 @@ class BaseModel(torch.nn.Module):
 
         cross_attn = kwargs.get("cross_attn", None)
         if cross_attn is not None:
-            out['c_crossattn'] = comfy.conds.CONDCrossAttn(cross_attn)
+            out['c_crossattn'] = comfy.conds.CONDCrossAttn(cross_attn, mask_padding=getattr(self.diffusion_model, "supports_context_padding_mask", False))
 
         cross_attn_cnet = kwargs.get("cross_attn_controlnet", None)
         if cross_attn_cnet is not None:
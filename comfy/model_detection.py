@@ -1,4 +1,6 @@
+import copy
 import json
+import comfy.model_detection_cache
 import comfy.supported_models
 import comfy.supported_models_base
 import comfy.utils
@@ -794,10 +796,32 @@ def model_config_from_unet_config(unet_config, state_dict=None):
     logging.error("no match {}".format(unet_config))
     return None
 
-def model_config_from_unet(state_dict, unet_key_prefix, use_base_if_no_match=False, metadata=None):
+def _model_config_from_cache(cached):
+    if cached is None:
+        return None
+    name = cached["model_config"]
+    for model_config in comfy.supported_models.models + [comfy.supported_models_base.BASE]:
+        if model_config.__name__ == name:
+            break
+    else:
+        return None
+    model_config = model_config(cached["unet_config"])
+    if cached["quant_config"]:
+        model_config.quant_config = cached["quant_config"]
+    return model_config
+
+def model_config_from_unet(state_dict, unet_key_prefix, use_base_if_no_match=False, metadata=None, cache_key=None):
+    """cache_key identifies the file the state dict was loaded from (see comfy.model_detection_cache.file_key)
+    so the detection result can be reused the next time that file is loaded."""
+    cache_name = "unet:{}:{}".format(unet_key_prefix, use_base_if_no_match)
+    model_config = _model_config_from_cache(comfy.model_detection_cache.get(cache_key, cache_name))
+    if model_config is not None:
+        return model_config
+
     unet_config = detect_unet_config(state_dict, unet_key_prefix, metadata=metadata)
     if unet_config is None:
         return None
+    detected_config = copy.deepcopy(unet_config)
     model_config = model_config_from_unet_config(unet_config, state_dict)
     if model_config is None and use_base_if_no_match:
         model_config = comfy.supported_models_base.BASE(unet_config)
@@ -808,6 +832,8 @@ def model_config_from_unet(state_dict, unet_key_prefix, use_base_if_no_match=Fal
         model_config.quant_config = quant_config
         logging.info("Detected mixed precision quantization")
 
+    if model_config is not None:
+        comfy.model_detection_cache.put(cache_key, cache_name, {"model_config": type(model_config).__name__, "unet_config": detected_config, "quant_config": quant_config})
     return model_config
 
 def unet_prefix_from_state_dict(state_dict):
@@ -0,0 +1,165 @@
+"""
+Persistent cache of model detection results.
+
+Detecting the architecture of a model walks its whole state dict. The result only depends on the file and on the
+detection code, so it is stored per file, keyed by the file size, mtime and a hash of its header (the safetensors
+header lists every tensor name, shape and dtype). Entries written by a different version of the detection code
+are discarded.
+
+The cache is disabled until enable() is called with a folder to store it in.
+"""
+
+import copy
+import hashlib
+import json
+import logging
+import os
+import struct
+import threading
+
+import torch
+
+CACHE_VERSION = 1
+CACHE_FILENAME = "model_detection.json"
+HEADER_HASH_BYTES = 1024 * 1024
+MAX_ENTRIES = 1024
+_DETECTION_SOURCES = ("model_detection.py", "supported_models.py", "supported_models_base.py", "utils.py")
+
+_lock = threading.RLock()
+_cache_path = None
+_entries = None
+
+
+def _detection_code_fingerprint():
+    base = os.path.dirname(os.path.abspath(__file__))
+    out = []
+    for name in _DETECTION_SOURCES:
+        try:
+            st = os.stat(os.path.join(base, name))
+            out.append([name, st.st_mtime_ns, st.st_size])
+        except OSError:
+            out.append([name, None, None])
+    return out
+
+
+def enable(cache_dir):
+    global _cache_path, _entries
+    with _lock:
+        _cache_path = os.path.join(cache_dir, CACHE_FILENAME)
+        _entries = None
+
+
+def disable():
+    global _cache_path, _entries
+    with _lock:
+        _cache_path = None
+        _entries = None
+
+
+def file_key(path):
+    """
+    Identity of a model file: size, mtime and a hash of its header.
+    None if the cache is disabled or the file can not be read.
+    """
+    if _cache_path is None:
+        return None
+    try:
+        st = os.stat(path)
+        h = hashlib.sha256()
+        with open(path, "rb") as f:
+            head = f.read(8)
+            header_size = struct.unpack("<Q", head)[0] if len(head) == 8 else 0
+            # safetensors: hash the exact header, otherwise the start of the file
+            if path.lower().endswith((".safetensors", ".sft")) and 0 < header_size <= 100 * 1024 * 1024:
+                h.update(f.read(header_size))
+            else:
+                h.update(head)
+                h.update(f.read(HEADER_HASH_BYTES))
+    except (OSError, struct.error):
+        return None
+    return "{}:{}:{}".format(st.st_size, st.st_mtime_ns, h.hexdigest())
+
+
+def _encode(value):
+    if isinstance(value, torch.dtype):
+        return {"__dtype__": str(value).removeprefix("torch.")}
+    if isinstance(value, tuple):
+        return {"__tuple__": [_encode(v) for v in value]}
+    if isinstance(value, list):
+        return [_encode(v) for v in value]
+    if isinstance(value, dict):
+        if not all(isinstance(k, str) for k in value):
+            raise TypeError("only string keys are supported")
+        return {k: _encode(v) for k, v in value.items()}
+    if value is None or isinstance(value, (bool, int, float, str)):
+        return value
+    raise TypeError("can not cache value of type {}".format(type(value).__name__))
+
+
+def _decode_hook(obj):
+    if "__dtype__" in obj:
+        return getattr(torch, obj["__dtype__"])
+    if "__tuple__" in obj:
+        return tuple(obj["__tuple__"])
+    return obj
+
+
+def _load():
+    global _entries
+    if _entries is not None:
+        return _entries
+    _entries = {}
+    try:
+        with open(_cache_path, "r", encoding="utf-8") as f:
+            data = json.load(f, object_hook=_decode_hook)
+    except FileNotFoundError:
+        return _entries
+    except (OSError, ValueError, AttributeError) as e:
+        logging.warning("Ignoring unreadable model detection cache {}: {}".format(_cache_path, e))
+        return _entries
+    if data.get("version") == CACHE_VERSION and data.get("code") == _detection_code_fingerprint():
+        _entries = data.get("files", {})
+    return _entries
+
+
+def _save():
+    try:
+        os.makedirs(os.path.dirname(_cache_path), exist_ok=True)
+        tmp_path = "{}.tmp".format(_cache_path)
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"version": CACHE_VERSION, "code": _detection_code_fingerprint(), "files": _encode(_entries)}, f)
+        os.replace(tmp_path, _cache_path)
+    except OSError as e:
+        logging.warning("Unable to write model detection cache {}: {}".format(_cache_path, e))
+
+
+def get(key, name):
+    """Return the cached value stored under name for the file key, or None."""
+    if key is None:
+        return None
+    with _lock:
+        if _cache_path is None:
+            return None
+        return copy.deepcopy(_load().get(key, {}).get(name))
+
+
+def put(key, name, value):
+    """Store a detection result for the file key. Values that can not be stored as json are skipped."""
+    if key is None:
+        return
+    with _lock:
+        if _cache_path is None:
+            return
+        try:
+            value = json.loads(json.dumps(_encode(value)), object_hook=_decode_hook)
+        except (TypeError, ValueError) as e:
+            logging.debug("Not caching model detection result {}: {}".format(name, e))
+            return
+        entries = _load()
+        entry = entries.pop(key, {})
+        entry[name] = value
+        entries[key] = entry
+        # Oldest entries first, so drop those once the cache is full
+        while len(entries) > MAX_ENTRIES:
+            entries.pop(next(iter(entries)))
+        _save()
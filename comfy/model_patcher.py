@@ -451,6 +451,9 @@ class ModelPatcher:
     def set_model_attn2_replace(self, patch, block_name, number, transformer_index=None):
         self.set_model_patch_replace(patch, "attn2", block_name, number, transformer_index)
 
+    def set_model_cross_attn_kv_cache(self, enabled=True):
+        self.model_options["transformer_options"]["cross_attn_kv_cache"] = enabled
+
     def set_model_attn1_output_patch(self, patch):
         self.set_model_patch(patch, "attn1_output_patch")
 
@@ -16,6 +16,7 @@ import comfy.model_patcher
 import comfy.patcher_extension
 import comfy.hooks
 import comfy.context_windows
+import comfy.ldm.modules.attention
 import comfy.utils
 import scipy.stats
 import numpy
@@ -26,66 +27,77 @@ def add_area_dims(area, num_dims):
         area = [2147483648] + area[:len(area) // 2] + [0] + area[len(area) // 2:]
     return area
 
-def get_area_and_mult(conds, x_in, timestep_in):
-    dims = tuple(x_in.shape[2:])
-    area = None
-    strength = 1.0
+cond_obj = collections.namedtuple('cond_obj', ['input_x', 'mult', 'conditioning', 'area', 'control', 'patches', 'uuid', 'hooks'])
 
+def cond_active_at(conds, timestep_in):
     if 'timestep_start' in conds:
-        timestep_start = conds['timestep_start']
-        if timestep_in[0] > timestep_start:
-            return None
+        if timestep_in[0] > conds['timestep_start']:
+            return False
     if 'timestep_end' in conds:
-        timestep_end = conds['timestep_end']
-        if timestep_in[0] < timestep_end:
-            return None
+        if timestep_in[0] < conds['timestep_end']:
+            return False
+    return True
+
+def narrow_to_area(x, area, first_dim=2):
+    if area is not None:
+        dims = len(area) // 2
+        for i in range(dims):
+            x = x.narrow(i + first_dim, area[dims + i], area[i])
+    return x
+
+def area_feather_mult(area, shape, full_dims, strength, dtype, device):
+    """Multiplier for an area without a mask: strength, faded in over up to 8 latent pixels from every area edge that is not an edge of the latent."""
+    dims = len(full_dims)
+    mult = torch.full(shape, strength, dtype=dtype, device=device)
+    for i in range(dims):
+        rr = min(8, shape[2 + i] // 4)
+        if rr == 0:
+            continue
+        ramp = torch.tensor([(1.0 / rr) * (t + 1) for t in range(rr)], dtype=dtype, device=device)
+        weight = torch.ones(shape[2 + i], dtype=dtype, device=device)
+        if area[dims + i] != 0:
+            weight[:rr] *= ramp
+        if (area[i] + area[dims + i]) < full_dims[i]:
+            weight[area[i] - rr:area[i]] *= ramp.flip(0)
+        mult *= weight.view((-1,) + (1,) * (dims - 1 - i))
+    return mult
+
+def plan_area_and_mult(conds, x_in, scalar_mult=False):
+    """
+    The parts of get_area_and_mult that do not change between sampling steps, as a cond_obj without input_x.
+    With scalar_mult, conds without a mask or area get their strength as a float instead of a full size multiplier.
+    """
+    dims = tuple(x_in.shape[2:])
+    area = None
+    strength = conds.get('strength', 1.0)
+
     if 'area' in conds:
         area = list(conds['area'])
         area = add_area_dims(area, len(dims))
         if (len(area) // 2) > len(dims):
             area = area[:len(dims)] + area[len(area) // 2:(len(area) // 2) + len(dims)]
-
-    if 'strength' in conds:
-        strength = conds['strength']
-
-    input_x = x_in
-    if area is not None:
         for i in range(len(dims)):
-            area[i] = min(input_x.shape[i + 2] - area[len(dims) + i], area[i])
-            input_x = input_x.narrow(i + 2, area[len(dims) + i], area[i])
+            area[i] = min(x_in.shape[i + 2] - area[len(dims) + i], area[i])
+
+    input_shape = tuple(x_in.shape[:2]) + (tuple(area[:len(dims)]) if area is not None else dims)
 
     if 'mask' in conds:
         # Scale the mask to the size of the input
         # The mask should have been resized as we began the sampling process
-        mask_strength = 1.0
-        if "mask_strength" in conds:
-            mask_strength = conds["mask_strength"]
+        mask_strength = conds.get("mask_strength", 1.0)
         mask = conds['mask']
         # assert (mask.shape[1:] == x_in.shape[2:])
 
-        mask = mask[:input_x.shape[0]]
-        if area is not None:
-            for i in range(len(dims)):
-                mask = mask.narrow(i + 1, area[len(dims) + i], area[i])
-
+        mask = narrow_to_area(mask[:input_shape[0]], area, first_dim=1)
         mask = mask * mask_strength
-        mask = mask.unsqueeze(1).repeat((input_x.shape[0] // mask.shape[0], input_x.shape[1]) + (1, ) * (mask.ndim - 1))
+        mask = mask.unsqueeze(1).repeat((input_shape[0] // mask.shape[0], input_shape[1]) + (1, ) * (mask.ndim - 1))
+        mult = mask * strength
+    elif area is not None:
+        mult = area_feather_mult(area, input_shape, dims, strength, x_in.dtype, x_in.device)
+    elif scalar_mult:
+        mult = float(strength)
     else:
-        mask = torch.ones_like(input_x)
-    mult = mask * strength
-
-    if 'mask' not in conds and area is not None:
-        fuzz = 8
-        for i in range(len(dims)):
-            rr = min(fuzz, mult.shape[2 + i] // 4)
-            if area[len(dims) + i] != 0:
-                for t in range(rr):
-                    m = mult.narrow(i + 2, t, 1)
-                    m *= ((1.0 / rr) * (t + 1))
-            if (area[i] + area[len(dims) + i]) < x_in.shape[i + 2]:
-                for t in range(rr):
-                    m = mult.narrow(i + 2, area[i] - 1 - t, 1)
-                    m *= ((1.0 / rr) * (t + 1))
+        mult = torch.ones(input_shape, dtype=x_in.dtype, device=x_in.device) * strength
 
     conditioning = {}
     model_conds = conds["model_conds"]
@@ -102,14 +114,19 @@ def get_area_and_mult(conds, x_in, timestep_in):
         gligen_type = gligen[0]
         gligen_model = gligen[1]
         if gligen_type == "position":
-            gligen_patch = gligen_model.model.set_position(input_x.shape, gligen[2], input_x.device)
+            gligen_patch = gligen_model.model.set_position(input_shape, gligen[2], x_in.device)
         else:
-            gligen_patch = gligen_model.model.set_empty(input_x.shape, input_x.device)
+            gligen_patch = gligen_model.model.set_empty(input_shape, x_in.device)
 
         patches['middle_patch'] = [gligen_patch]
 
-    cond_obj = collections.namedtuple('cond_obj', ['input_x', 'mult', 'conditioning', 'area', 'control', 'patches', 'uuid', 'hooks'])
-    return cond_obj(input_x, mult, conditioning, area, control, patches, conds['uuid'], hooks)
+    return cond_obj(None, mult, conditioning, area, control, patches, conds['uuid'], hooks)
+
+def get_area_and_mult(conds, x_in, timestep_in):
+    if not cond_active_at(conds, timestep_in):
+        return None
+    p = plan_area_and_mult(conds, x_in)
+    return p._replace(input_x=narrow_to_area(x_in, p.area))
 
 def cond_equal_size(c1, c2):
     if c1 is c2:
@@ -156,7 +173,173 @@ def cond_cat(c_list):
 
     return out
 
-def finalize_default_conds(model: 'BaseModel', hooked_to_run: dict[comfy.hooks.HookGroup,list[tuple[tuple,int]]], default_conds: list[list[dict]], x_in, timestep, model_options):
+def cond_padding_mask(c_list):
+    """Key padding mask of the batched c_crossattn if cond_cat padded it with masked tokens, otherwise None."""
+    conds = [x["c_crossattn"] for x in c_list if "c_crossattn" in x]
+    if len(conds) != len(c_list) or not hasattr(conds[0], "padding_mask"):
+        return None
+    return conds[0].padding_mask(conds[1:])
+
+def context_padding_mask_supported(model_options):
+    """
+    Padding c_crossattn with masked tokens relies on the model's own cross attention applying the mask. attn2 patches
+    can change the context so it no longer lines up with the mask and attn2 replace patches (IPAdapter and similar)
+    do not apply it, so with either present conds are padded by repeating instead.
+    """
+    transformer_options = model_options.get("transformer_options", {})
+    if transformer_options.get("patches", {}).get("attn2_patch"):
+        return False
+    if transformer_options.get("patches_replace", {}).get("attn2"):
+        return False
+    return True
+
+def cond_cat_repeat_padded(c_list):
+    """cond_cat, but c_crossattn of different lengths is always padded by repeating instead of with masked tokens."""
+    c_list = [dict(c, c_crossattn=c["c_crossattn"].__class__(c["c_crossattn"].cond, mask_padding=False)) if "c_crossattn" in c else c for c in c_list]
+    return cond_cat(c_list)
+
+def disable_cond_mask_padding(conds):
+    for cond_list in conds.values():
+        for c in cond_list or []:
+            crossattn = c.get("model_conds", {}).get("c_crossattn", None)
+            if getattr(crossattn, "mask_padding", False):
+                c["model_conds"]["c_crossattn"] = crossattn.__class__(crossattn.cond, mask_padding=False)
+
+class CondAccumulator:
+    """
+    Weighted sum of the model outputs for one list of conds and the total weight of every element.
+    While every output covered the whole latent with a constant weight, the total weight is kept as a scalar.
+    """
+
+    def __init__(self, x_in):
+        self.out = torch.zeros_like(x_in)
+        self.counts = None
+        self.reset()
+
+    def reset(self):
+        self.out.zero_()
+        self.count = torch.full((), 1e-37, dtype=self.out.dtype)
+        self.counts_active = False
+
+    def add(self, output, mult, area):
+        out = narrow_to_area(self.out, area)
+        if isinstance(mult, torch.Tensor):
+            out += output * mult
+        elif mult == 1.0:
+            out += output
+        else:
+            out += output * mult
+
+        if area is None and not isinstance(mult, torch.Tensor) and not self.counts_active:
+            self.count += mult
+            return
+        if not self.counts_active:
+            if self.counts is None:
+                self.counts = torch.empty_like(self.out)
+            self.counts.fill_(self.count.item())
+            self.counts_active = True
+        counts = narrow_to_area(self.counts, area)
+        counts += mult
+
+    def result(self):
+        if self.counts_active:
+            return self.out / self.counts
+        return self.out / self.count
+
+
+class CondPlan:
+    """
+    Step invariant preparation of the conds of one sampling run, built once in CFGGuider.inner_sample.
+
+    The area, multiplier and processed model conds of a cond only depend on the cond and the shape of the latent,
+    so they are prepared on the first step and reused. Which prepared conds can be batched together and their
+    concatenated model conds are remembered as well, and the output accumulators are reused between steps. Only
+    the timestep range of every cond is checked on each step.
+
+    Conds that were not passed to the sampler, like the resized conds of context windows, are prepared on every
+    call like before.
+    """
+
+    MAX_CONCAT_CACHE = 64
+
+    def __init__(self, conds: dict[str, list[dict]] = None):
+        self.known = {}
+        for cond_list in (conds or {}).values():
+            for c in cond_list or []:
+                self.known[id(c)] = c
+        self.prepared = {}
+        self.prepared_conditioning = set()
+        self.can_concat_cache = {}
+        self.concat_cache = {}
+        self.padding_mask_cache = {}
+        self.accumulators = {}
+
+    def get_cond(self, conds, x_in, timestep):
+        """Same as get_area_and_mult, but the multiplier of conds without a mask or area is a float."""
+        if not cond_active_at(conds, timestep):
+            return None
+        if self.known.get(id(conds)) is conds:
+            key = (id(conds), tuple(x_in.shape), x_in.dtype, x_in.device)
+            p = self.prepared.get(key, None)
+            if p is None:
+                p = plan_area_and_mult(conds, x_in, scalar_mult=True)
+                self.prepared[key] = p
+                self.prepared_conditioning.add(id(p.conditioning))
+        else:
+            p = plan_area_and_mult(conds, x_in, scalar_mult=True)
+        return p._replace(input_x=narrow_to_area(x_in, p.area))
+
+    def _is_prepared(self, conditioning_list):
+        return all(id(c) in self.prepared_conditioning for c in conditioning_list)
+
+    def can_concat(self, c1, c2):
+        if not self._is_prepared((c1.conditioning, c2.conditioning)):
+            return can_concat_cond(c1, c2)
+        key = (id(c1.conditioning), id(c2.conditioning))
+        out = self.can_concat_cache.get(key, None)
+        if out is None:
+            out = self.can_concat_cache[key] = can_concat_cond(c1, c2)
+        return out
+
+    def cond_cat(self, c_list):
+        if not self._is_prepared(c_list):
+            return cond_cat(c_list)
+        key = tuple(id(c) for c in c_list)
+        out = self.concat_cache.get(key, None)
+        if out is None:
+            out = cond_cat(c_list)
+            if len(self.concat_cache) < self.MAX_CONCAT_CACHE:
+                self.concat_cache[key] = out
+        return dict(out)
+
+    def padding_mask(self, c_list):
+        if not self._is_prepared(c_list):
+            return cond_padding_mask(c_list)
+        key = tuple(id(c) for c in c_list)
+        if key not in self.padding_mask_cache:
+            out = cond_padding_mask(c_list)
+            if len(self.padding_mask_cache) >= self.MAX_CONCAT_CACHE:
+                return out
+            self.padding_mask_cache[key] = out
+        return self.padding_mask_cache[key]
+
+    def acquire_accumulators(self, count, x_in):
+        """Reset and return the accumulators for count cond lists, or fresh ones if they are in use by an outer call."""
+        key = (count, tuple(x_in.shape), x_in.dtype, x_in.device)
+        acc = self.accumulators.get(key, None)
+        if acc is None or acc[1]:
+            acc = [[CondAccumulator(x_in) for _ in range(count)], True]
+            self.accumulators.setdefault(key, acc)
+        else:
+            for a in acc[0]:
+                a.reset()
+            acc[1] = True
+        return acc
+
+    def release_accumulators(self, acc):
+        acc[1] = False
+
+def finalize_default_conds(model: 'BaseModel', hooked_to_run: dict[comfy.hooks.HookGroup,list[tuple[tuple,int]]], default_conds: list[list[dict]], x_in, timestep, model_options, plan: CondPlan = None):
     # need to figure out remaining unmasked area for conds
     default_mults = []
     for _ in default_conds:
@@ -189,7 +372,7 @@ def finalize_default_conds(model: 'BaseModel', hooked_to_run: dict[comfy.hooks.H
         cond = default_conds[i]
         for x in cond:
             # do get_area_and_mult to get all the expected values
-            p = get_area_and_mult(x, x_in, timestep)
+            p = get_area_and_mult(x, x_in, timestep) if plan is None else plan.get_cond(x, x_in, timestep)
             if p is None:
                 continue
             # replace p's mult with calculated mult
@@ -213,17 +396,23 @@ def _calc_cond_batch_outer(model: BaseModel, conds: list[list[dict]], x_in: torc
     return executor.execute(model, conds, x_in, timestep, model_options)
 
 def _calc_cond_batch(model: BaseModel, conds: list[list[dict]], x_in: torch.Tensor, timestep, model_options):
-    out_conds = []
-    out_counts = []
+    # conds are prepared once per sampling run when called through a CFGGuider, see CondPlan
+    plan: CondPlan = model_options.get("cond_plan", None)
+    if plan is None:
+        plan = CondPlan()
+    accumulators = plan.acquire_accumulators(len(conds), x_in)
+    try:
+        return _calc_cond_batch_planned(model, conds, x_in, timestep, model_options, plan, accumulators[0])
+    finally:
+        plan.release_accumulators(accumulators)
+
+def _calc_cond_batch_planned(model: BaseModel, conds: list[list[dict]], x_in: torch.Tensor, timestep, model_options, plan: CondPlan, out_conds: list[CondAccumulator]):
     # separate conds by matching hooks
     hooked_to_run: dict[comfy.hooks.HookGroup,list[tuple[tuple,int]]] = {}
     default_conds = []
     has_default_conds = False
 
     for i in range(len(conds)):
-        out_conds.append(torch.zeros_like(x_in))
-        out_counts.append(torch.ones_like(x_in) * 1e-37)
-
         cond = conds[i]
         default_c = []
         if cond is not None:
@@ -232,7 +421,7 @@ def _calc_cond_batch(model: BaseModel, conds: list[list[dict]], x_in: torch.Tens
                     default_c.append(x)
                     has_default_conds = True
                     continue
-                p = get_area_and_mult(x, x_in, timestep)
+                p = plan.get_cond(x, x_in, timestep)
                 if p is None:
                     continue
                 if p.hooks is not None:
@@ -242,19 +431,26 @@ def _calc_cond_batch(model: BaseModel, conds: list[list[dict]], x_in: torch.Tens
         default_conds.append(default_c)
 
     if has_default_conds:
-        finalize_default_conds(model, hooked_to_run, default_conds, x_in, timestep, model_options)
+        finalize_default_conds(model, hooked_to_run, default_conds, x_in, timestep, model_options, plan=plan)
 
     model.current_patcher.prepare_state(timestep)
 
     # run every hooked_to_run separately
     for hooks, to_run in hooked_to_run.items():
+        # attn2 patches added by hooks or conds do not apply the padding mask, conds that would need it are run in separate batches
+        mask_padding = context_padding_mask_supported(model_options)
+        mask_padding = mask_padding and context_padding_mask_supported({"transformer_options": comfy.hooks.create_transformer_options_from_hooks(model.current_patcher, hooks)})
+        mask_padding = mask_padding and all(context_padding_mask_supported({"transformer_options": {"patches": o[0].patches or {}}}) for o in to_run)
         while len(to_run) > 0:
             first = to_run[0]
             first_shape = first[0][0].shape
             to_batch_temp = []
             for x in range(len(to_run)):
-                if can_concat_cond(to_run[x][0], first[0]):
-                    to_batch_temp += [x]
+                if not plan.can_concat(to_run[x][0], first[0]):
+                    continue
+                if not mask_padding and x > 0 and plan.padding_mask([first[0].conditioning, to_run[x][0].conditioning]) is not None:
+                    continue
+                to_batch_temp += [x]
 
             to_batch_temp.reverse()
             to_batch = to_batch_temp[:1]
@@ -265,7 +461,6 @@ def _calc_cond_batch(model: BaseModel, conds: list[list[dict]], x_in: torch.Tens
                 input_shape = [len(batch_amount) * first_shape[0]] + list(first_shape)[1:]
                 cond_shapes = collections.defaultdict(list)
                 for tt in batch_amount:
-                    cond = {k: v.size() for k, v in to_run[tt][0].conditioning.items()}
                     for k, v in to_run[tt][0].conditioning.items():
                         cond_shapes[k].append(v.size())
 
@@ -295,7 +490,9 @@ def _calc_cond_batch(model: BaseModel, conds: list[list[dict]], x_in: torch.Tens
 
             batch_chunks = len(cond_or_uncond)
             input_x = torch.cat(input_x)
-            c = cond_cat(c)
+            batch_conditioning = c
+            context_padding_mask = plan.padding_mask(batch_conditioning)
+            c = plan.cond_cat(batch_conditioning)
             timestep_ = torch.cat([timestep] * batch_chunks)
 
             transformer_options = model.current_patcher.apply_hooks(hooks=hooks)
@@ -313,6 +510,11 @@ def _calc_cond_batch(model: BaseModel, conds: list[list[dict]], x_in: torch.Tens
             transformer_options["cond_or_uncond"] = cond_or_uncond[:]
             transformer_options["uuids"] = uuids[:]
             transformer_options["sigmas"] = timestep
+            if context_padding_mask is not None:
+                if context_padding_mask_supported({"transformer_options": transformer_options}):
+                    transformer_options["context_padding_mask"] = context_padding_mask
+                else:
+                    c = cond_cat_repeat_padded(batch_conditioning)
 
             c['transformer_options'] = transformer_options
 
@@ -325,25 +527,9 @@ def _calc_cond_batch(model: BaseModel, conds: list[list[dict]], x_in: torch.Tens
                 output = model.apply_model(input_x, timestep_, **c).chunk(batch_chunks)
 
             for o in range(batch_chunks):
-                cond_index = cond_or_uncond[o]
-                a = area[o]
-                if a is None:
-                    out_conds[cond_index] += output[o] * mult[o]
-                    out_counts[cond_index] += mult[o]
-                else:
-                    out_c = out_conds[cond_index]
-                    out_cts = out_counts[cond_index]
-                    dims = len(a) // 2
-                    for i in range(dims):
-                        out_c = out_c.narrow(i + 2, a[i + dims], a[i])
-                        out_cts = out_cts.narrow(i + 2, a[i + dims], a[i])
-                    out_c += output[o] * mult[o]
-                    out_cts += mult[o]
-
-    for i in range(len(out_conds)):
-        out_conds[i] /= out_counts[i]
+                out_conds[cond_or_uncond[o]].add(output[o], mult[o], area[o])
 
-    return out_conds
+    return [out.result() for out in out_conds]
 
 def calc_cond_uncond_batch(model, cond, uncond, x_in, timestep, model_options): #TODO: remove
     logging.warning("WARNING: The comfy.samplers.calc_cond_uncond_batch function is deprecated please use the calc_cond_batch one instead.")
@@ -966,9 +1152,14 @@ class CFGGuider:
             latent_image = self.inner_model.process_latent_in(latent_image)
 
         self.conds = process_conds(self.inner_model, noise, self.conds, device, latent_image, denoise_mask, seed, latent_shapes=latent_shapes)
+        if not context_padding_mask_supported(self.model_options):
+            disable_cond_mask_padding(self.conds)
 
         extra_model_options = comfy.model_patcher.create_model_options_clone(self.model_options)
         extra_model_options.setdefault("transformer_options", {})["sample_sigmas"] = sigmas
+        if extra_model_options["transformer_options"].get("cross_attn_kv_cache", False) is True:
+            extra_model_options["transformer_options"]["cross_attn_kv_cache"] = comfy.ldm.modules.attention.CrossAttentionKVCache()
+        extra_model_options["cond_plan"] = CondPlan(self.conds)
         extra_args = {"model_options": extra_model_options, "seed": seed}
 
         executor = comfy.patcher_extension.WrapperExecutor.new_class_executor(
@@ -26,6 +26,7 @@ import math
 import os
 
 import comfy.utils
+import comfy.model_detection_cache
 
 from . import clip_vision
 from . import gligen
@@ -963,6 +964,76 @@ class VAE:
         pixel_samples = pixel_samples.to(self.output_device).movedim(1,-1)
         return pixel_samples
 
+    def decode_iter(self, samples_in, batch_size=1, vae_options={}, tile_t=None, overlap_t=1):
+        """
+        Decode like decode() but yield the images of batch_size latents at a time so only one chunk of pixels
+        exists at once. Video latents are decoded one video at a time, their batch and frame dimensions merged
+        like VAEDecode. With tile_t, every video is decoded tile_t latent frames at a time instead of whole, see
+        decode_iter_temporal.
+        """
+        if tile_t is not None and samples_in.ndim == 5 and self.latent_dim == 3 and self.temporal_compression_decode() is not None:
+            for x in range(samples_in.shape[0]):
+                yield from self.decode_iter_temporal(samples_in[x:x+1], tile_t, overlap_t, vae_options=vae_options)
+            return
+
+        for x in range(0, samples_in.shape[0], batch_size):
+            images = self.decode(samples_in[x:x+batch_size], vae_options=vae_options)
+            if images.ndim == 5:
+                images = images.reshape((-1,) + tuple(images.shape[-3:]))
+            yield images
+
+    def decode_iter_temporal(self, samples, tile_t, overlap_t=1, vae_options={}):
+        """
+        Decode one video latent in windows of tile_t latent frames that overlap by overlap_t frames, and yield its
+        frames as soon as no later window overlaps them. Windows are placed and blended like the temporal tiles of
+        decode_tiled, so the result matches VAE Decode (Tiled) with the same temporal size, not a whole decode.
+        """
+        length = samples.shape[2]
+        tile_t = max(2, tile_t)
+        overlap_t = max(0, min(overlap_t, tile_t - 1))
+        if length <= tile_t:
+            yield self.decode(samples, vae_options=vae_options)[0]
+            return
+
+        def scale(formula, val):
+            return formula(val) if callable(formula) else formula * val
+
+        upscale_t = self.upscale_ratio[0]
+        index_t = upscale_t if self.upscale_index_formula is None else self.upscale_index_formula[0]
+        feather = round(scale(upscale_t, overlap_t))
+        positions = [max(0, min(length - overlap_t, x)) for x in range(0, length - overlap_t, tile_t - overlap_t)]
+
+        pending = None  # weighted sum of the decoded frames that later windows still overlap
+        pending_weight = None
+        pending_start = 0
+        for i, pos in enumerate(positions):
+            frames = self.decode(samples.narrow(2, pos, min(tile_t, length - pos)), vae_options=vae_options)[0]
+            start = round(scale(index_t, pos))
+            weight = torch.ones((frames.shape[0], 1, 1, 1), device=frames.device)
+            if feather < frames.shape[0]:
+                for t in range(feather):
+                    a = (t + 1) / feather
+                    weight[t] *= a
+                    weight[-1 - t] *= a
+
+            if pending is None:
+                pending_start = start
+                pending = torch.zeros_like(frames[:0])
+                pending_weight = torch.zeros_like(weight[:0])
+            grow = start + frames.shape[0] - pending_start - pending.shape[0]
+            if grow > 0:
+                pending = torch.cat((pending, frames.new_zeros((grow,) + tuple(frames.shape[1:]))))
+                pending_weight = torch.cat((pending_weight, weight.new_zeros((grow,) + tuple(weight.shape[1:]))))
+            pending[start - pending_start:start - pending_start + frames.shape[0]] += frames * weight
+            pending_weight[start - pending_start:start - pending_start + frames.shape[0]] += weight
+            del frames
+
+            done = pending.shape[0] if i + 1 == len(positions) else round(scale(index_t, positions[i + 1])) - pending_start
+            yield pending[:done] / pending_weight[:done]
+            pending = pending[done:]
+            pending_weight = pending_weight[done:]
+            pending_start += done
+
     def decode_tiled(self, samples, tile_x=None, tile_y=None, overlap=None, tile_t=None, overlap_t=None):
         self.throw_exception_if_invalid()
         memory_used = self.memory_used_decode(samples.shape, self.vae_dtype) #TODO: calculate mem required for tile
@@ -1508,12 +1579,21 @@ def load_checkpoint(config_path=None, ckpt_path=None, output_vae=True, output_cl
 
 def load_checkpoint_guess_config(ckpt_path, output_vae=True, output_clip=True, output_clipvision=False, embedding_directory=None, output_model=True, model_options={}, te_model_options={}):
     sd, metadata = comfy.utils.load_torch_file(ckpt_path, return_metadata=True)
-    out = load_state_dict_guess_config(sd, output_vae, output_clip, output_clipvision, embedding_directory, output_model, model_options, te_model_options=te_model_options, metadata=metadata)
+    out = load_state_dict_guess_config(sd, output_vae, output_clip, output_clipvision, embedding_directory, output_model, model_options, te_model_options=te_model_options, metadata=metadata, detection_cache_key=comfy.model_detection_cache.file_key(ckpt_path))
     if out is None:
         raise RuntimeError("ERROR: Could not detect model type of: {}\n{}".format(ckpt_path, model_detection_error_hint(ckpt_path, sd)))
     return out
 
-def load_state_dict_guess_config(sd, output_vae=True, output_clip=True, output_clipvision=False, embedding_directory=None, output_model=True, model_options={}, te_model_options={}, metadata=None):
+def _state_dict_stats(sd, prefix, detection_cache_key):
+    """Parameter count and most common weight dtype of the weights under prefix."""
+    name = "stats:{}".format(prefix)
+    stats = comfy.model_detection_cache.get(detection_cache_key, name)
+    if stats is None:
+        stats = [comfy.utils.calculate_parameters(sd, prefix), comfy.utils.weight_dtype(sd, prefix)]
+        comfy.model_detection_cache.put(detection_cache_key, name, stats)
+    return stats[0], stats[1]
+
+def load_state_dict_guess_config(sd, output_vae=True, output_clip=True, output_clipvision=False, embedding_directory=None, output_model=True, model_options={}, te_model_options={}, metadata=None, detection_cache_key=None):
     clip = None
     clipvision = None
     vae = None
@@ -1521,18 +1601,20 @@ def load_state_dict_guess_config(sd, output_vae=True, output_clip=True, output_c
     model_patcher = None
 
     diffusion_model_prefix = model_detection.unet_prefix_from_state_dict(sd)
-    parameters = comfy.utils.calculate_parameters(sd, diffusion_model_prefix)
-    weight_dtype = comfy.utils.weight_dtype(sd, diffusion_model_prefix)
+    parameters, weight_dtype = _state_dict_stats(sd, diffusion_model_prefix, detection_cache_key)
     load_device = model_management.get_torch_device()
 
     custom_operations = model_options.get("custom_operations", None)
     if custom_operations is None:
         sd, metadata = comfy.utils.convert_old_quants(sd, diffusion_model_prefix, metadata=metadata)
+    else:
+        # Detection results are only cached for state dicts that went through the quant conversion
+        detection_cache_key = None
 
-    model_config = model_detection.model_config_from_unet(sd, diffusion_model_prefix, metadata=metadata)
+    model_config = model_detection.model_config_from_unet(sd, diffusion_model_prefix, metadata=metadata, cache_key=detection_cache_key)
     if model_config is None:
         logging.warning("Warning, This is not a checkpoint file, trying to load it as a diffusion model only.")
-        diffusion_model = load_diffusion_model_state_dict(sd, model_options={})
+        diffusion_model = load_diffusion_model_state_dict(sd, model_options={}, detection_cache_key=detection_cache_key)
         if diffusion_model is None:
             return None
         return (diffusion_model, None, VAE(sd={}), None)  # The VAE object is there to throw an exception if it's actually used'
@@ -1613,7 +1695,7 @@ def load_state_dict_guess_config(sd, output_vae=True, output_clip=True, output_c
     return (model_patcher, clip, vae, clipvision)
 
 
-def load_diffusion_model_state_dict(sd, model_options={}, metadata=None):
+def load_diffusion_model_state_dict(sd, model_options={}, metadata=None, detection_cache_key=None):
     """
     Loads a UNet diffusion model from a state dictionary, supporting both diffusers and regular formats.
 
@@ -1623,6 +1705,8 @@ def load_diffusion_model_state_dict(sd, model_options={}, metadata=None):
             - dtype: Override model data type
             - custom_operations: Custom model operations
             - fp8_optimizations: Enable FP8 optimizations
+        detection_cache_key (str, optional): Identity of the file the state dict was loaded from, used to reuse
+            earlier detection results (see comfy.model_detection_cache.file_key)
 
     Returns:
         ModelPatcher: A wrapped model instance that handles device management and weight loading.
@@ -1646,11 +1730,12 @@ def load_diffusion_model_state_dict(sd, model_options={}, metadata=None):
     custom_operations = model_options.get("custom_operations", None)
     if custom_operations is None:
         sd, metadata = comfy.utils.convert_old_quants(sd, "", metadata=metadata)
-    parameters = comfy.utils.calculate_parameters(sd)
-    weight_dtype = comfy.utils.weight_dtype(sd)
+    else:
+        detection_cache_key = None
+    parameters, weight_dtype = _state_dict_stats(sd, "", detection_cache_key)
 
     load_device = model_management.get_torch_device()
-    model_config = model_detection.model_config_from_unet(sd, "", metadata=metadata)
+    model_config = model_detection.model_config_from_unet(sd, "", metadata=metadata, cache_key=detection_cache_key)
 
     if model_config is not None:
         new_sd = sd
@@ -1708,7 +1793,7 @@ def load_diffusion_model_state_dict(sd, model_options={}, metadata=None):
 
 def load_diffusion_model(unet_path, model_options={}):
     sd, metadata = comfy.utils.load_torch_file(unet_path, return_metadata=True)
-    model = load_diffusion_model_state_dict(sd, model_options=model_options, metadata=metadata)
+    model = load_diffusion_model_state_dict(sd, model_options=model_options, metadata=metadata, detection_cache_key=comfy.model_detection_cache.file_key(unet_path))
     if model is None:
         logging.error("ERROR UNSUPPORTED DIFFUSION MODEL {}".format(unet_path))
         raise RuntimeError("ERROR: Could not detect model type of: {}\n{}".format(unet_path, model_detection_error_hint(unet_path, sd)))
@@ -0,0 +1,125 @@
+"""
+Image upscale models (spandrel ImageModelDescriptor) under the model management.
+
+The model gets a ModelPatcher so load_models_gpu keeps it on the device between prompts and can unload it when
+something else needs the memory. The tile size and how many tiles run at once are picked from the activation memory
+per input pixel of the model. That is measured once with a probe tile on cuda devices after the model was loaded, and
+estimated elsewhere or when the probe fails, then remembered for the architecture. Running out of memory doubles the remembered value so the next runs start smaller.
+"""
+
+import logging
+import math
+
+import torch
+
+import comfy.model_patcher
+import comfy.utils
+from comfy import model_management
+
+TILE_SIZES = (2048, 1536, 1024, 768, 512, 384, 256, 192, 128)
+MAX_TILES_PER_BATCH = 16
+PROBE_SIZE = 128
+MEMORY_MARGIN = 1.25
+# Estimate when no measurement is possible, the same one the upscale node always used
+ESTIMATED_MEMORY_PER_PIXEL = 3 * 384.0
+
+_memory_per_pixel = {}
+
+
+def model_patcher(upscale_model):
+    """The ModelPatcher of the upscale model, created on first use."""
+    patcher = getattr(upscale_model, "comfy_patcher", None)
+    if patcher is None:
+        patcher = comfy.model_patcher.ModelPatcher(upscale_model.model, load_device=model_management.get_torch_device(), offload_device=model_management.unet_offload_device())
+        upscale_model.comfy_patcher = patcher
+    return patcher
+
+
+def _memory_key(upscale_model, device):
+    return (upscale_model.architecture.id, upscale_model.scale, upscale_model.dtype, device.type, model_management.module_size(upscale_model.model))
+
+
+def _measure(upscale_model, device):
+    if not model_management.is_device_cuda(device):
+        return None
+    requirements = upscale_model.size_requirements
+    size = max(PROBE_SIZE, requirements.minimum)
+    size = math.ceil(size / requirements.multiple_of) * requirements.multiple_of
+    probe = torch.rand([1, upscale_model.input_channels, size, size], device=device)
+    try:
+        model_management.synchronize()
+        torch.cuda.reset_peak_memory_stats(device)
+        base = torch.cuda.memory_allocated(device)
+        with torch.inference_mode():
+            upscale_model(probe)
+        peak = torch.cuda.max_memory_allocated(device) - base
+    except model_management.OOM_EXCEPTION:
+        model_management.soft_empty_cache()
+        return None
+    except Exception as e:
+        logging.warning("Unable to measure the memory use of upscale model {}, using an estimate: {}".format(upscale_model.architecture.id, e))
+        return None
+    return peak * MEMORY_MARGIN / (size * size)
+
+
+def _estimated_memory_per_pixel(upscale_model):
+    return ESTIMATED_MEMORY_PER_PIXEL * torch.finfo(upscale_model.dtype).bits / 8 * max(upscale_model.scale, 1.0)
+
+
+def memory_per_pixel(upscale_model, device):
+    """Bytes of memory the model needs per pixel of its input while running."""
+    key = _memory_key(upscale_model, device)
+    value = _memory_per_pixel.get(key, None)
+    if value is None:
+        value = _measure(upscale_model, device)
+        if value is None:
+            value = _estimated_memory_per_pixel(upscale_model)
+        else:
+            logging.debug("Upscale model {} uses {:.0f} bytes per input pixel".format(upscale_model.architecture.id, value))
+        _memory_per_pixel[key] = value
+    return value
+
+
+def choose_tiling(upscale_model, device, image_shape, overlap):
+    """(tile size, tiles per batch) that fit in the free memory of device for a batch of image_shape [B, C, H, W]."""
+    per_pixel = memory_per_pixel(upscale_model, device)
+    free = model_management.get_free_memory(device) - model_management.extra_reserved_memory()
+    batch, _, height, width = image_shape
+    for tile in TILE_SIZES:
+        pixels = min(tile, height) * min(tile, width)
+        if per_pixel * pixels <= free or tile == TILE_SIZES[-1]:
+            break
+    tiles = batch * comfy.utils.get_tiled_scale_steps(width, height, tile_x=tile, tile_y=tile, overlap=overlap)
+    tiles_per_batch = max(1, min(MAX_TILES_PER_BATCH, tiles, int(free // max(per_pixel * pixels, 1))))
+    return tile, tiles_per_batch
+
+
+def upscale(upscale_model, image, overlap=32):
+    """Upscale an IMAGE batch [B, H, W, C] with the model, returns the clamped upscaled IMAGE."""
+    patcher = model_patcher(upscale_model)
+    device = patcher.load_device
+    in_img = image.movedim(-1, -3)
+
+    # The probe in memory_per_pixel needs the model on the device, so loading uses the remembered value or the estimate
+    per_pixel = _memory_per_pixel.get(_memory_key(upscale_model, device), None) or _estimated_memory_per_pixel(upscale_model)
+    memory_required = per_pixel * min(in_img.shape[2] * in_img.shape[3], 512 * 512)
+    model_management.load_models_gpu([patcher], memory_required=memory_required, force_full_load=True)
+
+    while True:
+        tile, tiles_per_batch = choose_tiling(upscale_model, device, in_img.shape, overlap)
+        try:
+            steps = in_img.shape[0] * comfy.utils.get_tiled_scale_steps(in_img.shape[3], in_img.shape[2], tile_x=tile, tile_y=tile, overlap=overlap)
+            pbar = comfy.utils.ProgressBar(steps)
+            s = comfy.utils.tiled_scale_batched(in_img, lambda a: upscale_model(a.to(device)), tile_x=tile, tile_y=tile, overlap=overlap,
+                                                upscale_amount=upscale_model.scale, out_channels=upscale_model.output_channels,
+                                                output_device=model_management.intermediate_device(), tiles_per_batch=tiles_per_batch, pbar=pbar)
+            break
+        except model_management.OOM_EXCEPTION as e:
+            model_management.soft_empty_cache()
+            if tile == TILE_SIZES[-1] and tiles_per_batch == 1:
+                raise e
+            key = _memory_key(upscale_model, device)
+            _memory_per_pixel[key] = _memory_per_pixel[key] * 2
+            logging.warning("Ran out of memory upscaling with tile {} x {} tiles, trying smaller tiles.".format(tile, tiles_per_batch))
+
+    return torch.clamp(s.movedim(-3, -1), min=0, max=1.0)
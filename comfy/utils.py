@@ -1155,6 +1155,63 @@ def tiled_scale_multidim(samples, function, tile=(64, 64), overlap=8, upscale_am
 def tiled_scale(samples, function, tile_x=64, tile_y=64, overlap = 8, upscale_amount = 4, out_channels = 3, output_device="cpu", pbar = None):
     return tiled_scale_multidim(samples, function, (tile_y, tile_x), overlap=overlap, upscale_amount=upscale_amount, out_channels=out_channels, output_device=output_device, pbar=pbar)
 
+@torch.inference_mode()
+def tiled_scale_batched(samples, function, tile_x=64, tile_y=64, overlap=8, upscale_amount=4, out_channels=3, output_device="cpu", tiles_per_batch=1, pbar=None):
+    """
+    Same tiles and blending as tiled_scale but function gets up to tiles_per_batch tiles at once.
+    Tiles of the same size from every image of the batch are stacked together.
+    """
+    batch, _, height, width = samples.shape
+    out_h, out_w = round(height * upscale_amount), round(width * upscale_amount)
+
+    # handle entire input fitting in a single tile
+    if height <= tile_y and width <= tile_x:
+        output = torch.empty([batch, out_channels, out_h, out_w], device=output_device)
+        for start in range(0, batch, tiles_per_batch):
+            end = min(batch, start + tiles_per_batch)
+            output[start:end] = function(samples[start:end]).to(output_device)
+            if pbar is not None:
+                pbar.update(end - start)
+        return output
+
+    groups = {}
+    for b in range(batch):
+        positions = itertools.product(*[range(0, size - overlap, tile - overlap) if size > tile else [0] for size, tile in ((height, tile_y), (width, tile_x))])
+        for it_y, it_x in positions:
+            y = max(0, min(height - overlap, it_y))
+            x = max(0, min(width - overlap, it_x))
+            groups.setdefault((min(tile_y, height - y), min(tile_x, width - x)), []).append((b, y, x))
+
+    out = torch.zeros([batch, out_channels, out_h, out_w], device=output_device)
+    out_div = torch.zeros([batch, 1, out_h, out_w], device=output_device)
+    feather = round(overlap * upscale_amount)
+
+    for (l_y, l_x), tiles in groups.items():
+        mask = None
+        for start in range(0, len(tiles), tiles_per_batch):
+            chunk = tiles[start:start + tiles_per_batch]
+            ps = function(torch.cat([samples[b:b + 1, :, y:y + l_y, x:x + l_x] for b, y, x in chunk])).to(output_device)
+
+            if mask is None:
+                mask = torch.ones([1, 1] + list(ps.shape[2:]), device=output_device)
+                for d in range(2, 4):
+                    if feather >= mask.shape[d]:
+                        continue
+                    for t in range(feather):
+                        a = (t + 1) / feather
+                        mask.narrow(d, t, 1).mul_(a)
+                        mask.narrow(d, mask.shape[d] - 1 - t, 1).mul_(a)
+
+            for i, (b, y, x) in enumerate(chunk):
+                u_y, u_x = round(y * upscale_amount), round(x * upscale_amount)
+                out[b:b + 1, :, u_y:u_y + mask.shape[2], u_x:u_x + mask.shape[3]].add_(ps[i:i + 1] * mask)
+                out_div[b:b + 1, :, u_y:u_y + mask.shape[2], u_x:u_x + mask.shape[3]].add_(mask)
+
+            if pbar is not None:
+                pbar.update(len(chunk))
+
+    return out.div_(out_div)
+
 PROGRESS_BAR_ENABLED = True
 def set_progress_bar_enabled(enabled):
     global PROGRESS_BAR_ENABLED
@@ -1,10 +1,12 @@
 from __future__ import annotations
 from abc import ABC, abstractmethod
 from fractions import Fraction
-from typing import Optional, Union, IO
+from typing import Iterator, Optional, Union, IO, TYPE_CHECKING
 import io
 import av
 from .._util import VideoContainer, VideoCodec, VideoComponents
+if TYPE_CHECKING:
+    import torch
 
 class VideoInput(ABC):
     """
@@ -34,6 +36,18 @@ class VideoInput(ABC):
         """
         pass
 
+    def iter_frames(self, chunk_size: int = 16) -> Iterator[torch.Tensor]:
+        """
+        Iterate over the frames as IMAGE tensors of at most chunk_size frames.
+
+        Consumers that can work one chunk at a time (saving, encoding, per frame operations) should use this
+        instead of get_components(), so implementations that produce frames incrementally never hold the whole
+        clip in memory. Default implementation slices the images of get_components().
+        """
+        images = self.get_components().images
+        for i in range(0, images.shape[0], chunk_size):
+            yield images[i:i + chunk_size]
+
     def get_stream_source(self) -> Union[str, io.BytesIO]:
         """
         Get a streamable source for the video. This allows processing without
@@ -2,13 +2,15 @@ from __future__ import annotations
 from av.container import InputContainer
 from av.subtitles.stream import SubtitleStream
 from fractions import Fraction
-from typing import Optional
+from typing import Callable, Iterable, Iterator, Optional
 from .._input import AudioInput, VideoInput
 import av
 import io
 import json
 import numpy as np
 import math
+import queue
+import threading
 import torch
 from .._util import VideoContainer, VideoCodec, VideoComponents
 
@@ -52,6 +54,172 @@ def get_open_write_kwargs(
     return open_kwargs
 
 
+def _decode_size(width: int, height: int, max_size: Optional[int]) -> tuple[int, int]:
+    """Frame size after downscaling so the longest side is at most max_size, keeping the aspect ratio."""
+    if max_size is None or max(width, height) <= max_size:
+        return width, height
+    scale = max_size / max(width, height)
+    return max(1, round(width * scale)), max(1, round(height * scale))
+
+
+def _frame_to_rgb24(frame: av.VideoFrame, width: int, height: int, out: np.ndarray):
+    """Convert a decoded frame to rgb24 of the given size and write it into out (H, W, 3) without a temporary array."""
+    if frame.width != width or frame.height != height:
+        frame = frame.reformat(width=width, height=height, format='rgb24', interpolation='AREA')
+    else:
+        frame = frame.reformat(format='rgb24')
+    plane = frame.planes[0]
+    rows = np.frombuffer(plane, dtype=np.uint8, count=plane.line_size * height).reshape(height, plane.line_size)
+    out[...] = rows[:, :width * 3].reshape(height, width, 3)
+
+
+ENCODE_BATCH_SIZE = 16
+ENCODE_QUEUE_SIZE = 4
+
+
+def images_to_uint8_batches(images: torch.Tensor, batch_size: int = ENCODE_BATCH_SIZE):
+    """
+    Yield the frames of an IMAGE tensor as uint8 rgb24 numpy arrays of shape (N, H, W, 3), batch_size frames at a time.
+    The conversion runs on the device the images are on, only the uint8 result is copied to the cpu.
+    """
+    for i in range(0, images.shape[0], batch_size):
+        batch = images[i:i + batch_size, ..., :3]
+        yield torch.clamp(batch * 255, min=0, max=255).to(dtype=torch.uint8).cpu().numpy()
+
+
+class VideoEncoderThread:
+    """
+    Encodes rgb24 frames into a video stream and muxes the packets on a worker thread.
+
+    Batches of frames are handed over through a bounded queue, so converting the next batch overlaps with encoding
+    the previous one. Codec threading is enabled on the stream. Nothing else may mux into the container until
+    finish() returned.
+    """
+    def __init__(self, container: av.container.OutputContainer, stream: av.VideoStream, pix_fmt: Optional[str] = None, queue_size: int = ENCODE_QUEUE_SIZE):
+        self.container = container
+        self.stream = stream
+        self.pix_fmt = pix_fmt
+        self.stream.thread_type = "AUTO"
+        self.queue = queue.Queue(maxsize=queue_size)
+        self.error = None
+        self.thread = threading.Thread(target=self._run, name="VideoEncoder", daemon=True)
+        self.thread.start()
+
+    def _run(self):
+        try:
+            while True:
+                frames = self.queue.get()
+                if frames is None:
+                    break
+                for img in frames:
+                    frame = av.VideoFrame.from_ndarray(img, format='rgb24')
+                    if self.pix_fmt is not None:
+                        frame = frame.reformat(format=self.pix_fmt)
+                    self.container.mux(self.stream.encode(frame))
+            # Flush video
+            self.container.mux(self.stream.encode(None))
+        except Exception as e:
+            self.error = e
+
+    def _put(self, item):
+        while True:
+            if self.error is not None or not self.thread.is_alive():
+                return False
+            try:
+                self.queue.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                pass
+
+    def put(self, frames: np.ndarray):
+        """Queue a (N, H, W, 3) uint8 batch of frames, blocks while the queue is full."""
+        if not self._put(frames):
+            self.finish()
+
+    def finish(self):
+        """Flush the encoder and wait for the thread. Raises the error of the worker thread if it had one."""
+        self._put(None)
+        self.thread.join()
+        if self.error is not None:
+            raise self.error
+
+
+def encode_frames(container: av.container.OutputContainer, stream: av.VideoStream, frames: Iterable[torch.Tensor], pix_fmt: Optional[str] = None) -> int:
+    """Encode and mux IMAGE chunks into stream, flushing it at the end. Returns the number of frames written."""
+    encoder = VideoEncoderThread(container, stream, pix_fmt=pix_fmt)
+    count = 0
+    try:
+        for chunk in frames:
+            for batch in images_to_uint8_batches(chunk):
+                encoder.put(batch)
+                count += batch.shape[0]
+    except BaseException:
+        encoder._put(None)
+        encoder.thread.join()
+        raise
+    encoder.finish()
+    return count
+
+
+def encode_images(container: av.container.OutputContainer, stream: av.VideoStream, images: torch.Tensor, pix_fmt: Optional[str] = None) -> int:
+    """Encode and mux all frames of an IMAGE tensor into stream, flushing it at the end."""
+    return encode_frames(container, stream, [images], pix_fmt=pix_fmt)
+
+
+def save_frames_to(
+    path: str | io.BytesIO,
+    frames: Iterable[torch.Tensor],
+    width: int,
+    height: int,
+    frame_rate: Fraction,
+    audio: Optional[AudioInput] = None,
+    format: VideoContainer = VideoContainer.AUTO,
+    codec: VideoCodec = VideoCodec.AUTO,
+    metadata: Optional[dict] = None
+):
+    """Write IMAGE chunks and optional audio as an h264 mp4, only one chunk of frames is needed at a time."""
+    if format != VideoContainer.AUTO and format != VideoContainer.MP4:
+        raise ValueError("Only MP4 format is supported for now")
+    if codec != VideoCodec.AUTO and codec != VideoCodec.H264:
+        raise ValueError("Only H264 codec is supported for now")
+    extra_kwargs = {}
+    if isinstance(format, VideoContainer) and format != VideoContainer.AUTO:
+        extra_kwargs["format"] = format.value
+    with av.open(path, mode='w', options={'movflags': 'use_metadata_tags'}, **extra_kwargs) as output:
+        # Add metadata before writing any streams
+        if metadata is not None:
+            for key, value in metadata.items():
+                output.metadata[key] = json.dumps(value)
+
+        frame_rate = Fraction(round(frame_rate * 1000), 1000)
+        # Create a video stream
+        video_stream = output.add_stream('h264', rate=frame_rate)
+        video_stream.width = width
+        video_stream.height = height
+        video_stream.pix_fmt = 'yuv420p'
+
+        # Create an audio stream
+        audio_sample_rate = 1
+        audio_stream: Optional[av.AudioStream] = None
+        if audio:
+            audio_sample_rate = int(audio['sample_rate'])
+            audio_stream = output.add_stream('aac', rate=audio_sample_rate)
+
+        # Encode video, converted to YUV420P as required by h264
+        frame_count = encode_frames(output, video_stream, frames, pix_fmt='yuv420p')
+
+        if audio_stream and audio:
+            waveform = audio['waveform']
+            waveform = waveform[:, :, :math.ceil((audio_sample_rate / frame_rate) * frame_count)]
+            frame = av.AudioFrame.from_ndarray(waveform.movedim(2, 1).reshape(1, -1).float().cpu().numpy(), format='flt', layout='mono' if waveform.shape[1] == 1 else 'stereo')
+            frame.sample_rate = audio_sample_rate
+            frame.pts = 0
+            output.mux(audio_stream.encode(frame))
+
+            # Flush encoder
+            output.mux(audio_stream.encode(None))
+
+
 class VideoFromFile(VideoInput):
     """
     Class representing video input from a file.
@@ -198,53 +366,165 @@ class VideoFromFile(VideoInput):
         with av.open(self.__file, mode='r') as container:
             return container.format.name
 
-    def get_components_internal(self, container: InputContainer) -> VideoComponents:
-        # Get video frames
-        frames = []
-        for frame in container.decode(video=0):
-            img = frame.to_ndarray(format='rgb24')  # shape: (H, W, 3)
-            img = torch.from_numpy(img) / 255.0  # shape: (H, W, 3)
-            frames.append(img)
+    def get_components_internal(
+        self,
+        container: InputContainer,
+        start_frame: int = 0,
+        end_frame: Optional[int] = None,
+        stride: int = 1,
+        max_frames: Optional[int] = None,
+        max_size: Optional[int] = None,
+    ) -> VideoComponents:
+        """
+        Decode the video and its first audio stream in a single pass.
 
-        images = torch.stack(frames) if len(frames) > 0 else torch.zeros(0, 3, 0, 0)
+        Args:
+            start_frame: Index of the first frame to keep.
+            end_frame: Index of the frame to stop at (exclusive), None for the end of the video.
+            stride: Keep every stride-th frame starting at start_frame. The frame rate is divided by it.
+            max_frames: Stop after this many frames were kept, None for no limit.
+            max_size: Downscale frames whose longest side is larger than this while decoding, None to keep the size.
 
-        # Get frame rate
-        video_stream = next(s for s in container.streams if s.type == 'video')
-        frame_rate = Fraction(video_stream.average_rate) if video_stream and video_stream.average_rate else Fraction(1)
+        When frames are selected the audio is cut to the time span of the kept frames.
+        """
+        if stride < 1:
+            raise ValueError(f"stride must be at least 1, got {stride}")
+        video_stream = self._get_first_video_stream(container)
+        video_stream.thread_type = "AUTO"
+        audio_stream = next((s for s in container.streams if s.type == 'audio'), None)
+        frame_rate = Fraction(video_stream.average_rate) if video_stream.average_rate else Fraction(1)
+        width, height = _decode_size(video_stream.width, video_stream.height, max_size)
+        selecting = start_frame > 0 or end_frame is not None or stride > 1 or max_frames is not None
+
+        # Frames are written straight into a preallocated uint8 buffer, grown if the metadata frame count was too low
+        capacity = self._estimate_selected_frames(container, video_stream, frame_rate, start_frame, end_frame, stride, max_frames)
+        buffer = torch.empty((capacity, height, width, 3), dtype=torch.uint8)
+        count = 0
+        index = 0
+        video_done = False
+        first_time = None
+        last_time = None
+        audio_frames = []
+        audio_start = None
+
+        streams = [video_stream] if audio_stream is None else [video_stream, audio_stream]
+        for packet in container.demux(*streams):
+            if packet.stream.type == 'audio':
+                if video_done and last_time is not None and packet.pts is not None and packet.time_base is not None and float(packet.pts * packet.time_base) > last_time:
+                    break
+                for frame in packet.decode():
+                    assert isinstance(frame, av.AudioFrame)
+                    if audio_start is None:
+                        audio_start = frame.time if frame.time is not None else 0.0
+                    audio_frames.append(frame.to_ndarray())  # shape: (channels, samples)
+                continue
+
+            if video_done:
+                if audio_stream is None:
+                    break
+                continue
+            for frame in packet.decode():
+                keep = index >= start_frame and (index - start_frame) % stride == 0 and (end_frame is None or index < end_frame)
+                index += 1
+                if not keep:
+                    if end_frame is not None and index >= end_frame:
+                        video_done = True
+                        break
+                    continue
+                if count == buffer.shape[0]:
+                    grown = torch.empty((max(count * 2, 16), height, width, 3), dtype=torch.uint8)
+                    grown[:count] = buffer[:count]
+                    buffer = grown
+                _frame_to_rgb24(frame, width, height, buffer[count].numpy())
+                count += 1
+                time = frame.time if frame.time is not None else (index - 1) / frame_rate
+                if first_time is None:
+                    first_time = float(time)
+                last_time = float(time + stride / frame_rate)
+                if (max_frames is not None and count >= max_frames) or (end_frame is not None and index >= end_frame):
+                    video_done = True
+                    break
+
+        if count > 0:
+            images = torch.empty((count, height, width, 3), dtype=torch.float32)
+            # Convert in chunks so only one float copy of the frames ever exists
+            for i in range(0, count, 16):
+                end = min(count, i + 16)
+                images[i:end].copy_(buffer[i:end]).div_(255.0)
+        else:
+            images = torch.zeros(0, 3, 0, 0)
+        del buffer
 
         # Get audio if available
         audio = None
-        try:
-            container.seek(0)  # Reset the container to the beginning
-            for stream in container.streams:
-                if stream.type != 'audio':
-                    continue
-                assert isinstance(stream, av.AudioStream)
-                audio_frames = []
-                for packet in container.demux(stream):
-                    for frame in packet.decode():
-                        assert isinstance(frame, av.AudioFrame)
-                        audio_frames.append(frame.to_ndarray())  # shape: (channels, samples)
-                if len(audio_frames) > 0:
-                    audio_data = np.concatenate(audio_frames, axis=1)  # shape: (channels, total_samples)
-                    audio_tensor = torch.from_numpy(audio_data).unsqueeze(0)  # shape: (1, channels, total_samples)
-                    audio = AudioInput({
-                        "waveform": audio_tensor,
-                        "sample_rate": int(stream.sample_rate) if stream.sample_rate else 1,
-                    })
-        except StopIteration:
-            pass  # No audio stream
+        if len(audio_frames) > 0:
+            audio_data = np.concatenate(audio_frames, axis=1)  # shape: (channels, total_samples)
+            sample_rate = int(audio_stream.sample_rate) if audio_stream.sample_rate else 1
+            if selecting and first_time is not None:
+                begin = max(0, round((first_time - audio_start) * sample_rate))
+                end = max(begin, round((last_time - audio_start) * sample_rate))
+                audio_data = audio_data[:, begin:end]
+            audio_tensor = torch.from_numpy(audio_data).unsqueeze(0)  # shape: (1, channels, total_samples)
+            audio = AudioInput({
+                "waveform": audio_tensor,
+                "sample_rate": sample_rate,
+            })
 
         metadata = container.metadata
-        return VideoComponents(images=images, audio=audio, frame_rate=frame_rate, metadata=metadata)
-
-    def get_components(self) -> VideoComponents:
+        return VideoComponents(images=images, audio=audio, frame_rate=frame_rate / stride, metadata=metadata)
+
+    def _estimate_selected_frames(self, container, video_stream, frame_rate, start_frame, end_frame, stride, max_frames) -> int:
+        total = video_stream.frames
+        if not total and container.duration is not None:
+            total = int(math.ceil(container.duration / av.time_base * frame_rate))
+        if end_frame is not None:
+            total = end_frame if not total else min(total, end_frame)
+        if not total:
+            estimate = 64
+        else:
+            estimate = max(0, math.ceil((total - start_frame) / stride)) + 1
+        if max_frames is not None:
+            estimate = min(estimate, max_frames)
+        return max(estimate, 1)
+
+    def get_components(
+        self,
+        start_frame: int = 0,
+        end_frame: Optional[int] = None,
+        stride: int = 1,
+        max_frames: Optional[int] = None,
+        max_size: Optional[int] = None,
+    ) -> VideoComponents:
+        """
+        Decode the video. See get_components_internal for the frame selection and downscaling arguments.
+        """
         if isinstance(self.__file, io.BytesIO):
             self.__file.seek(0)  # Reset the BytesIO object to the beginning
         with av.open(self.__file, mode='r') as container:
-            return self.get_components_internal(container)
+            return self.get_components_internal(container, start_frame=start_frame, end_frame=end_frame, stride=stride, max_frames=max_frames, max_size=max_size)
         raise ValueError(f"No video stream found in file '{self.__file}'")
 
+    def iter_frames(self, chunk_size: int = 16) -> Iterator[torch.Tensor]:
+        """
+        Decode the video incrementally, only one chunk of frames is in memory at a time.
+        """
+        if isinstance(self.__file, io.BytesIO):
+            self.__file.seek(0)
+        with av.open(self.__file, mode='r') as container:
+            video_stream = self._get_first_video_stream(container)
+            video_stream.thread_type = "AUTO"
+            width, height = video_stream.width, video_stream.height
+            buffer = torch.empty((chunk_size, height, width, 3), dtype=torch.uint8)
+            count = 0
+            for frame in container.decode(video_stream):
+                _frame_to_rgb24(frame, width, height, buffer[count].numpy())
+                count += 1
+                if count == chunk_size:
+                    yield buffer.float().div_(255.0)
+                    count = 0
+            if count > 0:
+                yield buffer[:count].float().div_(255.0)
+
     def save_to(
         self,
         path: str | io.BytesIO,
@@ -332,52 +612,77 @@ class VideoFromComponents(VideoInput):
         codec: VideoCodec = VideoCodec.AUTO,
         metadata: Optional[dict] = None
     ):
-        if format != VideoContainer.AUTO and format != VideoContainer.MP4:
-            raise ValueError("Only MP4 format is supported for now")
-        if codec != VideoCodec.AUTO and codec != VideoCodec.H264:
-            raise ValueError("Only H264 codec is supported for now")
-        extra_kwargs = {}
-        if isinstance(format, VideoContainer) and format != VideoContainer.AUTO:
-            extra_kwargs["format"] = format.value
-        with av.open(path, mode='w', options={'movflags': 'use_metadata_tags'}, **extra_kwargs) as output:
-            # Add metadata before writing any streams
-            if metadata is not None:
-                for key, value in metadata.items():
-                    output.metadata[key] = json.dumps(value)
-
-            frame_rate = Fraction(round(self.__components.frame_rate * 1000), 1000)
-            # Create a video stream
-            video_stream = output.add_stream('h264', rate=frame_rate)
-            video_stream.width = self.__components.images.shape[2]
-            video_stream.height = self.__components.images.shape[1]
-            video_stream.pix_fmt = 'yuv420p'
-
-            # Create an audio stream
-            audio_sample_rate = 1
-            audio_stream: Optional[av.AudioStream] = None
-            if self.__components.audio:
-                audio_sample_rate = int(self.__components.audio['sample_rate'])
-                audio_stream = output.add_stream('aac', rate=audio_sample_rate)
-
-            # Encode video
-            for i, frame in enumerate(self.__components.images):
-                img = (frame * 255).clamp(0, 255).byte().cpu().numpy() # shape: (H, W, 3)
-                frame = av.VideoFrame.from_ndarray(img, format='rgb24')
-                frame = frame.reformat(format='yuv420p')  # Convert to YUV420P as required by h264
-                packet = video_stream.encode(frame)
-                output.mux(packet)
+        images = self.__components.images
+        save_frames_to(path, [images], images.shape[2], images.shape[1], self.__components.frame_rate, audio=self.__components.audio,
+                       format=format, codec=codec, metadata=metadata)
 
-            # Flush video
-            packet = video_stream.encode(None)
-            output.mux(packet)
-
-            if audio_stream and self.__components.audio:
-                waveform = self.__components.audio['waveform']
-                waveform = waveform[:, :, :math.ceil((audio_sample_rate / frame_rate) * self.__components.images.shape[0])]
-                frame = av.AudioFrame.from_ndarray(waveform.movedim(2, 1).reshape(1, -1).float().cpu().numpy(), format='flt', layout='mono' if waveform.shape[1] == 1 else 'stereo')
-                frame.sample_rate = audio_sample_rate
-                frame.pts = 0
-                output.mux(audio_stream.encode(frame))
-
-                # Flush encoder
-                output.mux(audio_stream.encode(None))
+
+class VideoFromFrameChunks(VideoInput):
+    """
+    Class representing a video whose frames are produced chunk by chunk when they are needed.
+
+    frames is called every time the frames are consumed and returns an iterable of IMAGE tensors [N, H, W, 3].
+    Saving and iter_frames() only hold one chunk in memory, get_components() concatenates all of them.
+    """
+
+    def __init__(
+        self,
+        frames: Callable[[], Iterable[torch.Tensor]],
+        frame_rate: Fraction,
+        audio: Optional[AudioInput] = None,
+        dimensions: Optional[tuple[int, int]] = None,
+        frame_count: Optional[int] = None,
+    ):
+        """
+        Args:
+            frames: Function returning a new iterable over the frame chunks.
+            frame_rate: Frame rate of the video.
+            audio: Optional audio of the video.
+            dimensions: (width, height) if known up front, otherwise the first chunk is produced to find out.
+            frame_count: Number of frames if known up front, otherwise all chunks are produced to count them.
+        """
+        self.__frames = frames
+        self.__frame_rate = frame_rate
+        self.__audio = audio
+        self.__dimensions = dimensions
+        self.__frame_count = frame_count
+
+    def iter_frames(self, chunk_size: int = 16) -> Iterator[torch.Tensor]:
+        for chunk in self.__frames():
+            for i in range(0, chunk.shape[0], chunk_size):
+                yield chunk[i:i + chunk_size]
+
+    def get_components(self) -> VideoComponents:
+        chunks = list(self.__frames())
+        images = torch.cat(chunks) if len(chunks) > 0 else torch.zeros(0, 3, 0, 0)
+        return VideoComponents(images=images, audio=self.__audio, frame_rate=self.__frame_rate)
+
+    def get_dimensions(self) -> tuple[int, int]:
+        if self.__dimensions is None:
+            chunk = next(iter(self.__frames()), None)
+            if chunk is None:
+                raise ValueError("Video has no frames")
+            self.__dimensions = (chunk.shape[2], chunk.shape[1])
+        return self.__dimensions
+
+    def get_frame_count(self) -> int:
+        if self.__frame_count is None:
+            self.__frame_count = sum(chunk.shape[0] for chunk in self.__frames())
+        return self.__frame_count
+
+    def get_frame_rate(self) -> Fraction:
+        return self.__frame_rate
+
+    def get_duration(self) -> float:
+        return float(self.get_frame_count() / self.__frame_rate)
+
+    def save_to(
+        self,
+        path: str,
+        format: VideoContainer = VideoContainer.AUTO,
+        codec: VideoCodec = VideoCodec.AUTO,
+        metadata: Optional[dict] = None
+    ):
+        width, height = self.get_dimensions()
+        save_frames_to(path, self.iter_frames(), width, height, self.__frame_rate, audio=self.__audio,
+                       format=format, codec=codec, metadata=metadata)
@@ -3,7 +3,11 @@ from __future__ import annotations
 import json
 import os
 import random
+import struct
 import uuid
+import zlib
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from io import BytesIO
 
 import av
@@ -73,6 +77,72 @@ def _get_directory_by_folder_type(folder_type: FolderType) -> str:
     return folder_paths.get_temp_directory()
 
 
+ANIMATION_ENCODE_WORKERS = max(1, min(8, os.cpu_count() or 1))
+
+
+def _iter_uint8_frames(images: torch.Tensor, batch_size: int = 32):
+    """Yields the frames as uint8 numpy arrays, converting batch_size frames at a time with one tensor op."""
+    for i in range(0, len(images), batch_size):
+        yield from torch.clamp(images[i:i + batch_size] * 255.0, min=0, max=255).to(torch.uint8).cpu().numpy()
+
+
+def _map_ordered(function, items, workers: int = ANIMATION_ENCODE_WORKERS):
+    """map() on a thread pool that keeps the order and pulls at most 2 * workers items ahead from items."""
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        pending = deque()
+        for item in items:
+            pending.append(pool.submit(function, item))
+            if len(pending) >= workers * 2:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+
+
+def _png_chunk(fp, cid: bytes, data: bytes):
+    fp.write(struct.pack(">I", len(data)) + cid + data + struct.pack(">I", zlib.crc32(cid + data) & 0xFFFFFFFF))
+
+
+def _encode_png_frame(frame: np.ndarray, compress_level: int) -> tuple[bytes, bytes]:
+    """Compresses one frame as a PNG, returns its IHDR and its joined IDAT data."""
+    buffer = BytesIO()
+    PILImage.fromarray(frame).save(buffer, format="PNG", compress_level=compress_level)
+    data = buffer.getvalue()
+    ihdr, idat = b"", []
+    pos = 8
+    while pos < len(data):
+        length, cid = struct.unpack(">I4s", data[pos:pos + 8])
+        if cid == b"IHDR":
+            ihdr = data[pos + 8:pos + 8 + length]
+        elif cid == b"IDAT":
+            idat.append(data[pos + 8:pos + 8 + length])
+        pos += 12 + length
+    return ihdr, b"".join(idat)
+
+
+def _webp_chunk(cid: bytes, data: bytes) -> bytes:
+    return cid + struct.pack("<I", len(data)) + data + (b"\0" if len(data) % 2 else b"")
+
+
+def _encode_webp_frame(frame: np.ndarray, lossless: bool, quality: int, method: int) -> bytes:
+    """Compresses one frame as a still WebP, returns its image chunks (ALPH, VP8 or VP8L) ready for an ANMF chunk."""
+    buffer = BytesIO()
+    PILImage.fromarray(frame).save(buffer, format="WEBP", lossless=lossless, quality=quality, method=method)
+    data = buffer.getvalue()
+    chunks = []
+    pos = 12
+    while pos < len(data):
+        cid, length = struct.unpack("<4sI", data[pos:pos + 8])
+        end = pos + 8 + length + (length % 2)
+        if cid in (b"ALPH", b"VP8 ", b"VP8L"):
+            chunks.append(data[pos:end])
+        pos = end
+    return b"".join(chunks)
+
+
+def _uint24(value: int) -> bytes:
+    return struct.pack("<I", value)[:3]
+
+
 class ImageSaveHelper:
     """A helper class with static methods to handle image saving and metadata."""
 
@@ -120,9 +190,9 @@ class ImageSaveHelper:
         return metadata
 
     @staticmethod
-    def _create_webp_metadata(pil_image: PILImage.Image, cls: type[ComfyNode] | None) -> PILImage.Exif:
+    def _create_webp_metadata(pil_image: PILImage.Image | None, cls: type[ComfyNode] | None) -> PILImage.Exif:
         """Creates EXIF metadata bytes for WebP images."""
-        exif_data = pil_image.getexif()
+        exif_data = pil_image.getexif() if pil_image is not None else PILImage.Exif()
         if args.disable_metadata or cls is None or cls.hidden is None:
             return exif_data
         if cls.hidden.prompt is not None:
@@ -174,18 +244,39 @@ class ImageSaveHelper:
         full_output_folder, filename, counter, subfolder, _ = folder_paths.get_save_image_path(
             filename_prefix, _get_directory_by_folder_type(folder_type), images[0].shape[1], images[0].shape[0]
         )
-        pil_images = [ImageSaveHelper._convert_tensor_to_pil(img) for img in images]
         metadata = ImageSaveHelper._create_animated_png_metadata(cls)
         file = f"{filename}_{counter:05}_.png"
         save_path = os.path.join(full_output_folder, file)
-        pil_images[0].save(
-            save_path,
-            pnginfo=metadata,
-            compress_level=compress_level,
-            save_all=True,
-            duration=int(1000.0 / fps),
-            append_images=pil_images[1:],
-        )
+        if len(images) == 1:
+            ImageSaveHelper._convert_tensor_to_pil(images[0]).save(save_path, pnginfo=metadata, compress_level=compress_level)
+            return SavedResult(file, subfolder, folder_type)
+
+        # Frames are compressed in parallel as still PNGs, their image data is written as APNG frames
+        chunks = metadata.chunks if metadata is not None else []
+        duration = int(1000.0 / fps)
+        sequence = 0
+        frames = _map_ordered(lambda frame: _encode_png_frame(frame, compress_level), _iter_uint8_frames(images))
+        with open(save_path, "wb") as fp:
+            fp.write(b"\x89PNG\r\n\x1a\n")
+            for i, (ihdr, idat) in enumerate(frames):
+                if i == 0:
+                    _png_chunk(fp, b"IHDR", ihdr)
+                    for cid, data, *after_idat in chunks:
+                        if not (after_idat and after_idat[0]):
+                            _png_chunk(fp, cid, data)
+                    _png_chunk(fp, b"acTL", struct.pack(">II", len(images), 0))
+                width, height = struct.unpack(">II", ihdr[:8])
+                _png_chunk(fp, b"fcTL", struct.pack(">IIIIIHHBB", sequence, width, height, 0, 0, duration, 1000, 0, 0))
+                sequence += 1
+                if i == 0:
+                    _png_chunk(fp, b"IDAT", idat)
+                else:
+                    _png_chunk(fp, b"fdAT", struct.pack(">I", sequence) + idat)
+                    sequence += 1
+            for cid, data, *after_idat in chunks:
+                if after_idat and after_idat[0]:
+                    _png_chunk(fp, cid, data)
+            _png_chunk(fp, b"IEND", b"")
         return SavedResult(file, subfolder, folder_type)
 
     @staticmethod
@@ -218,19 +309,34 @@ class ImageSaveHelper:
         full_output_folder, filename, counter, subfolder, _ = folder_paths.get_save_image_path(
             filename_prefix, _get_directory_by_folder_type(folder_type), images[0].shape[1], images[0].shape[0]
         )
-        pil_images = [ImageSaveHelper._convert_tensor_to_pil(img) for img in images]
-        pil_exif = ImageSaveHelper._create_webp_metadata(pil_images[0], cls)
         file = f"{filename}_{counter:05}_.webp"
-        pil_images[0].save(
-            os.path.join(full_output_folder, file),
-            save_all=True,
-            duration=int(1000.0 / fps),
-            append_images=pil_images[1:],
-            exif=pil_exif,
-            lossless=lossless,
-            quality=quality,
-            method=method,
-        )
+        save_path = os.path.join(full_output_folder, file)
+        if len(images) == 1:
+            pil_image = ImageSaveHelper._convert_tensor_to_pil(images[0])
+            pil_image.save(save_path, exif=ImageSaveHelper._create_webp_metadata(pil_image, cls), lossless=lossless, quality=quality, method=method)
+            return SavedResult(file, subfolder, folder_type)
+
+        # Frames are compressed in parallel as still WebPs and assembled into ANMF frames of an animated WebP
+        exif_data = ImageSaveHelper._create_webp_metadata(None, cls)
+        # The EXIF chunk holds the bare TIFF data, without the "Exif\0\0" header of the JPEG APP1 segment
+        exif = exif_data.tobytes().removeprefix(b"Exif\x00\x00") if len(exif_data) else b""
+        duration = int(1000.0 / fps)
+        height, width = images.shape[1], images.shape[2]
+        frames = _map_ordered(lambda frame: _encode_webp_frame(frame, lossless, quality, method), _iter_uint8_frames(images))
+        with open(save_path, "wb") as fp:
+            fp.write(b"RIFF\0\0\0\0WEBP")
+            flags = 0x02 | (0x08 if exif else 0) | (0x10 if images.shape[-1] == 4 else 0)  # animation, exif, alpha
+            fp.write(_webp_chunk(b"VP8X", bytes([flags, 0, 0, 0]) + _uint24(width - 1) + _uint24(height - 1)))
+            fp.write(_webp_chunk(b"ANIM", struct.pack("<IH", 0, 0)))  # transparent background, infinite loop
+            for frame_data in frames:
+                # offset 0, 0, full canvas, do not blend, no disposal
+                header = _uint24(0) + _uint24(0) + _uint24(width - 1) + _uint24(height - 1) + _uint24(duration) + bytes([0x02])
+                fp.write(_webp_chunk(b"ANMF", header + frame_data))
+            if exif:
+                fp.write(_webp_chunk(b"EXIF", exif))
+            size = fp.tell()
+            fp.seek(4)
+            fp.write(struct.pack("<I", size - 8))
         return SavedResult(file, subfolder, folder_type)
 
     @staticmethod
@@ -1,11 +1,16 @@
 import asyncio
 import contextlib
+import copy
+import functools
 import json
 import logging
+import random
 import time
 import uuid
-from collections.abc import Callable, Iterable
-from dataclasses import dataclass
+import weakref
+from collections.abc import Callable, Iterable, Mapping
+from dataclasses import dataclass, field
+from email.utils import parsedate_to_datetime
 from enum import Enum
 from io import BytesIO
 from typing import Any, Literal, TypeVar
@@ -47,6 +52,27 @@ class ApiEndpoint:
         self.headers = headers or {}
 
 
+def _default_batch_data(task_ids: list[str]) -> dict[str, Any]:
+    return {"ids": ",".join(task_ids)}
+
+
+@dataclass
+class BatchPollEndpoint:
+    """Provider endpoint that reports the status of many tasks in a single request.
+
+    `build_data` turns a list of task ids into the request data (query params for GET, JSON body otherwise).
+    `split_response` maps the batch response to `{task_id: per-task JSON}`; each value must look like the response
+    of the regular per-task poll endpoint, as it is handed to the same status/progress/price extractors.
+    None of the bundled provider nodes pass one yet; polls without it go through the per-task endpoint.
+    """
+
+    endpoint: ApiEndpoint
+    split_response: Callable[[dict[str, Any]], dict[str, dict[str, Any]]]
+    build_data: Callable[[list[str]], dict[str, Any]] = _default_batch_data
+    max_batch_size: int = 50
+    gather_window: float = 0.25
+
+
 @dataclass
 class _RequestConfig:
     node_cls: type[IO.ComfyNode]
@@ -65,6 +91,7 @@ class _RequestConfig:
     final_label_on_success: str | None = "Completed"
     progress_origin_ts: float | None = None
     price_extractor: Callable[[dict[str, Any]], float | None] | None = None
+    on_response_headers: Callable[[Mapping[str, str]], None] | None = None
 
 
 @dataclass
@@ -83,6 +110,10 @@ COMPLETED_STATUSES = ["succeeded", "succeed", "success", "completed", "finished"
 FAILED_STATUSES = ["cancelled", "canceled", "canceling", "fail", "failed", "error"]
 QUEUED_STATUSES = ["created", "queued", "queueing", "submitted", "initializing"]
 
+_POLL_JITTER = 0.2  # +/- fraction applied to every poll sleep so that fanned-out jobs do not poll in lockstep
+_POLL_RESULT_TTL = 1.0  # seconds a poll response may be reused by an identical poll from another prompt
+_MAX_RETRY_AFTER = 300.0
+
 
 async def sync_op(
     cls: type[IO.ComfyNode],
@@ -141,6 +172,8 @@ async def poll_op(
     queued_statuses: list[str | int] | None = None,
     data: BaseModel | None = None,
     poll_interval: float = 5.0,
+    max_poll_interval: float | None = None,
+    poll_backoff: float = 1.5,
     max_poll_attempts: int = 160,
     timeout_per_poll: float = 120.0,
     max_retries_per_poll: int = 3,
@@ -149,6 +182,8 @@ async def poll_op(
     estimated_duration: int | None = None,
     cancel_endpoint: ApiEndpoint | None = None,
     cancel_timeout: float = 10.0,
+    batch_endpoint: BatchPollEndpoint | None = None,
+    task_id: str | None = None,
 ) -> M:
     raw = await poll_op_raw(
         cls,
@@ -161,6 +196,8 @@ async def poll_op(
         queued_statuses=queued_statuses,
         data=data,
         poll_interval=poll_interval,
+        max_poll_interval=max_poll_interval,
+        poll_backoff=poll_backoff,
         max_poll_attempts=max_poll_attempts,
         timeout_per_poll=timeout_per_poll,
         max_retries_per_poll=max_retries_per_poll,
@@ -169,6 +206,8 @@ async def poll_op(
         estimated_duration=estimated_duration,
         cancel_endpoint=cancel_endpoint,
         cancel_timeout=cancel_timeout,
+        batch_endpoint=batch_endpoint,
+        task_id=task_id,
     )
     if not isinstance(raw, dict):
         raise Exception("Expected JSON response to validate into a Pydantic model, got non-JSON (binary or text).")
@@ -200,17 +239,12 @@ async def sync_op_raw(
       - If as_binary=False (default): returns JSON dict (or {'_raw': '<text>'} if non-JSON).
       - If as_binary=True: returns bytes.
     """
-    if isinstance(data, BaseModel):
-        data = data.model_dump(exclude_none=True)
-        for k, v in list(data.items()):
-            if isinstance(v, Enum):
-                data[k] = v.value
     cfg = _RequestConfig(
         node_cls=cls,
         endpoint=endpoint,
         timeout=timeout,
         content_type=content_type,
-        data=data,
+        data=_model_to_data(data),
         files=files,
         multipart_parser=multipart_parser,
         max_retries=max_retries,
@@ -238,6 +272,8 @@ async def poll_op_raw(
     queued_statuses: list[str | int] | None = None,
     data: dict[str, Any] | BaseModel | None = None,
     poll_interval: float = 5.0,
+    max_poll_interval: float | None = None,
+    poll_backoff: float = 1.5,
     max_poll_attempts: int = 160,
     timeout_per_poll: float = 120.0,
     max_retries_per_poll: int = 3,
@@ -246,6 +282,8 @@ async def poll_op_raw(
     estimated_duration: int | None = None,
     cancel_endpoint: ApiEndpoint | None = None,
     cancel_timeout: float = 10.0,
+    batch_endpoint: BatchPollEndpoint | None = None,
+    task_id: str | None = None,
 ) -> dict[str, Any]:
     """
     Polls an endpoint until the task reaches a terminal state. Displays time while queued/processing,
@@ -253,13 +291,30 @@ async def poll_op_raw(
 
     Uses default complete, failed and queued states assumption.
 
+    The delay between polls starts at `poll_interval` and grows by `poll_backoff` (with jitter) up to
+    `max_poll_interval` (default: 3x `poll_interval`); it is reset whenever the task status or progress changes.
+    A `Retry-After` header sent by the server overrides the computed delay. Polling gives up after
+    `max_poll_attempts` non-queued polls.
+
+    Identical polls issued concurrently by other prompts share a single request. If `batch_endpoint` and `task_id`
+    are given, polls are gathered into batched status requests, falling back to `poll_endpoint` on failure.
+
     Returns the final JSON response from the poll endpoint.
     """
     completed_states = _normalize_statuses(COMPLETED_STATUSES if completed_statuses is None else completed_statuses)
     failed_states = _normalize_statuses(FAILED_STATUSES if failed_statuses is None else failed_statuses)
     queued_states = _normalize_statuses(QUEUED_STATUSES if queued_statuses is None else queued_statuses)
     started = time.monotonic()
+    active_polled = 0.0  # seconds spent waiting between non-queued polls
     consumed_attempts = 0  # counts only non-queued polls
+    if max_poll_interval is None:
+        max_poll_interval = poll_interval * 3
+    max_poll_interval = max(max_poll_interval, poll_interval)
+    current_interval = poll_interval
+    last_status: str | int | None = None
+    use_batch = batch_endpoint is not None and task_id is not None
+    scheduler = _get_poll_scheduler()
+    data = _model_to_data(data)
 
     progress_bar = utils.ProgressBar(100) if progress_extractor else None
     last_progress: int | None = None
@@ -290,40 +345,46 @@ async def poll_op_raw(
         except Exception as exc:
             logging.debug("Polling ticker exited: %s", exc)
 
-    ticker_task = asyncio.create_task(_ticker())
-    try:
-        while consumed_attempts < max_poll_attempts:
-            try:
-                resp_json = await sync_op_raw(
+    async def _cancel_remote_task():
+        if cancel_endpoint:
+            with contextlib.suppress(Exception):
+                await sync_op_raw(
                     cls,
-                    poll_endpoint,
-                    data=data,
-                    timeout=timeout_per_poll,
-                    max_retries=max_retries_per_poll,
-                    retry_delay=retry_delay_per_poll,
-                    retry_backoff=retry_backoff_per_poll,
-                    wait_label="Checking",
+                    cancel_endpoint,
+                    timeout=cancel_timeout,
+                    max_retries=0,
+                    wait_label="Cancelling task",
                     estimated_duration=None,
                     as_binary=False,
                     final_label_on_success=None,
                     monitor_progress=False,
                 )
-                if not isinstance(resp_json, dict):
-                    raise Exception("Polling endpoint returned non-JSON response.")
+
+    request_kw = {
+        "timeout": timeout_per_poll,
+        "max_retries": max_retries_per_poll,
+        "retry_delay": retry_delay_per_poll,
+        "retry_backoff": retry_backoff_per_poll,
+    }
+    ticker_task = asyncio.create_task(_ticker())
+    try:
+        while consumed_attempts < max_poll_attempts:
+            try:
+                resp_json = None
+                if use_batch:
+                    try:
+                        resp_json, retry_after = await scheduler.poll_batched(cls, batch_endpoint, task_id, **request_kw)
+                    except ProcessingInterrupted:
+                        raise
+                    except Exception as e:
+                        logging.warning("Batched status request failed, falling back to per-task polling: %s", e)
+                        use_batch = False
+                if resp_json is None:
+                    resp_json, retry_after = await scheduler.poll(cls, poll_endpoint, data, **request_kw)
+                if is_processing_interrupted():
+                    raise ProcessingInterrupted("Task cancelled")
             except ProcessingInterrupted:
-                if cancel_endpoint:
-                    with contextlib.suppress(Exception):
-                        await sync_op_raw(
-                            cls,
-                            cancel_endpoint,
-                            timeout=cancel_timeout,
-                            max_retries=0,
-                            wait_label="Cancelling task",
-                            estimated_duration=None,
-                            as_binary=False,
-                            final_label_on_success=None,
-                            monitor_progress=False,
-                        )
+                await _cancel_remote_task()
                 raise
 
             try:
@@ -337,10 +398,12 @@ async def poll_op_raw(
                 if new_price is not None:
                     state.price = new_price
 
+            progress_changed = False
             if progress_extractor:
                 new_progress = progress_extractor(resp_json)
                 if new_progress is not None and last_progress != new_progress:
                     progress_bar.update_absolute(new_progress, total=100)
+                    progress_changed = last_progress is not None
                     last_progress = new_progress
 
             now_ts = time.monotonic()
@@ -383,29 +446,23 @@ async def poll_op_raw(
                 logging.error(msg)
                 raise Exception(msg)
 
+            if progress_changed or status != last_status:
+                current_interval = poll_interval  # the task is moving: look again soon
+            last_status = status
+            delay = _poll_delay(current_interval, retry_after)
+            current_interval = min(max_poll_interval, current_interval * poll_backoff)
             try:
-                await sleep_with_interrupt(poll_interval, cls, None, None, None)
+                await sleep_with_interrupt(delay, cls, None, None, None)
             except ProcessingInterrupted:
-                if cancel_endpoint:
-                    with contextlib.suppress(Exception):
-                        await sync_op_raw(
-                            cls,
-                            cancel_endpoint,
-                            timeout=cancel_timeout,
-                            max_retries=0,
-                            wait_label="Cancelling task",
-                            estimated_duration=None,
-                            as_binary=False,
-                            final_label_on_success=None,
-                            monitor_progress=False,
-                        )
+                await _cancel_remote_task()
                 raise
             if not is_queued:
                 consumed_attempts += 1
+                active_polled += delay
 
         raise Exception(
-            f"Polling timed out after {max_poll_attempts} non-queued attempts "
-            f"(~{int(max_poll_attempts * poll_interval)}s of active polling)."
+            f"Polling timed out after {consumed_attempts} non-queued attempts "
+            f"(~{int(active_polled)}s of active polling)."
         )
     except ProcessingInterrupted:
         raise
@@ -419,6 +476,198 @@ async def poll_op_raw(
             await ticker_task
 
 
+def _poll_delay(interval: float, retry_after: float | None) -> float:
+    """Seconds to wait before the next poll: the server's Retry-After if sent, else the jittered interval."""
+    if retry_after is not None:
+        return retry_after * random.uniform(1.0, 1.0 + _POLL_JITTER)
+    return interval * random.uniform(1.0 - _POLL_JITTER, 1.0 + _POLL_JITTER)
+
+
+def _parse_retry_after(value: str | None) -> float | None:
+    """Parse a Retry-After header given either as delta-seconds or as an HTTP-date."""
+    if not value:
+        return None
+    value = value.strip()
+    try:
+        seconds = float(value)
+    except ValueError:
+        try:
+            seconds = parsedate_to_datetime(value).timestamp() - time.time()
+        except (TypeError, ValueError, OverflowError):
+            return None
+    return min(max(seconds, 0.0), _MAX_RETRY_AFTER)
+
+
+async def _poll_request(
+    cls: type[IO.ComfyNode],
+    endpoint: ApiEndpoint,
+    data: dict[str, Any] | None,
+    *,
+    timeout: float,
+    max_retries: int,
+    retry_delay: float,
+    retry_backoff: float,
+) -> tuple[dict[str, Any], float | None]:
+    """Issue one status request; returns the JSON response and the server's Retry-After hint (if any)."""
+    retry_after: float | None = None
+
+    def _capture_headers(headers: Mapping[str, str]) -> None:
+        nonlocal retry_after
+        retry_after = _parse_retry_after(headers.get("Retry-After"))
+
+    cfg = _RequestConfig(
+        node_cls=cls,
+        endpoint=endpoint,
+        timeout=timeout,
+        content_type="application/json",
+        data=data,
+        files=None,
+        multipart_parser=None,
+        max_retries=max_retries,
+        retry_delay=retry_delay,
+        retry_backoff=retry_backoff,
+        wait_label="Checking",
+        monitor_progress=False,
+        final_label_on_success=None,
+        on_response_headers=_capture_headers,
+    )
+    resp_json = await _request_base(cfg, expect_binary=False)
+    if not isinstance(resp_json, dict):
+        raise Exception("Polling endpoint returned non-JSON response.")
+    return resp_json, retry_after
+
+
+def _request_identity(cls: type[IO.ComfyNode], endpoint: ApiEndpoint) -> tuple:
+    """Parts of a request that must match for two prompts to share it: target and credentials."""
+    return (
+        endpoint.method,
+        endpoint.path,
+        tuple(sorted(get_auth_header(cls).items())),
+        tuple(sorted(endpoint.headers.items())),
+    )
+
+
+@dataclass
+class _PendingBatch:
+    waiters: dict[str, asyncio.Future] = field(default_factory=dict)
+    closed: bool = False
+
+
+class _PollScheduler:
+    """Shared by every `poll_op_raw` running on an event loop.
+
+    - Coalesces identical polls (same URL, params, body and credentials) from different prompts into one
+      in-flight request and reuses its response for `_POLL_RESULT_TTL` seconds.
+    - Gathers polls for providers that expose a `BatchPollEndpoint` into batched status requests.
+    """
+
+    def __init__(self):
+        self._inflight: dict[tuple, asyncio.Future] = {}
+        self._recent: dict[tuple, tuple[float, dict[str, Any], float | None]] = {}
+        self._batches: dict[tuple, _PendingBatch] = {}
+        self._flush_tasks: set[asyncio.Task] = set()  # the loop only keeps weak references to tasks
+
+    async def poll(
+        self,
+        cls: type[IO.ComfyNode],
+        endpoint: ApiEndpoint,
+        data: dict[str, Any] | None,
+        **request_kw,
+    ) -> tuple[dict[str, Any], float | None]:
+        key = (
+            *_request_identity(cls, endpoint),
+            json.dumps(endpoint.query_params, sort_keys=True, default=str),
+            json.dumps(data, sort_keys=True, default=str),
+        )
+        recent = self._recent.get(key)
+        if recent is not None and time.monotonic() - recent[0] < _POLL_RESULT_TTL:
+            return copy.deepcopy(recent[1]), recent[2]
+        fut = self._inflight.get(key)
+        if fut is None:
+            fut = asyncio.ensure_future(_poll_request(cls, endpoint, data, **request_kw))
+            self._inflight[key] = fut
+            fut.add_done_callback(functools.partial(self._on_poll_done, key))
+        resp_json, retry_after = await asyncio.shield(fut)
+        return copy.deepcopy(resp_json), retry_after
+
+    def _on_poll_done(self, key: tuple, fut: asyncio.Future) -> None:
+        self._inflight.pop(key, None)
+        now = time.monotonic()
+        for k in [k for k, v in self._recent.items() if now - v[0] >= _POLL_RESULT_TTL]:
+            del self._recent[k]
+        if not fut.cancelled() and fut.exception() is None:
+            self._recent[key] = (now, *fut.result())
+
+    async def poll_batched(
+        self,
+        cls: type[IO.ComfyNode],
+        batch: BatchPollEndpoint,
+        task_id: str,
+        **request_kw,
+    ) -> tuple[dict[str, Any], float | None]:
+        key = _request_identity(cls, batch.endpoint)
+        pending = self._batches.get(key)
+        if pending is None or pending.closed or len(pending.waiters) >= batch.max_batch_size:
+            pending = _PendingBatch()
+            self._batches[key] = pending
+            task = asyncio.create_task(self._flush_batch(key, pending, cls, batch, request_kw))
+            self._flush_tasks.add(task)
+            task.add_done_callback(self._on_flush_done)
+        fut = pending.waiters.get(task_id)
+        if fut is None:
+            fut = asyncio.get_running_loop().create_future()
+            pending.waiters[task_id] = fut
+        return await asyncio.shield(fut)
+
+    def _on_flush_done(self, task: asyncio.Task) -> None:
+        self._flush_tasks.discard(task)
+        if not task.cancelled() and task.exception() is not None:
+            logging.error("Batched status flush failed: %s", task.exception())
+
+    async def _flush_batch(
+        self,
+        key: tuple,
+        pending: _PendingBatch,
+        cls: type[IO.ComfyNode],
+        batch: BatchPollEndpoint,
+        request_kw: dict[str, Any],
+    ) -> None:
+        await asyncio.sleep(batch.gather_window)
+        pending.closed = True
+        if self._batches.get(key) is pending:
+            del self._batches[key]
+        try:
+            resp_json, retry_after = await _poll_request(
+                cls, batch.endpoint, batch.build_data(list(pending.waiters)), **request_kw
+            )
+            results = batch.split_response(resp_json)
+        except Exception as e:
+            for fut in pending.waiters.values():
+                if not fut.done():
+                    fut.set_exception(e)
+                    fut.exception()  # waiters may have gone away; don't warn about an unretrieved exception
+            return
+        for tid, fut in pending.waiters.items():
+            if fut.done():
+                continue
+            if tid in results:
+                fut.set_result((results[tid], retry_after))
+            else:
+                fut.set_exception(KeyError(f"Task {tid} missing from batched status response"))
+                fut.exception()
+
+
+_POLL_SCHEDULERS: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, _PollScheduler]" = weakref.WeakKeyDictionary()
+
+
+def _get_poll_scheduler() -> _PollScheduler:
+    loop = asyncio.get_running_loop()
+    scheduler = _POLL_SCHEDULERS.get(loop)
+    if scheduler is None:
+        scheduler = _POLL_SCHEDULERS[loop] = _PollScheduler()
+    return scheduler
+
+
 def _display_text(
     node_cls: type[IO.ComfyNode],
     text: str | None,
@@ -689,12 +938,14 @@ async def _request_base(cfg: _RequestConfig, expect_binary: bool):
                     except (ContentTypeError, json.JSONDecodeError):
                         body = await resp.text()
                     if resp.status in _RETRY_STATUS and attempt <= cfg.max_retries:
+                        retry_after = _parse_retry_after(resp.headers.get("Retry-After"))
+                        wait_for = max(delay, retry_after) if retry_after is not None else delay
                         logging.warning(
                             "HTTP %s %s -> %s. Retrying in %.2fs (retry %d of %d).",
                             method,
                             url,
                             resp.status,
-                            delay,
+                            wait_for,
                             attempt,
                             cfg.max_retries,
                         )
@@ -712,7 +963,7 @@ async def _request_base(cfg: _RequestConfig, expect_binary: bool):
                             logging.debug("[DEBUG] response logging failed: %s", _log_e)
 
                         await sleep_with_interrupt(
-                            delay,
+                            wait_for,
                             cfg.node_cls,
                             cfg.wait_label if cfg.monitor_progress else None,
                             start_time if cfg.monitor_progress else None,
@@ -778,6 +1029,8 @@ async def _request_base(cfg: _RequestConfig, expect_binary: bool):
                         response_content_to_log = payload if isinstance(payload, dict) else text
                     with contextlib.suppress(Exception):
                         extracted_price = cfg.price_extractor(payload) if cfg.price_extractor else None
+                    if cfg.on_response_headers:
+                        cfg.on_response_headers(resp.headers)
                     operation_succeeded = True
                     final_elapsed_seconds = int(time.monotonic() - start_time)
                     try:
@@ -888,6 +1141,15 @@ async def _request_base(cfg: _RequestConfig, expect_binary: bool):
                 )
 
 
+def _model_to_data(data: dict[str, Any] | BaseModel | None) -> dict[str, Any] | None:
+    if isinstance(data, BaseModel):
+        data = data.model_dump(exclude_none=True)
+        for k, v in list(data.items()):
+            if isinstance(v, Enum):
+                data[k] = v.value
+    return data
+
+
 def _validate_or_raise(response_model: type[M], payload: Any) -> M:
     try:
         return response_model.model_validate(payload)
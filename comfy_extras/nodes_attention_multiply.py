@@ -137,6 +137,28 @@ class UNetTemporalAttentionMultiply(io.ComfyNode):
         return io.NodeOutput(m)
 
 
+class UNetCrossAttentionKVCache(io.ComfyNode):
+    @classmethod
+    def define_schema(cls) -> io.Schema:
+        return io.Schema(
+            node_id="UNetCrossAttentionKVCache",
+            category="_for_testing/attention_experiments",
+            description="Reuse the cross attention keys and values of the text conditioning between sampling steps instead of projecting them on every step.",
+            inputs=[
+                io.Model.Input("model"),
+                io.Boolean.Input("enabled", default=True),
+            ],
+            outputs=[io.Model.Output()],
+            is_experimental=True,
+        )
+
+    @classmethod
+    def execute(cls, model, enabled) -> io.NodeOutput:
+        m = model.clone()
+        m.set_model_cross_attn_kv_cache(enabled)
+        return io.NodeOutput(m)
+
+
 class AttentionMultiplyExtension(ComfyExtension):
     @override
     async def get_node_list(self) -> list[type[io.ComfyNode]]:
@@ -145,6 +167,7 @@ class AttentionMultiplyExtension(ComfyExtension):
             UNetCrossAttentionMultiply,
             CLIPAttentionMultiply,
             UNetTemporalAttentionMultiply,
+            UNetCrossAttentionKVCache,
         ]
 
 async def comfy_entrypoint() -> AttentionMultiplyExtension:
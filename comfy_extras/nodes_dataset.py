@@ -1,45 +1,202 @@
+import concurrent.futures
+import functools
 import logging
 import os
 import json
+import struct
 
 import numpy as np
+import safetensors.torch
 import torch
 from PIL import Image
 from typing_extensions import override
 
+import comfy.utils
 import folder_paths
 import node_helpers
 from comfy_api.latest import ComfyExtension, io
 
 
+_PARALLEL_DECODE_MIN_IMAGES = 4  # below this, handing the work to the pool costs more than it saves
+_decode_pool = None
+
+
+def _get_decode_pool():
+    """Lazily create the thread pool shared by all dataset loaders.
+
+    Pillow releases the GIL while decoding and NumPy while copying, so threads decode in parallel
+    without the startup cost and module re-imports of worker processes.
+    """
+    global _decode_pool
+    if _decode_pool is None:
+        workers = max(1, min(8, os.cpu_count() or 1))
+        _decode_pool = concurrent.futures.ThreadPoolExecutor(max_workers=workers, thread_name_prefix="dataset_decode")
+    return _decode_pool
+
+
+def _submit_decode(image_paths):
+    """Start decoding `image_paths` to uint8 arrays; returns a list of futures in input order."""
+    if len(image_paths) >= _PARALLEL_DECODE_MIN_IMAGES:
+        pool = _get_decode_pool()
+        return [pool.submit(node_helpers.load_image_rgb, path) for path in image_paths]
+    futures = []
+    for path in image_paths:
+        future = concurrent.futures.Future()
+        try:
+            future.set_result(node_helpers.load_image_rgb(path))
+        except Exception as e:
+            future.set_exception(e)
+        futures.append(future)
+    return futures
+
+
+def uint8_to_image_tensor(img_array):
+    """Convert an [H, W, 3] uint8 array or tensor to a [1, H, W, 3] float32 IMAGE tensor."""
+    img_tensor = torch.as_tensor(img_array)
+    return img_tensor.to(torch.float32).div_(255.0)[None,]
+
+
 def load_and_process_images(image_files, input_dir):
     """Utility function to load and process a list of images.
 
+    Large lists are decoded in parallel in a pool of worker threads.
+
     Args:
         image_files: List of image filenames
         input_dir: Base directory containing the images
-        resize_method: How to handle images of different sizes ("None", "Stretch", "Crop", "Pad")
 
     Returns:
-        torch.Tensor: Batch of processed images
+        list[torch.Tensor]: Processed images, one tensor per file
     """
     if not image_files:
         raise ValueError("No valid images found in input")
 
-    output_images = []
+    image_paths = [os.path.join(input_dir, file) for file in image_files]
+    return [uint8_to_image_tensor(future.result()) for future in _submit_decode(image_paths)]
+
+
+class ImageDataset:
+    """Lazy handle on a list of image files.
+
+    Images are decoded chunk by chunk while iterating, with the next chunk decoding in the background,
+    so only about two chunks of pixels are resident at a time. Per-image transforms added with `map`
+    are applied as each chunk is produced.
+
+    Args:
+        image_paths: Absolute paths of the image files
+        captions: Optional captions, one per image
+        cache_uint8: Keep decoded images in memory as uint8 after the first pass so later passes skip decoding
+    """
+
+    def __init__(self, image_paths, captions=None, cache_uint8=False, transforms=(), _cache=None):
+        if not image_paths:
+            raise ValueError("No valid images found in input")
+        if captions is not None and len(captions) != len(image_paths):
+            raise ValueError(
+                f"Number of captions ({len(captions)}) does not match number of images ({len(image_paths)})."
+            )
+        self.image_paths = list(image_paths)
+        self.captions = captions
+        self.cache_uint8 = cache_uint8
+        self.transforms = tuple(transforms)
+        self._cache = _cache if _cache is not None else {}
+
+    def __len__(self):
+        return len(self.image_paths)
+
+    def map(self, fn):
+        """Return a new dataset that applies `fn` to every [1, H, W, C] image tensor (sharing the decode cache)."""
+        return ImageDataset(
+            self.image_paths,
+            self.captions,
+            cache_uint8=self.cache_uint8,
+            transforms=self.transforms + (fn,),
+            _cache=self._cache,
+        )
+
+    def _decode_chunk(self, start, end):
+        if all(i in self._cache for i in range(start, end)):
+            return None
+        return _submit_decode(self.image_paths[start:end])
+
+    def iter_chunks(self, chunk_size=64):
+        """Yield lists of up to `chunk_size` processed [1, H, W, C] float32 image tensors."""
+        chunk_size = max(1, chunk_size)
+        starts = list(range(0, len(self), chunk_size))
+        pending = self._decode_chunk(0, min(chunk_size, len(self)))
+        for n, start in enumerate(starts):
+            end = min(start + chunk_size, len(self))
+            futures = pending
+            if n + 1 < len(starts):
+                next_start = starts[n + 1]
+                pending = self._decode_chunk(next_start, min(next_start + chunk_size, len(self)))
+
+            images = []
+            for i in range(start, end):
+                if i in self._cache:
+                    img_array = self._cache[i]
+                else:
+                    img_array = torch.from_numpy(futures[i - start].result())
+                    if self.cache_uint8:
+                        self._cache[i] = img_array
+                image = uint8_to_image_tensor(img_array)
+                for fn in self.transforms:
+                    image = fn(image)
+                images.append(image)
+            yield images
+
+    def __iter__(self):
+        for chunk in self.iter_chunks():
+            yield from chunk
+
+
+ImageDatasetType = io.Custom("IMAGE_DATASET")
 
-    for file in image_files:
-        image_path = os.path.join(input_dir, file)
-        img = node_helpers.pillow(Image.open, image_path)
+DATASET_ENCODE_CHUNK_SIZE = 64
 
-        if img.mode == "I":
-            img = img.point(lambda i: i * (1 / 255))
-        img = img.convert("RGB")
-        img_array = np.array(img).astype(np.float32) / 255.0
-        img_tensor = torch.from_numpy(img_array)[None,]
-        output_images.append(img_tensor)
+VALID_IMAGE_EXTENSIONS = [".png", ".jpg", ".jpeg", ".webp"]
+
+
+def collect_image_text_files(sub_input_dir):
+    """List the images of a dataset folder and read the matching .txt captions.
+
+    Supports the kohya-ss/sd-scripts layout where `<repeats>_<name>` subfolders are repeated.
+
+    Returns:
+        tuple[list[str], list[str]]: Absolute image paths and their captions ("" when missing)
+    """
+    image_files = []
+    for item in os.listdir(sub_input_dir):
+        path = os.path.join(sub_input_dir, item)
+        if any(item.lower().endswith(ext) for ext in VALID_IMAGE_EXTENSIONS):
+            image_files.append(path)
+        elif os.path.isdir(path):
+            # Support kohya-ss/sd-scripts folder structure
+            repeat = 1
+            if item.split("_")[0].isdigit():
+                repeat = int(item.split("_")[0])
+            image_files.extend(
+                [
+                    os.path.join(path, f)
+                    for f in os.listdir(path)
+                    if any(f.lower().endswith(ext) for ext in VALID_IMAGE_EXTENSIONS)
+                ]
+                * repeat
+            )
 
-    return output_images
+    caption_file_path = [
+        f.replace(os.path.splitext(f)[1], ".txt") for f in image_files
+    ]
+    captions = []
+    for caption_file in caption_file_path:
+        caption_path = os.path.join(sub_input_dir, caption_file)
+        if os.path.exists(caption_path):
+            with open(caption_path, "r", encoding="utf-8") as f:
+                caption = f.read().strip()
+                captions.append(caption)
+        else:
+            captions.append("")
+    return image_files, captions
 
 
 class LoadImageDataSetFromFolderNode(io.ComfyNode):
@@ -69,11 +226,10 @@ class LoadImageDataSetFromFolderNode(io.ComfyNode):
     @classmethod
     def execute(cls, folder):
         sub_input_dir = os.path.join(folder_paths.get_input_directory(), folder)
-        valid_extensions = [".png", ".jpg", ".jpeg", ".webp"]
         image_files = [
             f
             for f in os.listdir(sub_input_dir)
-            if any(f.lower().endswith(ext) for ext in valid_extensions)
+            if any(f.lower().endswith(ext) for ext in VALID_IMAGE_EXTENSIONS)
         ]
         output_tensor = load_and_process_images(image_files, sub_input_dir)
         return io.NodeOutput(output_tensor)
@@ -113,39 +269,7 @@ class LoadImageTextDataSetFromFolderNode(io.ComfyNode):
         logging.info(f"Loading images from folder: {folder}")
 
         sub_input_dir = os.path.join(folder_paths.get_input_directory(), folder)
-        valid_extensions = [".png", ".jpg", ".jpeg", ".webp"]
-
-        image_files = []
-        for item in os.listdir(sub_input_dir):
-            path = os.path.join(sub_input_dir, item)
-            if any(item.lower().endswith(ext) for ext in valid_extensions):
-                image_files.append(path)
-            elif os.path.isdir(path):
-                # Support kohya-ss/sd-scripts folder structure
-                repeat = 1
-                if item.split("_")[0].isdigit():
-                    repeat = int(item.split("_")[0])
-                image_files.extend(
-                    [
-                        os.path.join(path, f)
-                        for f in os.listdir(path)
-                        if any(f.lower().endswith(ext) for ext in valid_extensions)
-                    ]
-                    * repeat
-                )
-
-        caption_file_path = [
-            f.replace(os.path.splitext(f)[1], ".txt") for f in image_files
-        ]
-        captions = []
-        for caption_file in caption_file_path:
-            caption_path = os.path.join(sub_input_dir, caption_file)
-            if os.path.exists(caption_path):
-                with open(caption_path, "r", encoding="utf-8") as f:
-                    caption = f.read().strip()
-                    captions.append(caption)
-            else:
-                captions.append("")
+        image_files, captions = collect_image_text_files(sub_input_dir)
 
         output_tensor = load_and_process_images(image_files, sub_input_dir)
 
@@ -153,6 +277,46 @@ class LoadImageTextDataSetFromFolderNode(io.ComfyNode):
         return io.NodeOutput(output_tensor, captions)
 
 
+class LoadImageDatasetStreamFromFolderNode(io.ComfyNode):
+    @classmethod
+    def define_schema(cls):
+        return io.Schema(
+            node_id="LoadImageDatasetStreamFromFolder",
+            display_name="Load Image Dataset Stream from Folder",
+            category="dataset",
+            is_experimental=True,
+            description="Create a lazy dataset handle for a folder of images and captions. "
+            "Images are decoded in chunks when consumed instead of all being loaded into memory.",
+            inputs=[
+                io.Combo.Input(
+                    "folder",
+                    options=folder_paths.get_input_subfolders(),
+                    tooltip="The folder to load images from.",
+                ),
+                io.Boolean.Input(
+                    "cache_uint8",
+                    default=False,
+                    tooltip="Keep decoded images in memory as uint8 after the first pass, "
+                    "so repeated passes over the dataset skip decoding.",
+                ),
+            ],
+            outputs=[
+                ImageDatasetType.Output(
+                    display_name="image_dataset",
+                    tooltip="Lazy image dataset with captions",
+                ),
+            ],
+        )
+
+    @classmethod
+    def execute(cls, folder, cache_uint8):
+        sub_input_dir = os.path.join(folder_paths.get_input_directory(), folder)
+        image_files, captions = collect_image_text_files(sub_input_dir)
+        dataset = ImageDataset(image_files, captions, cache_uint8=cache_uint8)
+        logging.info(f"Indexed {len(dataset)} images from {sub_input_dir}.")
+        return io.NodeOutput(dataset)
+
+
 def save_images_to_folder(image_list, output_dir, prefix="image"):
     """Utility function to save a list of image tensors to disk.
 
@@ -304,6 +468,108 @@ def pil_to_tensor(img):
     return torch.from_numpy(img_array)[None,]
 
 
+# ========== Perceptual Hashing ==========
+
+_BYTE_POPCOUNT = torch.tensor([bin(i).count("1") for i in range(256)], dtype=torch.uint8)
+# Images stacked at once by compute_average_hashes, bounds the extra float copy of the dataset
+HASH_BATCH_SIZE = 256
+_BIT_WEIGHTS = torch.tensor([128, 64, 32, 16, 8, 4, 2, 1], dtype=torch.uint8)
+_LUMA_WEIGHTS = torch.tensor([0.299, 0.587, 0.114])
+
+
+def compute_average_hashes(images):
+    """Compute 64-bit average hashes for a list of image tensors in batches.
+
+    Each image is area-downscaled to 8x8 (one bit per pixel, packed into an int64), converted to luma and thresholded at its mean.
+    Images with the same resolution are hashed together in batches of at most HASH_BATCH_SIZE images, so only one
+    batch is copied at a time.
+
+    Args:
+        images: List of [1, H, W, C] or [H, W, C] image tensors
+
+    Returns:
+        torch.Tensor: int64 tensor of shape [N], one bit-packed hash per image
+    """
+    hashes = torch.empty(len(images), dtype=torch.int64)
+    by_shape = {}
+    for idx, img in enumerate(images):
+        by_shape.setdefault(tuple(img.shape[-3:]), []).append(idx)
+
+    for shape_indices in by_shape.values():
+        for start in range(0, len(shape_indices), HASH_BATCH_SIZE):
+            indices = shape_indices[start:start + HASH_BATCH_SIZE]
+            hashes[indices] = _average_hash_batch([images[i].reshape(-1, *images[i].shape[-3:])[0] for i in indices])
+    return hashes
+
+
+def _average_hash_batch(images):
+    batch = torch.stack(images)
+    batch = batch[..., :3].float().cpu()
+    if batch.shape[-1] == 1:
+        gray = batch[..., 0]
+    else:
+        gray = batch @ _LUMA_WEIGHTS
+    small = torch.nn.functional.interpolate(
+        gray.unsqueeze(1), size=(8, 8), mode="area"
+    ).flatten(1)
+    bits = small > small.mean(dim=1, keepdim=True)
+    packed = (bits.view(-1, 8, 8).to(torch.uint8) * _BIT_WEIGHTS).sum(dim=-1, dtype=torch.uint8)
+    return packed.contiguous().view(torch.int64).squeeze(1)
+
+
+def hamming_distances(hashes, others):
+    """Pairwise Hamming distances between two int64 hash tensors ([N] x [M] -> [N, M])."""
+    xor = hashes.unsqueeze(1) ^ others.unsqueeze(0)
+    return _BYTE_POPCOUNT[xor.unsqueeze(-1).view(torch.uint8).long()].sum(dim=-1, dtype=torch.int32)
+
+
+def find_unique_hashes(hashes, max_distance):
+    """Greedily keep hashes that are more than `max_distance` bits away from every kept hash.
+
+    Uses multi-index hashing: the 64 bits are split into `max_distance + 1` segments, and by the pigeonhole
+    principle two hashes within `max_distance` share at least one segment exactly, so only hashes sharing
+    a segment are compared. For loose thresholds (short segments) the kept set is compared vectorized instead.
+
+    Returns:
+        list[int]: Indices of the kept hashes, in order
+    """
+    values = [h & 0xFFFFFFFFFFFFFFFF for h in hashes.tolist()]
+    keep_indices = []
+    num_segments = max_distance + 1
+
+    if num_segments <= 8:
+        bounds = [(64 * k) // num_segments for k in range(num_segments + 1)]
+        masks = [((1 << (hi - lo)) - 1, lo) for lo, hi in zip(bounds[:-1], bounds[1:])]
+        tables = [{} for _ in masks]
+        for i, value in enumerate(values):
+            keys = [(value >> shift) & mask for mask, shift in masks]
+            duplicate_of = None
+            for table, key in zip(tables, keys):
+                for j in table.get(key, ()):
+                    if (value ^ values[j]).bit_count() <= max_distance:
+                        duplicate_of = j
+                        break
+                if duplicate_of is not None:
+                    break
+            if duplicate_of is not None:
+                logging.debug(f"Image {i} is a near-duplicate of image {duplicate_of}, skipping")
+                continue
+            keep_indices.append(i)
+            for table, key in zip(tables, keys):
+                table.setdefault(key, []).append(i)
+        return keep_indices
+
+    kept = torch.empty(len(values), dtype=torch.int64)
+    for i in range(len(values)):
+        num_kept = len(keep_indices)
+        if num_kept > 0 and bool((hamming_distances(hashes[i:i + 1], kept[:num_kept]) <= max_distance).any()):
+            logging.debug(f"Image {i} is a near-duplicate of a kept image, skipping")
+            continue
+        keep_indices.append(i)
+        kept[num_kept] = hashes[i]
+    return keep_indices
+
+
 # ========== Base Classes for Transform Nodes ==========
 
 
@@ -388,14 +654,29 @@ class ImageProcessingNode(io.ComfyNode):
             cls.is_output_list if cls.is_output_list is not None else is_group
         )
 
-        inputs = [
-            io.Image.Input(
-                "images",
-                tooltip=(
-                    "List of images to process." if is_group else "Image to process."
-                ),
+        if is_group:
+            inputs = [io.Image.Input("images", tooltip="List of images to process.")]
+            output = io.Image.Output(
+                display_name="images",
+                is_output_list=output_is_list,
+                tooltip="Processed images",
+            )
+        else:
+            # Individual processing also accepts a lazy IMAGE_DATASET and returns one with this node applied
+            template = io.MatchType.Template("images", [io.Image, ImageDatasetType])
+            inputs = [
+                io.MatchType.Input(
+                    "images",
+                    template=template,
+                    tooltip="Image to process, or an image dataset to process chunk by chunk.",
+                )
+            ]
+            output = io.MatchType.Output(
+                template=template,
+                display_name="images",
+                is_output_list=output_is_list,
+                tooltip="Processed images",
             )
-        ]
         inputs.extend(cls.extra_inputs)
 
         return io.Schema(
@@ -405,13 +686,7 @@ class ImageProcessingNode(io.ComfyNode):
             is_experimental=True,
             is_input_list=is_group,  # True for group, False for individual
             inputs=inputs,
-            outputs=[
-                io.Image.Output(
-                    display_name="images",
-                    is_output_list=output_is_list,
-                    tooltip="Processed images",
-                )
-            ],
+            outputs=[output],
         )
 
     @classmethod
@@ -430,6 +705,9 @@ class ImageProcessingNode(io.ComfyNode):
         if is_group:
             # Group processing: images is list, call _group_process
             result = cls._group_process(images, **params)
+        elif isinstance(images, ImageDataset):
+            # Lazy dataset: defer _process until the dataset is consumed
+            result = images.map(functools.partial(cls._process, **params))
         else:
             # Individual processing: images is single item, call _process
             result = cls._process(images, **params)
@@ -970,44 +1248,9 @@ class ImageDeduplicationNode(ImageProcessingNode):
         if len(images) == 0:
             return []
 
-        # Compute simple perceptual hash for each image
-        def compute_hash(img_tensor):
-            """Compute a simple perceptual hash by resizing to 8x8 and comparing to average."""
-            img = tensor_to_pil(img_tensor)
-            # Resize to 8x8
-            img_small = img.resize((8, 8), Image.Resampling.LANCZOS).convert("L")
-            # Get pixels
-            pixels = list(img_small.getdata())
-            # Compute average
-            avg = sum(pixels) / len(pixels)
-            # Create hash (1 if above average, 0 otherwise)
-            hash_bits = "".join("1" if p > avg else "0" for p in pixels)
-            return hash_bits
-
-        def hamming_distance(hash1, hash2):
-            """Compute Hamming distance between two hash strings."""
-            return sum(c1 != c2 for c1, c2 in zip(hash1, hash2))
-
-        # Compute hashes for all images
-        hashes = [compute_hash(img) for img in images]
-
-        # Find duplicates
-        keep_indices = []
-        for i in range(len(images)):
-            is_duplicate = False
-            for j in keep_indices:
-                # Compare hashes
-                distance = hamming_distance(hashes[i], hashes[j])
-                similarity = 1.0 - (distance / 64.0)  # 64 bits total
-                if similarity >= similarity_threshold:
-                    is_duplicate = True
-                    logging.info(
-                        f"Image {i} is similar to image {j} (similarity: {similarity:.3f}), skipping"
-                    )
-                    break
-
-            if not is_duplicate:
-                keep_indices.append(i)
+        hashes = compute_average_hashes(images)
+        max_distance = int((1.0 - similarity_threshold) * 64.0 + 1e-6)
+        keep_indices = find_unique_hashes(hashes, max_distance)
 
         # Return only unique images
         unique_images = [images[i] for i in keep_indices]
@@ -1125,6 +1368,149 @@ class MergeTextListsNode(TextProcessingNode):
         return texts
 
 
+# ========== Training Dataset Shard Format ==========
+
+DATASET_INDEX_FILENAME = "index.json"
+DATASET_FORMAT_VERSION = 1
+
+
+def _flatten_tensors(value, prefix, tensors, seen):
+    """Replace every tensor in a nested list/tuple/dict structure by a {"__tensor__": key} reference.
+
+    Tensors are added to `tensors` under their key; the same tensor object is only stored once.
+    Raises TypeError for values that are neither tensors nor JSON-serializable.
+    """
+    if isinstance(value, torch.Tensor):
+        key = seen.get(id(value))
+        if key is None:
+            key = prefix
+            seen[id(value)] = key
+            tensors[key] = value.detach().cpu().contiguous().clone()
+        return {"__tensor__": key}
+    if isinstance(value, dict):
+        return {"__dict__": {str(k): _flatten_tensors(v, f"{prefix}.{k}", tensors, seen) for k, v in value.items()}}
+    if isinstance(value, (list, tuple)):
+        items = [_flatten_tensors(v, f"{prefix}.{i}", tensors, seen) for i, v in enumerate(value)]
+        return {"__tuple__": items} if isinstance(value, tuple) else items
+    if value is None or isinstance(value, (bool, int, float, str)):
+        return value
+    raise TypeError(
+        f"Cannot store {type(value).__name__} at '{prefix}' in a safetensors shard; use the pickle format instead."
+    )
+
+
+def _unflatten_tensors(value, tensors):
+    """Inverse of _flatten_tensors."""
+    if isinstance(value, dict):
+        if "__tensor__" in value:
+            return tensors[value["__tensor__"]]
+        if "__tuple__" in value:
+            return tuple(_unflatten_tensors(v, tensors) for v in value["__tuple__"])
+        return {k: _unflatten_tensors(v, tensors) for k, v in value["__dict__"].items()}
+    if isinstance(value, list):
+        return [_unflatten_tensors(v, tensors) for v in value]
+    return value
+
+
+def _tensor_offsets(shard_path):
+    """Read absolute byte offsets of every tensor from a safetensors header."""
+    with open(shard_path, "rb") as f:
+        header_size = struct.unpack("<Q", f.read(8))[0]
+        header = json.loads(f.read(header_size))
+    return {
+        k: 8 + header_size + v["data_offsets"][0]
+        for k, v in header.items()
+        if k != "__metadata__"
+    }
+
+
+def save_safetensors_shard(shard_path, latents, conditioning, first_sample):
+    """Write one shard of samples and return their index entries.
+
+    Each entry maps the sample to its shard, the byte offset and shape of its latent samples tensor,
+    its resolution bucket and the structure of its latent dict and conditioning.
+    """
+    tensors = {}
+    seen = {}
+    structures = []
+    for n, (latent, cond) in enumerate(zip(latents, conditioning)):
+        prefix = f"{first_sample + n}"
+        structures.append((
+            _flatten_tensors(latent, f"{prefix}.latent", tensors, seen),
+            _flatten_tensors(cond, f"{prefix}.cond", tensors, seen),
+        ))
+    safetensors.torch.save_file(tensors, shard_path, metadata={"format": "comfy_training_dataset"})
+
+    offsets = _tensor_offsets(shard_path)
+    shard_name = os.path.basename(shard_path)
+    entries = []
+    for latent_struct, cond_struct in structures:
+        samples_key = latent_struct["__dict__"]["samples"]["__tensor__"]
+        shape = list(tensors[samples_key].shape)
+        entries.append({
+            "shard": shard_name,
+            "offset": offsets[samples_key],
+            "shape": shape,
+            "bucket": shape[-2:],
+            "latent": latent_struct,
+            "conditioning": cond_struct,
+        })
+    return entries
+
+
+def parse_resolution_buckets(text):
+    """Parse a comma separated list of latent resolutions like "64x64, 96x64" into a set of (height, width)."""
+    buckets = set()
+    for part in text.split(","):
+        part = part.strip()
+        if not part:
+            continue
+        try:
+            height, width = (int(v) for v in part.lower().split("x"))
+        except ValueError:
+            raise ValueError(f"Invalid resolution bucket '{part}', expected HEIGHTxWIDTH in latent pixels.")
+        buckets.add((height, width))
+    return buckets
+
+
+def load_safetensors_dataset(dataset_dir, buckets=None):
+    """Load a dataset saved in the safetensors shard format.
+
+    Shards are memory-mapped, so the returned tensors are read-only views of the files and
+    only the pages that are actually used get read into memory. With buckets (a set of latent
+    (height, width)), only the samples of those resolution buckets are loaded; the buckets come
+    from the index, so shards without such samples are never opened.
+    """
+    with open(os.path.join(dataset_dir, DATASET_INDEX_FILENAME), "r", encoding="utf-8") as f:
+        index = json.load(f)
+
+    entries = index["samples"]
+    if buckets is not None:
+        entries = [e for e in entries if "bucket" not in e or tuple(e["bucket"]) in buckets]
+
+    shards = {}
+    all_latents = []
+    all_conditioning = []
+    for entry in entries:
+        shard = entry["shard"]
+        try:
+            if shard not in shards:
+                shards[shard], _ = comfy.utils.load_safetensors(os.path.join(dataset_dir, shard))
+                logging.info(f"Mapped {shard}")
+            latent = _unflatten_tensors(entry["latent"], shards[shard])
+            if "shape" in entry and list(latent["samples"].shape) != entry["shape"]:
+                raise ValueError(f"latent shape {list(latent['samples'].shape)} does not match the index {entry['shape']}")
+            conditioning = _unflatten_tensors(entry["conditioning"], shards[shard])
+        except (OSError, ValueError, RuntimeError, KeyError, struct.error) as e:
+            raise ValueError(f"Dataset shard {shard} in {dataset_dir} is missing or corrupt: {e}") from e
+        # Entries of older indexes have no bucket, they are filtered once loaded
+        if buckets is not None and "bucket" not in entry and tuple(latent["samples"].shape[-2:]) not in buckets:
+            continue
+        all_latents.append(latent)
+        all_conditioning.append(conditioning)
+    return all_latents, all_conditioning
+
+
 # ========== Training Dataset Nodes ==========
 
 
@@ -1233,7 +1619,7 @@ class MakeTrainingDataset(io.ComfyNode):
             is_experimental=True,
             is_input_list=True,  # images and texts as lists
             inputs=[
-                io.Image.Input("images", tooltip="List of images to encode."),
+                io.Image.Input("images", optional=True, tooltip="List of images to encode."),
                 io.Vae.Input(
                     "vae", tooltip="VAE model for encoding images to latents."
                 ),
@@ -1243,7 +1629,12 @@ class MakeTrainingDataset(io.ComfyNode):
                 io.String.Input(
                     "texts",
                     optional=True,
-                    tooltip="List of text captions. Can be length n (matching images), 1 (repeated for all), or omitted (uses empty string).",
+                    tooltip="List of text captions. Can be length n (matching images), 1 (repeated for all), or omitted (uses the dataset captions if any, else empty string).",
+                ),
+                ImageDatasetType.Input(
+                    "image_dataset",
+                    optional=True,
+                    tooltip="Lazy image dataset to encode chunk by chunk instead of an image list.",
                 ),
             ],
             outputs=[
@@ -1261,14 +1652,19 @@ class MakeTrainingDataset(io.ComfyNode):
         )
 
     @classmethod
-    def execute(cls, images, vae, clip, texts=None):
+    def execute(cls, vae, clip, images=None, texts=None, image_dataset=None):
         # Extract scalars (vae and clip are single values wrapped in lists)
         vae = vae[0]
         clip = clip[0]
+        image_dataset = image_dataset[0] if image_dataset else None
+        if image_dataset is None and not images:
+            raise ValueError("Either images or image_dataset must be provided.")
 
         # Handle text list
-        num_images = len(images)
+        num_images = len(image_dataset) if image_dataset is not None else len(images)
 
+        if (texts is None or len(texts) == 0) and image_dataset is not None and image_dataset.captions:
+            texts = list(image_dataset.captions)
         if texts is None or len(texts) == 0:
             # Treat as [""] for unconditional training
             texts = [""]
@@ -1285,10 +1681,16 @@ class MakeTrainingDataset(io.ComfyNode):
         # Encode images with VAE
         logging.info(f"Encoding {num_images} images with VAE...")
         latents_list = []  # list[{"samples": tensor}]
-        for img_tensor in images:
-            # img_tensor is [1, H, W, 3]
-            latent_tensor = vae.encode(img_tensor[:, :, :, :3])
-            latents_list.append({"samples": latent_tensor})
+        if image_dataset is not None:
+            # Only one chunk of decoded pixels is resident at a time
+            chunks = image_dataset.iter_chunks(DATASET_ENCODE_CHUNK_SIZE)
+        else:
+            chunks = [images]
+        for chunk in chunks:
+            for img_tensor in chunk:
+                # img_tensor is [1, H, W, 3]
+                latent_tensor = vae.encode(img_tensor[:, :, :, :3])
+                latents_list.append({"samples": latent_tensor})
 
         # Encode texts with CLIP
         logging.info(f"Encoding {len(texts)} texts with CLIP...")
@@ -1340,15 +1742,24 @@ class SaveTrainingDataset(io.ComfyNode):
                     max=100000,
                     tooltip="Number of samples per shard file.",
                 ),
+                io.Combo.Input(
+                    "shard_format",
+                    options=["safetensors", "pickle"],
+                    default="safetensors",
+                    tooltip="safetensors shards are memory-mapped when loaded instead of being read into memory. "
+                    "Use pickle if the conditioning contains objects that are not tensors or plain values.",
+                    optional=True,
+                ),
             ],
             outputs=[],
         )
 
     @classmethod
-    def execute(cls, latents, conditioning, folder_name, shard_size):
+    def execute(cls, latents, conditioning, folder_name, shard_size, shard_format=None):
         # Extract scalars
         folder_name = folder_name[0]
         shard_size = shard_size[0]
+        shard_format = shard_format[0] if shard_format else "safetensors"
 
         # latents: list[{"samples": tensor}]
         # conditioning: list[list[cond]]
@@ -1373,22 +1784,35 @@ class SaveTrainingDataset(io.ComfyNode):
         )
 
         # Save data in shards
+        index_entries = []
         for shard_idx in range(num_shards):
             start_idx = shard_idx * shard_size
             end_idx = min(start_idx + shard_size, num_samples)
 
-            # Get shard data (list of latent dicts and conditioning lists)
-            shard_data = {
-                "latents": latents[start_idx:end_idx],
-                "conditioning": conditioning[start_idx:end_idx],
-            }
+            if shard_format == "safetensors":
+                shard_filename = f"shard_{shard_idx:04d}.safetensors"
+                shard_path = os.path.join(output_dir, shard_filename)
+                index_entries.extend(
+                    save_safetensors_shard(
+                        shard_path,
+                        latents[start_idx:end_idx],
+                        conditioning[start_idx:end_idx],
+                        start_idx,
+                    )
+                )
+            else:
+                # Get shard data (list of latent dicts and conditioning lists)
+                shard_data = {
+                    "latents": latents[start_idx:end_idx],
+                    "conditioning": conditioning[start_idx:end_idx],
+                }
 
-            # Save shard
-            shard_filename = f"shard_{shard_idx:04d}.pkl"
-            shard_path = os.path.join(output_dir, shard_filename)
+                # Save shard
+                shard_filename = f"shard_{shard_idx:04d}.pkl"
+                shard_path = os.path.join(output_dir, shard_filename)
 
-            with open(shard_path, "wb") as f:
-                torch.save(shard_data, f)
+                with open(shard_path, "wb") as f:
+                    torch.save(shard_data, f)
 
             logging.info(
                 f"Saved shard {shard_idx + 1}/{num_shards}: {shard_filename} ({end_idx - start_idx} samples)"
@@ -1399,11 +1823,19 @@ class SaveTrainingDataset(io.ComfyNode):
             "num_samples": num_samples,
             "num_shards": num_shards,
             "shard_size": shard_size,
+            "shard_format": shard_format,
         }
         metadata_path = os.path.join(output_dir, "metadata.json")
         with open(metadata_path, "w") as f:
             json.dump(metadata, f, indent=2)
 
+        index_path = os.path.join(output_dir, DATASET_INDEX_FILENAME)
+        if shard_format == "safetensors":
+            with open(index_path, "w", encoding="utf-8") as f:
+                json.dump({"version": DATASET_FORMAT_VERSION, "samples": index_entries}, f)
+        elif os.path.exists(index_path):
+            os.remove(index_path)  # stale index from a previous safetensors save
+
         logging.info(f"Successfully saved {num_samples} samples to {output_dir}.")
         return io.NodeOutput()
 
@@ -1424,6 +1856,12 @@ class LoadTrainingDataset(io.ComfyNode):
                     default="training_dataset",
                     tooltip="Name of folder containing the saved dataset (inside output directory).",
                 ),
+                io.String.Input(
+                    "resolution_buckets",
+                    default="",
+                    optional=True,
+                    tooltip="Comma separated latent resolutions (HEIGHTxWIDTH, e.g. 64x64, 96x64) to load. Empty loads every sample. With safetensors datasets, shards without samples of these resolutions are not opened.",
+                ),
             ],
             outputs=[
                 io.Latent.Output(
@@ -1440,14 +1878,23 @@ class LoadTrainingDataset(io.ComfyNode):
         )
 
     @classmethod
-    def execute(cls, folder_name):
+    def execute(cls, folder_name, resolution_buckets=""):
         # Get dataset directory
         dataset_dir = os.path.join(folder_paths.get_output_directory(), folder_name)
 
         if not os.path.exists(dataset_dir):
             raise ValueError(f"Dataset directory not found: {dataset_dir}")
 
-        # Find all shard files
+        buckets = parse_resolution_buckets(resolution_buckets) or None
+
+        if os.path.exists(os.path.join(dataset_dir, DATASET_INDEX_FILENAME)):
+            all_latents, all_conditioning = load_safetensors_dataset(dataset_dir, buckets)
+            logging.info(
+                f"Successfully mapped {len(all_latents)} samples from {dataset_dir}."
+            )
+            return io.NodeOutput(all_latents, all_conditioning)
+
+        # Legacy pickle shards: find all shard files
         shard_files = sorted(
             [
                 f
@@ -1471,8 +1918,11 @@ class LoadTrainingDataset(io.ComfyNode):
             with open(shard_path, "rb") as f:
                 shard_data = torch.load(f)
 
-            all_latents.extend(shard_data["latents"])
-            all_conditioning.extend(shard_data["conditioning"])
+            for latent, cond in zip(shard_data["latents"], shard_data["conditioning"]):
+                if buckets is not None and tuple(latent["samples"].shape[-2:]) not in buckets:
+                    continue
+                all_latents.append(latent)
+                all_conditioning.append(cond)
 
             logging.info(f"Loaded {shard_file}: {len(shard_data['latents'])} samples")
 
@@ -1492,6 +1942,7 @@ class DatasetExtension(ComfyExtension):
             # Data loading/saving nodes
             LoadImageDataSetFromFolderNode,
             LoadImageTextDataSetFromFolderNode,
+            LoadImageDatasetStreamFromFolderNode,
             SaveImageDataSetToFolderNode,
             SaveImageTextDataSetToFolderNode,
             # Image transform nodes
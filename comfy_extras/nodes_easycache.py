@@ -5,6 +5,15 @@ import comfy.patcher_extension
 import logging
 import torch
 import comfy.model_patcher
+import comfy.ldm.chroma.model
+import comfy.ldm.flux.model
+import comfy.ldm.genmo.joint_model.asymm_models_joint
+import comfy.ldm.hunyuan_video.model
+import comfy.ldm.kandinsky5.model
+import comfy.ldm.lightricks.model
+import comfy.ldm.modules.diffusionmodules.mmdit
+import comfy.ldm.qwen_image.model
+import comfy.ldm.wan.model
 if TYPE_CHECKING:
     from uuid import UUID
 
@@ -495,11 +504,269 @@ class LazyCacheNode(io.ComfyNode):
         return io.NodeOutput(model)
 
 
+# diffusion model class, key of the hidden states in the "dit" block patch args, (block type, blocks attribute) in execution order
+FIRST_BLOCK_CACHE_ADAPTERS = [
+    (comfy.ldm.flux.model.Flux, "img", (("double_block", "double_blocks"), ("single_block", "single_blocks"))),
+    (comfy.ldm.chroma.model.Chroma, "img", (("double_block", "double_blocks"), ("single_block", "single_blocks"))),
+    (comfy.ldm.hunyuan_video.model.HunyuanVideo, "img", (("double_block", "double_blocks"), ("single_block", "single_blocks"))),
+    (comfy.ldm.wan.model.WanModel, "img", (("double_block", "blocks"),)),
+    (comfy.ldm.qwen_image.model.QwenImageTransformer2DModel, "img", (("double_block", "transformer_blocks"),)),
+    (comfy.ldm.modules.diffusionmodules.mmdit.MMDiT, "img", (("double_block", "joint_blocks"),)),
+    (comfy.ldm.lightricks.model.LTXVModel, "img", (("double_block", "transformer_blocks"),)),
+    (comfy.ldm.genmo.joint_model.asymm_models_joint.AsymmDiTJoint, "img", (("double_block", "blocks"),)),
+    (comfy.ldm.kandinsky5.model.Kandinsky5, "x", (("double_block", "visual_transformer_blocks"),)),
+]
+
+
+def get_first_block_cache_adapter(diffusion_model):
+    for model_class, hidden_key, block_types in FIRST_BLOCK_CACHE_ADAPTERS:
+        if isinstance(diffusion_model, model_class):
+            blocks = []
+            for block_type, attr in block_types:
+                blocks.append((block_type, len(getattr(diffusion_model, attr))))
+            return hidden_key, blocks
+    return None
+
+
+class FirstBlockCacheState:
+    """Cache of one batch of conds, identified by their uuids."""
+    def __init__(self):
+        self.in_range = False
+        self.skipping = False
+        self.first_input: torch.Tensor = None
+        self.first_residual: torch.Tensor = None
+        self.cumulative_change = 0.0
+        self.segment_inputs: dict[int, dict[str, torch.Tensor]] = {}
+        self.segment_residuals: dict[int, dict[str, torch.Tensor]] = {}
+        self.segment_keys: dict[int, list[str]] = {}
+
+
+class FirstBlockCacheHolder:
+    def __init__(self, reuse_threshold: float, first_blocks: int, start_percent: float, end_percent: float, verbose: bool=False):
+        self.name = "FirstBlockCache"
+        self.reuse_threshold = reuse_threshold
+        self.first_blocks = first_blocks
+        self.start_percent = start_percent
+        self.end_percent = end_percent
+        self.verbose = verbose
+        # timestep values
+        self.start_t = 0.0
+        self.end_t = 0.0
+        # block layout: (first skippable position, last position) of every block type that has skippable blocks
+        self.hidden_key = None
+        self.segments: list[tuple[int, int]] = []
+        # cache values
+        self.states: dict[tuple, FirstBlockCacheState] = {}
+        self.current: FirstBlockCacheState = None
+        self.total_calls = 0
+        self.total_calls_skipped = 0
+
+    def set_layout(self, hidden_key: str, blocks: list[tuple[str, int]]):
+        self.hidden_key = hidden_key
+        # The residual of the first blocks is compared between calls, so they have to be of one block type; the
+        # hidden states of later types have a different shape (the single blocks of Flux get txt and img joined)
+        first_type, first_count = blocks[0]
+        if self.first_blocks > first_count:
+            logging.warning(f"{self.name} - first_blocks {self.first_blocks} is more than the {first_count} {first_type}s of the model, using {first_count}.")
+            self.first_blocks = first_count
+        self.segments = []
+        start = 0
+        for _, count in blocks:
+            end = start + count - 1
+            if end >= self.first_blocks:
+                self.segments.append((max(start, self.first_blocks), end))
+            start += count
+        return self
+
+    def prepare_timesteps(self, model_sampling):
+        self.start_t = model_sampling.percent_to_sigma(self.start_percent)
+        self.end_t = model_sampling.percent_to_sigma(self.end_percent)
+        return self
+
+    def begin_call(self, transformer_options: dict):
+        sigmas = transformer_options.get("sigmas", None)
+        uuids = transformer_options.get("uuids", None)
+        state = self.states.setdefault(tuple(uuids) if uuids is not None else (), FirstBlockCacheState())
+        state.in_range = sigmas is not None and (sigmas[0] <= self.start_t).item() and (sigmas[0] > self.end_t).item()
+        state.skipping = False
+        self.current = state
+        self.total_calls += 1
+
+    def end_call(self):
+        if self.current is not None and self.current.skipping:
+            self.total_calls_skipped += 1
+        self.current = None
+
+    def decide(self, state: FirstBlockCacheState, residual: torch.Tensor):
+        prev = state.first_residual
+        state.first_residual = residual
+        can_skip = (state.in_range and prev is not None and prev.shape == residual.shape
+                    and all(i in state.segment_residuals for i in range(len(self.segments))))
+        if not can_skip:
+            state.cumulative_change = 0.0
+            state.skipping = False
+            return
+        change = ((residual - prev).abs().mean() / prev.abs().mean().clamp(min=1e-8)).item()
+        state.cumulative_change += change
+        state.skipping = state.cumulative_change < self.reuse_threshold
+        if self.verbose:
+            logging.info(f"{self.name} [verbose] - first block change: {change}, cumulative: {state.cumulative_change}, skipping: {state.skipping}")
+        if not state.skipping:
+            state.cumulative_change = 0.0
+
+    def reset(self):
+        self.states = {}
+        self.current = None
+        self.total_calls = 0
+        self.total_calls_skipped = 0
+        return self
+
+    def clone(self):
+        holder = FirstBlockCacheHolder(self.reuse_threshold, self.first_blocks, self.start_percent, self.end_percent, self.verbose)
+        holder.hidden_key = self.hidden_key
+        holder.segments = list(self.segments)
+        return holder
+
+
+def first_block_cache_block_patch(position: int, existing_patch=None):
+    """
+    "dit" block replace patch for the block at position in the execution order of all blocks of the model.
+
+    The first blocks always run. After them the change of their residual decides if the rest of the blocks are
+    skipped for this call. A skipped block type adds the residual it produced on the last computed call to its input
+    in its first skipped block, the other skipped blocks pass their input through.
+    """
+    def run_block(args, extra_args):
+        if existing_patch is not None:
+            return existing_patch(args, extra_args)
+        return extra_args["original_block"](args)
+
+    def block_patch(args, extra_args):
+        fbcache: FirstBlockCacheHolder = args["transformer_options"]["first_block_cache"]
+        state = fbcache.current
+        key = fbcache.hidden_key
+        if state is None:
+            return run_block(args, extra_args)
+
+        if position < fbcache.first_blocks:
+            if position == 0:
+                state.first_input = args[key].clone()
+            out = run_block(args, extra_args)
+            if torch.is_tensor(out):
+                out = {key: out}
+            if position == fbcache.first_blocks - 1:
+                fbcache.decide(state, out[key] - state.first_input)
+                state.first_input = None
+            return out
+
+        segment = next(i for i, (first, last) in enumerate(fbcache.segments) if first <= position <= last)
+        first, last = fbcache.segments[segment]
+        if state.skipping:
+            out = {k: args[k] for k in state.segment_keys[segment]}
+            if position == first:
+                for k, residual in state.segment_residuals[segment].items():
+                    out[k] = args[k] + residual
+            return out
+
+        if position == first:
+            state.segment_inputs[segment] = {k: args[k].clone() for k in ("img", "txt", "x") if torch.is_tensor(args.get(k, None))}
+        out = run_block(args, extra_args)
+        if torch.is_tensor(out):
+            out = {key: out}
+        if position == last:
+            inputs = state.segment_inputs.pop(segment)
+            state.segment_residuals[segment] = {k: out[k] - v for k, v in inputs.items() if torch.is_tensor(out.get(k, None)) and out[k].shape == v.shape}
+            state.segment_keys[segment] = list(out.keys())
+        return out
+    return block_patch
+
+
+def first_block_cache_forward_wrapper(executor, *args, **kwargs):
+    transformer_options: dict[str] = args[-1]
+    if not isinstance(transformer_options, dict):
+        transformer_options = kwargs.get("transformer_options")
+        if not transformer_options:
+            transformer_options = args[-2]
+    fbcache: FirstBlockCacheHolder = transformer_options["first_block_cache"]
+    fbcache.begin_call(transformer_options)
+    try:
+        return executor(*args, **kwargs)
+    finally:
+        fbcache.end_call()
+
+
+def first_block_cache_sample_wrapper(executor, *args, **kwargs):
+    """
+    This OUTER_SAMPLE wrapper gives every run its own cache and clears it at the end.
+    """
+    try:
+        guider = executor.class_obj
+        orig_model_options = guider.model_options
+        guider.model_options = comfy.model_patcher.create_model_options_clone(orig_model_options)
+        fbcache = guider.model_options["transformer_options"]["first_block_cache"].clone().prepare_timesteps(guider.model_patcher.model.model_sampling)
+        guider.model_options["transformer_options"]["first_block_cache"] = fbcache
+        logging.info(f"{fbcache.name} enabled - threshold: {fbcache.reuse_threshold}, first_blocks: {fbcache.first_blocks}, start_percent: {fbcache.start_percent}, end_percent: {fbcache.end_percent}")
+        return executor(*args, **kwargs)
+    finally:
+        fbcache = guider.model_options["transformer_options"]["first_block_cache"]
+        total = max(fbcache.total_calls, 1)
+        logging.info(f"{fbcache.name} - skipped the remaining blocks in {fbcache.total_calls_skipped}/{fbcache.total_calls} model calls ({100.0 * fbcache.total_calls_skipped / total:.0f}%).")
+        fbcache.reset()
+        guider.model_options = orig_model_options
+
+
+def apply_first_block_cache(model, reuse_threshold: float, first_blocks: int, start_percent: float, end_percent: float, verbose: bool=False):
+    adapter = get_first_block_cache_adapter(model.get_model_object("diffusion_model"))
+    if adapter is None:
+        logging.warning(f"FirstBlockCache - {type(model.get_model_object('diffusion_model')).__name__} is not supported, the model is left unchanged.")
+        return model
+    hidden_key, blocks = adapter
+    model = model.clone()
+    model.model_options["transformer_options"]["first_block_cache"] = FirstBlockCacheHolder(reuse_threshold, first_blocks, start_percent, end_percent, verbose).set_layout(hidden_key, blocks)
+    existing = model.model_options["transformer_options"].get("patches_replace", {}).get("dit", {})
+    position = 0
+    for block_type, count in blocks:
+        for i in range(count):
+            model.set_model_patch_replace(first_block_cache_block_patch(position, existing.get((block_type, i), None)), "dit", block_type, i)
+            position += 1
+    model.add_wrapper_with_key(comfy.patcher_extension.WrappersMP.OUTER_SAMPLE, "first_block_cache", first_block_cache_sample_wrapper)
+    model.add_wrapper_with_key(comfy.patcher_extension.WrappersMP.DIFFUSION_MODEL, "first_block_cache", first_block_cache_forward_wrapper)
+    return model
+
+
+class FirstBlockCacheNode(io.ComfyNode):
+    @classmethod
+    def define_schema(cls) -> io.Schema:
+        return io.Schema(
+            node_id="FirstBlockCache",
+            display_name="FirstBlockCache",
+            description="Runs the first transformer blocks on every step and skips the rest of the blocks when the output of the first blocks barely changed, reusing their cached residual. Supports Flux, Chroma, HunyuanVideo, Wan, Qwen Image, SD3, LTXV, Mochi and Kandinsky 5.",
+            category="advanced/debug/model",
+            is_experimental=True,
+            inputs=[
+                io.Model.Input("model", tooltip="The model to add FirstBlockCache to."),
+                io.Float.Input("reuse_threshold", min=0.0, default=0.1, max=3.0, step=0.01, tooltip="The accumulated relative change of the first blocks' residual below which the remaining blocks are skipped."),
+                io.Int.Input("first_blocks", min=1, default=1, max=64, tooltip="How many blocks run on every step. Only the first block type of the model counts (the double blocks of Flux, Chroma and HunyuanVideo), larger values are clamped to its number of blocks."),
+                io.Float.Input("start_percent", min=0.0, default=0.15, max=1.0, step=0.01, tooltip="The relative sampling step to begin use of FirstBlockCache."),
+                io.Float.Input("end_percent", min=0.0, default=0.95, max=1.0, step=0.01, tooltip="The relative sampling step to end use of FirstBlockCache."),
+                io.Boolean.Input("verbose", default=False, tooltip="Whether to log verbose information."),
+            ],
+            outputs=[
+                io.Model.Output(tooltip="The model with FirstBlockCache."),
+            ],
+        )
+
+    @classmethod
+    def execute(cls, model: io.Model.Type, reuse_threshold: float, first_blocks: int, start_percent: float, end_percent: float, verbose: bool) -> io.NodeOutput:
+        return io.NodeOutput(apply_first_block_cache(model, reuse_threshold, first_blocks, start_percent, end_percent, verbose))
+
+
 class EasyCacheExtension(ComfyExtension):
     async def get_node_list(self) -> list[type[io.ComfyNode]]:
         return [
             EasyCacheNode,
             LazyCacheNode,
+            FirstBlockCacheNode,
         ]
 
 def comfy_entrypoint():
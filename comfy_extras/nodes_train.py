@@ -1,3 +1,4 @@
+import concurrent.futures
 import logging
 import os
 
@@ -117,6 +118,91 @@ def process_cond_list(d, prefix=""):
     return d
 
 
+class BatchPrefetcher:
+    """Assemble training batches from a per-sample latent list in a background thread.
+
+    The batch for the next step is gathered (reading memory-mapped shards as needed) and converted to the
+    training dtype while the current step runs, so only about two batches are resident in memory.
+    """
+
+    def __init__(self, samples, dtype):
+        self.samples = samples  # list of (1, C, H, W) tensors, possibly memory-mapped
+        self.dtype = dtype
+        self._executor = concurrent.futures.ThreadPoolExecutor(max_workers=1, thread_name_prefix="train_prefetch")
+        self._pending = None  # (indices, future)
+
+    def _load(self, indices):
+        return torch.cat([self.samples[i] for i in indices], dim=0).to(self.dtype)
+
+    def prefetch(self, indices):
+        self._pending = (list(indices), self._executor.submit(self._load, indices))
+
+    def get(self, indices):
+        pending, self._pending = self._pending, None
+        if pending is not None and pending[0] == list(indices):
+            return pending[1].result()
+        return self._load(indices)
+
+    def close(self):
+        self._pending = None
+        self._executor.shutdown(wait=True, cancel_futures=True)
+
+
+LOSS_REPORT_INTERVAL = 10
+SIGMA_TABLE_SIZE = 10000
+
+
+class LossReporter:
+    """Collect per-step losses on the device and hand them to the callback in batches.
+
+    Calling loss.item() every step forces a device sync. Here losses are stacked and copied to the CPU
+    every `interval` steps with a non-blocking copy that is only read at the following flush.
+    """
+
+    def __init__(self, callback, pbar, interval=LOSS_REPORT_INTERVAL):
+        self.callback = callback
+        self.pbar = pbar
+        self.interval = max(1, interval)
+        self._losses = []
+        self._postfix = {}
+        self._in_flight = None  # (host tensor, cuda event or None, postfix)
+
+    def add(self, loss, **postfix):
+        self._losses.append(loss.detach().float().reshape(()))
+        self._postfix = postfix
+        if len(self._losses) >= self.interval:
+            self.flush()
+
+    def flush(self, wait=False):
+        self._drain()
+        if self._losses:
+            values = torch.stack(self._losses)
+            self._losses = []
+            if values.device.type == "cuda":
+                host = torch.empty(values.shape, dtype=values.dtype, pin_memory=True)
+                host.copy_(values, non_blocking=True)
+                event = torch.cuda.Event()
+                event.record()
+            else:
+                host, event = values.cpu(), None
+            self._in_flight = (host, event, self._postfix)
+        if wait:
+            self._drain()
+
+    def _drain(self):
+        if self._in_flight is None:
+            return
+        host, event, postfix = self._in_flight
+        self._in_flight = None
+        if event is not None:
+            event.synchronize()
+        values = host.tolist()
+        if self.callback:
+            for value in values:
+                self.callback(value)
+        self.pbar.set_postfix({"loss": f"{values[-1]:.4f}", **postfix})
+
+
 class TrainSampler(comfy.samplers.Sampler):
     def __init__(
         self,
@@ -130,6 +216,7 @@ class TrainSampler(comfy.samplers.Sampler):
         training_dtype=torch.bfloat16,
         real_dataset=None,
         bucket_latents=None,
+        streamed_dataset=None,
     ):
         self.loss_fn = loss_fn
         self.optimizer = optimizer
@@ -139,7 +226,12 @@ class TrainSampler(comfy.samplers.Sampler):
         self.grad_acc = grad_acc
         self.seed = seed
         self.training_dtype = training_dtype
+        self._sigma_lut: torch.Tensor | None = None  # percent_to_sigma table, built on first use
         self.real_dataset: list[torch.Tensor] | None = real_dataset
+        # Streamed mode data: per-sample (1, C, H, W) latents loaded batch by batch through a prefetcher
+        self.streamed_dataset: list[torch.Tensor] | None = streamed_dataset
+        self.prefetcher: BatchPrefetcher | None = None
+        self._next_indices: list[int] | None = None
         # Bucket mode data
         self.bucket_latents: list[torch.Tensor] | None = (
             bucket_latents  # list of (Bi, C, Hi, Wi)
@@ -202,15 +294,40 @@ class TrainSampler(comfy.samplers.Sampler):
             bwd_loss.backward()
         return loss
 
+    def _sigma_table(self, model_wrap):
+        """Tabulate percent_to_sigma once so batches of sigmas can be drawn with one vectorized lookup.
+
+        The table samples the open interval (0, 1) at cell centers, avoiding the sentinel values
+        percent_to_sigma returns at exactly 0 and 1. Most model samplings map a percent to
+        sigma((1 - percent) * t_max) for some timestep t_max, which is evaluated for the whole table
+        at once when it matches percent_to_sigma; the others are tabulated entry by entry.
+        """
+        if self._sigma_lut is None:
+            model_sampling = model_wrap.inner_model.model_sampling
+            percents = (torch.arange(SIGMA_TABLE_SIZE, dtype=torch.float64) + 0.5) / SIGMA_TABLE_SIZE
+            probes = [0, SIGMA_TABLE_SIZE // 3, SIGMA_TABLE_SIZE // 2, SIGMA_TABLE_SIZE - 1]
+            expected = torch.tensor([float(model_sampling.percent_to_sigma(percents[i].item())) for i in probes])
+            # Discrete samplings span timesteps up to timestep(sigma_max), continuous ones [0, 1]
+            for t_max in (model_sampling.timestep(model_sampling.sigma_max.reshape(1)), torch.ones(1)):
+                t_max = t_max.float().cpu()
+                sigmas = model_sampling.sigma((1.0 - percents).float() * t_max).float().cpu()
+                if torch.allclose(sigmas[probes], expected, rtol=1e-4):
+                    break
+            else:
+                sigmas = torch.tensor([float(model_sampling.percent_to_sigma(p)) for p in percents.tolist()])
+            self._sigma_lut = sigmas.float()
+        return self._sigma_lut
+
     def _generate_batch_sigmas(self, model_wrap, batch_size, device):
         """Generate random sigma values for a batch."""
-        batch_sigmas = [
-            model_wrap.inner_model.model_sampling.percent_to_sigma(
-                torch.rand((1,)).item()
-            )
-            for _ in range(batch_size)
-        ]
-        return torch.tensor(batch_sigmas).to(device)
+        table = self._sigma_table(model_wrap)
+        # Linear interpolation between table entries at uniformly random percents
+        pos = (torch.rand((batch_size,)) * SIGMA_TABLE_SIZE - 0.5).clamp_(0, SIGMA_TABLE_SIZE - 1)
+        lo = pos.floor().long()
+        hi = (lo + 1).clamp_(max=SIGMA_TABLE_SIZE - 1)
+        frac = pos - lo
+        batch_sigmas = table[lo] + (table[hi] - table[lo]) * frac
+        return batch_sigmas.to(device)
 
     def _train_step_bucket_mode(self, model_wrap, cond, extra_args, noisegen, latent_image, pbar):
         """Execute one training step in bucket mode."""
@@ -243,9 +360,7 @@ class TrainSampler(comfy.samplers.Sampler):
             self.num_images,
             bwd=True,
         )
-        if self.loss_callback:
-            self.loss_callback(loss.item())
-        pbar.set_postfix({"loss": f"{loss.item():.4f}", "bucket": bucket_idx})
+        self.loss_reporter.add(loss, bucket=bucket_idx)
 
     def _train_step_standard_mode(self, model_wrap, cond, extra_args, noisegen, latent_image, dataset_size, pbar):
         """Execute one training step in standard (non-bucket, non-multi-res) mode."""
@@ -267,42 +382,67 @@ class TrainSampler(comfy.samplers.Sampler):
             dataset_size,
             bwd=True,
         )
-        if self.loss_callback:
-            self.loss_callback(loss.item())
-        pbar.set_postfix({"loss": f"{loss.item():.4f}"})
+        self.loss_reporter.add(loss)
+
+    def _train_step_streamed_mode(self, model_wrap, cond, extra_args, noisegen, latent_image, dataset_size, pbar):
+        """Execute one training step in streamed mode (streamed_dataset is set)."""
+        indicies = self._next_indices or torch.randperm(dataset_size)[: self.batch_size].tolist()
+        batch_latent = self.prefetcher.get(indicies).to(latent_image)
+        # Start gathering the next step's batch while this one trains
+        self._next_indices = torch.randperm(dataset_size)[: self.batch_size].tolist()
+        self.prefetcher.prefetch(self._next_indices)
+
+        batch_noise = noisegen.generate_noise({"samples": batch_latent}).to(
+            batch_latent.device
+        )
+        batch_sigmas = self._generate_batch_sigmas(model_wrap, len(indicies), batch_latent.device)
+
+        loss = self.fwd_bwd(
+            model_wrap,
+            batch_sigmas,
+            batch_noise,
+            batch_latent,
+            cond,
+            indicies,
+            extra_args,
+            dataset_size,
+            bwd=True,
+        )
+        self.loss_reporter.add(loss)
 
     def _train_step_multires_mode(self, model_wrap, cond, extra_args, noisegen, latent_image, dataset_size, pbar):
-        """Execute one training step in multi-resolution mode (real_dataset is set)."""
+        """Execute one training step in multi-resolution mode (real_dataset is set).
+
+        Samples of the step that share a latent shape are run as one batch.
+        """
         indicies = torch.randperm(dataset_size)[: self.batch_size].tolist()
-        total_loss = 0
+        groups = {}
         for index in indicies:
-            single_latent = self.real_dataset[index].to(latent_image)
+            groups.setdefault(tuple(self.real_dataset[index].shape), []).append(index)
+
+        total_loss = 0
+        for group in groups.values():
+            batch_latent = torch.cat([self.real_dataset[i] for i in group], dim=0).to(latent_image)
             batch_noise = noisegen.generate_noise(
-                {"samples": single_latent}
-            ).to(single_latent.device)
-            batch_sigmas = (
-                model_wrap.inner_model.model_sampling.percent_to_sigma(
-                    torch.rand((1,)).item()
-                )
-            )
-            batch_sigmas = torch.tensor([batch_sigmas]).to(single_latent.device)
+                {"samples": batch_latent}
+            ).to(batch_latent.device)
+            batch_sigmas = self._generate_batch_sigmas(model_wrap, len(group), batch_latent.device)
             loss = self.fwd_bwd(
                 model_wrap,
                 batch_sigmas,
                 batch_noise,
-                single_latent,
+                batch_latent,
                 cond,
-                [index],
+                group,
                 extra_args,
                 dataset_size,
                 bwd=False,
             )
-            total_loss += loss
+            # loss is the mean over the group; weight it so every sample counts equally
+            total_loss += loss * len(group)
         total_loss = total_loss / self.grad_acc / len(indicies)
         total_loss.backward()
-        if self.loss_callback:
-            self.loss_callback(total_loss.item())
-        pbar.set_postfix({"loss": f"{total_loss.item():.4f}"})
+        self.loss_reporter.add(total_loss)
 
     def sample(
         self,
@@ -319,35 +459,45 @@ class TrainSampler(comfy.samplers.Sampler):
         cond = model_wrap.conds["positive"]
         dataset_size = sigmas.size(0)
         torch.cuda.empty_cache()
+        if self.streamed_dataset is not None:
+            self.prefetcher = BatchPrefetcher(self.streamed_dataset, latent_image.dtype)
         ui_pbar = ProgressBar(self.total_steps)
-        for i in (
-            pbar := trange(
-                self.total_steps,
-                desc="Training LoRA",
-                smoothing=0.01,
-                disable=not comfy.utils.PROGRESS_BAR_ENABLED,
-            )
-        ):
-            noisegen = comfy_extras.nodes_custom_sampler.Noise_RandomNoise(
-                self.seed + i * 1000
-            )
+        pbar = trange(
+            self.total_steps,
+            desc="Training LoRA",
+            smoothing=0.01,
+            disable=not comfy.utils.PROGRESS_BAR_ENABLED,
+        )
+        self.loss_reporter = LossReporter(self.loss_callback, pbar)
+        try:
+            for i in pbar:
+                noisegen = comfy_extras.nodes_custom_sampler.Noise_RandomNoise(
+                    self.seed + i * 1000
+                )
 
-            if self.bucket_latents is not None:
-                self._train_step_bucket_mode(model_wrap, cond, extra_args, noisegen, latent_image, pbar)
-            elif self.real_dataset is None:
-                self._train_step_standard_mode(model_wrap, cond, extra_args, noisegen, latent_image, dataset_size, pbar)
-            else:
-                self._train_step_multires_mode(model_wrap, cond, extra_args, noisegen, latent_image, dataset_size, pbar)
-
-            if (i + 1) % self.grad_acc == 0:
-                for param_groups in self.optimizer.param_groups:
-                    for param in param_groups["params"]:
-                        if param.grad is None:
-                            continue
-                        param.grad.data = param.grad.data.to(param.data.dtype)
-                self.optimizer.step()
-                self.optimizer.zero_grad()
-            ui_pbar.update(1)
+                if self.bucket_latents is not None:
+                    self._train_step_bucket_mode(model_wrap, cond, extra_args, noisegen, latent_image, pbar)
+                elif self.streamed_dataset is not None:
+                    self._train_step_streamed_mode(model_wrap, cond, extra_args, noisegen, latent_image, dataset_size, pbar)
+                elif self.real_dataset is None:
+                    self._train_step_standard_mode(model_wrap, cond, extra_args, noisegen, latent_image, dataset_size, pbar)
+                else:
+                    self._train_step_multires_mode(model_wrap, cond, extra_args, noisegen, latent_image, dataset_size, pbar)
+
+                if (i + 1) % self.grad_acc == 0:
+                    for param_groups in self.optimizer.param_groups:
+                        for param in param_groups["params"]:
+                            if param.grad is None:
+                                continue
+                            param.grad.data = param.grad.data.to(param.data.dtype)
+                    self.optimizer.step()
+                    self.optimizer.zero_grad()
+                ui_pbar.update(1)
+            self.loss_reporter.flush(wait=True)
+        finally:
+            if self.prefetcher is not None:
+                self.prefetcher.close()
+                self.prefetcher = None
         torch.cuda.empty_cache()
         return torch.zeros_like(latent_image)
 
@@ -534,6 +684,31 @@ def _prepare_latents_and_count(latents, dtype, bucket_mode):
     return latents, num_images, multi_res
 
 
+def _prepare_streamed_latents(latents, dtype):
+    """Split latents into per-sample (1, C, H, W) views without copying them.
+
+    Unlike _prepare_latents_and_count, nothing is converted or concatenated up front, so memory-mapped
+    latents (e.g. from LoadTrainingDataset) stay on disk until a batch needs them.
+
+    Args:
+        latents: Latents (tensor or list of tensors)
+        dtype: Training dtype, only applied to the first sample (used as the guider's dummy latent)
+
+    Returns:
+        tuple: (list of per-sample latents, num_images, multi_res)
+    """
+    if isinstance(latents, torch.Tensor):
+        latents = [latents]
+    samples = []
+    for latent in latents:
+        samples.extend(latent.split(1, dim=0))
+    num_images = len(samples)
+    multi_res = len({tuple(t.shape) for t in samples}) > 1
+    samples[0] = samples[0].to(dtype)
+    logging.debug(f"Streamed mode: {num_images} samples, multi_res={multi_res}")
+    return samples, num_images, multi_res
+
+
 def _validate_and_expand_conditioning(positive, num_images, bucket_mode):
     """Validate conditioning count matches image count, expand if needed.
 
@@ -794,7 +969,7 @@ def _create_loss_function(loss_function_name):
 
 
 def _run_training_loop(
-    guider, train_sampler, latents, num_images, seed, bucket_mode, multi_res
+    guider, train_sampler, latents, num_images, seed, bucket_mode, multi_res, streamed=False
 ):
     """Execute the training loop.
 
@@ -806,11 +981,22 @@ def _run_training_loop(
         seed: Random seed
         bucket_mode: Whether bucket mode is enabled
         multi_res: Whether multi-resolution mode is enabled
+        streamed: Whether latents are streamed per batch (the guider gets a single-sample dummy latent)
     """
     sigmas = torch.tensor(range(num_images))
     noise = comfy_extras.nodes_custom_sampler.Noise_RandomNoise(seed)
 
-    if bucket_mode:
+    if streamed:
+        # The dataset size is carried by sigmas; a full-size dummy would defeat streaming
+        dummy_latent = latents[0]
+        guider.sample(
+            noise.generate_noise({"samples": dummy_latent}),
+            dummy_latent,
+            train_sampler,
+            sigmas,
+            seed=noise.seed,
+        )
+    elif bucket_mode:
         # Use first bucket's first latent as dummy for guider
         dummy_latent = latents[0][:1].repeat(num_images, 1, 1, 1)
         guider.sample(
@@ -952,6 +1138,12 @@ class TrainLoraNode(io.ComfyNode):
                     default=False,
                     tooltip="Enable bypass mode for training. When enabled, adapters are applied via forward hooks instead of weight modification. Useful for quantized models where weights cannot be directly modified.",
                 ),
+                io.Boolean.Input(
+                    "stream_latents",
+                    default=False,
+                    optional=True,
+                    tooltip="Load latents batch by batch in a background thread instead of holding the whole dataset in memory. Works best with datasets from Load Training Dataset (memory-mapped safetensors shards). Ignored in bucket mode.",
+                ),
             ],
             outputs=[
                 io.Custom("LORA_MODEL").Output(
@@ -985,6 +1177,7 @@ class TrainLoraNode(io.ComfyNode):
         existing_lora,
         bucket_mode,
         bypass_mode,
+        stream_latents=None,
     ):
         # Extract scalars from lists (due to is_input_list=True)
         model = model[0]
@@ -1003,6 +1196,7 @@ class TrainLoraNode(io.ComfyNode):
         existing_lora = existing_lora[0]
         bucket_mode = bucket_mode[0]
         bypass_mode = bypass_mode[0]
+        streamed = bool(stream_latents and stream_latents[0]) and not bucket_mode
 
         # Process latents based on mode
         if bucket_mode:
@@ -1020,9 +1214,12 @@ class TrainLoraNode(io.ComfyNode):
         mp.set_model_compute_dtype(dtype)
 
         # Prepare latents and compute counts
-        latents, num_images, multi_res = _prepare_latents_and_count(
-            latents, dtype, bucket_mode
-        )
+        if streamed:
+            latents, num_images, multi_res = _prepare_streamed_latents(latents, dtype)
+        else:
+            latents, num_images, multi_res = _prepare_latents_and_count(
+                latents, dtype, bucket_mode
+            )
 
         # Validate and expand conditioning
         positive = _validate_and_expand_conditioning(positive, num_images, bucket_mode)
@@ -1097,6 +1294,7 @@ class TrainLoraNode(io.ComfyNode):
                     seed=seed,
                     training_dtype=dtype,
                     real_dataset=latents if multi_res else None,
+                    streamed_dataset=latents if streamed and not multi_res else None,
                 )
 
             # Setup guider
@@ -1121,6 +1319,7 @@ class TrainLoraNode(io.ComfyNode):
                     seed,
                     bucket_mode,
                     multi_res,
+                    streamed=streamed,
                 )
             finally:
                 # Eject bypass hooks if they were injected
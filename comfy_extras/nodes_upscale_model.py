@@ -1,7 +1,6 @@
 import logging
 from spandrel import ModelLoader, ImageModelDescriptor
-from comfy import model_management
-import torch
+import comfy.upscale_model
 import comfy.utils
 import folder_paths
 from typing_extensions import override
@@ -41,6 +40,8 @@ class UpscaleModelLoader(io.ComfyNode):
         if not isinstance(out, ImageModelDescriptor):
             raise Exception("Upscale model must be a single-image model.")
 
+        comfy.upscale_model.model_patcher(out)
+
         return io.NodeOutput(out)
 
     load_model = execute  # TODO: remove
@@ -65,35 +66,7 @@ class ImageUpscaleWithModel(io.ComfyNode):
 
     @classmethod
     def execute(cls, upscale_model, image) -> io.NodeOutput:
-        device = model_management.get_torch_device()
-
-        memory_required = model_management.module_size(upscale_model.model)
-        memory_required += (512 * 512 * 3) * image.element_size() * max(upscale_model.scale, 1.0) * 384.0 #The 384.0 is an estimate of how much some of these models take, TODO: make it more accurate
-        memory_required += image.nelement() * image.element_size()
-        model_management.free_memory(memory_required, device)
-
-        upscale_model.to(device)
-        in_img = image.movedim(-1,-3).to(device)
-
-        tile = 512
-        overlap = 32
-
-        oom = True
-        try:
-            while oom:
-                try:
-                    steps = in_img.shape[0] * comfy.utils.get_tiled_scale_steps(in_img.shape[3], in_img.shape[2], tile_x=tile, tile_y=tile, overlap=overlap)
-                    pbar = comfy.utils.ProgressBar(steps)
-                    s = comfy.utils.tiled_scale(in_img, lambda a: upscale_model(a), tile_x=tile, tile_y=tile, overlap=overlap, upscale_amount=upscale_model.scale, pbar=pbar)
-                    oom = False
-                except model_management.OOM_EXCEPTION as e:
-                    tile //= 2
-                    if tile < 128:
-                        raise e
-        finally:
-            upscale_model.to("cpu")
-
-        s = torch.clamp(s.movedim(-3,-1), min=0, max=1.0)
+        s = comfy.upscale_model.upscale(upscale_model, image)
         return io.NodeOutput(s)
 
     upscale = execute  # TODO: remove
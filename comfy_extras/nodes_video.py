@@ -1,16 +1,45 @@
 from __future__ import annotations
 
 import os
+import asyncio
 import av
-import torch
 import folder_paths
 import json
 from typing import Optional
 from typing_extensions import override
 from fractions import Fraction
 from comfy_api.latest import ComfyExtension, io, ui, Input, InputImpl, Types
+from comfy_api.latest._input_impl.video_types import encode_images
 from comfy.cli_args import args
 
+
+def _reserve_output_file(full_output_folder: str, filename: str, counter: int, extension: str) -> str:
+    """
+    Create the empty output file before encoding in a thread starts. Saves run concurrently, so another save with
+    the same prefix can compute the same counter before this file exists; the next free counter is used instead.
+    """
+    while True:
+        file = f"{filename}_{counter:05}_.{extension}"
+        try:
+            with open(os.path.join(full_output_folder, file), "xb"):
+                pass
+            return file
+        except FileExistsError:
+            counter += 1
+
+
+async def _encode_reserved(path: str, encode, *args, **kwargs):
+    """Run encode in a thread, removing the reserved output file if it fails."""
+    try:
+        await asyncio.to_thread(encode, *args, **kwargs)
+    except BaseException:
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+        raise
+
+
 class SaveWEBM(io.ComfyNode):
     @classmethod
     def define_schema(cls):
@@ -31,37 +60,39 @@ class SaveWEBM(io.ComfyNode):
         )
 
     @classmethod
-    def execute(cls, images, codec, fps, filename_prefix, crf) -> io.NodeOutput:
+    async def execute(cls, images, codec, fps, filename_prefix, crf) -> io.NodeOutput:
         full_output_folder, filename, counter, subfolder, filename_prefix = folder_paths.get_save_image_path(
             filename_prefix, folder_paths.get_output_directory(), images[0].shape[1], images[0].shape[0]
         )
 
-        file = f"{filename}_{counter:05}_.webm"
-        container = av.open(os.path.join(full_output_folder, file), mode="w")
-
+        file = _reserve_output_file(full_output_folder, filename, counter, "webm")
+        metadata = {}
         if cls.hidden.prompt is not None:
-            container.metadata["prompt"] = json.dumps(cls.hidden.prompt)
+            metadata["prompt"] = json.dumps(cls.hidden.prompt)
 
         if cls.hidden.extra_pnginfo is not None:
             for x in cls.hidden.extra_pnginfo:
-                container.metadata[x] = json.dumps(cls.hidden.extra_pnginfo[x])
-
-        codec_map = {"vp9": "libvpx-vp9", "av1": "libsvtav1"}
-        stream = container.add_stream(codec_map[codec], rate=Fraction(round(fps * 1000), 1000))
-        stream.width = images.shape[-2]
-        stream.height = images.shape[-3]
-        stream.pix_fmt = "yuv420p10le" if codec == "av1" else "yuv420p"
-        stream.bit_rate = 0
-        stream.options = {'crf': str(crf)}
-        if codec == "av1":
-            stream.options["preset"] = "6"
-
-        for frame in images:
-            frame = av.VideoFrame.from_ndarray(torch.clamp(frame[..., :3] * 255, min=0, max=255).to(device=torch.device("cpu"), dtype=torch.uint8).numpy(), format="rgb24")
-            for packet in stream.encode(frame):
-                container.mux(packet)
-        container.mux(stream.encode())
-        container.close()
+                metadata[x] = json.dumps(cls.hidden.extra_pnginfo[x])
+
+        def encode():
+            with av.open(os.path.join(full_output_folder, file), mode="w") as container:
+                for key, value in metadata.items():
+                    container.metadata[key] = value
+
+                codec_map = {"vp9": "libvpx-vp9", "av1": "libsvtav1"}
+                stream = container.add_stream(codec_map[codec], rate=Fraction(round(fps * 1000), 1000))
+                stream.width = images.shape[-2]
+                stream.height = images.shape[-3]
+                stream.pix_fmt = "yuv420p10le" if codec == "av1" else "yuv420p"
+                stream.bit_rate = 0
+                stream.options = {'crf': str(crf)}
+                if codec == "av1":
+                    stream.options["preset"] = "6"
+
+                encode_images(container, stream, images)
+
+        # Encoding runs in a thread so the executor can run other nodes until the file is finished
+        await _encode_reserved(os.path.join(full_output_folder, file), encode)
 
         return io.NodeOutput(ui=ui.PreviewVideo([ui.SavedResult(file, subfolder, io.FolderType.output)]))
 
@@ -85,7 +116,7 @@ class SaveVideo(io.ComfyNode):
         )
 
     @classmethod
-    def execute(cls, video: Input.Video, filename_prefix, format: str, codec) -> io.NodeOutput:
+    async def execute(cls, video: Input.Video, filename_prefix, format: str, codec) -> io.NodeOutput:
         width, height = video.get_dimensions()
         full_output_folder, filename, counter, subfolder, filename_prefix = folder_paths.get_save_image_path(
             filename_prefix,
@@ -102,13 +133,15 @@ class SaveVideo(io.ComfyNode):
                 metadata["prompt"] = cls.hidden.prompt
             if len(metadata) > 0:
                 saved_metadata = metadata
-        file = f"{filename}_{counter:05}_.{Types.VideoContainer.get_extension(format)}"
-        video.save_to(
-            os.path.join(full_output_folder, file),
-            format=Types.VideoContainer(format),
-            codec=codec,
-            metadata=saved_metadata
-        )
+        save_kwargs = {"format": Types.VideoContainer(format), "codec": codec, "metadata": saved_metadata}
+        if isinstance(video, InputImpl.VideoFromFrameChunks):
+            # The frames may be produced by models while saving, that has to happen on the executor thread
+            file = f"{filename}_{counter:05}_.{Types.VideoContainer.get_extension(format)}"
+            video.save_to(os.path.join(full_output_folder, file), **save_kwargs)
+        else:
+            file = _reserve_output_file(full_output_folder, filename, counter, Types.VideoContainer.get_extension(format))
+            # Encoding runs in a thread so the executor can run other nodes until the file is finished
+            await _encode_reserved(os.path.join(full_output_folder, file), video.save_to, os.path.join(full_output_folder, file), **save_kwargs)
 
         return io.NodeOutput(ui=ui.PreviewVideo([ui.SavedResult(file, subfolder, io.FolderType.output)]))
 
@@ -138,6 +171,52 @@ class CreateVideo(io.ComfyNode):
             InputImpl.VideoFromComponents(Types.VideoComponents(images=images, audio=audio, frame_rate=Fraction(fps)))
         )
 
+class CreateVideoFromLatent(io.ComfyNode):
+    @classmethod
+    def define_schema(cls):
+        return io.Schema(
+            node_id="CreateVideoFromLatent",
+            search_aliases=["vae decode video", "decode to video", "streaming video"],
+            display_name="Create Video from Latent",
+            category="image/video",
+            description="Create a video that is decoded by the VAE in chunks while it is saved, so the whole clip is never in memory as images. The frames are decoded again every time the video is used. Video latents (Wan, Hunyuan Video, LTXV, ...) are decoded in overlapping windows of frames that are blended like VAE Decode (Tiled) with the same temporal size, so the result can differ slightly from VAE Decode unless frames_per_chunk covers the whole video.",
+            inputs=[
+                io.Latent.Input("samples", tooltip="The latent to decode."),
+                io.Vae.Input("vae", tooltip="The VAE model used for decoding the latent."),
+                io.Float.Input("fps", default=30.0, min=1.0, max=120.0, step=1.0),
+                io.Int.Input("frames_per_chunk", default=16, min=1, max=4096, tooltip="How many frames are decoded at once. For video latents this is the temporal window size, windows overlap by one latent frame."),
+                io.Audio.Input("audio", optional=True, tooltip="The audio to add to the video."),
+            ],
+            outputs=[
+                io.Video.Output(),
+            ],
+        )
+
+    @classmethod
+    def execute(cls, samples, vae, fps: float, frames_per_chunk: int, audio: Optional[Input.Audio] = None) -> io.NodeOutput:
+        latent = samples["samples"]
+        if latent.is_nested:
+            latent = latent.unbind()[0]
+        video_latent = latent.ndim == 5 and vae.latent_dim == 3
+        batch_size = 1 if video_latent else frames_per_chunk
+        tile_t = None
+        temporal_compression = vae.temporal_compression_decode()
+        if video_latent and temporal_compression is not None:
+            tile_t = max(2, frames_per_chunk // temporal_compression)
+
+        dimensions = None
+        frame_count = None
+        ratio = vae.spacial_compression_decode()
+        if isinstance(ratio, int):
+            dimensions = (latent.shape[-1] * ratio, latent.shape[-2] * ratio)
+        if not video_latent:
+            frame_count = latent.shape[0]
+
+        return io.NodeOutput(
+            InputImpl.VideoFromFrameChunks(lambda: vae.decode_iter(latent, batch_size=batch_size, tile_t=tile_t), frame_rate=Fraction(fps), audio=audio,
+                                           dimensions=dimensions, frame_count=frame_count)
+        )
+
 class GetVideoComponents(io.ComfyNode):
     @classmethod
     def define_schema(cls):
@@ -210,6 +289,7 @@ class VideoExtension(ComfyExtension):
             SaveWEBM,
             SaveVideo,
             CreateVideo,
+            CreateVideoFromLatent,
             GetVideoComponents,
             LoadVideo,
         ]
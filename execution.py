@@ -1011,6 +1011,8 @@ def full_type_name(klass):
     return module + '.' + klass.__qualname__
 
 async def validate_prompt(prompt_id, prompt, partial_execution_list: Union[list[str], None]):
+    # Import lazily registered node modules on this loop before the synchronous lookups below
+    await nodes.load_lazy_nodes([node.get('class_type') for node in prompt.values() if isinstance(node, dict)])
     outputs = set()
     for x in prompt:
         if 'class_type' not in prompt[x]:
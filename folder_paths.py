@@ -2,10 +2,13 @@ from __future__ import annotations
 
 import os
 import time
+import threading
+import concurrent.futures
 import mimetypes
 import logging
 from typing import Literal, List
-from collections.abc import Collection
+from collections import OrderedDict
+from collections.abc import Callable, Collection
 
 from comfy.cli_args import args
 
@@ -62,10 +65,18 @@ filename_list_cache: dict[str, tuple[list[str], dict[str, float], float]] = {}
 class CacheHelper:
     """
     Helper class for managing file list cache data.
+
+    While active it also counts reads of file lists and input/output directories, which tells /object_info which
+    node definitions depend on folder contents.
     """
     def __init__(self):
         self.cache: dict[str, tuple[list[str], dict[str, float], float]] = {}
         self.active = False
+        self.reads = 0
+
+    def note_read(self) -> None:
+        if self.active:
+            self.reads += 1
 
     def get(self, key: str, default=None) -> tuple[list[str], dict[str, float], float]:
         if not self.active:
@@ -119,14 +130,17 @@ def set_input_directory(input_dir: str) -> None:
 
 def get_output_directory() -> str:
     global output_directory
+    cache_helper.note_read()
     return output_directory
 
 def get_temp_directory() -> str:
     global temp_directory
+    cache_helper.note_read()
     return temp_directory
 
 def get_input_directory() -> str:
     global input_directory
+    cache_helper.note_read()
     return input_directory
 
 def get_user_directory() -> str:
@@ -298,48 +312,269 @@ def add_model_folder_path(folder_name: str, full_folder_path: str, is_default: b
 
 def get_folder_paths(folder_name: str) -> list[str]:
     folder_name = map_legacy(folder_name)
+    cache_helper.note_read()
     return folder_names_and_paths[folder_name][0][:]
 
-def recursive_search(directory: str, excluded_dir_names: list[str] | None=None) -> tuple[list[str], dict[str, float]]:
-    if not os.path.isdir(directory):
-        return [], {}
+SCAN_MAX_WORKERS = 8
 
-    if excluded_dir_names is None:
-        excluded_dir_names = []
+_scan_pool: concurrent.futures.ThreadPoolExecutor | None = None
+_scan_pool_lock = threading.Lock()
 
-    result = []
-    dirs = {}
 
-    # Attempt to add the initial directory to dirs with error handling
+def _get_scan_pool() -> concurrent.futures.ThreadPoolExecutor:
+    global _scan_pool
+    with _scan_pool_lock:
+        if _scan_pool is None:
+            _scan_pool = concurrent.futures.ThreadPoolExecutor(max_workers=SCAN_MAX_WORKERS, thread_name_prefix="dirscan")
+        return _scan_pool
+
+
+def _parallel_map(fn, items: list) -> list:
+    # Directory listings and stats mostly wait on the filesystem (NFS/SMB especially), so threads overlap well
+    if len(items) <= 1:
+        return [fn(x) for x in items]
+    return list(_get_scan_pool().map(fn, items))
+
+
+def _dir_mtime(path: str) -> float | None:
     try:
-        dirs[directory] = os.path.getmtime(directory)
-    except FileNotFoundError:
-        logging.warning(f"Warning: Unable to access {directory}. Skipping this path.")
+        return os.path.getmtime(path)
+    except OSError:
+        return None
 
-    logging.debug("recursive file list on directory {}".format(directory))
-    dirpath: str
-    subdirs: list[str]
-    filenames: list[str]
-
-    for dirpath, subdirs, filenames in os.walk(directory, followlinks=True, topdown=True):
-        subdirs[:] = [d for d in subdirs if d not in excluded_dir_names]
-        for file_name in filenames:
-            try:
-                relative_path = os.path.relpath(os.path.join(dirpath, file_name), directory)
-                result.append(relative_path)
-            except:
-                logging.warning(f"Warning: Unable to access {file_name}. Skipping this file.")
-                continue
 
-        for d in subdirs:
-            path: str = os.path.join(dirpath, d)
-            try:
-                dirs[path] = os.path.getmtime(path)
-            except FileNotFoundError:
-                logging.warning(f"Warning: Unable to access {path}. Skipping this path.")
-                continue
+def _file_stats(path: str) -> tuple[int, float, float] | None:
+    try:
+        st = os.stat(path)
+    except OSError as e:
+        logging.warning(f"Warning: Unable to access {path}. Error: {e}. Skipping this file.")
+        return None
+    return st.st_size, st.st_mtime, st.st_ctime
+
+
+class _DirRecord:
+    __slots__ = ("mtime", "files", "subdirs", "linked_dirs")
+
+    def __init__(self, mtime: float, files: dict[str, tuple[int, float, float] | None], subdirs: list[str], linked_dirs: list[str]):
+        self.mtime = mtime
+        self.files = files
+        self.subdirs = subdirs
+        self.linked_dirs = linked_dirs
+
+
+class DirectorySnapshot:
+    """
+    Cached recursive listing of one directory tree, shared by everything that lists model, input or output folders.
+
+    Listings use os.scandir, so file and directory entries cost no extra stat calls. Every directory keeps its own
+    mtime, which lets refresh() only rescan the directories whose entries changed. File stats (size, mtime, ctime)
+    are only collected when a consumer asks for them, and then for every file again, since a file rewritten in
+    place does not change the mtime of its directory. stats_filter limits that to the files a consumer reports.
+    With follow_symlinks=False, links to directories are not descended into, like os.walk(followlinks=False),
+    and are reported by linked_dirs() instead.
+    """
+
+    def __init__(self, root: str, excluded_dir_names: Collection[str] = (), follow_symlinks: bool = True):
+        self.root = os.fspath(root)
+        self.excluded_dir_names = set(excluded_dir_names)
+        self.follow_symlinks = follow_symlinks
+        self.records: dict[str, _DirRecord] = {}
+        self.lock = threading.Lock()
+
+    def _scan_dir(self, path: str) -> _DirRecord | None:
+        mtime = _dir_mtime(path)
+        if mtime is None:
+            logging.warning(f"Warning: Unable to access {path}. Skipping this path.")
+            return None
+        files = {}
+        subdirs = []
+        linked_dirs = []
+        try:
+            with os.scandir(path) as it:
+                for entry in it:
+                    try:
+                        if entry.is_dir(follow_symlinks=True):
+                            if entry.name in self.excluded_dir_names:
+                                continue
+                            if not self.follow_symlinks and entry.is_symlink():
+                                linked_dirs.append(entry.name)
+                                continue
+                            # Followed links that point back up the tree would recurse forever
+                            if entry.is_symlink() and _links_to_ancestor(entry.path, path):
+                                continue
+                            subdirs.append(entry.name)
+                        else:
+                            files[entry.name] = None
+                    except OSError:
+                        logging.warning(f"Warning: Unable to access {entry.path}. Skipping this file.")
+        except OSError:
+            logging.warning(f"Warning: Unable to access {path}. Skipping this path.")
+            return None
+        return _DirRecord(mtime, files, subdirs, linked_dirs)
+
+    def _drop_subtree(self, path: str) -> None:
+        prefix = path + os.sep
+        for key in [k for k in self.records if k == path or k.startswith(prefix)]:
+            del self.records[key]
+
+    def refresh(self, with_stats: bool = False, stats_filter: Callable[[str], bool] | None = None) -> DirectorySnapshot:
+        """
+        Rescan the directories that changed since the last refresh. With with_stats, the stats of every file, or of
+        the files whose path relative to the root passes stats_filter, are collected again.
+        """
+        with self.lock:
+            if not self.records:
+                frontier = [self.root] if os.path.isdir(self.root) else []
+            else:
+                paths = list(self.records)
+                frontier = []
+                for path, mtime in zip(paths, _parallel_map(_dir_mtime, paths)):
+                    if path not in self.records:
+                        continue  # removed together with a parent below
+                    if mtime is None:
+                        self._drop_subtree(path)
+                    elif mtime != self.records[path].mtime:
+                        frontier.append(path)
+
+            if frontier:
+                logging.debug("rescanning {} directories under {}".format(len(frontier), self.root))
+            while frontier:
+                next_frontier = []
+                for path, record in zip(frontier, _parallel_map(self._scan_dir, frontier)):
+                    old = self.records.get(path)
+                    if record is None:
+                        self._drop_subtree(path)
+                        continue
+                    if old is not None:
+                        # Stats of files in a changed directory are collected again, a name may now be a different file
+                        for name in set(old.subdirs) - set(record.subdirs):
+                            self._drop_subtree(os.path.join(path, name))
+                    self.records[path] = record
+                    for name in record.subdirs:
+                        sub = os.path.join(path, name)
+                        if sub not in self.records:
+                            next_frontier.append(sub)
+                frontier = next_frontier
+
+            if with_stats:
+                self._fill_stats(stats_filter)
+        return self
+
+    def _fill_stats(self, stats_filter: Callable[[str], bool] | None) -> None:
+        wanted = []
+        for path, record in self.records.items():
+            for name in record.files:
+                if stats_filter is None or stats_filter(os.path.relpath(os.path.join(path, name), self.root)):
+                    wanted.append((path, name))
+        if not wanted:
+            return
+        results = _parallel_map(_file_stats, [os.path.join(path, name) for path, name in wanted])
+        for (path, name), stats in zip(wanted, results):
+            if stats is None:
+                self.records[path].files.pop(name, None)
+            else:
+                self.records[path].files[name] = stats
+
+    def update_file(self, full_path: str) -> None:
+        """Record a file that was written, moved or deleted, without waiting for its directory to be rescanned."""
+        with self.lock:
+            record = self.records.get(os.path.dirname(full_path))
+            if record is None:
+                return  # the directory is new, the next refresh finds it through its parent
+            name = os.path.basename(full_path)
+            if os.path.isfile(full_path):
+                record.files[name] = _file_stats(full_path)
+            else:
+                record.files.pop(name, None)
+
+    def files(self) -> list[str]:
+        """Relative paths of all files in the tree."""
+        return [rel for rel, _full, _stats in self.entries()]
+
+    def dirs(self) -> dict[str, float]:
+        """Every directory in the tree, including the root, with its mtime."""
+        return {path: record.mtime for path, record in self.records.items()}
+
+    def linked_dirs(self) -> list[str]:
+        """Full paths of the links to directories that were not followed."""
+        return [os.path.join(path, name) for path, record in list(self.records.items()) for name in record.linked_dirs]
+
+    def entries(self):
+        """Yield (relative path, full path, stats or None) for every file in the tree."""
+        for path, record in list(self.records.items()):
+            for name, stats in list(record.files.items()):
+                full_path = os.path.join(path, name)
+                yield os.path.relpath(full_path, self.root), full_path, stats
+
+
+def _links_to_ancestor(link_path: str, parent: str) -> bool:
+    target = os.path.realpath(link_path)
+    parent_real = os.path.realpath(parent)
+    return parent_real == target or parent_real.startswith(target.rstrip(os.sep) + os.sep)
+
+
+# Least recently used snapshots are dropped past this count, every listed userdata subdirectory gets its own
+MAX_DIRECTORY_SNAPSHOTS = 256
+_directory_snapshots: OrderedDict[tuple[str, tuple[str, ...], bool], DirectorySnapshot] = OrderedDict()
+_directory_snapshots_lock = threading.Lock()
+
+
+def get_directory_snapshots(directories: list[str], excluded_dir_names: Collection[str] | None = None, with_stats: bool = False,
+                            follow_symlinks: bool = True, stats_filter: Callable[[str], bool] | None = None) -> list[DirectorySnapshot]:
+    """
+    Return refreshed snapshots for several directory trees, refreshing the trees concurrently.
+    Snapshots are shared process wide, keyed by directory, excluded directory names and symlink handling.
+    """
+    key_excluded = tuple(sorted(excluded_dir_names or ()))
+    snapshots = []
+    with _directory_snapshots_lock:
+        for directory in directories:
+            directory = os.fspath(directory)
+            key = (directory, key_excluded, follow_symlinks)
+            snapshot = _directory_snapshots.get(key)
+            if snapshot is None:
+                snapshot = DirectorySnapshot(directory, key_excluded, follow_symlinks)
+                _directory_snapshots[key] = snapshot
+            else:
+                _directory_snapshots.move_to_end(key)
+            snapshots.append(snapshot)
+        while len(_directory_snapshots) > MAX_DIRECTORY_SNAPSHOTS:
+            _directory_snapshots.popitem(last=False)
+
+    if len(snapshots) <= 1:
+        for snapshot in snapshots:
+            snapshot.refresh(with_stats, stats_filter)
+        return snapshots
+    # Roots are refreshed on their own threads so they can use the shared pool for their subdirectories
+    with concurrent.futures.ThreadPoolExecutor(max_workers=len(snapshots), thread_name_prefix="dirscan-root") as executor:
+        return list(executor.map(lambda snapshot: snapshot.refresh(with_stats, stats_filter), snapshots))
+
+
+def get_directory_snapshot(directory: str, excluded_dir_names: Collection[str] | None = None, with_stats: bool = False,
+                           follow_symlinks: bool = True, stats_filter: Callable[[str], bool] | None = None) -> DirectorySnapshot:
+    return get_directory_snapshots([directory], excluded_dir_names, with_stats, follow_symlinks, stats_filter)[0]
+
+
+def notify_file_changed(full_path: str) -> None:
+    """Update every shared directory snapshot containing a file that ComfyUI itself wrote, moved or deleted."""
+    full_path = os.path.abspath(full_path)
+    with _directory_snapshots_lock:
+        snapshots = list(_directory_snapshots.values())
+    for snapshot in snapshots:
+        root = os.path.abspath(snapshot.root)
+        if full_path.startswith(root.rstrip(os.sep) + os.sep):
+            snapshot.update_file(os.path.join(snapshot.root, os.path.relpath(full_path, root)))
+
+
+def recursive_search(directory: str, excluded_dir_names: list[str] | None=None) -> tuple[list[str], dict[str, float]]:
+    if not os.path.isdir(directory):
+        return [], {}
+
+    logging.debug("recursive file list on directory {}".format(directory))
+    snapshot = get_directory_snapshot(directory, excluded_dir_names)
+    result = snapshot.files()
     logging.debug("found {} files".format(len(result)))
-    return result, dirs
+    return result, snapshot.dirs()
 
 def filter_files_extensions(files: Collection[str], extensions: Collection[str]) -> list[str]:
     return sorted(list(filter(lambda a: os.path.splitext(a)[-1].lower() in extensions or len(extensions) == 0, files)))
@@ -382,6 +617,8 @@ def get_filename_list_(folder_name: str) -> tuple[list[str], dict[str, float], f
     output_list = set()
     folders = folder_names_and_paths[folder_name]
     output_folders = {}
+    # Refresh all roots of the folder concurrently; recursive_search then reads the shared snapshots
+    get_directory_snapshots([x for x in folders[0] if os.path.isdir(x)], excluded_dir_names=[".git"])
     for x in folders[0]:
         files, folders_all = recursive_search(x, excluded_dir_names=[".git"])
         output_list.update(filter_files_extensions(files, folders[1]))
@@ -417,6 +654,7 @@ def cached_filename_list_(folder_name: str) -> tuple[list[str], dict[str, float]
 
 def get_filename_list(folder_name: str) -> list[str]:
     folder_name = map_legacy(folder_name)
+    cache_helper.note_read()
     out = cached_filename_list_(folder_name)
     if out is None:
         out = get_filename_list_(folder_name)
@@ -7,7 +7,7 @@ import folder_paths
 import time
 from comfy.cli_args import args, enables_dynamic_vram
 from app.logger import setup_logger
-from app.assets.scanner import seed_assets
+from app.assets.scanner import start_background_seed
 import itertools
 import utils.extra_config
 import logging
@@ -187,6 +187,8 @@ import hook_breaker_ac10a0
 
 import comfy.memory_management
 import comfy.model_patcher
+import comfy.model_detection_cache
+import comfy.attention_autotune
 
 import comfy_aimdo.control
 import comfy_aimdo.torch
@@ -351,13 +353,13 @@ def cleanup_temp():
         shutil.rmtree(temp_dir, ignore_errors=True)
 
 
-def setup_database():
+def setup_database(asyncio_loop=None):
     try:
         from app.database.db import init_db, dependencies_available
         if dependencies_available():
             init_db()
-            if not args.disable_assets_autoscan:
-                seed_assets(["models"], enable_logging=True)
+            if not args.disable_assets_autoscan and asyncio_loop is not None:
+                start_background_seed(["models"], enable_logging=True, loop=asyncio_loop)
     except Exception as e:
         logging.error(f"Failed to initialize database. Please ensure you have installed the latest requirements. If the error persists, please report this as in future the database will be required: {e}")
 
@@ -372,6 +374,10 @@ def start_comfyui(asyncio_loop=None):
         logging.info(f"Setting temp directory to: {temp_dir}")
         folder_paths.set_temp_directory(temp_dir)
     cleanup_temp()
+    if not args.disable_model_detection_cache:
+        comfy.model_detection_cache.enable(folder_paths.get_system_user_directory("cache"))
+    if args.autotune_attention:
+        comfy.attention_autotune.enable(folder_paths.get_system_user_directory("cache"))
 
     if args.windows_standalone_build:
         try:
@@ -396,7 +402,7 @@ def start_comfyui(asyncio_loop=None):
     hook_breaker_ac10a0.restore_functions()
 
     cuda_malloc_warning()
-    setup_database()
+    setup_database(asyncio_loop)
 
     prompt_server.add_routes()
     hijack_progress(prompt_server)
@@ -1,9 +1,10 @@
 import hashlib
+import numpy as np
 import torch
 
 from comfy.cli_args import args
 
-from PIL import ImageFile, UnidentifiedImageError
+from PIL import Image, ImageFile, UnidentifiedImageError
 
 def conditioning_set_values(conditioning, values={}, append=False):
     c = []
@@ -34,6 +35,13 @@ def pillow(fn, arg):
             ImageFile.LOAD_TRUNCATED_IMAGES = prev_value
     return x
 
+def load_image_rgb(path):
+    """Decode an image file to an RGB uint8 array of shape [H, W, 3]."""
+    img = pillow(Image.open, path)
+    if img.mode == "I":
+        img = img.point(lambda i: i * (1 / 255))
+    return np.array(img.convert("RGB"))
+
 def hasher():
     hashfuncs = {
         "md5": hashlib.md5,
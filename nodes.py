@@ -13,6 +13,7 @@ import math
 import time
 import random
 import logging
+import asyncio
 
 from PIL import Image, ImageOps, ImageSequence
 from PIL.PngImagePlugin import PngInfo
@@ -34,6 +35,7 @@ from comfy_api.version_list import supported_versions
 from comfy_api.latest import io, ComfyExtension
 
 import comfy.clip_vision
+from app.node_manifest import NodeManifest, LazyNodeMappings, ImportProfiler
 
 import comfy.model_management
 from comfy.cli_args import args
@@ -2097,6 +2099,10 @@ NODE_CLASS_MAPPINGS = {
     "LoraLoaderModelOnly": LoraLoaderModelOnly,
 }
 
+if args.lazy_node_loading != "off":
+    # Holds placeholders for the nodes of modules that were not imported yet, see load_lazy_nodes
+    NODE_CLASS_MAPPINGS = LazyNodeMappings(NODE_CLASS_MAPPINGS)
+
 NODE_DISPLAY_NAME_MAPPINGS = {
     # Sampling
     "KSampler": "KSampler",
@@ -2170,6 +2176,18 @@ EXTENSION_WEB_DIRS = {}
 # Dictionary of successfully loaded module names and associated directories.
 LOADED_MODULE_DIRS = {}
 
+# Per module import timings, reported with --profile-node-imports.
+NODE_IMPORT_PROFILER = ImportProfiler()
+
+# Manifest of the node modules when lazy node loading is enabled, it also caches their /object_info output.
+NODE_MANIFEST: NodeManifest | None = None
+
+
+async def load_lazy_nodes(node_ids=None) -> None:
+    """Import the modules of lazily registered nodes among node_ids (all of them if None). Nothing to do when lazy loading is off."""
+    if isinstance(NODE_CLASS_MAPPINGS, LazyNodeMappings):
+        await NODE_CLASS_MAPPINGS.load(node_ids)
+
 
 def get_module_name(module_path: str) -> str:
     """
@@ -2193,8 +2211,10 @@ def get_module_name(module_path: str) -> str:
     return base_path
 
 
-async def load_custom_node(module_path: str, ignore=set(), module_parent="custom_nodes") -> bool:
+async def load_custom_node(module_path: str, ignore=set(), module_parent="custom_nodes", manifest: NodeManifest | None = None) -> bool:
     module_name = get_module_name(module_path)
+    registered_nodes = {}
+    web_dirs = {}
     if os.path.isfile(module_path):
         sp = os.path.splitext(module_path)
         module_name = sp[0]
@@ -2231,6 +2251,7 @@ async def load_custom_node(module_path: str, ignore=set(), module_parent="custom
                     project_name = project_config.project.name
 
                     EXTENSION_WEB_DIRS[project_name] = web_dir_path
+                    web_dirs[project_name] = web_dir_path
 
                     logging.info("Automatically register web folder {} for {}".format(web_dir_name, project_name))
         except Exception as e:
@@ -2240,6 +2261,7 @@ async def load_custom_node(module_path: str, ignore=set(), module_parent="custom
             web_dir = os.path.abspath(os.path.join(module_dir, getattr(module, "WEB_DIRECTORY")))
             if os.path.isdir(web_dir):
                 EXTENSION_WEB_DIRS[module_name] = web_dir
+                web_dirs[module_name] = web_dir
 
         # V1 node definition
         if hasattr(module, "NODE_CLASS_MAPPINGS") and getattr(module, "NODE_CLASS_MAPPINGS") is not None:
@@ -2247,8 +2269,14 @@ async def load_custom_node(module_path: str, ignore=set(), module_parent="custom
                 if name not in ignore:
                     NODE_CLASS_MAPPINGS[name] = node_cls
                     node_cls.RELATIVE_PYTHON_MODULE = "{}.{}".format(module_parent, get_module_name(module_path))
+                    registered_nodes[name] = {"class_name": getattr(node_cls, "__name__", name)}
             if hasattr(module, "NODE_DISPLAY_NAME_MAPPINGS") and getattr(module, "NODE_DISPLAY_NAME_MAPPINGS") is not None:
                 NODE_DISPLAY_NAME_MAPPINGS.update(module.NODE_DISPLAY_NAME_MAPPINGS)
+                for name, display_name in module.NODE_DISPLAY_NAME_MAPPINGS.items():
+                    if name in registered_nodes:
+                        registered_nodes[name]["display_name"] = display_name
+            if manifest is not None:
+                manifest.record(module_path, os.path.abspath(module_dir), registered_nodes, web_dirs)
             return True
         # V3 Extension Definition
         elif hasattr(module, "comfy_entrypoint"):
@@ -2274,8 +2302,13 @@ async def load_custom_node(module_path: str, ignore=set(), module_parent="custom
                     if schema.node_id not in ignore:
                         NODE_CLASS_MAPPINGS[schema.node_id] = node_cls
                         node_cls.RELATIVE_PYTHON_MODULE = "{}.{}".format(module_parent, get_module_name(module_path))
+                        registered_nodes[schema.node_id] = {"class_name": node_cls.__name__}
                     if schema.display_name is not None:
                         NODE_DISPLAY_NAME_MAPPINGS[schema.node_id] = schema.display_name
+                        if schema.node_id in registered_nodes:
+                            registered_nodes[schema.node_id]["display_name"] = schema.display_name
+                if manifest is not None:
+                    manifest.record(module_path, os.path.abspath(module_dir), registered_nodes, web_dirs)
                 return True
             except Exception as e:
                 logging.warning(f"Error while calling comfy_entrypoint in {module_path}: {e}")
@@ -2288,7 +2321,47 @@ async def load_custom_node(module_path: str, ignore=set(), module_parent="custom
         logging.warning(f"Cannot import {module_path} module for custom nodes: {e}")
         return False
 
-async def init_external_custom_nodes():
+def _lazy_loading_enabled(module_parent: str) -> bool:
+    if args.lazy_node_loading == "all":
+        return True
+    return args.lazy_node_loading == "builtin" and module_parent in ("comfy_extras", "comfy_api_nodes")
+
+
+def _register_lazy_module(module_path: str, entry: dict, ignore: set, module_parent: str, manifest: NodeManifest) -> bool:
+    """Register the nodes a manifest entry lists as placeholders that import the module on first use."""
+    async def loader():
+        with NODE_IMPORT_PROFILER.measure(module_path, module_parent, lazy=True) as record:
+            record["success"] = await load_custom_node(module_path, ignore, module_parent=module_parent, manifest=manifest)
+        return record["success"]
+
+    for name, node in entry["nodes"].items():
+        if name in ignore:
+            continue
+        NODE_CLASS_MAPPINGS.set_lazy(name, module_path, loader)
+        if "display_name" in node:
+            NODE_DISPLAY_NAME_MAPPINGS[name] = node["display_name"]
+    EXTENSION_WEB_DIRS.update(entry["web_dirs"])
+    LOADED_MODULE_DIRS[get_module_name(module_path)] = entry["module_dir"]
+    return True
+
+
+async def load_node_module(module_path: str, ignore=set(), module_parent="custom_nodes", manifest: NodeManifest | None = None) -> bool:
+    """
+    Load a node module, or only register its nodes from the manifest when lazy loading applies to it.
+
+    Modules without a fresh manifest entry are imported right away and recorded for the next start.
+    """
+    if manifest is not None and _lazy_loading_enabled(module_parent):
+        entry = manifest.get(module_path)
+        if entry is not None:
+            return _register_lazy_module(module_path, entry, ignore, module_parent, manifest)
+
+    with NODE_IMPORT_PROFILER.measure(module_path, module_parent) as record:
+        record["success"] = await load_custom_node(module_path, ignore, module_parent=module_parent, manifest=manifest)
+    return record["success"]
+
+
+async def init_external_custom_nodes(manifest: NodeManifest | None = None):
     """
     Initializes the external custom nodes.
 
@@ -2322,7 +2395,7 @@ async def init_external_custom_nodes():
                     continue
 
             time_before = time.perf_counter()
-            success = await load_custom_node(module_path, base_node_names, module_parent="custom_nodes")
+            success = await load_node_module(module_path, base_node_names, module_parent="custom_nodes", manifest=manifest)
             node_import_times.append((time.perf_counter() - time_before, module_path, success))
 
     if len(node_import_times) > 0:
@@ -2335,7 +2408,7 @@ async def init_external_custom_nodes():
             logging.info("{:6.1f} seconds{}: {}".format(n[0], import_message, n[1]))
         logging.info("")
 
-async def init_builtin_extra_nodes():
+async def init_builtin_extra_nodes(manifest: NodeManifest | None = None):
     """
     Initializes the built-in extra nodes in ComfyUI.
 
@@ -2438,19 +2511,19 @@ async def init_builtin_extra_nodes():
 
     import_failed = []
     for node_file in extras_files:
-        if not await load_custom_node(os.path.join(extras_dir, node_file), module_parent="comfy_extras"):
+        if not await load_node_module(os.path.join(extras_dir, node_file), module_parent="comfy_extras", manifest=manifest):
             import_failed.append(node_file)
 
     return import_failed
 
 
-async def init_builtin_api_nodes():
+async def init_builtin_api_nodes(manifest: NodeManifest | None = None):
     api_nodes_dir = os.path.join(os.path.dirname(os.path.realpath(__file__)), "comfy_api_nodes")
     api_nodes_files = sorted(glob.glob(os.path.join(api_nodes_dir, "nodes_*.py")))
 
     import_failed = []
     for node_file in api_nodes_files:
-        if not await load_custom_node(node_file, module_parent="comfy_api_nodes"):
+        if not await load_node_module(node_file, module_parent="comfy_api_nodes", manifest=manifest):
             import_failed.append(os.path.basename(node_file))
 
     return import_failed
@@ -2466,17 +2539,28 @@ async def init_public_apis():
 async def init_extra_nodes(init_custom_nodes=True, init_api_nodes=True):
     await init_public_apis()
 
-    import_failed = await init_builtin_extra_nodes()
+    global NODE_MANIFEST
+    manifest = None
+    if isinstance(NODE_CLASS_MAPPINGS, LazyNodeMappings):
+        NODE_CLASS_MAPPINGS.loop = asyncio.get_running_loop()  # lazy node modules are imported on this loop
+        manifest = NODE_MANIFEST = NodeManifest().load()
+
+    import_failed = await init_builtin_extra_nodes(manifest)
 
     import_failed_api = []
     if init_api_nodes:
-        import_failed_api = await init_builtin_api_nodes()
+        import_failed_api = await init_builtin_api_nodes(manifest)
 
     if init_custom_nodes:
-        await init_external_custom_nodes()
+        await init_external_custom_nodes(manifest)
     else:
         logging.info("Skipping loading of custom nodes")
 
+    if manifest is not None:
+        manifest.save()
+    if args.profile_node_imports:
+        NODE_IMPORT_PROFILER.report()
+
     if len(import_failed_api) > 0:
         logging.warning("WARNING: some comfy_api_nodes/ nodes did not import correctly. This may be because they are missing some dependencies.\n")
         for node in import_failed_api:
@@ -1,5 +1,6 @@
 import os
 import sys
+import shutil
 import asyncio
 import traceback
 import time
@@ -33,11 +34,13 @@ import node_helpers
 from comfyui_version import __version__
 from app.frontend_management import FrontendManager, parse_version
 from comfy_api.internal import _ComfyNodeInternal
-from app.assets.scanner import seed_assets
+from app.assets.scanner import start_background_seed
 from app.assets.api.routes import register_assets_system
+import app.assets.manager as assets_manager
 
 from app.user_manager import UserManager
 from app.model_manager import ModelFileManager
+from app.node_manifest import LazyNodeMappings
 from app.custom_node_manager import CustomNodeManager
 from app.subgraph_manager import SubgraphManager
 from typing import Optional, Union
@@ -421,8 +424,89 @@ class PromptServer():
             else:
                 return web.Response(status=400)
 
+        async def dedupe_image_upload(request):
+            """
+            Stream the upload to a temp file while hashing it. If the upload folder already holds a file with the same
+            content, that file is returned instead of writing another copy.
+            """
+            from blake3 import blake3
+            import app.assets.hashing as hashing
+
+            fields = {}
+            filename = None
+            tmp_path = None
+            size = 0
+            hasher = blake3()
+            reader = await request.multipart()
+            try:
+                while True:
+                    field = await reader.next()
+                    if field is None:
+                        break
+                    if field.name == "image" and tmp_path is None:
+                        filename = field.filename
+                        tmp_dir = os.path.join(folder_paths.get_temp_directory(), "uploads")
+                        os.makedirs(tmp_dir, exist_ok=True)
+                        tmp_path = os.path.join(tmp_dir, f"{uuid.uuid4().hex}.part")
+                        with open(tmp_path, "wb") as f:
+                            while True:
+                                chunk = await field.read_chunk(1024 * 1024)
+                                if not chunk:
+                                    break
+                                hasher.update(chunk)
+                                f.write(chunk)
+                                size += len(chunk)
+                    elif field.name in ("type", "subfolder", "overwrite"):
+                        fields[field.name] = await field.text()
+
+                if tmp_path is None or not filename:
+                    return web.Response(status=400)
+
+                upload_dir, image_upload_type = get_dir_by_type(fields.get("type"))
+                subfolder = fields.get("subfolder", "")
+                full_output_folder = os.path.join(upload_dir, os.path.normpath(subfolder))
+                filepath = os.path.abspath(os.path.join(full_output_folder, filename))
+                if os.path.commonpath((upload_dir, filepath)) != upload_dir:
+                    return web.Response(status=400)
+
+                asset_hash = "blake3:" + hasher.hexdigest()
+                overwrite = fields.get("overwrite") in ("true", "1")
+                if not overwrite and size > 0:
+                    existing = assets_manager.find_file_by_hash(asset_hash=asset_hash, base_dir=upload_dir)
+                    if existing is not None:
+                        subfolder, filename = os.path.split(os.path.relpath(existing, upload_dir))
+                        return web.json_response({"name": filename, "subfolder": subfolder.replace(os.sep, "/"), "type": image_upload_type})
+
+                os.makedirs(full_output_folder, exist_ok=True)
+                if not overwrite:
+                    split = os.path.splitext(filename)
+                    i = 1
+                    while os.path.exists(filepath):
+                        # Files that were never indexed are only hashed if their size matches
+                        if os.path.getsize(filepath) == size and "blake3:" + await hashing.blake3_hash_on_demand(filepath) == asset_hash:
+                            break
+                        filename = f"{split[0]} ({i}){split[1]}"
+                        filepath = os.path.join(full_output_folder, filename)
+                        i += 1
+
+                if overwrite or not os.path.exists(filepath):
+                    try:
+                        os.replace(tmp_path, filepath)
+                    except OSError:
+                        # The temp directory can be on another drive
+                        shutil.copyfile(tmp_path, filepath)
+                if size > 0:
+                    assets_manager.register_file_hash(abs_path=filepath, asset_hash=asset_hash)
+                return web.json_response({"name": filename, "subfolder": subfolder, "type": image_upload_type})
+            finally:
+                if tmp_path is not None and os.path.exists(tmp_path):
+                    os.remove(tmp_path)
+
         @routes.post("/upload/image")
         async def upload_image(request):
+            # ?dedupe=true returns an existing file with the same content instead of storing another copy
+            if request.query.get("dedupe") in ("true", "1") and assets_manager.upload_dedupe_available():
+                return await dedupe_image_upload(request)
             post = await request.post()
             return image_upload(post)
 
@@ -692,25 +776,58 @@ class PromptServer():
         @routes.get("/object_info")
         async def get_object_info(request):
             try:
-                seed_assets(["models"])
+                start_background_seed(["models"])
             except Exception as e:
                 logging.error(f"Failed to seed assets: {e}")
+            # Lazily registered nodes are served from the manifest cache, only the modules without one are imported
+            manifest = nodes.NODE_MANIFEST
+            mappings = nodes.NODE_CLASS_MAPPINGS
+            cached = {}
+            lazy_modules = {}
+            if manifest is not None and isinstance(mappings, LazyNodeMappings):
+                for x in list(mappings):
+                    module_path = mappings.lazy_module(x)
+                    if module_path is None:
+                        continue
+                    info = manifest.get_object_info(module_path, x)
+                    if info is not None:
+                        cached[x] = info
+                    else:
+                        lazy_modules[x] = module_path
+            await nodes.load_lazy_nodes([x for x in mappings if x not in cached])
             with folder_paths.cache_helper:
                 out = {}
-                for x in nodes.NODE_CLASS_MAPPINGS:
+                for x in list(mappings):
+                    if x in cached:
+                        out[x] = cached[x]
+                        continue
                     try:
+                        reads = folder_paths.cache_helper.reads
                         out[x] = node_info(x)
+                        # Inputs listing files or folders change without the module changing, those are not cached
+                        if x in lazy_modules and folder_paths.cache_helper.reads == reads:
+                            manifest.record_object_info(lazy_modules[x], x, out[x])
                     except Exception:
                         logging.error(f"[ERROR] An error occurred while retrieving information for the '{x}' node.")
                         logging.error(traceback.format_exc())
-                return web.json_response(out)
+            if manifest is not None:
+                manifest.save()
+            return web.json_response(out)
 
         @routes.get("/object_info/{node_class}")
         async def get_object_info_node(request):
             node_class = request.match_info.get("node_class", None)
             out = {}
             if (node_class is not None) and (node_class in nodes.NODE_CLASS_MAPPINGS):
-                out[node_class] = node_info(node_class)
+                mappings = nodes.NODE_CLASS_MAPPINGS
+                module_path = mappings.lazy_module(node_class) if isinstance(mappings, LazyNodeMappings) else None
+                if module_path is not None and nodes.NODE_MANIFEST is not None:
+                    info = nodes.NODE_MANIFEST.get_object_info(module_path, node_class)
+                    if info is not None:
+                        return web.json_response({node_class: info})
+                await nodes.load_lazy_nodes([node_class])
+                if node_class in nodes.NODE_CLASS_MAPPINGS:
+                    out[node_class] = node_info(node_class)
             return web.json_response(out)
 
         @routes.get("/api/jobs")
@@ -0,0 +1,68 @@
+"""Tests for the connection setup and write queue in app/database/db.py"""
+
+import threading
+
+import pytest
+from sqlalchemy import event, text
+from sqlalchemy.exc import IntegrityError, OperationalError
+from sqlalchemy.orm import sessionmaker
+
+from app.database.db import WriteQueue, _create_engine
+
+
+@pytest.fixture
+def db_url(tmp_path):
+    url = f"sqlite:///{tmp_path / 'test.db'}"
+    with _create_engine(url).begin() as conn:
+        conn.execute(text("CREATE TABLE items (id INTEGER PRIMARY KEY, value TEXT UNIQUE)"))
+    return url
+
+
+def _insert(session, value):
+    session.execute(text("INSERT INTO items (value) VALUES (:v)"), {"v": value})
+    return value
+
+
+def test_connections_use_wal_and_read_only_pool(db_url):
+    with _create_engine(db_url).connect() as conn:
+        assert conn.exec_driver_sql("PRAGMA journal_mode").scalar() == "wal"
+        assert conn.exec_driver_sql("PRAGMA synchronous").scalar() == 1
+
+    with sessionmaker(bind=_create_engine(db_url, read_only=True))() as session:
+        assert session.execute(text("SELECT count(*) FROM items")).scalar() == 0
+        with pytest.raises(OperationalError):
+            _insert(session, "x")
+
+
+def test_write_queue_coalesces_commits(db_url):
+    Session = sessionmaker(bind=_create_engine(db_url))
+    commits = []
+    event.listen(Session, "after_commit", lambda session: commits.append(1))
+    queue = WriteQueue(Session)
+
+    # Hold the writer so the following writes pile up and are committed together
+    gate = threading.Event()
+    blocker = queue.submit(lambda session: gate.wait())
+    futures = [queue.submit(_insert, f"v{i}") for i in range(50)]
+    gate.set()
+
+    assert blocker.result(10)
+    assert [f.result(10) for f in futures] == [f"v{i}" for i in range(50)]
+    queue.stop()
+    assert len(commits) <= 3
+    with Session() as session:
+        assert session.execute(text("SELECT count(*) FROM items")).scalar() == 50
+
+
+def test_write_queue_failure_only_fails_its_own_write(db_url):
+    Session = sessionmaker(bind=_create_engine(db_url))
+    queue = WriteQueue(Session, max_delay=0.5)
+    first = queue.submit(_insert, "a")
+    duplicate = queue.submit(_insert, "a")
+    last = queue.submit(_insert, "b")
+
+    assert first.result(10) == "a"
+    assert last.result(10) == "b"
+    with pytest.raises(IntegrityError):
+        duplicate.result(10)
+    queue.stop()
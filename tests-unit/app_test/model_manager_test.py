@@ -1,11 +1,13 @@
 import pytest
 import base64
+import os
 import json
 import struct
 from io import BytesIO
 from PIL import Image
 from aiohttp import web
 from unittest.mock import patch
+from app import model_manager as model_manager_module
 from app.model_manager import ModelFileManager
 
 pytestmark = (
@@ -13,8 +15,10 @@ pytestmark = (
 )  # This applies the asyncio mark to all test functions in the module
 
 @pytest.fixture
-def model_manager():
-    return ModelFileManager()
+def model_manager(tmp_path):
+    manager = ModelFileManager()
+    manager.preview_cache_dir = str(tmp_path / "preview_cache")
+    return manager
 
 @pytest.fixture
 def app(model_manager):
@@ -60,3 +64,80 @@ async def test_get_model_preview_safetensors(aiohttp_client, app, tmp_path):
 
         # Clean up
         img.close()
+
+
+async def test_get_model_preview_thumbnail_cached(aiohttp_client, app, model_manager, tmp_path):
+    models_dir = tmp_path / "models"
+    models_dir.mkdir()
+    (models_dir / "model.safetensors").write_bytes(b"\0" * 16)
+    Image.new('RGB', (800, 400), 'red').save(models_dir / "model.preview.png")
+
+    with patch('folder_paths.folder_names_and_paths', {
+        'test_folder': ([str(models_dir)], None)
+    }):
+        client = await aiohttp_client(app)
+        response = await client.get('/experiment/models/preview/test_folder/0/model.safetensors?size=100')
+        assert response.status == 200
+        assert response.headers['Cache-Control']
+        etag = response.headers['ETag']
+        with Image.open(BytesIO(await response.read())) as img:
+            assert img.size == (128, 64)
+
+        # The encoded thumbnail is on disk, revalidation is answered without a body
+        assert any(p.suffix == '.webp' for p in (tmp_path / "preview_cache").rglob('*'))
+        response = await client.get('/experiment/models/preview/test_folder/0/model.safetensors?size=100', headers={'If-None-Match': etag})
+        assert response.status == 304
+
+        response = await client.get('/experiment/models/preview/test_folder/0/model.safetensors')
+        with Image.open(BytesIO(await response.read())) as img:
+            assert img.size == (800, 400)
+        assert response.headers['ETag'] != etag
+
+
+async def test_get_model_preview_follows_replaced_sidecar(aiohttp_client, app, tmp_path):
+    (tmp_path / "model.safetensors").write_bytes(b"\0" * 16)
+    sidecar = tmp_path / "model.preview.png"
+    Image.new('RGB', (40, 20), 'red').save(sidecar)
+
+    with patch('folder_paths.folder_names_and_paths', {
+        'test_folder': ([str(tmp_path)], None)
+    }):
+        client = await aiohttp_client(app)
+        response = await client.get('/experiment/models/preview/test_folder/0/model.safetensors')
+        with Image.open(BytesIO(await response.read())) as img:
+            assert img.size == (40, 20)
+
+        # Overwriting the sidecar in place leaves the directory mtime alone
+        Image.new('RGB', (30, 30), 'blue').save(sidecar)
+        stat = sidecar.stat()
+        os.utime(sidecar, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+        response = await client.get('/experiment/models/preview/test_folder/0/model.safetensors')
+        with Image.open(BytesIO(await response.read())) as img:
+            assert img.size == (30, 30)
+
+
+async def test_preview_disk_cache_is_bounded(model_manager, tmp_path, monkeypatch):
+    monkeypatch.setattr(model_manager_module, "PREVIEW_DISK_CACHE_PRUNE_INTERVAL", 1)
+    for i in range(4):
+        (tmp_path / f"model{i}.safetensors").write_bytes(b"\0" * 16)
+        Image.effect_noise((64, 64), 64).convert('RGB').save(tmp_path / f"model{i}.preview.png")
+    first = model_manager.render_model_preview(str(tmp_path / "model0.safetensors"))
+    monkeypatch.setattr(model_manager_module, "PREVIEW_DISK_CACHE_MAX_BYTES", len(first[0]) * 2)
+    for i in range(1, 4):
+        model_manager.render_model_preview(str(tmp_path / f"model{i}.safetensors"))
+
+    cached = list((tmp_path / "preview_cache").rglob('*.webp'))
+    assert 1 <= len(cached) <= 2
+    assert sum(p.stat().st_size for p in cached) <= len(first[0]) * 2
+
+
+async def test_get_model_preview_missing(aiohttp_client, app, tmp_path):
+    (tmp_path / "model.safetensors").write_bytes(b"\0" * 16)
+    with patch('folder_paths.folder_names_and_paths', {
+        'test_folder': ([str(tmp_path)], None)
+    }):
+        client = await aiohttp_client(app)
+        response = await client.get('/experiment/models/preview/test_folder/0/model.safetensors')
+        assert response.status == 404
+        response = await client.get('/experiment/models/preview/test_folder/0/model.safetensors?size=abc')
+        assert response.status == 400
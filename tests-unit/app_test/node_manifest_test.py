@@ -0,0 +1,153 @@
+"""Tests for the lazy node manifest in app/node_manifest.py"""
+
+import asyncio
+import os
+import threading
+
+import pytest
+
+from app.node_manifest import NodeManifest, LazyNodeMappings
+
+
+@pytest.fixture
+def node_module(tmp_path):
+    path = tmp_path / "nodes_example.py"
+    path.write_text("NODE_CLASS_MAPPINGS = {}\n")
+    return str(path)
+
+
+def test_manifest_roundtrip(tmp_path, node_module):
+    manifest_path = str(tmp_path / "cache" / "node_manifest.json")
+    manifest = NodeManifest(manifest_path)
+    manifest.record(node_module, str(tmp_path), {"Example": {"class_name": "Example", "display_name": "An Example"}}, {})
+    manifest.save()
+
+    loaded = NodeManifest(manifest_path).load()
+    entry = loaded.get(node_module)
+    assert entry["nodes"]["Example"]["display_name"] == "An Example"
+    assert entry["module_dir"] == str(tmp_path)
+
+
+def test_manifest_entry_invalidated_on_change(tmp_path, node_module):
+    manifest = NodeManifest(str(tmp_path / "node_manifest.json"))
+    manifest.record(node_module, str(tmp_path), {"Example": {"class_name": "Example"}}, {})
+    manifest.dirty = False
+
+    st = os.stat(node_module)
+    os.utime(node_module, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000_000))
+    assert manifest.get(node_module) is None
+    assert manifest.dirty
+
+
+def test_manifest_package_fingerprint_ignores_pycache(tmp_path):
+    package = tmp_path / "my_nodes"
+    (package / "__pycache__").mkdir(parents=True)
+    (package / "__init__.py").write_text("NODE_CLASS_MAPPINGS = {}\n")
+    manifest = NodeManifest(str(tmp_path / "node_manifest.json"))
+    manifest.record(str(package), str(package), {}, {})
+
+    (package / "__pycache__" / "x.cpython-311.pyc").write_bytes(b"\0")
+    assert manifest.get(str(package)) is not None
+    (package / "helpers.py").write_text("X = 1\n")
+    assert manifest.get(str(package)) is None
+
+
+def test_manifest_object_info_cache(tmp_path, node_module):
+    other = tmp_path / "nodes_other.py"
+    other.write_text("NODE_CLASS_MAPPINGS = {}\n")
+    manifest_path = str(tmp_path / "node_manifest.json")
+    manifest = NodeManifest(manifest_path)
+    manifest.record(node_module, str(tmp_path), {"Example": {"class_name": "Example"}}, {})
+    manifest.record(str(other), str(tmp_path), {}, {})
+    manifest.record_object_info(node_module, "Example", {"name": "Example", "input": {"required": {}}})
+    manifest.save()
+
+    loaded = NodeManifest(manifest_path).load()
+    assert loaded.get(node_module) is not None
+    assert loaded.get_object_info(node_module, "Example")["name"] == "Example"
+    # Importing an unchanged module again keeps its cached object info
+    loaded.record(node_module, str(tmp_path), {"Example": {"class_name": "Example"}}, {})
+    assert loaded.get_object_info(node_module, "Example") is not None
+
+    # Any changed module can affect the inputs of other nodes, so every cached object info is dropped
+    st = os.stat(other)
+    os.utime(other, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000_000))
+    assert loaded.get(str(other)) is None
+    assert loaded.get_object_info(node_module, "Example") is None
+
+
+def test_lazy_mapping_imports_on_first_lookup():
+    mappings = LazyNodeMappings({"Eager": int})
+    calls = []
+
+    def loader():
+        calls.append(1)
+        mappings["A"] = str
+        mappings["B"] = bytes
+        return True
+
+    for name in ("A", "B", "Gone"):
+        mappings.set_lazy(name, "/nodes/example.py", loader)
+
+    assert "A" in mappings and not mappings.is_loaded("A")
+    assert mappings.lazy_module("A") == "/nodes/example.py" and mappings.lazy_module("Eager") is None
+    assert len(calls) == 0
+    assert mappings["A"] is str
+    assert mappings.get("B") is bytes
+    # Nodes the module no longer defines disappear instead of raising on every lookup
+    assert "Gone" not in mappings
+    assert len(calls) == 1
+
+
+def test_lazy_mapping_failed_import_behaves_like_missing_node():
+    mappings = LazyNodeMappings()
+    mappings.set_lazy("Broken", "/nodes/broken.py", lambda: False)
+
+    assert mappings.get("Broken") is None
+    with pytest.raises(KeyError):
+        mappings["Broken"]
+    assert dict(mappings.items()) == {}
+
+
+def test_lazy_mapping_copies_hold_real_classes():
+    mappings = LazyNodeMappings({"Eager": int})
+
+    def loader():
+        mappings["A"] = str
+        return True
+
+    mappings.set_lazy("A", "/nodes/example.py", loader)
+    assert {**mappings} == {"Eager": int, "A": str}
+    mappings.set_lazy("A", "/nodes/example.py", loader)
+    assert dict(mappings) == {"Eager": int, "A": str}
+    mappings.set_lazy("B", "/nodes/other.py", lambda: False)
+    assert mappings.copy() == {"Eager": int, "A": str}
+
+
+def test_lazy_mapping_async_loader_runs_on_owner_loop():
+    mappings = LazyNodeMappings()
+    threads = []
+
+    async def loader():
+        await asyncio.sleep(0)
+        threads.append(threading.current_thread())
+        mappings["A"] = str
+        return True
+
+    mappings.set_lazy("A", "/nodes/example.py", loader)
+    mappings.set_lazy("B", "/nodes/example_b.py", loader)
+    loop = asyncio.new_event_loop()
+    thread = threading.Thread(target=loop.run_forever, daemon=True)
+    thread.start()
+    try:
+        mappings.loop = loop
+        # A lookup from another thread waits for the import on the loop instead of starting its own loop
+        assert mappings["A"] is str
+        assert threads == [thread]
+        # On the loop itself the import is awaited before the lookup
+        asyncio.run_coroutine_threadsafe(mappings.load(["B"]), loop).result()
+        assert "B" not in mappings and threads == [thread, thread]
+    finally:
+        loop.call_soon_threadsafe(loop.stop)
+        thread.join()
+        loop.close()
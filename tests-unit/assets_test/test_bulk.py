@@ -0,0 +1,90 @@
+import uuid
+from pathlib import Path
+
+import requests
+from conftest import get_asset_filename
+
+
+def test_bulk_tags_metadata_and_preview(http: requests.Session, api_base: str, asset_factory, make_asset_bytes):
+    scope = f"bulk-{uuid.uuid4().hex[:6]}"
+    created = [
+        asset_factory(f"bulk_{i}.bin", ["input", "unit-tests", scope, "old"], {"keep": False}, make_asset_bytes(f"bulk_{i}", 1024 + i))
+        for i in range(3)
+    ]
+    ids = [a["id"] for a in created]
+    missing = str(uuid.uuid4())
+
+    r = http.post(
+        api_base + "/api/assets/bulk",
+        json={
+            "ids": ids + [missing],
+            "add_tags": ["New", "bulk-added"],
+            "remove_tags": ["old"],
+            "user_metadata": {"batch": 7},
+            "preview_id": None,
+        },
+        timeout=120,
+    )
+    body = r.json()
+    assert r.status_code == 200, body
+    assert body["updated"] == ids
+    assert body["not_found"] == [missing]
+
+    for aid in ids:
+        detail = http.get(f"{api_base}/api/assets/{aid}", timeout=120).json()
+        assert {"new", "bulk-added", scope}.issubset(detail["tags"])
+        assert "old" not in detail["tags"]
+        assert detail["user_metadata"]["batch"] == 7
+        assert "keep" not in detail["user_metadata"]
+
+    # Metadata projection is rebuilt, so filters see the new values
+    r = http.get(
+        api_base + "/api/assets",
+        params={"include_tags": f"unit-tests,{scope}", "metadata_filter": '{"batch": 7}'},
+        timeout=120,
+    )
+    assert sorted(a["id"] for a in r.json()["assets"]) == sorted(ids)
+
+    # Adding the same tags again is a no-op
+    r = http.post(api_base + "/api/assets/bulk", json={"ids": ids, "add_tags": ["new"]}, timeout=120)
+    assert r.status_code == 200
+
+
+def test_bulk_rejects_invalid_body(http: requests.Session, api_base: str):
+    r = http.post(api_base + "/api/assets/bulk", json={"ids": [str(uuid.uuid4())]}, timeout=120)
+    assert r.status_code == 400
+    r = http.post(api_base + "/api/assets/bulk", json={"ids": ["nope"], "add_tags": ["x"]}, timeout=120)
+    assert r.status_code == 400
+    r = http.post(
+        api_base + "/api/assets/bulk",
+        json={"ids": [str(uuid.uuid4())], "add_tags": ["x"], "remove_tags": ["X"]},
+        timeout=120,
+    )
+    assert r.status_code == 400
+
+
+def test_bulk_delete_removes_orphan_content(
+    http: requests.Session, api_base: str, comfy_tmp_base_dir: Path, asset_factory, make_asset_bytes
+):
+    scope = f"bulk-del-{uuid.uuid4().hex[:6]}"
+    data = make_asset_bytes(scope, 2048)
+    first = asset_factory("bulk_del_a.bin", ["input", "unit-tests", scope], {}, data)
+    second = asset_factory("bulk_del_b.bin", ["input", "unit-tests", scope], {}, data)
+    assert first["asset_hash"] == second["asset_hash"]
+    path = comfy_tmp_base_dir / "input" / "unit-tests" / scope / get_asset_filename(first["asset_hash"], ".bin")
+    assert path.exists()
+
+    r = http.post(api_base + "/api/assets/bulk/delete", json={"ids": [first["id"]]}, timeout=120)
+    assert r.status_code == 200
+    assert r.json()["deleted"] == [first["id"]]
+    # Content is still referenced by the second asset
+    assert path.exists()
+    assert http.head(f"{api_base}/api/assets/hash/{first['asset_hash']}", timeout=120).status_code == 200
+
+    r = http.post(api_base + "/api/assets/bulk/delete", json={"ids": [first["id"], second["id"]]}, timeout=120)
+    body = r.json()
+    assert body["deleted"] == [second["id"]]
+    assert body["not_found"] == [first["id"]]
+    assert not path.exists()
+    assert http.head(f"{api_base}/api/assets/hash/{first['asset_hash']}", timeout=120).status_code == 404
+    assert http.get(f"{api_base}/api/assets/{second['id']}", timeout=120).status_code == 404
@@ -0,0 +1,76 @@
+import uuid
+from pathlib import Path
+
+import requests
+from conftest import trigger_sync_seed_assets
+
+
+def _find_seed(http: requests.Session, api_base: str, name: str) -> dict:
+    r = http.get(
+        api_base + "/api/assets",
+        params={"include_tags": "unit-tests,hashseed", "name_contains": name},
+        timeout=120,
+    )
+    assert r.status_code == 200
+    matches = [a for a in r.json().get("assets", []) if a.get("name") == name]
+    assert len(matches) == 1
+    return matches[0]
+
+
+def test_seed_asset_hashed_on_demand(
+    http: requests.Session,
+    api_base: str,
+    comfy_tmp_base_dir: Path,
+):
+    case_dir = comfy_tmp_base_dir / "input" / "unit-tests" / "hashseed"
+    case_dir.mkdir(parents=True, exist_ok=True)
+    name = f"seed_{uuid.uuid4().hex[:8]}.bin"
+    (case_dir / name).write_bytes(uuid.uuid4().bytes * 512)
+
+    trigger_sync_seed_assets(http, api_base)
+    seed = _find_seed(http, api_base, name)
+    assert seed.get("asset_hash") is None
+
+    r = http.post(f"{api_base}/api/assets/{seed['id']}/hash", timeout=120)
+    body = r.json()
+    assert r.status_code == 200, body
+    assert body["asset_hash"].startswith("blake3:")
+    assert http.head(f"{api_base}/api/assets/hash/{body['asset_hash']}", timeout=120).status_code == 200
+
+    # Hashing again is a no-op
+    r2 = http.post(f"{api_base}/api/assets/{seed['id']}/hash", timeout=120)
+    assert r2.status_code == 200
+    assert r2.json()["asset_hash"] == body["asset_hash"]
+
+
+def test_seed_asset_merged_into_existing_hash(
+    http: requests.Session,
+    api_base: str,
+    comfy_tmp_base_dir: Path,
+    asset_factory,
+):
+    data = uuid.uuid4().bytes * 256
+    uploaded = asset_factory("hash_merge_upload.bin", ["input", "unit-tests", "hashupload"], {}, data)
+
+    case_dir = comfy_tmp_base_dir / "input" / "unit-tests" / "hashseed"
+    case_dir.mkdir(parents=True, exist_ok=True)
+    name = f"copy_{uuid.uuid4().hex[:8]}.bin"
+    (case_dir / name).write_bytes(data)
+
+    trigger_sync_seed_assets(http, api_base)
+    seed = _find_seed(http, api_base, name)
+
+    r = http.post(f"{api_base}/api/assets/{seed['id']}/hash", timeout=120)
+    body = r.json()
+    assert r.status_code == 200, body
+    assert body["asset_hash"] == uploaded["asset_hash"]
+    assert body["id"] == seed["id"]
+
+
+def test_seed_status_reports_last_scan(http: requests.Session, api_base: str):
+    trigger_sync_seed_assets(http, api_base)
+    r = http.get(api_base + "/api/assets/seed/status", timeout=30)
+    assert r.status_code == 200
+    scan = r.json()["scan"]
+    assert scan["phase"] == "done"
+    assert scan["processed"] == scan["total"]
@@ -340,3 +340,36 @@ def test_list_assets_name_contains_literal_underscore(
     assert b["name"] not in names, "Underscore must be escaped — should not match 'fooxbar'"
     assert c["name"] not in names, "Underscore must be escaped — should not match 'foobar'"
     assert body["total"] == 1
+
+
+def test_list_assets_cursor_paging(http: requests.Session, api_base: str, asset_factory, make_asset_bytes):
+    names = [f"cur{i}_u.safetensors" for i in range(5)]
+    for n in names:
+        asset_factory(n, ["models", "checkpoints", "unit-tests", "cursor"], {}, make_asset_bytes(n, size=1024))
+
+    params = {"include_tags": "unit-tests,cursor", "sort": "name", "order": "asc", "limit": "2"}
+    got = []
+    cursor = None
+    for _ in range(5):
+        r = http.get(api_base + "/api/assets", params={**params, **({"cursor": cursor} if cursor else {})}, timeout=120)
+        body = r.json()
+        assert r.status_code == 200, body
+        got.extend(a["name"] for a in body["assets"])
+        cursor = body.get("next_cursor")
+        assert (cursor is not None) == body["has_more"]
+        if cursor is None:
+            break
+    assert got == sorted(names)
+
+    # A cursor only continues the ordering it was issued for
+    first = http.get(api_base + "/api/assets", params=params, timeout=120).json()
+    r = http.get(
+        api_base + "/api/assets",
+        params={**params, "order": "desc", "cursor": first["next_cursor"]},
+        timeout=120,
+    )
+    assert r.status_code == 400
+    assert r.json()["error"]["code"] == "INVALID_CURSOR"
+
+    r = http.get(api_base + "/api/assets", params={**params, "cursor": first["next_cursor"], "offset": "2"}, timeout=120)
+    assert r.status_code == 400
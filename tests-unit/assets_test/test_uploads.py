@@ -279,3 +279,38 @@ def test_duplicate_upload_same_display_name_does_not_clobber(
     b2 = r2.content
     assert r2.status_code == 200
     assert b2 == d2
+
+
+def test_upload_image_dedupe_returns_existing_file(http: requests.Session, api_base: str, comfy_tmp_base_dir):
+    data = uuid.uuid4().bytes * 64
+    subfolder = f"unit-tests/dedupe-{uuid.uuid4().hex[:6]}"
+
+    def upload(name: str, payload: bytes, **form):
+        r = http.post(
+            api_base + "/upload/image",
+            params={"dedupe": "true"},
+            files={"image": (name, payload, "image/png")},
+            data={"subfolder": subfolder, **form},
+            timeout=120,
+        )
+        assert r.status_code == 200, r.text
+        return r.json()
+
+    first = upload("ref.png", data)
+    assert first == {"name": "ref.png", "subfolder": subfolder, "type": "input"}
+
+    # Same content under another name is not stored again
+    assert upload("ref_copy.png", data) == first
+    upload_dir = comfy_tmp_base_dir / "input" / subfolder
+    assert sorted(p.name for p in upload_dir.iterdir()) == ["ref.png"]
+
+    # Different content with a taken name still gets a numbered name
+    other = upload("ref.png", b"other" + data)
+    assert other["name"] == "ref (1).png"
+    assert (upload_dir / "ref (1).png").read_bytes() == b"other" + data
+
+    # Overwrite always writes the requested name
+    assert upload("ref.png", b"new" + data, overwrite="true")["name"] == "ref.png"
+    assert (upload_dir / "ref.png").read_bytes() == b"new" + data
+    # The overwritten file no longer counts as a copy of the original content
+    assert upload("again.png", data)["name"] == "again.png"
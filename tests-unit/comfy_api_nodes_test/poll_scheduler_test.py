@@ -0,0 +1,90 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+import torch
+
+from comfy.cli_args import args
+if not torch.cuda.is_available():
+    args.cpu = True
+
+# Bind the top level utils package first, the client imports server after nodes.py put comfy/ on sys.path
+import utils.install_util  # noqa: E402, F401
+from comfy_api_nodes.util import client  # noqa: E402
+from comfy_api_nodes.util.client import ApiEndpoint, BatchPollEndpoint, poll_op_raw  # noqa: E402
+
+pytestmark = pytest.mark.asyncio
+
+
+def _node_cls():
+    return SimpleNamespace(hidden=SimpleNamespace(unique_id="1", auth_token_comfy_org=None, api_key_comfy_org="key"))
+
+
+@pytest.fixture
+def requests(monkeypatch):
+    """Records the status requests instead of sending them, responses come from `requests.respond`."""
+    calls = []
+    state = SimpleNamespace(calls=calls, respond=lambda endpoint, data: {"status": "processing"})
+
+    async def fake_poll_request(cls, endpoint, data, **kwargs):
+        calls.append((endpoint.path, data))
+        await asyncio.sleep(0)
+        return state.respond(endpoint, data), None
+
+    monkeypatch.setattr(client, "_poll_request", fake_poll_request)
+    monkeypatch.setattr(client, "_display_text", lambda *args, **kwargs: None)
+    return state
+
+
+def _batch_endpoint(**kwargs):
+    return BatchPollEndpoint(
+        endpoint=ApiEndpoint("/tasks/status"),
+        split_response=lambda resp: {t["id"]: t for t in resp["tasks"]},
+        gather_window=0.01,
+        **kwargs,
+    )
+
+
+async def test_batched_polls_share_one_request(requests):
+    requests.respond = lambda endpoint, data: {"tasks": [{"id": i, "status": "done"} for i in data["ids"].split(",")]}
+    scheduler = client._PollScheduler()
+    batch = _batch_endpoint()
+    results = await asyncio.gather(*(scheduler.poll_batched(_node_cls(), batch, f"t{i}", timeout=1.0, max_retries=0, retry_delay=0.0, retry_backoff=1.0) for i in range(3)))
+    assert [r[0]["id"] for r in results] == ["t0", "t1", "t2"]
+    assert requests.calls == [("/tasks/status", {"ids": "t0,t1,t2"})]
+    assert not scheduler._flush_tasks
+
+
+async def test_batched_flush_errors_reach_every_waiter(requests):
+    def fail(endpoint, data):
+        raise RuntimeError("batch endpoint down")
+
+    requests.respond = fail
+    scheduler = client._PollScheduler()
+    batch = _batch_endpoint(max_batch_size=2)
+    results = await asyncio.gather(*(scheduler.poll_batched(_node_cls(), batch, f"t{i}", timeout=1.0, max_retries=0, retry_delay=0.0, retry_backoff=1.0) for i in range(3)), return_exceptions=True)
+    assert all(isinstance(r, RuntimeError) for r in results)
+    assert len(requests.calls) == 2  # the third task went to a second batch
+    assert not scheduler._flush_tasks
+
+
+async def test_poll_falls_back_from_batch_and_times_out_after_max_attempts(requests, monkeypatch):
+    def respond(endpoint, data):
+        if endpoint.path == "/tasks/status":
+            return {"tasks": []}
+        return {"status": "processing"}
+
+    requests.respond = respond
+    monkeypatch.setattr(client, "_POLL_RESULT_TTL", 0.0)  # the polls are closer together than the reuse window
+    with pytest.raises(Exception, match="timed out after 3 non-queued attempts"):
+        await poll_op_raw(
+            _node_cls(),
+            ApiEndpoint("/tasks/t0"),
+            status_extractor=lambda resp: resp.get("status"),
+            poll_interval=0.01,
+            max_poll_attempts=3,
+            batch_endpoint=_batch_endpoint(),
+            task_id="t0",
+        )
+    assert requests.calls[0] == ("/tasks/status", {"ids": "t0"})
+    assert requests.calls[1:] == [("/tasks/t0", None)] * 3
@@ -0,0 +1,82 @@
+import json
+import os
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+import torch
+from PIL import Image, ImageSequence
+
+from comfy.cli_args import args
+if not torch.cuda.is_available():
+    args.cpu = True
+
+import folder_paths  # noqa: E402
+from comfy_api.latest._io import FolderType  # noqa: E402
+from comfy_api.latest._ui import ImageSaveHelper  # noqa: E402
+
+
+@pytest.fixture
+def output_dir(tmp_path):
+    previous = folder_paths.get_output_directory()
+    folder_paths.set_output_directory(str(tmp_path))
+    yield tmp_path
+    folder_paths.set_output_directory(previous)
+
+
+def _frames(count=5, height=24, width=40):
+    generator = torch.Generator().manual_seed(0)
+    return torch.rand([count, height, width, 3], generator=generator)
+
+
+def _expected(images):
+    return [np.clip(255.0 * image.numpy(), 0, 255).astype(np.uint8) for image in images]
+
+
+def _node_cls():
+    return SimpleNamespace(hidden=SimpleNamespace(prompt={"1": {"class_type": "Test"}}, extra_pnginfo={"workflow": {"nodes": []}}))
+
+
+def test_save_animated_png_frames_and_metadata(output_dir):
+    images = _frames()
+    result = ImageSaveHelper.save_animated_png(images, "anim", FolderType.output, _node_cls(), fps=10.0, compress_level=1)
+    path = os.path.join(output_dir, result.subfolder, result.filename)
+    with Image.open(path) as img:
+        assert img.n_frames == len(images)
+        for frame, expected in zip(ImageSequence.Iterator(img), _expected(images)):
+            assert frame.info["duration"] == 100
+            assert np.array_equal(np.asarray(frame.convert("RGB")), expected)
+    with open(path, "rb") as f:
+        data = f.read()
+    # The metadata goes in private comf chunks after the image data
+    assert data.index(b"comfprompt\0") > data.rindex(b"fdAT")
+    assert b"comfworkflow\0" in data
+
+
+@pytest.mark.parametrize("count", [1, 4])
+def test_save_animated_webp_frames_and_metadata(output_dir, count):
+    images = _frames(count)
+    result = ImageSaveHelper.save_animated_webp(images, "anim", FolderType.output, _node_cls(), fps=8.0, lossless=True, quality=80, method=0)
+    with Image.open(os.path.join(output_dir, result.subfolder, result.filename)) as img:
+        assert getattr(img, "n_frames", 1) == count
+        for frame, expected in zip(ImageSequence.Iterator(img), _expected(images)):
+            assert np.array_equal(np.asarray(frame.convert("RGB")), expected)
+            if count > 1:
+                assert frame.info["duration"] == 125
+        assert img.getexif()[0x0110] == "prompt:" + json.dumps({"1": {"class_type": "Test"}})
+
+
+def test_save_animated_webp_exif_chunk(output_dir, monkeypatch):
+    images = _frames(3)
+    result = ImageSaveHelper.save_animated_webp(images, "anim", FolderType.output, _node_cls(), fps=8.0, lossless=True, quality=80, method=0)
+    with open(os.path.join(output_dir, result.subfolder, result.filename), "rb") as f:
+        data = f.read()
+    exif = data.index(b"EXIF")
+    assert data[exif + 8:exif + 12] in (b"MM\x00*", b"II*\x00")
+
+    monkeypatch.setattr(args, "disable_metadata", True)
+    result = ImageSaveHelper.save_animated_webp(images, "anim", FolderType.output, _node_cls(), fps=8.0, lossless=True, quality=80, method=0)
+    with open(os.path.join(output_dir, result.subfolder, result.filename), "rb") as f:
+        data = f.read()
+    assert b"EXIF" not in data
+    assert data[20] & 0x08 == 0
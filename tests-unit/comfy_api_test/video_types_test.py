@@ -6,9 +6,10 @@ import av
 import io
 from fractions import Fraction
 from comfy_api.input_impl.video_types import VideoFromFile, VideoFromComponents
-from comfy_api.util.video_types import VideoComponents
+from comfy_api.util.video_types import VideoComponents, VideoContainer
 from comfy_api.input.basic_types import AudioInput
 from av.error import InvalidDataError
+from comfy_api.latest._input_impl.video_types import VideoEncoderThread, VideoFromFrameChunks
 
 EPSILON = 0.0001
 
@@ -131,6 +132,92 @@ def test_video_from_file_get_dimensions(simple_video_file):
     assert height == 4
 
 
+def test_video_from_file_get_components(simple_video_file):
+    """Full decode returns every frame as float images"""
+    components = VideoFromFile(simple_video_file).get_components()
+    assert components.images.shape == (3, 4, 4, 3)
+    assert components.images.dtype == torch.float32
+    assert components.frame_rate == Fraction(30)
+    # Frames are filled with increasing gray levels
+    means = components.images.mean(dim=(1, 2, 3))
+    assert means[0] < means[1] < means[2]
+
+
+def test_video_from_file_frame_selection():
+    """Start, end, stride, max frames and downscaling are applied while decoding"""
+    tmp = tempfile.NamedTemporaryFile(suffix=".mp4", delete=False)
+    file_path = tmp.name
+    with av.open(file_path, mode="w") as container:
+        stream = container.add_stream("h264", rate=30)
+        stream.width = 16
+        stream.height = 8
+        stream.pix_fmt = "yuv420p"
+        for i in range(10):
+            frame = av.VideoFrame.from_ndarray(torch.full((8, 16, 3), i * 25, dtype=torch.uint8).numpy(), format="rgb24")
+            container.mux(stream.encode(frame))
+        container.mux(stream.encode(None))
+    try:
+        video = VideoFromFile(file_path)
+        full = video.get_components().images
+
+        selected = video.get_components(start_frame=1, end_frame=8, stride=3)
+        assert torch.equal(selected.images, full[1:8:3])
+        assert selected.frame_rate == Fraction(10)
+
+        assert torch.equal(video.get_components(start_frame=2, max_frames=4).images, full[2:6])
+        assert video.get_components(max_size=8).images.shape == (10, 4, 8, 3)
+    finally:
+        os.unlink(file_path)
+
+
+def test_video_from_components_save_round_trip():
+    """Frames encoded through the encoder thread all end up in the file"""
+    images = torch.linspace(0, 1, 40)[:, None, None, None].expand(40, 16, 16, 3).contiguous()
+    video = VideoFromComponents(VideoComponents(images=images, frame_rate=Fraction(24)))
+    buffer = io.BytesIO()
+    video.save_to(buffer, format=VideoContainer.MP4)
+    components = VideoFromFile(buffer).get_components()
+    assert components.images.shape == (40, 16, 16, 3)
+    assert torch.allclose(components.images, images, atol=0.05)
+
+
+def test_video_encoder_thread_error():
+    """Errors of the encoder thread are raised in the producer"""
+    with av.open(io.BytesIO(), mode="w", format="mp4") as container:
+        stream = container.add_stream("h264", rate=24)
+        stream.width = 16
+        stream.height = 16
+        stream.pix_fmt = "yuv420p"
+        encoder = VideoEncoderThread(container, stream, pix_fmt="not_a_pixel_format")
+        encoder.put(torch.zeros(2, 16, 16, 3, dtype=torch.uint8).numpy())
+        with pytest.raises(ValueError):
+            encoder.finish()
+
+
+def test_video_from_frame_chunks_streams():
+    """Frame chunks are produced lazily, on every use, and saved without concatenating them"""
+    produced = []
+
+    def frames():
+        for i in range(5):
+            produced.append(i)
+            yield torch.full((8, 16, 16, 3), i / 4)
+
+    video = VideoFromFrameChunks(frames, frame_rate=Fraction(24))
+    assert produced == []
+    assert video.get_dimensions() == (16, 16)
+    assert video.get_frame_count() == 40
+    assert [c.shape[0] for c in video.iter_frames(chunk_size=5)] == [5, 3] * 5
+
+    buffer = io.BytesIO()
+    video.save_to(buffer, format=VideoContainer.MP4)
+    video_file = VideoFromFile(buffer)
+    chunks = list(video_file.iter_frames(chunk_size=16))
+    assert [c.shape[0] for c in chunks] == [16, 16, 8]
+    assert torch.equal(torch.cat(chunks), video_file.get_components().images)
+    assert torch.allclose(torch.cat(chunks), video.get_components().images, atol=0.05)
+
+
 def test_video_from_file_bytesio_input():
     """VideoFromFile works with BytesIO input"""
     buffer = io.BytesIO()
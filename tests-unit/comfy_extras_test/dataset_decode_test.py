@@ -0,0 +1,56 @@
+import numpy as np
+import pytest
+import torch
+from PIL import Image, UnidentifiedImageError
+from unittest.mock import patch, MagicMock
+
+# Mock server module for PromptServer
+mock_server = MagicMock()
+
+with patch.dict('sys.modules', {'server': mock_server}):
+    from comfy_extras import nodes_dataset
+    from comfy_extras.nodes_dataset import ImageDataset, load_and_process_images
+
+
+def _write_images(folder, count):
+    names = []
+    for i in range(count):
+        name = f"{i:03}.png"
+        Image.new("RGB", (8 + i % 3, 6), (i, 255 - i, 7)).save(folder / name)
+        names.append(name)
+    return names
+
+
+@pytest.mark.parametrize("count", [2, 12])
+def test_load_and_process_images_keeps_order(tmp_path, count):
+    names = _write_images(tmp_path, count)
+    images = load_and_process_images(names, str(tmp_path))
+    assert len(images) == count
+    for i, image in enumerate(images):
+        assert image.dtype == torch.float32
+        assert image.shape == (1, 6, 8 + i % 3, 3)
+        assert torch.equal(image[0, 0, 0], torch.tensor([i, 255 - i, 7]) / 255.0)
+
+
+def test_decode_pool_uses_threads(tmp_path):
+    names = _write_images(tmp_path, nodes_dataset._PARALLEL_DECODE_MIN_IMAGES)
+    futures = nodes_dataset._submit_decode([str(tmp_path / n) for n in names])
+    assert isinstance(nodes_dataset._get_decode_pool(), nodes_dataset.concurrent.futures.ThreadPoolExecutor)
+    assert all(isinstance(f.result(), np.ndarray) for f in futures)
+
+
+def test_decode_errors_surface_per_image(tmp_path):
+    names = _write_images(tmp_path, 5)
+    (tmp_path / names[2]).write_bytes(b"not an image")
+    with pytest.raises(UnidentifiedImageError):
+        load_and_process_images(names, str(tmp_path))
+
+
+def test_image_dataset_chunks_and_cache(tmp_path):
+    names = _write_images(tmp_path, 10)
+    dataset = ImageDataset([str(tmp_path / n) for n in names], cache_uint8=True).map(lambda image: image * 2)
+    chunks = list(dataset.iter_chunks(chunk_size=4))
+    assert [len(c) for c in chunks] == [4, 4, 2]
+    assert len(dataset._cache) == 10
+    again = list(dataset)
+    assert all(torch.equal(a, b) for a, b in zip(again, [img for c in chunks for img in c]))
@@ -0,0 +1,76 @@
+import torch
+from unittest.mock import patch, MagicMock
+
+# Mock server module for PromptServer
+mock_server = MagicMock()
+
+with patch.dict('sys.modules', {'server': mock_server}):
+    from comfy_extras import nodes_dataset
+    from comfy_extras.nodes_dataset import (
+        ImageDeduplicationNode,
+        compute_average_hashes,
+        find_unique_hashes,
+        hamming_distances,
+    )
+
+
+def reference_unique(hashes, max_distance):
+    """Naive O(n^2) greedy deduplication used as ground truth"""
+    values = [h & 0xFFFFFFFFFFFFFFFF for h in hashes.tolist()]
+    keep = []
+    for i, v in enumerate(values):
+        if all((v ^ values[j]).bit_count() > max_distance for j in keep):
+            keep.append(i)
+    return keep
+
+
+class TestImageDeduplication:
+
+    def test_hashes_are_packed_int64(self):
+        images = [torch.rand(1, 32, 48, 3) for _ in range(4)] + [torch.rand(1, 16, 16, 3)]
+        hashes = compute_average_hashes(images)
+        assert hashes.dtype == torch.int64
+        assert hashes.shape == (5,)
+
+    def test_hashes_do_not_depend_on_batch_size(self):
+        images = [torch.rand(1, 24, 24, 3) for _ in range(7)] + [torch.rand(1, 8, 16, 3) for _ in range(3)]
+        expected = compute_average_hashes(images)
+        with patch.object(nodes_dataset, "HASH_BATCH_SIZE", 2):
+            assert torch.equal(compute_average_hashes(images), expected)
+
+    def test_identical_and_scaled_images_share_hash(self):
+        img = torch.rand(1, 64, 64, 3)
+        upscaled = img.repeat_interleave(2, dim=1).repeat_interleave(2, dim=2)
+        hashes = compute_average_hashes([img, upscaled])
+        assert hamming_distances(hashes[:1], hashes[1:]).item() == 0
+
+    def test_hamming_distances_match_python_popcount(self):
+        a = torch.randint(-2**63, 2**63 - 1, (7,), dtype=torch.int64)
+        b = torch.randint(-2**63, 2**63 - 1, (5,), dtype=torch.int64)
+        dist = hamming_distances(a, b)
+        for i, x in enumerate(a.tolist()):
+            for j, y in enumerate(b.tolist()):
+                assert dist[i, j].item() == ((x ^ y) & 0xFFFFFFFFFFFFFFFF).bit_count()
+
+    def test_find_unique_matches_naive_greedy(self):
+        base = torch.randint(-2**63, 2**63 - 1, (50,), dtype=torch.int64)
+        # add near-duplicates by flipping a few bits
+        flips = torch.tensor([1 << k for k in (0, 17, 40)], dtype=torch.int64)
+        hashes = torch.cat([base, base ^ flips[0], base ^ (flips[0] | flips[1]), base ^ flips.sum()])
+        for max_distance in (0, 1, 2, 3, 10, 40):
+            assert find_unique_hashes(hashes, max_distance) == reference_unique(hashes, max_distance)
+
+    def test_node_removes_duplicates(self):
+        a = torch.rand(1, 32, 32, 3)
+        b = torch.rand(1, 32, 32, 3)
+        result = ImageDeduplicationNode._group_process([a, b, a.clone(), b.clone()], 0.95)
+        assert len(result) == 2
+        assert result[0] is a and result[1] is b
+
+    def test_large_hash_set_drops_planted_duplicates(self):
+        generator = torch.Generator().manual_seed(0)
+        base = torch.randint(-2**63, 2**63 - 1, (50000,), dtype=torch.int64, generator=generator)
+        bits = torch.randint(0, 63, (50000,), generator=generator)
+        hashes = torch.cat([base, base ^ (1 << bits)])
+        # Random 64-bit hashes are ~32 bits apart, so only the flipped copies are within the threshold
+        assert find_unique_hashes(hashes, 3) == list(range(50000))
@@ -0,0 +1,73 @@
+import torch
+
+from comfy.cli_args import args
+if not torch.cuda.is_available():
+    args.cpu = True
+
+import comfy.model_patcher  # noqa: E402
+from comfy.ldm.flux.model import Flux  # noqa: E402
+from comfy.ldm.lumina.model import NextDiT  # noqa: E402
+from comfy_extras.nodes_easycache import FirstBlockCacheHolder, apply_first_block_cache  # noqa: E402
+
+
+class ModelHolder(torch.nn.Module):
+    def __init__(self, diffusion_model):
+        super().__init__()
+        self.diffusion_model = diffusion_model
+
+
+def _flux_patcher():
+    torch.manual_seed(0)
+    model = Flux(in_channels=4, out_channels=4, vec_in_dim=8, context_in_dim=16, hidden_size=32, mlp_ratio=2.0, num_heads=2,
+                 depth=2, depth_single_blocks=2, axes_dim=[4, 6, 6], theta=10000, patch_size=2, qkv_bias=True,
+                 guidance_embed=False, txt_ids_dims=[], operations=torch.nn)
+    with torch.no_grad():
+        for param in model.parameters():
+            param.normal_(0.0, 0.1)
+    return comfy.model_patcher.ModelPatcher(ModelHolder(model), torch.device("cpu"), torch.device("cpu"))
+
+
+def _run(patcher, sigmas):
+    model = patcher.get_model_object("diffusion_model")
+    fbcache: FirstBlockCacheHolder = patcher.model_options["transformer_options"]["first_block_cache"]
+    fbcache.start_t, fbcache.end_t = 2.0, -1.0
+    torch.manual_seed(1)
+    x, context, y = torch.randn(1, 4, 8, 8), torch.randn(1, 5, 16), torch.randn(1, 8)
+    out = []
+    with torch.no_grad():
+        for sigma in sigmas:
+            sigma = torch.tensor([sigma])
+            transformer_options = dict(patcher.model_options["transformer_options"], sigmas=sigma, uuids=["cond"], wrappers=patcher.wrappers)
+            out.append((model(x, sigma, context, y, transformer_options=transformer_options), model(x, sigma, context, y, transformer_options={})))
+    return fbcache, out
+
+
+def test_first_block_cache_threshold_zero_is_exact():
+    fbcache, out = _run(apply_first_block_cache(_flux_patcher(), 0.0, 1, 0.0, 1.0), [0.9, 0.9, 0.8])
+    assert fbcache.segments == [(1, 1), (2, 3)]
+    assert fbcache.total_calls == 3 and fbcache.total_calls_skipped == 0
+    for cached, reference in out:
+        assert torch.equal(cached, reference)
+
+
+def test_first_block_cache_reuses_residuals():
+    fbcache, out = _run(apply_first_block_cache(_flux_patcher(), 10.0, 1, 0.0, 1.0), [0.9, 0.9, 0.8])
+    assert fbcache.total_calls == 3 and fbcache.total_calls_skipped == 2
+    # Same input as the computed call, so the cached residuals reproduce it
+    assert torch.allclose(out[1][0], out[1][1], atol=1e-5)
+    assert not torch.allclose(out[2][0], out[2][1], atol=1e-5)
+
+
+def test_first_block_cache_clamps_first_blocks_to_first_block_type():
+    # The Flux test model has 2 double and 2 single blocks, the single blocks see txt and img joined
+    fbcache, out = _run(apply_first_block_cache(_flux_patcher(), 10.0, 3, 0.0, 1.0), [0.9, 0.9])
+    assert fbcache.first_blocks == 2
+    assert fbcache.segments == [(2, 3)]
+    assert fbcache.total_calls_skipped == 1
+    assert torch.allclose(out[1][0], out[1][1], atol=1e-5)
+
+
+def test_first_block_cache_unsupported_model():
+    model = NextDiT(dim=32, n_layers=1, n_refiner_layers=1, n_heads=2, n_kv_heads=2, cap_feat_dim=16, axes_dims=(4, 6, 6), axes_lens=(8, 8, 8), operations=torch.nn)
+    patcher = comfy.model_patcher.ModelPatcher(ModelHolder(model), torch.device("cpu"), torch.device("cpu"))
+    assert apply_first_block_cache(patcher, 0.1, 1, 0.0, 1.0) is patcher
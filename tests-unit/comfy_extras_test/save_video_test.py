@@ -0,0 +1,70 @@
+import asyncio
+import os
+import threading
+from types import SimpleNamespace
+
+import pytest
+import torch
+from unittest.mock import patch, MagicMock
+
+from comfy.cli_args import args
+if not torch.cuda.is_available():
+    args.cpu = True
+
+import folder_paths  # noqa: E402
+
+# Mock server module for PromptServer
+mock_server = MagicMock()
+
+with patch.dict('sys.modules', {'server': mock_server}):
+    from comfy_extras.nodes_video import SaveVideo  # noqa: E402
+
+pytestmark = pytest.mark.asyncio
+
+
+@pytest.fixture
+def output_dir(tmp_path):
+    previous = folder_paths.get_output_directory()
+    folder_paths.set_output_directory(str(tmp_path))
+    yield tmp_path
+    folder_paths.set_output_directory(previous)
+
+
+class _Video:
+    def __init__(self, content, started, fail=False):
+        self.content = content
+        self.started = started
+        self.fail = fail
+
+    def get_dimensions(self):
+        return 16, 16
+
+    def save_to(self, path, **kwargs):
+        self.started.wait(5)
+        if self.fail:
+            raise RuntimeError("encoder failed")
+        with open(path, "wb") as f:
+            f.write(self.content)
+
+
+async def test_concurrent_saves_with_one_prefix_get_their_own_files(output_dir, monkeypatch):
+    monkeypatch.setattr(SaveVideo, "hidden", SimpleNamespace(prompt=None, extra_pnginfo=None))
+    started = threading.Event()
+    # Both saves compute their filename before either encode thread writes anything
+    saves = [asyncio.create_task(SaveVideo.execute(_Video(bytes([i]) * 4, started), "clip", "mp4", "auto")) for i in range(2)]
+    await asyncio.sleep(0.05)
+    started.set()
+    outputs = await asyncio.gather(*saves)
+
+    files = [output.ui.values[0]["filename"] for output in outputs]
+    assert len(set(files)) == 2
+    assert sorted(open(os.path.join(output_dir, f), "rb").read() for f in files) == [b"\0" * 4, b"\1" * 4]
+
+
+async def test_failed_save_removes_reserved_file(output_dir, monkeypatch):
+    monkeypatch.setattr(SaveVideo, "hidden", SimpleNamespace(prompt=None, extra_pnginfo=None))
+    started = threading.Event()
+    started.set()
+    with pytest.raises(RuntimeError, match="encoder failed"):
+        await SaveVideo.execute(_Video(b"", started, fail=True), "clip", "mp4", "auto")
+    assert os.listdir(output_dir) == []
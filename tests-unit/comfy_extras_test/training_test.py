@@ -0,0 +1,177 @@
+import json
+import os
+from types import SimpleNamespace
+
+import pytest
+import torch
+from unittest.mock import patch, MagicMock
+
+from comfy.cli_args import args
+if not torch.cuda.is_available():
+    args.cpu = True
+
+# Mock server module for PromptServer
+mock_server = MagicMock()
+
+with patch.dict('sys.modules', {'server': mock_server}):
+    from comfy_extras.nodes_dataset import (
+        DATASET_FORMAT_VERSION,
+        DATASET_INDEX_FILENAME,
+        load_safetensors_dataset,
+        parse_resolution_buckets,
+        save_safetensors_shard,
+    )
+    from comfy_extras.nodes_train import SIGMA_TABLE_SIZE, BatchPrefetcher, LossReporter, TrainSampler
+import comfy.model_sampling  # noqa: E402
+
+
+def _samples(count):
+    latents = [{"samples": torch.randn(1, 4, 8, 6 + 2 * (i % 2))} for i in range(count)]
+    shared = torch.randn(1, 7, 16)
+    conditioning = [[[torch.randn(1, 5, 16), {"pooled_output": shared, "strength": 0.5, "area": (8, 8)}]] for i in range(count)]
+    return latents, conditioning
+
+
+def _save(dataset_dir, latents, conditioning, shard_size=2):
+    entries = []
+    for start in range(0, len(latents), shard_size):
+        shard_path = os.path.join(dataset_dir, f"shard_{start // shard_size:04d}.safetensors")
+        entries += save_safetensors_shard(shard_path, latents[start:start + shard_size], conditioning[start:start + shard_size], start)
+    with open(os.path.join(dataset_dir, DATASET_INDEX_FILENAME), "w", encoding="utf-8") as f:
+        json.dump({"version": DATASET_FORMAT_VERSION, "samples": entries}, f)
+    return entries
+
+
+def test_safetensors_dataset_round_trip(tmp_path):
+    latents, conditioning = _samples(5)
+    entries = _save(tmp_path, latents, conditioning)
+    assert [e["shard"] for e in entries] == ["shard_0000.safetensors"] * 2 + ["shard_0001.safetensors"] * 2 + ["shard_0002.safetensors"]
+
+    loaded_latents, loaded_conditioning = load_safetensors_dataset(tmp_path)
+    assert len(loaded_latents) == 5
+    for latent, loaded in zip(latents, loaded_latents):
+        assert torch.equal(latent["samples"], loaded["samples"])
+    for cond, loaded in zip(conditioning, loaded_conditioning):
+        assert torch.equal(cond[0][0], loaded[0][0])
+        assert torch.equal(cond[0][1]["pooled_output"], loaded[0][1]["pooled_output"])
+        assert loaded[0][1]["strength"] == 0.5
+        assert loaded[0][1]["area"] == (8, 8)
+
+
+def test_safetensors_shard_rejects_unsupported_values(tmp_path):
+    with pytest.raises(TypeError):
+        save_safetensors_shard(os.path.join(tmp_path, "shard.safetensors"), [{"samples": torch.zeros(1)}], [[object()]], 0)
+
+
+@pytest.mark.parametrize("damage", ["missing", "truncated"])
+def test_safetensors_dataset_reports_bad_shards(tmp_path, damage):
+    latents, conditioning = _samples(4)
+    _save(tmp_path, latents, conditioning)
+    shard_path = os.path.join(tmp_path, "shard_0001.safetensors")
+    if damage == "missing":
+        os.remove(shard_path)
+    else:
+        with open(shard_path, "r+b") as f:
+            f.truncate(os.path.getsize(shard_path) // 2)
+    with pytest.raises(ValueError, match="shard_0001.safetensors"):
+        load_safetensors_dataset(tmp_path)
+
+
+def test_safetensors_index_records_offset_shape_and_bucket(tmp_path):
+    latents, conditioning = _samples(2)
+    entries = _save(tmp_path, latents, conditioning)
+    with open(os.path.join(tmp_path, "shard_0000.safetensors"), "rb") as f:
+        data = f.read()
+    for latent, entry in zip(latents, entries):
+        assert entry["shape"] == list(latent["samples"].shape)
+        assert entry["bucket"] == entry["shape"][-2:]
+        raw = latent["samples"].contiguous().numpy().tobytes()
+        assert data[entry["offset"]:entry["offset"] + len(raw)] == raw
+
+
+def test_safetensors_dataset_bucket_filter_skips_other_shards(tmp_path):
+    latents, conditioning = _samples(5)
+    _save(tmp_path, latents, conditioning, shard_size=1)
+    # Samples 1 and 3 are in the 8x8 bucket, their shards are never opened
+    os.remove(os.path.join(tmp_path, "shard_0001.safetensors"))
+    os.remove(os.path.join(tmp_path, "shard_0003.safetensors"))
+    loaded_latents, loaded_conditioning = load_safetensors_dataset(tmp_path, parse_resolution_buckets("8x6"))
+    assert len(loaded_latents) == len(loaded_conditioning) == 3
+    for i, loaded in zip([0, 2, 4], loaded_latents):
+        assert torch.equal(latents[i]["samples"], loaded["samples"])
+
+
+def test_safetensors_dataset_rejects_shape_mismatch(tmp_path):
+    latents, conditioning = _samples(2)
+    entries = _save(tmp_path, latents, conditioning)
+    entries[1]["shape"] = [1, 4, 8, 4]
+    with open(os.path.join(tmp_path, DATASET_INDEX_FILENAME), "w", encoding="utf-8") as f:
+        json.dump({"version": DATASET_FORMAT_VERSION, "samples": entries}, f)
+    with pytest.raises(ValueError, match="does not match the index"):
+        load_safetensors_dataset(tmp_path)
+
+
+def test_parse_resolution_buckets():
+    assert parse_resolution_buckets("") == set()
+    assert parse_resolution_buckets("64x64, 96X64,") == {(64, 64), (96, 64)}
+    with pytest.raises(ValueError):
+        parse_resolution_buckets("64")
+
+
+def test_batch_prefetcher_returns_prefetched_batch():
+    samples = [torch.full((1, 2, 3, 3), float(i)) for i in range(6)]
+    prefetcher = BatchPrefetcher(samples, torch.float16)
+    try:
+        prefetcher.prefetch([4, 1])
+        batch = prefetcher.get([4, 1])
+        assert batch.dtype == torch.float16
+        assert batch[:, 0, 0, 0].tolist() == [4.0, 1.0]
+        # A different request than the prefetched one is loaded directly
+        prefetcher.prefetch([0, 2])
+        assert prefetcher.get([3, 5])[:, 0, 0, 0].tolist() == [3.0, 5.0]
+        assert prefetcher.get([0, 2])[:, 0, 0, 0].tolist() == [0.0, 2.0]
+    finally:
+        prefetcher.close()
+
+
+@pytest.mark.parametrize("sampling", [comfy.model_sampling.ModelSamplingDiscrete, comfy.model_sampling.ModelSamplingContinuousEDM])
+def test_sigma_table_matches_percent_to_sigma(sampling):
+    model_sampling = sampling()
+    sampler = TrainSampler(loss_fn=None, optimizer=None)
+    table = sampler._sigma_table(SimpleNamespace(inner_model=SimpleNamespace(model_sampling=model_sampling)))
+    percents = ((torch.arange(SIGMA_TABLE_SIZE, dtype=torch.float64) + 0.5) / SIGMA_TABLE_SIZE).tolist()
+    expected = torch.tensor([float(model_sampling.percent_to_sigma(p)) for p in percents])
+    assert table.shape == (SIGMA_TABLE_SIZE,)
+    assert torch.allclose(table, expected, rtol=1e-5)
+
+
+class _Pbar:
+    def __init__(self):
+        self.postfix = None
+
+    def set_postfix(self, postfix):
+        self.postfix = postfix
+
+
+def test_loss_reporter_reports_every_loss_in_order():
+    reported = []
+    pbar = _Pbar()
+    reporter = LossReporter(reported.append, pbar, interval=3)
+    for step in range(3):
+        reporter.add(torch.tensor(float(step)), lr="1e-4")
+    # A full interval is only read back at the next flush, so the device never has to sync early
+    assert reported == []
+    for step in range(3, 8):
+        reporter.add(torch.tensor(float(step)))
+    assert reported == [0.0, 1.0, 2.0]
+    reporter.flush(wait=True)
+    assert reported == [float(step) for step in range(8)]
+    assert pbar.postfix == {"loss": "7.0000"}
+
+
+def test_loss_reporter_without_callback_updates_progress():
+    pbar = _Pbar()
+    reporter = LossReporter(None, pbar, interval=2)
+    reporter.add(torch.tensor([0.25]), step=1)
+    reporter.flush(wait=True)
+    assert pbar.postfix == {"loss": "0.2500", "step": 1}
@@ -0,0 +1,80 @@
+import pytest
+import torch
+
+from comfy.cli_args import args
+if not torch.cuda.is_available():
+    args.cpu = True
+
+import comfy.attention_autotune as autotune  # noqa: E402
+from comfy.ldm.modules import attention  # noqa: E402
+from comfy.ldm.modules.attention import attention_pytorch, attention_sub_quad  # noqa: E402
+
+
+@pytest.fixture
+def table_dir(tmp_path):
+    autotune.enable(str(tmp_path))
+    yield tmp_path
+    autotune.disable()
+
+
+def _inputs(seq_q=64, seq_k=77):
+    return torch.randn(1, seq_q, 64), torch.randn(1, seq_k, 64), torch.randn(1, seq_k, 64)
+
+
+def test_autotune_rejects_wrong_results_and_persists(table_dir):
+    def broken(q, k, v, heads, **kwargs):
+        return torch.zeros_like(q)
+
+    candidates = {"sub_quad": attention_sub_quad, "pytorch": attention_pytorch, "broken": broken}
+    q, k, v = _inputs()
+    with torch.inference_mode():
+        chosen = autotune.select("sub_quad", attention_sub_quad, candidates, q, k, v, 4)
+    assert chosen in (attention_sub_quad, attention_pytorch)
+    assert (table_dir / autotune.TABLE_FILENAME).exists()
+
+    # A new process reads the decision back instead of tuning again, similar lengths share the bucket
+    autotune.enable(str(table_dir))
+    calls = []
+    candidates["pytorch"] = lambda *args, **kwargs: calls.append(1)
+    q, k, v = _inputs(seq_q=60, seq_k=70)
+    with torch.inference_mode():
+        again = autotune.select("sub_quad", attention_sub_quad, candidates, q, k, v, 4)
+    assert (again is attention_sub_quad) == (chosen is attention_sub_quad)
+    assert len(calls) == 0
+
+
+def test_autotune_bucket_key():
+    q, k, _ = _inputs(seq_q=1000, seq_k=77)
+    assert autotune.bucket_key(q, k, 4) == "cpu|float32|h4|q1024|k128|d16|nomask"
+    assert autotune.bucket_key(q.view(1, 1000, 4, 16).transpose(1, 2), k.view(1, 77, 4, 16).transpose(1, 2), 4, mask=k, skip_reshape=True) == "cpu|float32|h4|q1024|k128|d16|mask"
+
+
+def test_autotune_bucket_key_separates_gpu_models(monkeypatch):
+    names = {0: "GPU A", 1: "GPU B"}
+    monkeypatch.setattr(torch.cuda, "get_device_name", lambda device: names[device.index])
+    autotune._device_label.cache_clear()
+    try:
+        assert autotune._device_label(torch.device("cuda", 0)) == "GPU A"
+        assert autotune._device_label(torch.device("cuda", 1)) == "GPU B"
+        assert autotune._device_label(torch.device("xpu", 1)) == "xpu:1"
+    finally:
+        autotune._device_label.cache_clear()
+
+
+def test_autotuned_falls_back_when_choice_fails_in_bucket(table_dir, monkeypatch):
+    def short_only(q, k, v, heads, **kwargs):
+        if k.shape[1] != 77:
+            raise RuntimeError("unsupported key length")
+        return attention_sub_quad(q, k, v, heads, **kwargs)
+
+    monkeypatch.setitem(attention.REGISTERED_ATTENTION_FUNCTIONS, "short_only", short_only)
+    q, k, v = _inputs()
+    key = autotune.bucket_key(q, k, 4)
+    autotune._load()[key] = "short_only"
+
+    q2, k2, v2 = _inputs(seq_k=70)
+    assert autotune.bucket_key(q2, k2, 4) == key
+    with torch.inference_mode():
+        out = attention.attention_autotuned(q2, k2, v2, 4)
+        assert torch.allclose(out, attention_sub_quad(q2, k2, v2, 4))
+    assert autotune._load()[key] == "sub_quad"
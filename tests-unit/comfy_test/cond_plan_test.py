@@ -0,0 +1,104 @@
+import torch
+
+from comfy.cli_args import args
+if not torch.cuda.is_available():
+    args.cpu = True
+
+import comfy.conds  # noqa: E402
+import comfy.samplers  # noqa: E402
+
+
+class _Patcher:
+    def get_free_memory(self, device):
+        return 1e12
+
+    def prepare_state(self, timestep):
+        pass
+
+    def apply_hooks(self, hooks):
+        return {}
+
+
+class _Model:
+    def __init__(self):
+        self.current_patcher = _Patcher()
+        self.batches = []
+
+    def memory_required(self, input_shape, cond_shapes=None):
+        return 0
+
+    def apply_model(self, x, t, c_crossattn, **kwargs):
+        self.batches.append(x.shape[0])
+        return x * 0.5 + c_crossattn.mean(dim=(1, 2)).view(-1, 1, 1, 1)
+
+
+def _cond(length=77, **kwargs):
+    c = {"model_conds": {"c_crossattn": comfy.conds.CONDCrossAttn(torch.randn(1, length, 8))}, "uuid": object()}
+    c.update(kwargs)
+    return c
+
+
+def _reference_cond_batch(model, conds, x, timestep):
+    """The batching loop of _calc_cond_batch before cond plans, without hooks, controlnets or memory based splitting."""
+    out_conds = [torch.zeros_like(x) for _ in conds]
+    out_counts = [torch.ones_like(x) * 1e-37 for _ in conds]
+    to_run = []
+    for i, cond in enumerate(conds):
+        for c in cond:
+            p = comfy.samplers.get_area_and_mult(c, x, timestep)
+            if p is not None:
+                to_run.append((p, i))
+
+    while to_run:
+        first = to_run[0][0]
+        batch = [o for o in to_run if comfy.samplers.can_concat_cond(o[0], first)]
+        to_run = [o for o in to_run if not any(o is b for b in batch)]
+        c = comfy.samplers.cond_cat([p.conditioning for p, _i in batch])
+        output = model.apply_model(torch.cat([p.input_x for p, _i in batch]), torch.cat([timestep] * len(batch)), **c).chunk(len(batch))
+        for (p, i), out in zip(batch, output):
+            out_c = out_conds[i]
+            out_cts = out_counts[i]
+            if p.area is not None:
+                dims = len(p.area) // 2
+                for d in range(dims):
+                    out_c = out_c.narrow(d + 2, p.area[d + dims], p.area[d])
+                    out_cts = out_cts.narrow(d + 2, p.area[d + dims], p.area[d])
+            out_c += out * p.mult
+            out_cts += p.mult
+    return [out_c / out_cts for out_c, out_cts in zip(out_conds, out_counts)]
+
+
+def test_cond_plan_matches_unplanned_batches():
+    torch.manual_seed(0)
+    positive = [_cond(strength=0.7), _cond(length=154, area=(16, 8, 4, 4)), _cond(timestep_start=0.5)]
+    negative = [_cond(mask=torch.rand(1, 32, 24), mask_strength=0.5)]
+    conds = [positive, negative]
+    plan = comfy.samplers.CondPlan({"positive": positive, "negative": negative})
+
+    for step, sigma in enumerate((1.0, 0.4)):
+        x = torch.randn(1, 4, 32, 24)
+        timestep = torch.tensor([sigma])
+        expected = _reference_cond_batch(_Model(), conds, x, timestep)
+        # The accumulators are reused between steps, so run the planned batch twice per step
+        for _ in range(2):
+            model = _Model()
+            out = comfy.samplers._calc_cond_batch(model, conds, x, timestep, {"cond_plan": plan})
+            for a, b in zip(expected, out):
+                assert torch.equal(a, b)
+        # The third positive cond only runs once sigma drops below its timestep_start
+        assert sum(model.batches) == (3 if step == 0 else 4)
+    assert len(plan.prepared) == 4
+
+
+def test_area_feather_mult_matches_get_area_and_mult():
+    x = torch.zeros(1, 2, 40, 40)
+    cond = _cond(area=(32, 16, 4, 0), strength=0.5)
+    p = comfy.samplers.get_area_and_mult(cond, x, torch.tensor([1.0]))
+    assert p.mult.shape == (1, 2, 32, 16)
+    column = p.mult[0, 0, :, 8]
+    # Faded in from the top edge, which is inside the latent, up to full strength, then faded out at the bottom
+    assert torch.allclose(column[:8], 0.5 * torch.arange(1, 9) / 8)
+    assert torch.all(column[8:24] == 0.5)
+    assert torch.allclose(column[24:], 0.5 * torch.arange(8, 0, -1) / 8)
+    # The left edge of the area is the edge of the latent, so it is not faded
+    assert p.mult[0, 0, 12, 0] == 0.5
@@ -0,0 +1,107 @@
+import torch
+
+from comfy.cli_args import args
+if not torch.cuda.is_available():
+    args.cpu = True
+
+import comfy.conds  # noqa: E402
+import comfy.hooks  # noqa: E402
+import comfy.samplers  # noqa: E402
+from comfy.ldm.modules.attention import BasicTransformerBlock  # noqa: E402
+
+
+def _crossattn(length, mask_padding=True):
+    return comfy.conds.CONDCrossAttn(torch.randn(1, length, 16), mask_padding=mask_padding)
+
+
+def test_crossattn_mask_padding_concat():
+    short, long = _crossattn(77), _crossattn(400)
+    assert not _crossattn(77, mask_padding=False).can_concat(long)
+    assert short.can_concat(long)
+
+    out = short.concat([long])
+    mask = short.padding_mask([long])
+    assert out.shape == (2, 400, 16)
+    assert torch.equal(out[0, :77], short.cond[0]) and not out[0, 77:].any()
+    assert mask[0].sum() == 77 and mask[1].all()
+
+    # Small length differences keep using repeat padding, which needs no mask
+    assert _crossattn(77).padding_mask([_crossattn(154)]) is None
+    assert comfy.samplers.cond_padding_mask([{"c_crossattn": short}, {"c_crossattn": long}]).shape == (2, 400)
+
+
+def test_masked_batch_matches_unbatched():
+    torch.manual_seed(0)
+    block = BasicTransformerBlock(32, 4, 8, context_dim=16, checkpoint=False, operations=torch.nn)
+    x = torch.randn(2, 64, 32)
+    conds = [_crossattn(77), _crossattn(400)]
+
+    context = conds[0].concat(conds[1:])
+    transformer_options = {"context_padding_mask": conds[0].padding_mask(conds[1:])}
+    with torch.no_grad():
+        batched = block(x, context=context, transformer_options=transformer_options)
+        separate = torch.cat([block(x[i:i + 1], context=c.cond, transformer_options={}) for i, c in enumerate(conds)])
+    assert torch.allclose(batched, separate, atol=1e-5)
+
+
+def test_attn2_patches_disable_mask_padding():
+    assert comfy.samplers.context_padding_mask_supported({})
+    assert comfy.samplers.context_padding_mask_supported({"transformer_options": {"patches": {"attn2_patch": []}}})
+    assert not comfy.samplers.context_padding_mask_supported({"transformer_options": {"patches": {"attn2_patch": [lambda *a: a]}}})
+    assert not comfy.samplers.context_padding_mask_supported({"transformer_options": {"patches_replace": {"attn2": {("input", 1): None}}}})
+
+    conds = {"positive": [{"model_conds": {"c_crossattn": _crossattn(77)}}], "negative": [{"model_conds": {"c_crossattn": _crossattn(400)}}]}
+    comfy.samplers.disable_cond_mask_padding(conds)
+    short, long = conds["positive"][0]["model_conds"]["c_crossattn"], conds["negative"][0]["model_conds"]["c_crossattn"]
+    # Too far apart to repeat pad, so they are run in separate batches
+    assert not short.can_concat(long)
+    assert short.padding_mask([long]) is None
+
+
+class _HookPatcher:
+    is_clip = False
+
+    def get_free_memory(self, device):
+        return 1e12
+
+    def prepare_state(self, timestep):
+        pass
+
+    def prepare_hook_patches_current_keyframe(self, t, hook_group, model_options):
+        pass
+
+    def apply_hooks(self, hooks):
+        return comfy.hooks.create_transformer_options_from_hooks(self, hooks)
+
+
+class _Model:
+    def __init__(self):
+        self.current_patcher = _HookPatcher()
+        self.batches = []
+
+    def memory_required(self, input_shape, cond_shapes=None):
+        return 0
+
+    def apply_model(self, x, t, c_crossattn, transformer_options={}, **kwargs):
+        self.batches.append((x.shape[0], c_crossattn.shape[1], "context_padding_mask" in transformer_options))
+        return x * 0.5
+
+
+def test_hook_attn2_patches_disable_mask_padding():
+    hooks = comfy.hooks.HookGroup()
+    hooks.add(comfy.hooks.TransformerOptionsHook({"patches": {"attn2_patch": [lambda *a: a]}}, hook_scope=comfy.hooks.EnumHookScope.HookedOnly))
+    x = torch.randn(1, 4, 8, 8)
+    timestep = torch.tensor([1.0])
+    for cond_hooks, expected in ((None, [(2, 400, True)]), (hooks, [(1, 77, False), (1, 400, False)])):
+        positive = [{"model_conds": {"c_crossattn": _crossattn(77)}, "hooks": cond_hooks, "uuid": object()}]
+        negative = [{"model_conds": {"c_crossattn": _crossattn(400)}, "hooks": cond_hooks, "uuid": object()}]
+        model = _Model()
+        plan = comfy.samplers.CondPlan({"positive": positive, "negative": negative})
+        comfy.samplers._calc_cond_batch(model, [positive, negative], x, timestep, {"cond_plan": plan})
+        assert model.batches == expected
+
+    # Each pair repeat pads within the limit, together they would need the mask, so they are repeat padded instead
+    positive = [{"model_conds": {"c_crossattn": _crossattn(n)}, "hooks": hooks, "uuid": object()} for n in (77, 154, 231)]
+    model = _Model()
+    comfy.samplers._calc_cond_batch(model, [positive], x, timestep, {"cond_plan": comfy.samplers.CondPlan({"positive": positive})})
+    assert model.batches == [(3, 462, False)]
@@ -0,0 +1,78 @@
+import torch
+
+from comfy.cli_args import args
+if not torch.cuda.is_available():
+    args.cpu = True
+
+from comfy.ldm.modules.attention import BasicTransformerBlock, CrossAttentionKVCache  # noqa: E402
+
+
+def _block():
+    torch.manual_seed(0)
+    block = BasicTransformerBlock(32, 4, 8, context_dim=16, checkpoint=False, operations=torch.nn)
+    calls = []
+    block.attn2.to_k.register_forward_hook(lambda module, args, out: calls.append(1))
+    return block, calls
+
+
+def test_kv_cache_reuses_projection():
+    block, calls = _block()
+    x = torch.randn(2, 64, 32)
+    context = torch.randn(2, 77, 16)
+    cache = CrossAttentionKVCache()
+    options = {"cross_attn_kv_cache": cache, "uuids": ["cond", "uncond"]}
+
+    with torch.no_grad():
+        expected = block(x, context=context, transformer_options={})
+        calls.clear()
+        for _ in range(3):
+            assert torch.equal(block(x, context=context, transformer_options=options), expected)
+        assert len(calls) == 1
+
+        # A different context tensor, even with the same values, is projected again
+        block(x, context=context.clone(), transformer_options=options)
+        assert len(calls) == 2
+
+
+def test_kv_cache_only_used_for_attn2():
+    block, calls = _block()
+    x = torch.randn(1, 64, 32)
+    context = torch.randn(1, 77, 16)
+    cache = CrossAttentionKVCache()
+    # An attn1 patch hands attn1 an explicit self attention context
+    patches = {"attn1_patch": [lambda n, context_attn1, value_attn1, extra_options: (n, context_attn1, value_attn1)]}
+    options = {"cross_attn_kv_cache": cache, "uuids": ["cond"], "patches": patches}
+
+    with torch.no_grad():
+        expected = block(x, context=context, transformer_options={"patches": patches})
+        assert torch.equal(block(x, context=context, transformer_options=options), expected)
+        assert [key[0] for key in cache.entries] == [id(block.attn2)]
+
+        # Called directly, CrossAttention does not use the cache unless asked to
+        calls.clear()
+        block.attn2(x, context=context, transformer_options=options)
+        block.attn2(x, context=context, transformer_options=options)
+        assert len(calls) == 2
+
+
+def test_kv_cache_invalidated_by_weight_patch():
+    block, calls = _block()
+    x = torch.randn(1, 64, 32)
+    context = torch.randn(1, 77, 16)
+    cache = CrossAttentionKVCache()
+    options = {"cross_attn_kv_cache": cache, "uuids": ["cond"]}
+
+    with torch.no_grad():
+        block(x, context=context, transformer_options=options)
+        block.attn2.to_k.weight.mul_(2.0)
+        patched = block(x, context=context, transformer_options=options)
+        assert len(calls) == 2
+        assert torch.equal(patched, block(x, context=context, transformer_options={}))
+
+
+def test_kv_cache_cast_context_is_stable():
+    cache = CrossAttentionKVCache()
+    context = torch.randn(1, 77, 16)
+    out = cache.cast_context(context, torch.device("cpu"), torch.float16)
+    assert out.dtype == torch.float16
+    assert cache.cast_context(context, torch.device("cpu"), torch.float16) is out
@@ -93,6 +93,102 @@ def test_recursive_search(temp_dir):
     assert set(files) == {"file1.txt", os.path.join("subdir", "file2.txt")}
     assert len(dirs) == 2  # temp_dir and subdir
 
+def test_directory_snapshot_refreshes_changed_directories(temp_dir):
+    os.makedirs(os.path.join(temp_dir, "a", "deep"))
+    os.makedirs(os.path.join(temp_dir, "b"))
+    open(os.path.join(temp_dir, "a", "deep", "one.bin"), "w").close()
+    open(os.path.join(temp_dir, "b", "two.bin"), "w").close()
+
+    snapshot = folder_paths.get_directory_snapshot(temp_dir)
+    assert set(snapshot.files()) == {os.path.join("a", "deep", "one.bin"), os.path.join("b", "two.bin")}
+
+    with open(os.path.join(temp_dir, "b", "three.bin"), "wb") as f:
+        f.write(b"abc")
+    os.remove(os.path.join(temp_dir, "a", "deep", "one.bin"))
+    os.rmdir(os.path.join(temp_dir, "a", "deep"))
+    # Make the change visible on filesystems with coarse mtime resolution
+    for d in ("a", "b"):
+        os.utime(os.path.join(temp_dir, d), (1, 1))
+
+    snapshot = folder_paths.get_directory_snapshot(temp_dir, with_stats=True)
+    stats = {rel: st for rel, _full, st in snapshot.entries()}
+    assert set(stats) == {os.path.join("b", "two.bin"), os.path.join("b", "three.bin")}
+    assert stats[os.path.join("b", "three.bin")][0] == 3
+    assert os.path.join(temp_dir, "a", "deep") not in snapshot.dirs()
+
+
+def test_directory_snapshot_restats_replaced_files(temp_dir):
+    path = os.path.join(temp_dir, "model.bin")
+    with open(path, "wb") as f:
+        f.write(b"a")
+    snapshot = folder_paths.get_directory_snapshot(temp_dir, with_stats=True)
+    assert [st[0] for _rel, _full, st in snapshot.entries()] == [1]
+
+    # Replace the file under the same name, the directory changes but the name does not
+    with open(path + ".tmp", "wb") as f:
+        f.write(b"abcd")
+    os.replace(path + ".tmp", path)
+
+    snapshot = folder_paths.get_directory_snapshot(temp_dir, with_stats=True)
+    assert [st[0] for _rel, _full, st in snapshot.entries()] == [4]
+
+    # Rewriting the file in place does not change the directory at all
+    dir_mtime = os.stat(temp_dir).st_mtime_ns
+    with open(path, "ab") as f:
+        f.write(b"ef")
+    os.utime(temp_dir, ns=(dir_mtime, dir_mtime))
+
+    snapshot = folder_paths.get_directory_snapshot(temp_dir, with_stats=True)
+    assert [st[0] for _rel, _full, st in snapshot.entries()] == [6]
+
+
+def test_directory_snapshot_stats_filter(temp_dir):
+    os.makedirs(os.path.join(temp_dir, ".hidden"))
+    for name in ("model.safetensors", "notes.txt", os.path.join(".hidden", "other.safetensors")):
+        open(os.path.join(temp_dir, name), "w").close()
+
+    snapshot = folder_paths.get_directory_snapshot(temp_dir, with_stats=True, stats_filter=lambda rel: not rel.startswith(".") and rel.endswith(".safetensors"))
+    stats = {rel: st for rel, _full, st in snapshot.entries()}
+    assert stats["model.safetensors"] is not None
+    assert stats["notes.txt"] is None and stats[os.path.join(".hidden", "other.safetensors")] is None
+
+
+@pytest.mark.skipif(sys.platform == "win32", reason="symlinks need privileges on Windows")
+def test_directory_snapshot_skips_symlink_loops(temp_dir):
+    os.makedirs(os.path.join(temp_dir, "sub"))
+    open(os.path.join(temp_dir, "sub", "file.txt"), "w").close()
+    os.symlink(temp_dir, os.path.join(temp_dir, "sub", "loop"))
+
+    files, dirs = folder_paths.recursive_search(temp_dir)
+    assert files == [os.path.join("sub", "file.txt")]
+    assert len(dirs) == 2
+
+
+@pytest.mark.skipif(sys.platform == "win32", reason="symlinks need privileges on Windows")
+def test_directory_snapshot_without_following_symlinks(temp_dir):
+    with tempfile.TemporaryDirectory() as outside:
+        open(os.path.join(outside, "linked.txt"), "w").close()
+        os.makedirs(os.path.join(temp_dir, ".git"))
+        open(os.path.join(temp_dir, ".git", "HEAD"), "w").close()
+        os.symlink(outside, os.path.join(temp_dir, "dirlink"))
+        os.symlink(os.path.join(outside, "linked.txt"), os.path.join(temp_dir, "filelink.txt"))
+
+        snapshot = folder_paths.get_directory_snapshot(temp_dir, follow_symlinks=False)
+        assert set(snapshot.files()) == {os.path.join(".git", "HEAD"), "filelink.txt"}
+        followed = folder_paths.get_directory_snapshot(temp_dir)
+        assert os.path.join("dirlink", "linked.txt") in followed.files()
+
+def test_directory_snapshot_cache_is_bounded(temp_dir, monkeypatch):
+    monkeypatch.setattr(folder_paths, "MAX_DIRECTORY_SNAPSHOTS", 2)
+    for name in ("a", "b", "c"):
+        os.makedirs(os.path.join(temp_dir, name))
+    first = folder_paths.get_directory_snapshot(os.path.join(temp_dir, "a"))
+    folder_paths.get_directory_snapshot(os.path.join(temp_dir, "b"))
+    assert folder_paths.get_directory_snapshot(os.path.join(temp_dir, "a")) is first
+    folder_paths.get_directory_snapshot(os.path.join(temp_dir, "c"))
+    roots = [snapshot.root for snapshot in folder_paths._directory_snapshots.values()]
+    assert roots == [os.path.join(temp_dir, "a"), os.path.join(temp_dir, "c")]
+
 def test_filter_files_extensions():
     files = ["file1.txt", "file2.jpg", "file3.png", "file4.txt"]
     assert folder_paths.filter_files_extensions(files, [".txt"]) == ["file1.txt", "file4.txt"]
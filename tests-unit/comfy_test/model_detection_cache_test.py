@@ -0,0 +1,74 @@
+import os
+
+import pytest
+import torch
+import safetensors.torch
+
+from comfy.cli_args import args
+if not torch.cuda.is_available():
+    args.cpu = True
+
+import comfy.model_detection  # noqa: E402
+import comfy.model_detection_cache  # noqa: E402
+import comfy.supported_models  # noqa: E402
+
+
+@pytest.fixture
+def detection_cache(tmp_path):
+    comfy.model_detection_cache.enable(str(tmp_path / "cache"))
+    yield comfy.model_detection_cache
+    comfy.model_detection_cache.disable()
+
+
+@pytest.fixture
+def model_file(tmp_path):
+    path = str(tmp_path / "model.safetensors")
+    safetensors.torch.save_file({"a": torch.zeros(4), "b": torch.ones(2, 2)}, path)
+    return path
+
+
+def test_file_key_tracks_file_identity(detection_cache, model_file):
+    key = detection_cache.file_key(model_file)
+    assert key is not None
+    assert detection_cache.file_key(model_file) == key
+
+    safetensors.torch.save_file({"a": torch.zeros(5), "b": torch.ones(2, 2)}, model_file)
+    assert detection_cache.file_key(model_file) != key
+
+    detection_cache.disable()
+    assert detection_cache.file_key(model_file) is None
+
+
+def test_entries_survive_reload(detection_cache, model_file, tmp_path):
+    key = detection_cache.file_key(model_file)
+    value = {"dtype": torch.bfloat16, "shape": (1, 2), "nested": {"x": [1, 2.5, None]}}
+    detection_cache.put(key, "test", value)
+    assert os.path.isfile(tmp_path / "cache" / detection_cache.CACHE_FILENAME)
+
+    detection_cache.enable(str(tmp_path / "cache"))
+    assert detection_cache.get(key, "test") == value
+    assert detection_cache.get(key, "missing") is None
+    # Values that can not be stored are skipped instead of failing the load
+    detection_cache.put(key, "tensor", {"t": torch.zeros(1)})
+    assert detection_cache.get(key, "tensor") is None
+
+
+def test_model_config_reused_from_cache(detection_cache, model_file, monkeypatch):
+    calls = []
+
+    def detect_unet_config(state_dict, key_prefix, metadata=None):
+        calls.append(key_prefix)
+        return dict(comfy.supported_models.SD15.unet_config, in_channels=4, adm_in_channels=None, context_dim=768)
+
+    monkeypatch.setattr(comfy.model_detection, "detect_unet_config", detect_unet_config)
+    key = detection_cache.file_key(model_file)
+
+    first = comfy.model_detection.model_config_from_unet({}, "model.diffusion_model.", cache_key=key)
+    second = comfy.model_detection.model_config_from_unet({}, "model.diffusion_model.", cache_key=key)
+    assert type(first) is type(second) is comfy.supported_models.SD15
+    assert first.unet_config == second.unet_config
+    assert len(calls) == 1
+
+    # No key, no cache
+    comfy.model_detection.model_config_from_unet({}, "model.diffusion_model.")
+    assert len(calls) == 2
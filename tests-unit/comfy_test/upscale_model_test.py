@@ -0,0 +1,75 @@
+import pytest
+import spandrel
+import torch
+from spandrel.architectures.ESRGAN import ESRGAN
+
+from comfy.cli_args import args
+if not torch.cuda.is_available():
+    args.cpu = True
+
+import comfy.upscale_model  # noqa: E402
+import comfy.utils  # noqa: E402
+from comfy import model_management  # noqa: E402
+
+
+def _upscale_model():
+    torch.manual_seed(0)
+    return spandrel.ModelLoader().load_from_state_dict(ESRGAN(in_nc=3, out_nc=3, num_filters=8, num_blocks=1, scale=2).state_dict()).eval()
+
+
+@pytest.mark.parametrize("tiles_per_batch", [1, 3, 16])
+def test_tiled_scale_batched_matches_tiled_scale(tiles_per_batch):
+    conv = torch.nn.Conv2d(3, 3, 3, padding=1)
+    function = lambda a: conv(torch.nn.functional.interpolate(a, scale_factor=2, mode="nearest"))  # noqa: E731
+    samples = torch.rand(2, 3, 100, 75)
+    expected = comfy.utils.tiled_scale(samples, function, tile_x=32, tile_y=48, overlap=8, upscale_amount=2)
+    out = comfy.utils.tiled_scale_batched(samples, function, tile_x=32, tile_y=48, overlap=8, upscale_amount=2, tiles_per_batch=tiles_per_batch)
+    assert torch.allclose(out, expected, atol=1e-5)
+
+
+def test_upscale_model_is_managed():
+    upscale_model = _upscale_model()
+    patcher = comfy.upscale_model.model_patcher(upscale_model)
+    assert comfy.upscale_model.model_patcher(upscale_model) is patcher
+
+    image = torch.rand(2, 40, 48, 3)
+    out = comfy.upscale_model.upscale(upscale_model, image)
+    with torch.no_grad():
+        expected = upscale_model(image.movedim(-1, -3).to(patcher.load_device)).clamp(0, 1).movedim(-3, -1).cpu()
+    assert out.shape == (2, 80, 96, 3)
+    assert torch.allclose(out, expected, atol=1e-5)
+    assert any(m.model is patcher for m in model_management.current_loaded_models)
+
+    tile, tiles_per_batch = comfy.upscale_model.choose_tiling(upscale_model, patcher.load_device, (2, 3, 4096, 4096), 32)
+    assert tile in comfy.upscale_model.TILE_SIZES and 1 <= tiles_per_batch <= comfy.upscale_model.MAX_TILES_PER_BATCH
+    model_management.unload_all_models()
+
+
+def test_upscale_measures_after_loading(monkeypatch):
+    upscale_model = _upscale_model()
+    patcher = comfy.upscale_model.model_patcher(upscale_model)
+    loaded_at_measure = []
+
+    def measure(model, device):
+        loaded_at_measure.append(any(m.model is patcher for m in model_management.current_loaded_models))
+        return None
+
+    monkeypatch.setattr(comfy.upscale_model, "_memory_per_pixel", {})
+    monkeypatch.setattr(comfy.upscale_model, "_measure", measure)
+    comfy.upscale_model.upscale(upscale_model, torch.rand(1, 16, 16, 3))
+    assert loaded_at_measure == [True]
+    model_management.unload_all_models()
+
+
+def test_probe_failure_uses_estimate(monkeypatch):
+    upscale_model = _upscale_model()
+
+    def device_mismatch(device):
+        raise RuntimeError("Expected all tensors to be on the same device")
+
+    # Run the cuda probe path on the cpu, failing the way a model left on the offload device does
+    monkeypatch.setattr(comfy.upscale_model, "_memory_per_pixel", {})
+    monkeypatch.setattr(model_management, "is_device_cuda", lambda device: True)
+    monkeypatch.setattr(torch.cuda, "reset_peak_memory_stats", device_mismatch)
+    value = comfy.upscale_model.memory_per_pixel(upscale_model, torch.device("cpu"))
+    assert value == comfy.upscale_model._estimated_memory_per_pixel(upscale_model)
@@ -0,0 +1,43 @@
+import torch
+
+from comfy.cli_args import args
+if not torch.cuda.is_available():
+    args.cpu = True
+
+import comfy.sd  # noqa: E402
+import comfy.utils  # noqa: E402
+
+
+def _causal_decode(samples):
+    """Stand-in for a causal video VAE: the first latent frame gives 1 frame, every later one 4, with an 8x upscale."""
+    first = samples[:, :3, :1]
+    rest = samples[:, :3, 1:].repeat_interleave(4, dim=2) * torch.linspace(0.5, 1.0, 4).repeat(samples.shape[2] - 1).view(1, 1, -1, 1, 1)
+    frames = torch.cat((first, rest), dim=2)
+    return frames.repeat_interleave(8, dim=3).repeat_interleave(8, dim=4)
+
+
+def _vae():
+    vae = comfy.sd.VAE.__new__(comfy.sd.VAE)
+    vae.latent_dim = 3
+    vae.upscale_ratio = (lambda a: max(0, a * 4 - 3), 8, 8)
+    vae.upscale_index_formula = (4, 8, 8)
+    vae.decode = lambda samples, vae_options={}: _causal_decode(samples).movedim(1, -1)
+    return vae
+
+
+def test_decode_iter_temporal_matches_tiled_decode():
+    torch.manual_seed(0)
+    vae = _vae()
+    samples = torch.randn(2, 4, 11, 3, 5)
+    for tile_t, overlap_t in ((4, 1), (5, 2), (11, 1)):
+        chunks = list(vae.decode_iter(samples, tile_t=tile_t, overlap_t=overlap_t))
+        expected = comfy.utils.tiled_scale_multidim(samples, _causal_decode, tile=(tile_t, 99, 99), overlap=(overlap_t, 0, 0),
+                                                    upscale_amount=vae.upscale_ratio, index_formulas=vae.upscale_index_formula)
+        expected = expected.movedim(1, -1).reshape(-1, 24, 40, 3)
+        decoded = torch.cat(chunks)
+        assert decoded.shape == expected.shape == (2 * 41, 24, 40, 3)
+        assert torch.allclose(decoded, expected, atol=1e-6)
+        if tile_t < 11:
+            # Frames are yielded as soon as no later window overlaps them, not once per video
+            assert len(chunks) > 2
+            assert max(c.shape[0] for c in chunks) <= 4 * tile_t - 3
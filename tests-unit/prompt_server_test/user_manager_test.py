@@ -257,6 +257,21 @@ async def test_listuserdata_v2_default(aiohttp_client, app, tmp_path):
     assert file_paths == {"test_dir/file1.txt", "test_dir/subdir/file2.txt"}
 
 
+@pytest.mark.skipif(os.name == "nt", reason="symlinks need privileges on Windows")
+async def test_listuserdata_v2_does_not_follow_symlinks(aiohttp_client, app, tmp_path):
+    os.makedirs(tmp_path / "outside")
+    (tmp_path / "outside" / "secret.txt").write_text("content")
+    os.makedirs(tmp_path / "test_dir")
+    (tmp_path / "test_dir" / "file1.txt").write_text("content")
+    os.symlink(tmp_path / "outside", tmp_path / "test_dir" / "link")
+
+    client = await aiohttp_client(app)
+    resp = await client.get("/v2/userdata?path=test_dir")
+    assert resp.status == 200
+    data = await resp.json()
+    assert [(item["type"], item["path"]) for item in data] == [("directory", "test_dir/link"), ("file", "test_dir/file1.txt")]
+
+
 async def test_listuserdata_v2_normalized_separators(aiohttp_client, app, tmp_path, monkeypatch):
     # Force backslash as os separator
     monkeypatch.setattr(os, 'sep', '\\')
@@ -287,3 +302,69 @@ async def test_listuserdata_v2_url_encoded_path(aiohttp_client, app, tmp_path):
     assert entry["name"] == "file.txt"
     # Ensure the path is correctly decoded and uses forward slash
     assert entry["path"] == "my dir/file.txt"
+
+
+async def test_listuserdata_paginated(aiohttp_client, app, tmp_path):
+    os.makedirs(tmp_path / "test_dir" / "a")
+    for name in ("b.json", "a/c.json", "d.json", ".hidden.json"):
+        (tmp_path / "test_dir" / name).write_text("{}")
+
+    client = await aiohttp_client(app)
+    pages = []
+    cursor = None
+    while True:
+        url = "/userdata?dir=test_dir&recurse=true&limit=2" + (f"&cursor={cursor}" if cursor else "")
+        resp = await client.get(url)
+        assert resp.status == 200
+        body = await resp.json()
+        pages.append(body["items"])
+        cursor = body["pagination"]["next_cursor"]
+        if not body["pagination"]["has_more"]:
+            assert cursor is None
+            break
+    assert pages == [["a/c.json", "b.json"], ["d.json"]]
+
+    resp = await client.get("/userdata?dir=test_dir&limit=0")
+    assert resp.status == 400
+
+
+async def test_listuserdata_index_follows_write_move_delete(aiohttp_client, app, tmp_path):
+    os.makedirs(tmp_path / "test_dir")
+    (tmp_path / "test_dir" / "one.json").write_text("{}")
+
+    client = await aiohttp_client(app)
+    resp = await client.get("/userdata?dir=test_dir&full_info=true")
+    assert [(f["path"], f["size"]) for f in await resp.json()] == [("one.json", 2)]
+
+    # Overwriting in place does not change the directory mtime, the endpoint updates the index
+    resp = await client.post("/userdata/test_dir%2Fone.json", data=b'{"a": 1}')
+    assert resp.status == 200
+    resp = await client.get("/userdata?dir=test_dir&full_info=true")
+    assert [(f["path"], f["size"]) for f in await resp.json()] == [("one.json", 8)]
+
+    resp = await client.post("/userdata/test_dir%2Fone.json/move/test_dir%2Ftwo.json")
+    assert resp.status == 200
+    resp = await client.get("/userdata?dir=test_dir")
+    assert await resp.json() == ["two.json"]
+
+    resp = await client.delete("/userdata/test_dir%2Ftwo.json")
+    assert resp.status == 204
+    resp = await client.get("/userdata?dir=test_dir")
+    assert await resp.json() == []
+
+
+async def test_listuserdata_v2_paginated(aiohttp_client, app, tmp_path):
+    os.makedirs(tmp_path / "test_dir" / "sub")
+    (tmp_path / "test_dir" / "a.json").write_text("{}")
+    (tmp_path / "test_dir" / "b.json").write_text("{}")
+
+    client = await aiohttp_client(app)
+    resp = await client.get("/v2/userdata?path=test_dir&limit=2")
+    body = await resp.json()
+    assert [item["name"] for item in body["items"]] == ["sub", "a.json"]
+    assert body["pagination"]["has_more"]
+
+    resp = await client.get(f"/v2/userdata?path=test_dir&limit=2&cursor={body['pagination']['next_cursor']}")
+    body = await resp.json()
+    assert [item["name"] for item in body["items"]] == ["b.json"]
+    assert not body["pagination"]["has_more"]
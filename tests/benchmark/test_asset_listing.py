@@ -0,0 +1,119 @@
+"""
+Asset listing benchmark: seeds a large synthetic asset table, applies the migrations and checks
+the p95 latency of walking pages with the keyset cursor under common filter and sort combinations.
+
+    pytest tests/benchmark -m benchmark --assets-bench-rows 500000
+"""
+import os
+import random
+import time
+import uuid
+from datetime import datetime, timedelta
+
+import pytest
+import sqlalchemy as sa
+from alembic import command
+from alembic.config import Config
+from sqlalchemy.orm import Session
+
+from app.assets.database.models import Asset, AssetInfo, AssetInfoMeta, AssetInfoTag, Tag
+from app.assets.database.queries import list_asset_infos_page
+
+pytestmark = pytest.mark.benchmark
+
+PAGE_SIZE = 50
+PAGES = 100
+P95_LIMIT_MS = 250
+TAGS = [f"bench-{i}" for i in range(50)] + ["bench-rare"]
+CASES = {
+    "newest": {},
+    "name": {"sort": "name", "order": "asc"},
+    "one_tag": {"include_tags": ["bench-3"]},
+    "two_tags": {"include_tags": ["bench-3", "input"]},
+    "rare_tag": {"include_tags": ["bench-rare"]},
+    "exclude_tag": {"include_tags": ["output"], "exclude_tags": ["bench-1"]},
+    "metadata": {"metadata_filter": {"epoch": 42}},
+    "tag_and_metadata": {"include_tags": ["bench-2"], "metadata_filter": {"epoch": 2}},
+}
+
+
+COMFY_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
+
+
+def _alembic_config(db_url: str) -> Config:
+    config = Config(os.path.join(COMFY_ROOT, "alembic.ini"))
+    config.set_main_option("script_location", os.path.join(COMFY_ROOT, "alembic_db"))
+    config.set_main_option("sqlalchemy.url", db_url)
+    return config
+
+
+def _seed(engine: sa.Engine, rows: int) -> None:
+    rng = random.Random(0)
+    base = datetime(2025, 1, 1)
+    roots = ["models", "input", "output"]
+    with engine.begin() as conn:
+        conn.execute(sa.insert(Tag), [{"name": t, "tag_type": "user"} for t in TAGS])
+        for start in range(0, rows, 20_000):
+            assets, infos, tags, meta = [], [], [], []
+            for k in range(start, min(rows, start + 20_000)):
+                asset_id, info_id = str(uuid.UUID(int=rng.getrandbits(128))), str(uuid.UUID(int=rng.getrandbits(128)))
+                ts = base + timedelta(seconds=rng.randrange(10**8))
+                assets.append({"id": asset_id, "hash": None, "size_bytes": rng.randrange(10**9), "mime_type": None, "created_at": ts})
+                infos.append({
+                    "id": info_id, "owner_id": "", "name": f"bench_{k}.bin", "asset_id": asset_id, "preview_id": None,
+                    "user_metadata": {"epoch": k % 100}, "created_at": ts, "updated_at": ts, "last_access_time": ts,
+                })
+                row_tags = {roots[k % 3], TAGS[k % 50], TAGS[(k * 7) % 50]}
+                if k % 10_000 == 0:
+                    row_tags.add("bench-rare")
+                for tag in row_tags:
+                    tags.append({"asset_info_id": info_id, "tag_name": tag, "origin": "manual", "added_at": ts})
+                meta.append({
+                    "asset_info_id": info_id, "key": "epoch", "ordinal": 0,
+                    "val_str": None, "val_num": k % 100, "val_bool": None, "val_json": None,
+                })
+            conn.execute(sa.insert(Asset), assets)
+            conn.execute(sa.insert(AssetInfo), infos)
+            conn.execute(sa.insert(AssetInfoTag), tags)
+            conn.execute(sa.insert(AssetInfoMeta), meta)
+
+
+@pytest.fixture(scope="module")
+def bench_engine(tmp_path_factory, pytestconfig):
+    rows = pytestconfig.getoption("assets_bench_rows")
+    db_url = f"sqlite:///{tmp_path_factory.mktemp('assets_bench') / 'assets.sqlite3'}"
+    config = _alembic_config(db_url)
+    # Seed at the initial revision and migrate afterwards, like an existing large install upgrading
+    command.upgrade(config, "0001_assets")
+    engine = sa.create_engine(db_url)
+    _seed(engine, rows)
+    command.upgrade(config, "head")
+    yield engine
+    engine.dispose()
+
+
+@pytest.mark.parametrize("case", list(CASES))
+def test_keyset_listing_p95(bench_engine, case, skip_timing_checks):
+    kwargs = CASES[case]
+    sort = kwargs.get("sort", "created_at")
+    after = None
+    timings = []
+    seen = set()
+    for _ in range(PAGES):
+        with Session(bench_engine) as session:
+            start = time.perf_counter()
+            infos, _tags, _total = list_asset_infos_page(session, limit=PAGE_SIZE, after=after, **kwargs)
+            timings.append((time.perf_counter() - start) * 1000)
+        if not infos:
+            break
+        ids = {info.id for info in infos}
+        assert not ids & seen, "keyset pages must not overlap"
+        seen |= ids
+        last = infos[-1]
+        after = (getattr(last, sort), last.id)
+
+    timings.sort()
+    p95 = timings[min(len(timings) - 1, int(len(timings) * 0.95))]
+    print(f"{case}: {len(timings)} pages, p50 {timings[len(timings) // 2]:.1f} ms, p95 {p95:.1f} ms")  # noqa: T201
+    if not skip_timing_checks:
+        assert p95 < P95_LIMIT_MS, f"{case}: p95 listing latency {p95:.1f} ms"
@@ -0,0 +1,95 @@
+"""
+FirstBlockCache benchmark: runs an Euler sampling loop on a randomly initialized Flux sized model with and without
+the cache and reports the time per step and how close the cached result is to the uncached one for a few thresholds.
+
+    pytest tests/benchmark/test_first_block_cache.py -m benchmark -s
+"""
+import time
+
+import pytest
+import torch
+
+from comfy.cli_args import args
+if not torch.cuda.is_available():
+    args.cpu = True
+
+import comfy.model_management  # noqa: E402
+import comfy.model_patcher  # noqa: E402
+from comfy.ldm.flux.model import Flux  # noqa: E402
+from comfy_extras.nodes_easycache import apply_first_block_cache  # noqa: E402
+
+pytestmark = pytest.mark.benchmark
+
+STEPS = 20
+THRESHOLDS = [0.0, 0.2, 0.4, 0.8]
+
+
+class ModelHolder(torch.nn.Module):
+    def __init__(self, diffusion_model):
+        super().__init__()
+        self.diffusion_model = diffusion_model
+
+
+class FlowSampling:
+    def percent_to_sigma(self, percent):
+        return 1.0 - percent
+
+
+def _model(device, dtype):
+    torch.manual_seed(0)
+    model = Flux(in_channels=16, out_channels=16, vec_in_dim=64, context_in_dim=64, hidden_size=256, mlp_ratio=4.0, num_heads=4,
+                 depth=4, depth_single_blocks=8, axes_dim=[16, 24, 24], theta=10000, patch_size=2, qkv_bias=True,
+                 guidance_embed=False, txt_ids_dims=[], operations=torch.nn)
+    with torch.no_grad():
+        for param in model.parameters():
+            param.normal_(0.0, 0.02)
+    return model.to(device, dtype)
+
+
+def _sample(patcher, device, dtype):
+    model = patcher.get_model_object("diffusion_model")
+    transformer_options = patcher.model_options["transformer_options"]
+    if "first_block_cache" in transformer_options:
+        transformer_options["first_block_cache"] = transformer_options["first_block_cache"].clone().prepare_timesteps(FlowSampling())
+    generator = torch.Generator().manual_seed(1)
+    x = torch.randn(1, 16, 64, 64, generator=generator).to(device, dtype)
+    context = torch.randn(1, 128, 64, generator=generator).to(device, dtype)
+    y = torch.randn(1, 64, generator=generator).to(device, dtype)
+    sigmas = torch.linspace(1.0, 0.0, STEPS + 1)
+    with torch.inference_mode():
+        comfy.model_management.synchronize()
+        start = time.perf_counter()
+        for i in range(STEPS):
+            sigma = sigmas[i:i + 1].to(device)
+            options = dict(transformer_options, sigmas=sigma, uuids=["cond"], wrappers=patcher.wrappers)
+            denoised = x - model(x, sigma, context, y, transformer_options=options) * sigma
+            x = denoised + (x - denoised) * (sigmas[i + 1] / sigmas[i]).item()
+        comfy.model_management.synchronize()
+    return x.float().cpu(), (time.perf_counter() - start) / STEPS, transformer_options.get("first_block_cache", None)
+
+
+def _psnr(a, b):
+    mse = torch.mean((a - b) ** 2).item()
+    peak = (b.max() - b.min()).item()
+    return float("inf") if mse == 0 else 10.0 * torch.log10(torch.tensor(peak ** 2 / mse)).item()
+
+
+def test_first_block_cache_speed_and_quality():
+    device = comfy.model_management.get_torch_device()
+    dtype = torch.float32 if device.type == "cpu" else torch.float16
+    patcher = comfy.model_patcher.ModelPatcher(ModelHolder(_model(device, dtype)), device, device)
+    reference, reference_time, _ = _sample(patcher, device, dtype)
+    print(f"\nuncached: {reference_time * 1000:.1f} ms/step")  # noqa: T201
+
+    results = {}
+    for threshold in THRESHOLDS:
+        out, step_time, fbcache = _sample(apply_first_block_cache(patcher, threshold, 1, 0.0, 1.0), device, dtype)
+        cosine = torch.nn.functional.cosine_similarity(out.flatten(), reference.flatten(), dim=0).item()
+        results[threshold] = (fbcache.total_calls_skipped, step_time)
+        print(f"threshold {threshold}: {step_time * 1000:.1f} ms/step, skipped {fbcache.total_calls_skipped}/{fbcache.total_calls}, "  # noqa: T201
+              f"psnr {_psnr(out, reference):.2f} dB, cosine {cosine:.5f}")
+        if threshold == 0.0:
+            assert fbcache.total_calls_skipped == 0
+            assert torch.allclose(out, reference, atol=1e-3)
+
+    assert results[THRESHOLDS[-1]][0] > 0
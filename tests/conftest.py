@@ -6,6 +6,7 @@ def pytest_addoption(parser):
     parser.addoption('--output_dir', action="store", default='tests/inference/samples', help='Output directory for generated images')
     parser.addoption("--listen", type=str, default="127.0.0.1", metavar="IP", nargs="?", const="0.0.0.0", help="Specify the IP address to listen on (default: 127.0.0.1). If --listen is provided without an argument, it defaults to 0.0.0.0. (listens on all)")
     parser.addoption("--port", type=int, default=8188, help="Set the listen port.")
+    parser.addoption("--assets-bench-rows", type=int, default=100_000, help="Number of synthetic assets seeded by the asset listing benchmark.")
     parser.addoption("--skip-timing-checks", action="store_true", default=False, help="Skip timing-related assertions in tests (useful for CI environments with variable performance)")
 
 # This initializes args at the beginning of the test session